@@ -0,0 +1,120 @@
+"""Per-query cost of materials search: full rows vs projected rows.
+
+Builds a throwaway LanceDB materials table of random vectors (no
+encoder needed) and times the two result paths at several limits:
+
+* ``full``      — ``to_pandas()`` with the vector column, ``to_dict
+  ("records")`` and a ``MaterialChunk`` per row (the old path);
+* ``projected`` — ``select(...)`` + ``to_arrow()`` + ``MaterialHit``
+  rows (what ``VectorDBService.search_materials`` does now).
+
+Reports median latency and the tracemalloc peak per query.
+
+    cd Backend/AIMicroservice
+    python -m benchmarks.bench_vector_search --rows 20000 --queries 200
+"""
+
+import argparse
+import functools
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import lancedb
+import numpy as np
+import pyarrow as pa
+from lancedb.table import Table
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from models.dtos.vector_db_dtos import MaterialChunk, MaterialHit  # noqa: E402
+from services.vector_db_service import _MATERIAL_COLUMNS, material_hits, vector_column  # noqa: E402
+
+DIM = 384
+LIMITS = (5, 20, 100)
+
+
+def build_table(db: lancedb.DBConnection, rows: int, users: int, seed: int) -> Table:
+    rng = np.random.default_rng(seed)
+    owners = [str(uuid.UUID(int=i + 1)) for i in range(users)]
+    vectors = rng.standard_normal((rows, DIM), dtype=np.float32)
+    data = pa.table({
+        "text": [f"chunk {i} " + "lorem ipsum " * 60 for i in range(rows)],
+        "vector": vector_column(vectors, pa.float32()),
+        "source": [f"doc-{i % 50}.pdf" for i in range(rows)],
+        "chunk_index": pa.array(np.arange(rows), type=pa.int64()),
+        "user_id": [owners[i % users] for i in range(rows)],
+        "content_hash": [None] * rows,
+    })
+    return db.create_table("materials", data=data)
+
+
+def full_rows(table: Table, query: List[float], limit: int, user_id: str) -> List[MaterialChunk]:
+    df = table.search(query).where(f"user_id = '{user_id}'", prefilter=True).limit(limit).to_pandas()
+    records = df.to_dict("records")
+    for r in records:
+        r.pop("user_id", None)
+    return [MaterialChunk(**r) for r in records]
+
+
+def projected_rows(table: Table, query: List[float], limit: int, user_id: str) -> List[MaterialHit]:
+    results = (
+        table.search(query)
+        .where(f"user_id = '{user_id}'", prefilter=True)
+        .select(_MATERIAL_COLUMNS)
+        .limit(limit)
+        .to_arrow()
+    )
+    return material_hits(results, user_id)
+
+
+def measure(fn: Callable[[], object], queries: int) -> Dict[str, float]:
+    fn()  # warm caches / lazy dataset open
+    latencies = []
+    peaks = []
+    for _ in range(queries):
+        tracemalloc.start()
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "peak_kib": statistics.median(peaks) / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed + 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        table = build_table(lancedb.connect(tmp), args.rows, args.users, args.seed)
+        user_id = str(uuid.UUID(int=1))
+        print(f"{args.rows} rows, {args.users} users, dim {DIM}, {args.queries} queries per cell")
+        print(f"{'limit':>5}  {'path':<10} {'p50 ms':>8} {'peak KiB':>10}")
+        for limit in LIMITS:
+            query = rng.standard_normal(DIM, dtype=np.float32).tolist()
+            results = {}
+            for name, fn in (("full", full_rows), ("projected", projected_rows)):
+                results[name] = measure(functools.partial(fn, table, query, limit, user_id), args.queries)
+                r = results[name]
+                print(f"{limit:>5}  {name:<10} {r['p50_ms']:>8.2f} {r['peak_kib']:>10.1f}")
+            speedup = results["full"]["p50_ms"] / max(results["projected"]["p50_ms"], 1e-9)
+            saved = 1 - results["projected"]["peak_kib"] / max(results["full"]["peak_kib"], 1e-9)
+            print(f"{limit:>5}  {'Δ':<10} {speedup:>7.2f}x {saved:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
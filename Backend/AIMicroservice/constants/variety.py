@@ -1,6 +1,6 @@
 import random
 from collections import deque
-from typing import Deque, Dict, List
+from typing import Deque, Dict, List, Tuple
 
 
 # Massively expanded topic pool. The previous list of ~22 per tier was
@@ -326,6 +326,14 @@ class VarietyPicker:
         recent.append(chosen)
         return chosen
 
+    def recent_topics(self, session_key: str) -> Tuple[str, ...]:
+        return tuple(self._topic_history(session_key))
+
+    def remember_topic(self, session_key: str, topic: str) -> None:
+        """Record a topic chosen elsewhere (e.g. a pre-generated task)
+        so later picks for this session steer away from it."""
+        self._topic_history(session_key).append(topic)
+
     def pick_tone(self, session_key: str = "global") -> str:
         recent = self._tone_history(session_key)
         candidates = [t for t in TONES if t not in recent] or TONES
@@ -5,6 +5,10 @@ Two call shapes:
                                       (uses INTERNAL_SERVICE_KEY to read raw value)
   - {aiProviderId, token}          → verify a freshly-typed key before save
 
+Verifying also drops the caller's cached token list (see
+`services.user_service`), and `/ai-tokens/invalidate` lets the User
+service do the same whenever a token is added, removed or made default.
+
 Returned shape never throws on bad-key — we always return success=true and
 encode validity in `payload.valid`. That keeps the frontend free of
 exception-handling for an expected-no-result case.
@@ -24,8 +28,8 @@ from litellm.exceptions import (
 
 from models.base_response import BaseResponse
 from services.ai_service import PROVIDER_CONFIG
-from services.user_service import UserService
-from utils.user_context import extract_user_context
+from services.user_service import UserService, invalidate_ai_tokens
+from utils.user_context import extract_user_context, require_internal_key
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +78,9 @@ class AITokenVerifyController:
                 raise_with_code,
             )
             ctx = extract_user_context(request)
+            # The user is checking a saved key, probably because it just
+            # changed — don't answer from the cached list.
+            invalidate_ai_tokens(ctx.user_id)
             tokens = await self.user_service.get_ai_tokens(ctx)
             for tok in tokens:
                 if tok.get("id") == payload.token_id:
@@ -100,6 +107,17 @@ class AITokenVerifyController:
         )
 
     def _setup_routes(self) -> None:
+        @self.router.post("/invalidate", response_model=BaseResponse[bool])
+        async def invalidate_tokens(request: Request) -> BaseResponse[bool]:
+            """Called by the User service (internal key + x-user-id)
+            after the user's tokens change."""
+            # Only the User service may call this; a browser holding a
+            # valid JWT must not flush other users' cached tokens.
+            require_internal_key(request)
+            ctx = extract_user_context(request)
+            invalidate_ai_tokens(ctx.user_id)
+            return BaseResponse[bool](success=True, payload=True)
+
         @self.router.post(
             "/verify",
             response_model=BaseResponse[VerifyAITokenResponse],
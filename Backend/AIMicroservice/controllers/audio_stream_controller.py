@@ -0,0 +1,56 @@
+from fastapi import APIRouter, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from services.audio_streams import AudioStreamStore
+
+
+class AudioStreamController:
+    """`/static/audio/stream/{id}.mp3` — listening audio while it is
+    still being synthesised (see AudioStreamStore). Lives under
+    /static because that is what the reverse proxy forwards to this
+    service without auth, like the finished files; the router has to
+    be included before the StaticFiles mount."""
+
+    def __init__(self, store: AudioStreamStore) -> None:
+        self.router = APIRouter(prefix="/static/audio/stream", tags=["Listening"])
+        self.store = store
+        self._setup_routes()
+
+    def _setup_routes(self) -> None:
+        @self.router.get("/{stream_id}.mp3")
+        async def stream_audio(stream_id: str) -> Response:
+            from utils.error_codes import (
+                LISTENING_AUDIO_FAILED,
+                LISTENING_AUDIO_NOT_FOUND,
+                raise_with_code,
+            )
+
+            stream = self.store.get(stream_id)
+            if stream is None:
+                path = self.store.file_path(stream_id)
+                if path is None:
+                    raise_with_code(
+                        LISTENING_AUDIO_NOT_FOUND,
+                        status.HTTP_404_NOT_FOUND,
+                        "Audio not found or expired",
+                    )
+                return FileResponse(path, media_type="audio/mpeg")
+
+            # Hold the response until the first clip exists, so a
+            # synthesis failure is still an error status, not an
+            # empty 200.
+            await stream.wait_started()
+            if not stream.chunks:
+                raise_with_code(
+                    LISTENING_AUDIO_FAILED,
+                    status.HTTP_502_BAD_GATEWAY,
+                    stream.error or "Audio synthesis failed",
+                )
+            return StreamingResponse(
+                stream.iter_bytes(),
+                media_type="audio/mpeg",
+                headers={"Cache-Control": "no-store"},
+            )
+
+    def get_router(self) -> APIRouter:
+        return self.router
@@ -2,12 +2,14 @@ from typing import Optional
 from pydantic import BaseModel
 
 from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 from models.dtos.listening_task_dto import ListeningTaskRequest
 from models.base_response import BaseResponse
 from models.responses.listening_task_response import ListeningTaskResponse
 from services.listening_task_service import ListeningTaskService
 from services.user_service import UserService
 from services.writing_task_service import WritingTaskService
+from utils.sse import Emit, delta_forwarder, question_forwarder, sse_response
 from utils.user_context import extract_user_context
 
 
@@ -67,6 +69,28 @@ class ListeningController:
             )
             return BaseResponse[ListeningTaskResponse](success=True, payload=task_response)
 
+        @self.router.post("/listening/stream")
+        async def create_listening_task_stream(
+            request: Request, task_request: ListeningTaskRequest
+        ) -> StreamingResponse:
+            """SSE variant of /listening: `delta` events carry the
+            transcript + questions JSON as the model writes it,
+            `question` events each validated question as it closes,
+            then a `result` event (with the synthesized audio URL)
+            identical to the /listening body."""
+            user_context = extract_user_context(request)
+
+            async def job(emit: Emit) -> BaseResponse[ListeningTaskResponse]:
+                task_response = await self.listening_task_service.create_listening_task(
+                    task_request,
+                    user_context=user_context,
+                    on_delta=delta_forwarder(emit),
+                    on_question=question_forwarder(emit),
+                )
+                return BaseResponse[ListeningTaskResponse](success=True, payload=task_response)
+
+            return sse_response(job)
+
         @self.router.post(
             "/listening/adaptive",
             response_model=BaseResponse[AdaptiveListeningResponse],
@@ -1,12 +1,14 @@
 from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Body, Request
 from services.material_service import MaterialService
-from services.vector_db_service import VectorDBService
-from services.ai_service import AI_Service
+from services.service_registry import get_service_registry
 from pydantic import BaseModel
 import logging
 from models.base_response import BaseResponse
-from models.dtos.material_dtos import ProcessPdfResponse, GenerateQuizResponse, DocumentMap
+from models.dtos.material_dtos import ProcessPdfResponse, GenerateQuizResponse, DocumentMap, QuizQuestion, UploadJobStatus
+from services.upload_jobs import get_upload_job_store
+from fastapi.responses import StreamingResponse
+from utils.sse import Emit, sse_response
 from utils.user_context import extract_user_context
 
 logging.basicConfig(level=logging.INFO)
@@ -16,9 +18,9 @@ router = APIRouter(prefix="/materials", tags=["materials"])
 
 
 def get_material_service() -> MaterialService:
-    vector_db = VectorDBService()
-    ai_service = AI_Service()
-    return MaterialService(vector_db, ai_service)
+    # Shared instance — MaterialService holds no per-request state, and
+    # building one per call used to reload the sentence encoder.
+    return get_service_registry().material_service
 
 
 class GenerateQuizRequest(BaseModel):
@@ -29,6 +31,9 @@ class GenerateQuizRequest(BaseModel):
     # Optional so older clients still work — backend re-derives the
     # map from indexed material when this is missing.
     document_map: Optional[DocumentMap] = None
+    # Or just the `document_id` /materials/upload returned; the stored
+    # map is loaded server-side.
+    document_id: Optional[str] = None
 
 
 class MaterialsErrorExample(BaseModel):
@@ -53,8 +58,11 @@ class MaterialsResultRequest(BaseModel):
     model_config = {"populate_by_name": True}
 
 
-@router.post("/upload", response_model=BaseResponse[ProcessPdfResponse])
+@router.post("/upload", response_model=BaseResponse[ProcessPdfResponse], deprecated=True)
 async def upload_pdf(request: Request, file: UploadFile = File(...), service: MaterialService = Depends(get_material_service)) -> BaseResponse[ProcessPdfResponse]:
+    """Deprecated: holds the request open for the whole ingestion.
+    Kept for older clients; use POST /upload/jobs and poll
+    GET /upload/jobs/{job_id} instead."""
     from utils.error_codes import (
         FILE_NAME_REQUIRED,
         FILE_TYPE_PDF_ONLY,
@@ -87,6 +95,51 @@ async def upload_pdf(request: Request, file: UploadFile = File(...), service: Ma
         raise_with_code(FILE_PROCESSING_FAILED, 500, str(e))
 
 
+@router.post("/upload/jobs", response_model=BaseResponse[UploadJobStatus], status_code=202)
+async def start_upload_job(
+    request: Request,
+    file: UploadFile = File(...),
+    service: MaterialService = Depends(get_material_service)
+) -> BaseResponse[UploadJobStatus]:
+    """Non-blocking variant of /upload: starts ingestion in the
+    background and returns a job id right away. Poll
+    GET /upload/jobs/{job_id} for progress and the final result."""
+    from utils.error_codes import (
+        FILE_NAME_REQUIRED,
+        FILE_TYPE_PDF_ONLY,
+        raise_with_code,
+    )
+    user_context = extract_user_context(request)
+    if not file.filename:
+        raise_with_code(FILE_NAME_REQUIRED, 400, "File name is required")
+
+    if not file.filename.lower().endswith(".pdf"):
+        logger.warning(f"Rejected non-PDF file: {file.filename}")
+        raise_with_code(FILE_TYPE_PDF_ONLY, 400, "Only PDF files are supported")
+
+    content = await file.read()
+    filename = file.filename
+    logger.info(f"Queued PDF ingestion job for {filename} ({len(content)} bytes).")
+    status = await get_upload_job_store().submit(
+        user_context.user_id,
+        filename,
+        lambda progress: service.process_pdf(
+            content, filename, user_context=user_context, on_progress=progress
+        ),
+    )
+    return BaseResponse[UploadJobStatus](success=True, payload=status)
+
+
+@router.get("/upload/jobs/{job_id}", response_model=BaseResponse[UploadJobStatus])
+async def get_upload_job(request: Request, job_id: str) -> BaseResponse[UploadJobStatus]:
+    from utils.error_codes import UPLOAD_JOB_NOT_FOUND, raise_with_code
+    user_context = extract_user_context(request)
+    status = await get_upload_job_store().get(job_id, user_context.user_id)
+    if status is None:
+        raise_with_code(UPLOAD_JOB_NOT_FOUND, 404, f"Upload job {job_id} not found")
+    return BaseResponse[UploadJobStatus](success=True, payload=status)
+
+
 @router.post("/quiz", response_model=BaseResponse[GenerateQuizResponse])
 async def generate_quiz(
     request: Request,
@@ -102,6 +155,7 @@ async def generate_quiz(
             user_context=user_context,
             target_language=body.target_language,
             document_map=body.document_map,
+            document_id=body.document_id,
         )
 
         logger.info("Quiz generated successfully.")
@@ -113,6 +167,46 @@ async def generate_quiz(
         raise_with_code(TASK_GENERATION_FAILED, 500, str(e))
 
 
+@router.post("/quiz/stream")
+async def generate_quiz_stream(
+    request: Request,
+    body: GenerateQuizRequest = Body(...),
+    service: MaterialService = Depends(get_material_service)
+) -> StreamingResponse:
+    """SSE variant of /quiz. Emits `delta` events ({"exercise": i,
+    "text": ...}) as each exercise's questions are generated and a
+    `question` event for every question the moment it validates, then
+    a `result` event with the same body /quiz returns."""
+    from utils.error_codes import TASK_GENERATION_FAILED, raise_with_code
+    user_context = extract_user_context(request)
+
+    async def job(emit: Emit) -> BaseResponse[GenerateQuizResponse]:
+        async def on_delta(exercise_index: int, text: str) -> None:
+            await emit("delta", {"exercise": exercise_index, "text": text})
+
+        async def on_question(exercise_index: int, question: QuizQuestion) -> None:
+            await emit("question", {"exercise": exercise_index, "question": question})
+
+        try:
+            result = await service.generate_quiz(
+                body.selected_types,
+                user_context=user_context,
+                target_language=body.target_language,
+                document_map=body.document_map,
+                document_id=body.document_id,
+                on_delta=on_delta,
+                on_question=on_question,
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating quiz: {str(e)}", exc_info=True)
+            raise_with_code(TASK_GENERATION_FAILED, 500, str(e))
+        return BaseResponse[GenerateQuizResponse](success=True, payload=result)
+
+    return sse_response(job)
+
+
 @router.post("/result", response_model=BaseResponse[bool])
 async def log_materials_result(
     request: Request, body: MaterialsResultRequest
@@ -13,6 +13,7 @@ from models.responses.speaking_format_response import (
     SpeakingGradeResponse,
     is_known_format,
 )
+from utils.uploads import read_upload_with_digest
 from utils.user_context import extract_user_context
 import logging
 
@@ -67,7 +68,7 @@ class SpeakingController:
             language: str = Query(...),
             ui_locale: str = Query("en", alias="uiLocale"),
         ) -> BaseResponse[SpeakingAnalysisResponse]:
-            audio_bytes = await audio_file.read()
+            audio_bytes, audio_digest = await read_upload_with_digest(audio_file)
             logger.debug(f"Received audio file: {audio_file.filename}, size: {len(audio_bytes)} bytes")
             user_context = extract_user_context(request)
             result = await self.speaking_service.analyze_user_audio(
@@ -76,6 +77,7 @@ class SpeakingController:
                 language,
                 user_context=user_context,
                 ui_locale=ui_locale,
+                audio_digest=audio_digest,
             )
 
             # FR6 — persist each identified error to the user's recurring
@@ -85,17 +87,22 @@ class SpeakingController:
 
             language_code = to_iso_language(language)
             if language_code:
+                # One upsert per error, dispatched concurrently off the
+                # request path.
                 for err in result.identified_errors:
-                    await self.user_service.record_user_error(
-                        user_context,
-                        {
-                            "languageCode": language_code,
-                            "errorText": err.erroneous_text,
-                            "correction": err.suggestion,
-                            "errorType": err.error_type,
-                            "source": "speaking",
-                            "context": err.explanation,
-                        },
+                    self.user_service.dispatch(
+                        self.user_service.record_user_error(
+                            user_context,
+                            {
+                                "languageCode": language_code,
+                                "errorText": err.erroneous_text,
+                                "correction": err.suggestion,
+                                "errorType": err.error_type,
+                                "source": "speaking",
+                                "context": err.explanation,
+                            },
+                        ),
+                        name="speaking.user_error",
                     )
 
             return BaseResponse(success=True, payload=result)
@@ -203,10 +210,11 @@ class SpeakingController:
                     400,
                     f"Unknown speaking format: {format}",
                 )
-            audio_bytes = await audio_file.read()
+            audio_bytes, audio_digest = await read_upload_with_digest(audio_file)
             user_context = extract_user_context(request)
             result = await self.speaking_service.grade_speaking_response(
                 audio_file_bytes=audio_bytes,
+                audio_digest=audio_digest,
                 filename=audio_file.filename,
                 language=language,
                 format=format,
@@ -1,6 +1,7 @@
-from typing import Literal, Optional, Union
+from typing import Awaitable, Callable, Literal, Optional, Union
 
 from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from services.writing_task_service import WritingTaskService
@@ -12,7 +13,8 @@ from models.request.explain_answer_request import ExplainAnswerRequest
 from models.responses.explain_answer_response import ExplainAnswerResponse
 from models.request.writing_task_request import WritingTaskRequest
 from models.base_response import BaseResponse
-from utils.user_context import extract_user_context
+from utils.sse import Emit, delta_forwarder, sse_response
+from utils.user_context import UserContext, extract_user_context
 
 
 class AdaptiveWritingRequest(BaseModel):
@@ -92,6 +94,47 @@ class WritingController:
         self.user_service = user_service
         self._setup_routes()
 
+    async def _evaluate_and_log_essay(
+        self,
+        body: EssayEvaluateRequest,
+        user_context: UserContext,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+    ) -> EssayEvaluation:
+        from utils.language_codes import to_iso_language
+
+        evaluation = await self.writing_task_service.evaluate_essay(
+            body.language,
+            body.level,
+            topic=body.topic,
+            essay=body.essay,
+            word_count_target=body.wordCountTarget,
+            user_context=user_context,
+            on_delta=on_delta,
+        )
+
+        # Log to TaskHistoryEntry — same shape as other writing
+        # results so the existing adaptive-focus deriver can read
+        # the weaknesses field.
+        await self.user_service.log_task_history(
+            user_context,
+            {
+                "taskType": "writing",
+                "title": f"Essay practice ({body.language})",
+                "score": evaluation.score,
+                "language": to_iso_language(body.language),
+                "metadata": {
+                    "flavour": "essay",
+                    "isCorrect": evaluation.passed,
+                    "topic": body.topic[:200],
+                    "lessonId": body.lessonId,
+                    "wordCount": evaluation.word_count,
+                    "wordCountTarget": evaluation.word_count_target,
+                    "weaknesses": evaluation.weaknesses,
+                },
+            },
+        )
+        return evaluation
+
     def _setup_routes(self) -> None:
         @self.router.post(
             "/multiplechoice",
@@ -256,18 +299,14 @@ class WritingController:
             Reuses MaterialService.generate_standalone_task — same
             Stage 2 + Stage 3 pipeline + dedup safeguards as Materials,
             so a quality fix in either path benefits both."""
-            from services.material_service import MaterialService
-            from services.vector_db_service import VectorDBService
-            from services.ai_service import AI_Service
+            from services.service_registry import get_service_registry
             from utils.error_codes import (
                 AI_RESPONSE_PARSE_FAILED,
                 raise_with_code,
             )
 
             user_context = extract_user_context(request)
-            material_service = MaterialService(
-                VectorDBService(), AI_Service()
-            )
+            material_service = get_service_registry().material_service
             history = await self.user_service.get_recent_history(
                 user_context, limit=20
             )
@@ -321,40 +360,25 @@ class WritingController:
             """Grade a learner's essay 0-100 and log the outcome to
             history so adaptive logic can pick up writing weaknesses."""
             user_context = extract_user_context(request)
-            from utils.language_codes import to_iso_language
+            evaluation = await self._evaluate_and_log_essay(body, user_context)
+            return BaseResponse[EssayEvaluation](success=True, payload=evaluation)
 
-            evaluation = await self.writing_task_service.evaluate_essay(
-                body.language,
-                body.level,
-                topic=body.topic,
-                essay=body.essay,
-                word_count_target=body.wordCountTarget,
-                user_context=user_context,
-            )
+        @self.router.post("/essay/evaluate/stream")
+        async def evaluate_essay_stream(
+            request: Request, body: EssayEvaluateRequest
+        ) -> StreamingResponse:
+            """SSE variant of /essay/evaluate: `delta` events carry the
+            grader's raw output as it is generated, then one `result`
+            event with the same body /essay/evaluate returns."""
+            user_context = extract_user_context(request)
 
-            # Log to TaskHistoryEntry — same shape as other writing
-            # results so the existing adaptive-focus deriver can read
-            # the weaknesses field.
-            await self.user_service.log_task_history(
-                user_context,
-                {
-                    "taskType": "writing",
-                    "title": f"Essay practice ({body.language})",
-                    "score": evaluation.score,
-                    "language": to_iso_language(body.language),
-                    "metadata": {
-                        "flavour": "essay",
-                        "isCorrect": evaluation.passed,
-                        "topic": body.topic[:200],
-                        "lessonId": body.lessonId,
-                        "wordCount": evaluation.word_count,
-                        "wordCountTarget": evaluation.word_count_target,
-                        "weaknesses": evaluation.weaknesses,
-                    },
-                },
-            )
+            async def job(emit: Emit) -> BaseResponse[EssayEvaluation]:
+                evaluation = await self._evaluate_and_log_essay(
+                    body, user_context, on_delta=delta_forwarder(emit)
+                )
+                return BaseResponse[EssayEvaluation](success=True, payload=evaluation)
 
-            return BaseResponse[EssayEvaluation](success=True, payload=evaluation)
+            return sse_response(job, exclude_none=True)
 
         @self.router.post(
             "/explainanswer",
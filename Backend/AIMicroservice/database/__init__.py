@@ -1,4 +1,21 @@
 from database.connection import async_session, engine, Base
-from database.models import LessonCompletion
+from database.models import (
+    DocumentMapRecord,
+    LessonCompletion,
+    MaterialDocument,
+    MaterialOwnership,
+    PlacementItem,
+    UploadJobRecord,
+)
 
-__all__ = ["async_session", "engine", "Base", "LessonCompletion"]
+__all__ = [
+    "async_session",
+    "engine",
+    "Base",
+    "LessonCompletion",
+    "MaterialDocument",
+    "MaterialOwnership",
+    "DocumentMapRecord",
+    "PlacementItem",
+    "UploadJobRecord",
+]
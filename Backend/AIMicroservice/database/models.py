@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
+from typing import Any, Optional
 
-from sqlalchemy import DateTime, String, UniqueConstraint
+from sqlalchemy import JSON, Boolean, DateTime, Float, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from database.connection import Base
@@ -20,3 +21,115 @@ class LessonCompletion(Base):
     __table_args__ = (
         UniqueConstraint("user_id", "lesson_id", name="uq_user_lesson"),
     )
+
+
+class MaterialDocument(Base):
+    """One ingested PDF, keyed by the SHA-256 of its bytes. Its chunks
+    and embeddings live once in the LanceDB materials table under the
+    same `content_hash`; users reach them through MaterialOwnership."""
+
+    __tablename__ = "material_documents"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    chunks_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # ProcessPdfResponse.analyzed_types / .document_map of the first upload.
+    analyzed_types: Mapped[Any] = mapped_column(JSON, nullable=False, default=list)
+    document_map: Mapped[Optional[Any]] = mapped_column(JSON, nullable=True)
+    # Whose n-gram fingerprint file later owners copy.
+    source_owner_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    source_filename: Mapped[str] = mapped_column(String(512), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+
+class MaterialOwnership(Base):
+    __tablename__ = "material_ownerships"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    content_hash: Mapped[str] = mapped_column(
+        String(64), ForeignKey("material_documents.content_hash"), nullable=False
+    )
+    filename: Mapped[str] = mapped_column(String(512), nullable=False)
+    uploaded_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "content_hash", name="uq_user_material"),
+    )
+
+
+class DocumentMapRecord(Base):
+    """The DocumentMap `process_pdf` produced for one user's upload, so
+    generate_quiz can load it by id instead of re-classifying."""
+
+    __tablename__ = "document_maps"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    filename: Mapped[str] = mapped_column(String(512), nullable=False)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    document_map: Mapped[Any] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+    __table_args__ = (
+        # Re-uploading a file of the same name replaces its map.
+        UniqueConstraint("user_id", "filename", name="uq_user_document_map"),
+    )
+
+
+class PlacementItem(Base):
+    """One validated placement task in the adaptive item bank, with its
+    IRT difficulty (logits) and answer statistics. See ItemBank."""
+
+    __tablename__ = "placement_items"
+
+    # The task's own id, as served to the client.
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    language: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Prompts/descriptions are written in the UI language.
+    ui_locale: Mapped[str] = mapped_column(String(64), nullable=False)
+    task_type: Mapped[str] = mapped_column(String(32), nullable=False)
+    # CEFR level the task was generated for; seeds `difficulty`.
+    seed_level: Mapped[str] = mapped_column(String(2), nullable=False)
+    payload: Mapped[Any] = mapped_column(JSON, nullable=False)
+    difficulty: Mapped[float] = mapped_column(Float, nullable=False)
+    guess: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    responses: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    correct: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    retired: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+    __table_args__ = (
+        # Shelf loads: every live item of one (language, UI language).
+        Index("ix_placement_items_shelf", "language", "ui_locale", "retired"),
+    )
+
+
+class UploadJobRecord(Base):
+    """Last known UploadJobStatus of a background PDF ingestion job, so
+    any replica can answer polls for it. See UploadJobStore."""
+
+    __tablename__ = "upload_jobs"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    user_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    # UploadJobStatus.model_dump(mode="json").
+    status: Mapped[Any] = mapped_column(JSON, nullable=False)
+    # Bumped by the owning replica while the job runs; a queued/running
+    # row that stops being bumped belongs to a replica that went away.
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        index=True,
+    )
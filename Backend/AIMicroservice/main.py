@@ -7,26 +7,27 @@ from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 from controllers.writing_controller import WritingController
-from services.writing_task_service import WritingTaskService
-from services.ai_service import AI_Service
+from services.service_registry import get_service_registry
 from services.learning_path_service import LearningPathService
 from controllers.learning_path_controller import LearningPathController
 
 # from services.bielik_service import Bielik_Service
 from middlewares.error_handling_middleware import ErrorHandlingMiddleware
-from services.vector_db_service import VectorDBService
 from controllers.placement_controller import PlacementController
 from services.placement_service import PlacementService
 from controllers.speaking_controller import SpeakingController
 from services.speaking_service import SpeakingService
 from services.image_service import ImageService
 from controllers.listening_controller import ListeningController
+from controllers.audio_stream_controller import AudioStreamController
+from services.audio_streams import get_audio_stream_store
 from services.listening_task_service import ListeningTaskService
 from controllers.material_controller import router as material_router
 from controllers.ai_token_verify_controller import AITokenVerifyController
 from database.init_db import init_db, close_db
+from utils.static_files import AssetStaticFiles
+from utils.user_context import require_internal_key
 import logging
 import litellm
 from typing import Awaitable, Callable
@@ -44,59 +45,19 @@ console_handler.setFormatter(formatter)
 logger.addHandler(console_handler)
 
 
-async def _audio_janitor() -> None:
-    """Background task: every hour, delete stale files in static/audio
-    and static/images. Without this the listening-task generator and
-    Imagen renderer slowly fill the VM's disk — every task writes a
-    unique <uuid>.mp3/.png and nothing ever cleans them up."""
-    import asyncio
-    import time
-
-    sweep_dirs = [
-        (os.path.join("static", "audio"), float(os.environ.get("AUDIO_TTL_HOURS", "24"))),
-        (os.path.join("static", "images"), float(os.environ.get("IMAGE_TTL_HOURS", "24"))),
-    ]
-    sleep_seconds = 60 * 60  # one sweep per hour
-    while True:
-        try:
-            for directory, ttl_hours in sweep_dirs:
-                if not os.path.isdir(directory):
-                    continue
-                cutoff = time.time() - ttl_hours * 3600
-                removed = 0
-                for name in os.listdir(directory):
-                    path = os.path.join(directory, name)
-                    try:
-                        if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
-                            os.remove(path)
-                            removed += 1
-                    except OSError:
-                        # File raced with another writer or permissions
-                        # changed underfoot. Skip; we'll catch it next pass.
-                        continue
-                if removed:
-                    logger.info("Janitor removed %d expired files in %s", removed, directory)
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("Janitor sweep failed: %s", exc)
-        await asyncio.sleep(sleep_seconds)
-
-
 @asynccontextmanager
 async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
     """Initialise the database on startup and dispose of pools on shutdown."""
-    import asyncio
-
     await init_db()
     logger.info("AI database ready.")
-    janitor = asyncio.create_task(_audio_janitor(), name="audio-janitor")
+    # Load the shared sentence encoder in the background; /health/ready
+    # reports 503 until it's in memory. Also schedules maintenance,
+    # including the expired static asset sweep.
+    await service_registry.start()
     try:
         yield
     finally:
-        janitor.cancel()
-        try:
-            await janitor
-        except asyncio.CancelledError:
-            pass
+        await service_registry.stop()
         await close_db()
         logger.info("AI database shut down.")
 
@@ -144,7 +105,10 @@ All responses follow the `BaseResponse` schema:
 # and only created at runtime when audio is written. StaticFiles raises
 # at construction if the directory is missing, so ensure it exists first.
 os.makedirs("static", exist_ok=True)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Routes match in registration order: the listening audio stream must
+# come before the mount, which would otherwise claim all of /static.
+app.include_router(AudioStreamController(get_audio_stream_store()).get_router())
+app.mount("/static", AssetStaticFiles(directory="static"), name="static")
 
 
 @app.get("/health", include_in_schema=False)
@@ -152,6 +116,28 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 async def health() -> dict:
     return {"status": "ok", "service": "ai"}
 
+
+@app.get("/health/ready", include_in_schema=False)
+@app.get("/api/health/ready", include_in_schema=False)
+async def readiness() -> JSONResponse:
+    """Readiness probe: 200 only once the shared encoder is loaded, so
+    an orchestrator doesn't route traffic to a replica that would stall
+    the first request on a multi-second model load."""
+    return JSONResponse(
+        status_code=200 if service_registry.ready else 503,
+        content=service_registry.readiness(),
+    )
+
+
+@app.get("/internal/metrics", include_in_schema=False)
+async def internal_metrics(request: Request) -> dict:
+    """Runtime counters for the shared components (embedding queue
+    depth, batch sizes, encode latency). Not routed through the
+    gateway — scrape it from inside the cluster with
+    `X-Internal-Service-Key`."""
+    require_internal_key(request)
+    return await service_registry.metrics()
+
 error_handler_middleware_instance = ErrorHandlingMiddleware(app)
 
 app.add_middleware(ErrorHandlingMiddleware)
@@ -168,22 +154,30 @@ app.add_middleware(
     allow_headers=["Content-Type", "Authorization", "X-User-Id", "X-User-Email", "X-User-Role", "X-Internal-Service-Key"],
 )
 
-# Instantiate common services
-ai_service = AI_Service()
-vector_db_service = VectorDBService()
+# Instantiate common services. The registry owns the single AI_Service
+# and VectorDBService (one encoder, one LanceDB connection) shared by
+# every router below; the lifespan warms it up.
+service_registry = get_service_registry()
+ai_service = service_registry.ai_service
+vector_db_service = service_registry.vector_db_service
 
 from services.user_service import UserService as AIUserService
 _writing_user_service = AIUserService()
 app.include_router(
     WritingController(
-        WritingTaskService(vector_db_service, ai_service),
+        service_registry.writing_task_service,
         _writing_user_service,
     ).get_router(),
     prefix="/api",
 )
 
 # PLACEMENT #
-placement_service = PlacementService(ai_service, vector_db_service)
+placement_service = PlacementService(
+    ai_service,
+    vector_db_service,
+    task_pool=service_registry.task_pool,
+    item_bank=service_registry.item_bank,
+)
 placement_controller = PlacementController(placement_service)
 app.include_router(placement_controller.get_router(), prefix="/api")
 
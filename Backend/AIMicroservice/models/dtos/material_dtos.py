@@ -48,6 +48,25 @@ class ProcessPdfResponse(BaseModel):
         default_factory=list
     )
     document_map: Optional[DocumentMap] = None
+    # Id of the stored document_map; pass it to /materials/quiz instead
+    # of the map itself.
+    document_id: Optional[str] = None
+
+
+class UploadJobStatus(BaseModel):
+    """Progress of a background PDF ingestion (/materials/upload/jobs)."""
+
+    job_id: str
+    filename: str
+    # queued | running | done | failed
+    status: str
+    # extracting | embedding | analyzing, while running
+    stage: Optional[str] = None
+    # Overall completion in [0, 1].
+    progress: float = 0.0
+    result: Optional[ProcessPdfResponse] = None
+    # Same {code, message} body the synchronous endpoint would raise.
+    error: Optional[Dict[str, Any]] = None
 
 
 # -----------------------------------------------------------------
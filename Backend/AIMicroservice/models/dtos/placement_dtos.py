@@ -1,8 +1,14 @@
+from typing import Optional
+
 from pydantic import BaseModel, ConfigDict
 from pydantic.alias_generators import to_camel
 
 class PlacementAnswer(BaseModel):
     is_correct: bool
+    # Id of the task this answers and the answer given; the item bank
+    # scores that against the item itself. Older clients omit both.
+    task_id: Optional[str] = None
+    answer: Optional[str] = None
 
     model_config = ConfigDict(
         alias_generator=to_camel,
@@ -1,5 +1,6 @@
+from dataclasses import dataclass, field
 from pydantic import BaseModel, ConfigDict, Field
-from typing import List, Optional, Any
+from typing import List, Mapping, Optional, Any
 
 class LevelSkills(BaseModel):
     listening: str
@@ -61,6 +62,25 @@ class MaterialChunk(BaseModel):
         extra='ignore' 
     )
 
+@dataclass(frozen=True, slots=True)
+class MaterialHit:
+    """One `search_materials` result row: only the projected columns,
+    no vector, no validation. Call `to_model()` where a MaterialChunk
+    is actually needed (serialisation)."""
+
+    text: str
+    source: str
+    chunk_index: int
+    distance: Optional[float] = None
+
+    def to_model(self) -> MaterialChunk:
+        return MaterialChunk.model_validate({
+            "text": self.text,
+            "source": self.source,
+            "chunk_index": self.chunk_index,
+            "_distance": self.distance,
+        })
+
 class TaskTemplate(BaseModel):
     id: Optional[str] = None
     template: str
@@ -70,3 +90,20 @@ class TaskTemplate(BaseModel):
         populate_by_name=True,
         extra='allow' 
     )
+
+@dataclass(frozen=True, slots=True)
+class TemplateHit:
+    """One `search_task_templates` result row, like MaterialHit: no
+    vector, no validation. `extra` holds any further columns the
+    templates were saved with; `to_model()` builds the TaskTemplate."""
+
+    id: Optional[str]
+    template: str
+    distance: Optional[float] = None
+    extra: Mapping[str, Any] = field(default_factory=dict)
+
+    def to_model(self) -> TaskTemplate:
+        data = {"id": self.id, "template": self.template, **self.extra}
+        if self.distance is not None:
+            data["_distance"] = self.distance
+        return TaskTemplate(**data)
@@ -4,7 +4,6 @@ import json
 import logging
 import os
 import random
-import time
 
 from dotenv import load_dotenv
 from fastapi import HTTPException, status
@@ -16,9 +15,11 @@ from litellm.exceptions import (
     RateLimitError,
     Timeout,
 )
-from typing import Optional, Union, Dict, Any, Tuple
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, NoReturn, Optional, Tuple, Union
 
 from services.user_service import UserService
+from utils.cache_backends import get_shared_cache_backend
+from utils.ttl_cache import TTLCache
 from utils.user_context import UserContext
 
 logger = logging.getLogger(__name__)
@@ -70,16 +71,23 @@ def _is_retryable(exc: BaseException) -> bool:
 #   2) Latency — Groq cold paths can spike 5-10s; warm cache hit is
 #      microseconds.
 # Notes / caveats:
-#   - This is per-process. With a single AI-service replica that's fine;
-#     for multi-replica deploys this should move to Redis.
+#   - This is L1, per-process. Misses fall through to the shared L2
+#     backend picked by AI_CACHE_BACKEND (sqlite / redis; see
+#     utils/cache_backends.py) so replicas don't re-bill each other's
+#     prompts.
 #   - We DON'T cache when temperature > 0.5 (the call site asked for
 #     creativity — caching would defeat that).
 #   - The cache key includes the user's API token (because litellm
 #     dispatches requests by it), so two users with different keys
 #     won't share entries even on identical prompts.
+#   - Concurrent identical calls are single-flighted: the second caller
+#     awaits the first one's in-flight completion instead of billing a
+#     second one.
 _AI_CACHE_TTL = 60 * 10  # 10 minutes
-_AI_CACHE_MAX = 256
-_ai_cache: Dict[str, Tuple[float, str]] = {}
+# Cap on cached completion text, not entry count — an essay evaluation
+# is ~100x a one-line translation.
+_AI_CACHE_MAX_BYTES = int(os.getenv("AI_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+_ai_cache: TTLCache[str, str] = TTLCache("ai_responses", _AI_CACHE_TTL, _AI_CACHE_MAX_BYTES)
 
 
 def _ai_cache_key(model: str, prompt: str, system_prompt: str,
@@ -100,24 +108,6 @@ def _ai_cache_key(model: str, prompt: str, system_prompt: str,
     return h.hexdigest()
 
 
-def _ai_cache_get(key: str) -> Optional[str]:
-    entry = _ai_cache.get(key)
-    if not entry:
-        return None
-    expires_at, value = entry
-    if time.time() > expires_at:
-        _ai_cache.pop(key, None)
-        return None
-    return value
-
-
-def _ai_cache_put(key: str, value: str) -> None:
-    if len(_ai_cache) >= _AI_CACHE_MAX:
-        oldest = min(_ai_cache.items(), key=lambda kv: kv[1][0])[0]
-        _ai_cache.pop(oldest, None)
-    _ai_cache[key] = (time.time() + _AI_CACHE_TTL, value)
-
-
 PROVIDER_CONFIG: Dict[str, Dict[str, Any]] = {
     "openai": {"model": "gpt-5.4-mini"},
     "google-geminis": {"model": "vertex_ai/gemini-2.5-flash"},
@@ -174,19 +164,15 @@ class AI_Service:
             )
         return model, extra_params
 
-    async def get_ai_response(
-        self, 
-        prompt: str, 
-        model: str = "vertex_ai/gemini-2.5-flash",
-        response_format: Optional[Dict[str, str]] = {"type": "json_object"},
-        system_prompt: str = "You are a philologist with over 20 years of experience in language education.",
-        user_context: Optional[UserContext] = None,
-        ai_provider_id: Optional[str] = None,
-        temperature: float = 0.7,
-    ) -> str:
-        litellm_model = model
-        litellm_params: Dict[str, Any] = {}
-
+    async def _resolve_call(
+        self,
+        model: str,
+        user_context: Optional[UserContext],
+        ai_provider_id: Optional[str],
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Pick the litellm model + params for this call: the user's
+        default key when there is a user, platform credentials
+        otherwise."""
         if user_context:
             token = await self.user_service.get_default_ai_token(
                 user_context, ai_provider_id=ai_provider_id
@@ -205,13 +191,90 @@ class AI_Service:
 
         if model and not user_context and ai_provider_id is None:
             litellm_model = model
+        return litellm_model, litellm_params
+
+    async def get_ai_response(
+        self, 
+        prompt: str, 
+        model: str = "vertex_ai/gemini-2.5-flash",
+        response_format: Optional[Dict[str, str]] = {"type": "json_object"},
+        system_prompt: str = "You are a philologist with over 20 years of experience in language education.",
+        user_context: Optional[UserContext] = None,
+        ai_provider_id: Optional[str] = None,
+        temperature: float = 0.7,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+    ) -> str:
+        """Full completion text. When `on_delta` is given the call is
+        made in stream mode and every text delta is handed to it as it
+        arrives (used by the SSE endpoints); the return value is the
+        same concatenated text either way."""
+        if on_delta is not None:
+            parts: List[str] = []
+            async for delta in self.get_ai_response_stream(
+                prompt,
+                model=model,
+                response_format=response_format,
+                system_prompt=system_prompt,
+                user_context=user_context,
+                ai_provider_id=ai_provider_id,
+                temperature=temperature,
+            ):
+                parts.append(delta)
+                await on_delta(delta)
+            return "".join(parts)
+
+        litellm_model, litellm_params = await self._resolve_call(
+            model, user_context, ai_provider_id
+        )
 
         # Cache only deterministic-ish calls. Anything above temp 0.5 is
         # asking for creative variety (e.g. task generation), which is
         # exactly the case where a cache hit would hurt.
-        cacheable = temperature <= 0.5
-        cache_key = None
-        if cacheable:
+        if temperature > 0.5:
+            return await self._complete(
+                litellm_model, litellm_params, prompt, system_prompt,
+                response_format, temperature,
+            )
+
+        cache_key = _ai_cache_key(
+            litellm_model,
+            prompt,
+            system_prompt,
+            litellm_params.get("api_key"),
+            temperature,
+            response_format,
+        )
+        return await _ai_cache.get_or_load(
+            cache_key,
+            lambda: self._complete_through_shared_cache(
+                cache_key, litellm_model, litellm_params, prompt,
+                system_prompt, response_format, temperature,
+            ),
+        )
+
+    async def get_ai_response_stream(
+        self,
+        prompt: str,
+        model: str = "vertex_ai/gemini-2.5-flash",
+        response_format: Optional[Dict[str, str]] = {"type": "json_object"},
+        system_prompt: str = "You are a philologist with over 20 years of experience in language education.",
+        user_context: Optional[UserContext] = None,
+        ai_provider_id: Optional[str] = None,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[str]:
+        """Yield the completion as text deltas (litellm stream mode).
+
+        Same provider resolution, caching and error codes as
+        get_ai_response. A cache hit is yielded as one delta. Retries
+        only happen before the first delta — once text has gone out to
+        the client a failure is raised as-is.
+        """
+        litellm_model, litellm_params = await self._resolve_call(
+            model, user_context, ai_provider_id
+        )
+
+        cache_key: Optional[str] = None
+        if temperature <= 0.5:
             cache_key = _ai_cache_key(
                 litellm_model,
                 prompt,
@@ -220,11 +283,66 @@ class AI_Service:
                 temperature,
                 response_format,
             )
-            cached = _ai_cache_get(cache_key)
+            cached = _ai_cache.get(cache_key)
+            shared = get_shared_cache_backend()
+            if cached is None and shared is not None:
+                cached = await shared.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts: List[str] = []
+        async for delta in self._stream_completion(
+            litellm_model, litellm_params, prompt, system_prompt,
+            response_format, temperature,
+        ):
+            parts.append(delta)
+            yield delta
+
+        if cache_key is not None:
+            content = "".join(parts)
+            _ai_cache.put(cache_key, content)
+            shared = get_shared_cache_backend()
+            if shared is not None:
+                await shared.set(cache_key, content, _AI_CACHE_TTL)
+
+    async def _complete_through_shared_cache(
+        self,
+        cache_key: str,
+        litellm_model: str,
+        litellm_params: Dict[str, Any],
+        prompt: str,
+        system_prompt: str,
+        response_format: Optional[Dict[str, str]],
+        temperature: float,
+    ) -> str:
+        """L1 miss path: try the shared L2 backend, else call the
+        provider and publish the result there for other replicas."""
+        shared = get_shared_cache_backend()
+        if shared is not None:
+            cached = await shared.get(cache_key)
             if cached is not None:
-                logger.info("ai_service cache hit (model=%s)", litellm_model)
+                logger.info("ai_service shared cache hit (model=%s)", litellm_model)
                 return cached
+        content = await self._complete(
+            litellm_model, litellm_params, prompt, system_prompt,
+            response_format, temperature,
+        )
+        if shared is not None:
+            await shared.set(cache_key, content, _AI_CACHE_TTL)
+        return content
 
+    async def _complete(
+        self,
+        litellm_model: str,
+        litellm_params: Dict[str, Any],
+        prompt: str,
+        system_prompt: str,
+        response_format: Optional[Dict[str, str]],
+        temperature: float,
+    ) -> str:
+        """One provider call with retries; maps failures to coded
+        HTTP errors."""
         chat_response = None
         last_exc: Optional[BaseException] = None
         for attempt in range(1, _AI_RETRY_MAX_ATTEMPTS + 1):
@@ -254,63 +372,12 @@ class AI_Service:
                 last_exc = exc
                 if attempt >= _AI_RETRY_MAX_ATTEMPTS or not _is_retryable(exc):
                     break
-                # Exp backoff with full jitter so simultaneous retries
-                # from concurrent requests don't synchronise into a
-                # thundering herd at the upstream.
-                base = min(
-                    _AI_RETRY_MAX_DELAY_S,
-                    _AI_RETRY_BASE_DELAY_S * (2 ** (attempt - 1)),
-                )
-                delay = random.uniform(0.0, base)
-                logger.warning(
-                    "AI call attempt %d/%d failed (%s: %s); retrying in %.2fs",
-                    attempt,
-                    _AI_RETRY_MAX_ATTEMPTS,
-                    type(exc).__name__,
-                    str(exc)[:200],
-                    delay,
-                )
-                await asyncio.sleep(delay)
+                await _backoff(attempt, exc)
 
         if chat_response is None:
             # All attempts exhausted — translate the last exception to
             # a structured HTTP error using the same mapping as before.
-            exc = last_exc
-            if isinstance(exc, AuthenticationError):
-                from utils.error_codes import AI_AUTH_FAILED, raise_with_code
-                logger.error("Invalid API key for model %s", litellm_model)
-                raise_with_code(
-                    AI_AUTH_FAILED,
-                    status.HTTP_401_UNAUTHORIZED,
-                    "Invalid or expired API key for the selected AI provider",
-                )
-            if isinstance(exc, RateLimitError):
-                from utils.error_codes import AI_RATE_LIMITED, raise_with_code
-                logger.warning("Rate limit hit for model %s", litellm_model)
-                raise_with_code(
-                    AI_RATE_LIMITED,
-                    status.HTTP_429_TOO_MANY_REQUESTS,
-                    "AI provider rate limit exceeded, please try again later",
-                )
-            if isinstance(exc, Timeout):
-                from utils.error_codes import AI_TIMEOUT, raise_with_code
-                logger.warning("Timeout calling model %s", litellm_model)
-                raise_with_code(
-                    AI_TIMEOUT,
-                    status.HTTP_504_GATEWAY_TIMEOUT,
-                    "AI provider did not respond in time",
-                )
-            from utils.error_codes import AI_BAD_GATEWAY, raise_with_code
-            logger.exception(
-                "Unexpected error from AI provider after %d attempts: %s",
-                _AI_RETRY_MAX_ATTEMPTS,
-                exc,
-            )
-            raise_with_code(
-                AI_BAD_GATEWAY,
-                status.HTTP_502_BAD_GATEWAY,
-                "AI provider request failed",
-            )
+            _raise_provider_error(last_exc, litellm_model)
 
         content: Optional[str] = chat_response.choices[0].message.content
         if content is None:
@@ -320,6 +387,153 @@ class AI_Service:
                 status.HTTP_502_BAD_GATEWAY,
                 "AI provider returned empty content",
             )
-        if cacheable and cache_key is not None:
-            _ai_cache_put(cache_key, content)
         return content
+
+    async def _stream_completion(
+        self,
+        litellm_model: str,
+        litellm_params: Dict[str, Any],
+        prompt: str,
+        system_prompt: str,
+        response_format: Optional[Dict[str, str]],
+        temperature: float,
+    ) -> AsyncIterator[str]:
+        stream: Any = None
+        iterator: Any = None
+        first: Optional[str] = None
+        last_exc: Optional[BaseException] = None
+        for attempt in range(1, _AI_RETRY_MAX_ATTEMPTS + 1):
+            try:
+                stream = await acompletion(
+                    model=litellm_model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt},
+                    ],
+                    response_format=response_format,
+                    timeout=180,
+                    temperature=temperature,
+                    stream=True,
+                    **litellm_params,
+                )
+                iterator = stream.__aiter__()
+                # Most provider failures (capacity, auth, rate limit)
+                # surface on the first read, so it belongs inside the
+                # retry window.
+                first = await _next_text(iterator)
+                break
+            except HTTPException:
+                raise
+            except Exception as exc:
+                last_exc = exc
+                if attempt >= _AI_RETRY_MAX_ATTEMPTS or not _is_retryable(exc):
+                    break
+                await _backoff(attempt, exc)
+
+        if first is None:
+            _raise_provider_error(last_exc, litellm_model)
+        if not first:
+            from utils.error_codes import AI_EMPTY_RESPONSE, raise_with_code
+            raise_with_code(
+                AI_EMPTY_RESPONSE,
+                status.HTTP_502_BAD_GATEWAY,
+                "AI provider returned empty content",
+            )
+
+        yield first
+        try:
+            async for chunk in iterator:
+                text = _delta_text(chunk)
+                if text:
+                    yield text
+        except HTTPException:
+            raise
+        except Exception as exc:
+            _raise_provider_error(exc, litellm_model)
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                try:
+                    await aclose()
+                except Exception:  # noqa: BLE001
+                    pass
+
+
+def _delta_text(chunk: object) -> str:
+    choices = getattr(chunk, "choices", None) or []
+    if not choices:
+        return ""
+    delta = getattr(choices[0], "delta", None)
+    return getattr(delta, "content", None) or ""
+
+
+async def _next_text(iterator: AsyncIterator[object]) -> str:
+    """First non-empty delta from a litellm stream, or "" if the
+    stream ended without any text."""
+    while True:
+        try:
+            chunk = await iterator.__anext__()
+        except StopAsyncIteration:
+            return ""
+        text = _delta_text(chunk)
+        if text:
+            return text
+
+
+async def _backoff(attempt: int, exc: BaseException) -> None:
+    # Exp backoff with full jitter so simultaneous retries
+    # from concurrent requests don't synchronise into a
+    # thundering herd at the upstream.
+    base = min(
+        _AI_RETRY_MAX_DELAY_S,
+        _AI_RETRY_BASE_DELAY_S * (2 ** (attempt - 1)),
+    )
+    delay = random.uniform(0.0, base)
+    logger.warning(
+        "AI call attempt %d/%d failed (%s: %s); retrying in %.2fs",
+        attempt,
+        _AI_RETRY_MAX_ATTEMPTS,
+        type(exc).__name__,
+        str(exc)[:200],
+        delay,
+    )
+    await asyncio.sleep(delay)
+
+
+def _raise_provider_error(exc: Optional[BaseException], litellm_model: str) -> NoReturn:
+    """Translate a provider exception to a structured HTTP error."""
+    if isinstance(exc, AuthenticationError):
+        from utils.error_codes import AI_AUTH_FAILED, raise_with_code
+        logger.error("Invalid API key for model %s", litellm_model)
+        raise_with_code(
+            AI_AUTH_FAILED,
+            status.HTTP_401_UNAUTHORIZED,
+            "Invalid or expired API key for the selected AI provider",
+        )
+    if isinstance(exc, RateLimitError):
+        from utils.error_codes import AI_RATE_LIMITED, raise_with_code
+        logger.warning("Rate limit hit for model %s", litellm_model)
+        raise_with_code(
+            AI_RATE_LIMITED,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            "AI provider rate limit exceeded, please try again later",
+        )
+    if isinstance(exc, Timeout):
+        from utils.error_codes import AI_TIMEOUT, raise_with_code
+        logger.warning("Timeout calling model %s", litellm_model)
+        raise_with_code(
+            AI_TIMEOUT,
+            status.HTTP_504_GATEWAY_TIMEOUT,
+            "AI provider did not respond in time",
+        )
+    from utils.error_codes import AI_BAD_GATEWAY, raise_with_code
+    logger.exception(
+        "Unexpected error from AI provider after %d attempts: %s",
+        _AI_RETRY_MAX_ATTEMPTS,
+        exc,
+    )
+    raise_with_code(
+        AI_BAD_GATEWAY,
+        status.HTTP_502_BAD_GATEWAY,
+        "AI provider request failed",
+    )
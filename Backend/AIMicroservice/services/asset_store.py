@@ -0,0 +1,215 @@
+"""Content-addressed store for generated static assets (TTS audio,
+Imagen pictures).
+
+Every writer used to save `static/<kind>/<uuid>.<ext>`, so identical
+bytes (a cached TTS clip, a repeated phrase) landed on disk once per
+request, and an hourly janitor `listdir`+`getmtime`-ed both directories
+to find what had expired. `AssetStore.save` now names a file by the
+SHA-256 of its bytes under a two-character shard
+(`static/audio/ab/ab12….mp3`), so identical assets are stored once.
+Each file also gets a row in a SQLite index with its expiry time.
+Saving existing bytes again only pushes that expiry out. `sweep`
+reads just the expired rows through the `expires_at` index and deletes
+exactly those files, with no directory scan. It runs as a maintenance
+job.
+
+A hashed path never changes content, so `AssetStaticFiles`
+(utils/static_files.py) serves those paths with `Cache-Control:
+immutable` and the digest as the ETag.
+Aliases map other stable names (listening stream ids) to an asset and
+expire with it.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("ai_microservice")
+
+STATIC_ROOT = "static"
+_INDEX_PATH = os.getenv("ASSET_INDEX_PATH", os.path.join("data", "static_assets.sqlite3"))
+# Lifetime of each kind of asset after its last save.
+_TTL_S: Dict[str, float] = {
+    "audio": float(os.getenv("AUDIO_TTL_HOURS", "24")) * 3600,
+    "images": float(os.getenv("IMAGE_TTL_HOURS", "24")) * 3600,
+}
+# Files deleted per sweep; the rest wait for the next run.
+_SWEEP_BATCH = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_assets_expires_at ON assets (expires_at);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_aliases_expires_at ON aliases (expires_at);
+"""
+
+
+class AssetStore:
+    def __init__(
+        self,
+        root: str = STATIC_ROOT,
+        index_path: str = _INDEX_PATH,
+        ttl_s: Optional[Dict[str, float]] = None,
+        public_base_url: Optional[str] = None,
+    ) -> None:
+        self.root = root
+        self.index_path = index_path
+        self.ttl_s = dict(_TTL_S if ttl_s is None else ttl_s)
+        self.public_base_url = public_base_url
+        # One connection shared by request threads and the sweeper; the
+        # lock also keeps "file exists" and "row exists" in step.
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.saved = 0
+        self.deduplicated = 0
+        self.swept = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.index_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            fresh = not os.path.exists(self.index_path)
+            db = sqlite3.connect(self.index_path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+            self._db = db
+            if fresh:
+                self._adopt_untracked(db)
+        return self._db
+
+    def _adopt_untracked(self, db: sqlite3.Connection) -> None:
+        """A new index starts by tracking whatever is already on disk
+        (files from before the store existed, or a lost index). Each
+        file expires a TTL after its mtime. This scan runs only when
+        the index is first created."""
+        rows = []
+        for kind, ttl in self.ttl_s.items():
+            base = os.path.join(self.root, kind)
+            for dirpath, _, names in os.walk(base):
+                for name in names:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    rel = os.path.relpath(path, self.root).replace(os.sep, "/")
+                    rows.append((rel, kind, st.st_size, st.st_mtime + ttl))
+        if rows:
+            db.executemany("INSERT OR IGNORE INTO assets VALUES (?, ?, ?, ?)", rows)
+            logger.info("Asset index adopted %d existing files.", len(rows))
+
+    def put(self, kind: str, data: bytes, ext: str, alias: Optional[str] = None) -> str:
+        """Store `data` and return its path relative to the static root
+        (`audio/ab/ab12….mp3`). Saving bytes that are already stored
+        only extends their expiry."""
+        digest = hashlib.sha256(data).hexdigest()
+        rel = f"{kind}/{digest[:2]}/{digest}.{ext}"
+        path = os.path.join(self.root, *rel.split("/"))
+        expires_at = time.time() + self.ttl_s.get(kind, 24 * 3600.0)
+        with self._lock:
+            db = self._connect()
+            if os.path.exists(path):
+                self.deduplicated += 1
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as fh:
+                    fh.write(data)
+                os.replace(tmp, path)
+                self.saved += 1
+            db.execute(
+                "INSERT INTO assets VALUES (?, ?, ?, ?) ON CONFLICT(path) DO UPDATE SET "
+                "expires_at = max(expires_at, excluded.expires_at)",
+                (rel, kind, len(data), expires_at),
+            )
+            if alias is not None:
+                db.execute(
+                    "INSERT OR REPLACE INTO aliases VALUES (?, ?, ?)", (alias, rel, expires_at)
+                )
+        return rel
+
+    async def save(self, kind: str, data: bytes, ext: str, alias: Optional[str] = None) -> str:
+        """`put` off the event loop; returns the public URL."""
+        rel = await asyncio.to_thread(self.put, kind, data, ext, alias)
+        return self.url(rel)
+
+    def url(self, rel: str) -> str:
+        # Read per call: main.py loads .env after the services import.
+        base = os.getenv("PUBLIC_BASE_URL", "") if self.public_base_url is None else self.public_base_url
+        return f"{base}/{STATIC_ROOT}/{rel}"
+
+    def resolve(self, alias: str) -> Optional[str]:
+        """Filesystem path of the asset `alias` points to, while both
+        exist."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT path FROM aliases WHERE alias = ? AND expires_at > ?", (alias, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        path = os.path.join(self.root, *row[0].split("/"))
+        return path if os.path.isfile(path) else None
+
+    def sweep(self) -> Dict[str, Any]:
+        """Delete expired assets straight from the index (maintenance
+        job)."""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            db = self._connect()
+            expired: List[str] = [
+                row[0]
+                for row in db.execute(
+                    "SELECT path FROM assets WHERE expires_at <= ? ORDER BY expires_at LIMIT ?",
+                    (now, _SWEEP_BATCH),
+                )
+            ]
+            for rel in expired:
+                try:
+                    os.remove(os.path.join(self.root, *rel.split("/")))
+                except FileNotFoundError:
+                    pass
+                except OSError as exc:
+                    # Keep the row; next sweep retries.
+                    logger.warning("Asset sweep could not remove %s: %s", rel, exc)
+                    continue
+                db.execute("DELETE FROM assets WHERE path = ?", (rel,))
+                removed += 1
+            db.execute("DELETE FROM aliases WHERE expires_at <= ?", (now,))
+            remaining = db.execute("SELECT count(*), coalesce(sum(size), 0) FROM assets").fetchone()
+            self.swept += removed
+        return {"removed": removed, "assets": remaining[0], "bytes": remaining[1]}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"saved": self.saved, "deduplicated": self.deduplicated, "swept": self.swept}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_store: Optional[AssetStore] = None
+
+
+def get_asset_store() -> AssetStore:
+    global _store
+    if _store is None:
+        _store = AssetStore()
+    return _store
@@ -0,0 +1,147 @@
+"""Progressive delivery of listening-task audio.
+
+`create_listening_task` used to wait for every TTS turn and write the
+joined MP3 before answering. Now it starts the turns
+(`TTSService.multispeaker_clips`), hands the clip futures to
+`AudioStreamStore.open` and returns straight away with a stream URL.
+The store appends each clip as soon as it and every earlier turn are
+done — MP3 frames at identical config are byte-concatenable — and
+`GET /static/audio/stream/{id}.mp3` relays the bytes with chunked
+transfer while later turns are still being synthesised, so playback
+starts after the first turn's latency.
+
+Once the last clip arrives the joined bytes go into the AssetStore
+with the stream id as an alias; after `ttl_s` the in-memory copy is
+dropped and the same URL serves that file. Streams live in process memory, so
+requests have to reach the replica that generated the task (one AI
+replica in docker-compose).
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+import uuid
+from concurrent.futures import Future
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set
+
+from services.asset_store import AssetStore, get_asset_store
+
+logger = logging.getLogger("ai_microservice")
+
+_STREAM_TTL_S = float(os.getenv("AUDIO_STREAM_TTL_S", "300"))
+_STREAM_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class _AudioStream:
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.error: Optional[str] = None
+        self.finished_at: Optional[float] = None
+        self.changed = asyncio.Condition()
+
+    async def _notify(self) -> None:
+        async with self.changed:
+            self.changed.notify_all()
+
+    async def wait_started(self) -> None:
+        """Until the first clip is in, or the stream ended without one."""
+        async with self.changed:
+            await self.changed.wait_for(lambda: bool(self.chunks) or self.done)
+
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        sent = 0
+        while True:
+            while sent < len(self.chunks):
+                yield self.chunks[sent]
+                sent += 1
+            if self.done:
+                return
+            async with self.changed:
+                await self.changed.wait_for(lambda: len(self.chunks) > sent or self.done)
+
+
+class AudioStreamStore:
+    def __init__(self, assets: Optional[AssetStore] = None, ttl_s: float = _STREAM_TTL_S) -> None:
+        self.assets = assets or get_asset_store()
+        self.ttl_s = ttl_s
+        self._streams: Dict[str, _AudioStream] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def open(self, clips: Sequence["Future[bytes]"]) -> str:
+        """Start relaying `clips` (in order) and return the stream id."""
+        self._purge()
+        stream_id = uuid.uuid4().hex
+        stream = _AudioStream()
+        self._streams[stream_id] = stream
+        task = asyncio.create_task(
+            self._collect(stream_id, stream, list(clips)), name=f"audio-stream-{stream_id}"
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return stream_id
+
+    def get(self, stream_id: str) -> Optional[_AudioStream]:
+        self._purge()
+        return self._streams.get(stream_id)
+
+    def file_path(self, stream_id: str) -> Optional[str]:
+        """The finished file of `stream_id`, if it exists."""
+        if not _STREAM_ID_RE.match(stream_id):
+            return None
+        return self.assets.resolve(f"stream/{stream_id}")
+
+    async def _collect(
+        self, stream_id: str, stream: _AudioStream, clips: List["Future[bytes]"]
+    ) -> None:
+        try:
+            for clip in clips:
+                stream.chunks.append(await asyncio.wrap_future(clip))
+                await stream._notify()
+            await self.assets.save("audio", b"".join(stream.chunks), "mp3", alias=f"stream/{stream_id}")
+        except asyncio.CancelledError:
+            stream.error = "cancelled"
+            raise
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Audio stream %s failed: %s", stream_id, exc)
+            stream.error = str(exc)
+        finally:
+            for clip in clips:
+                clip.cancel()
+            stream.done = True
+            stream.finished_at = time.monotonic()
+            # Shielded so a cancelled collector still wakes its readers.
+            await asyncio.shield(stream._notify())
+
+    def _purge(self) -> None:
+        cutoff = time.monotonic() - self.ttl_s
+        expired = [
+            stream_id for stream_id, stream in self._streams.items()
+            if stream.finished_at is not None and stream.finished_at < cutoff
+        ]
+        for stream_id in expired:
+            del self._streams[stream_id]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "open": sum(1 for s in self._streams.values() if not s.done),
+            "buffered": len(self._streams),
+        }
+
+    async def shutdown(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+_store: Optional[AudioStreamStore] = None
+
+
+def get_audio_stream_store() -> AudioStreamStore:
+    global _store
+    if _store is None:
+        _store = AudioStreamStore()
+    return _store
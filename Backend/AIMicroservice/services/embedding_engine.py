@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("ai_microservice")
+
+# Upper bound on the number of texts handed to one `model.encode` call.
+# MiniLM on CPU is roughly linear in batch size past ~32, so bigger
+# batches stop buying throughput and only add tail latency.
+_DEFAULT_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "32"))
+# How long the worker holds the first request of a batch open waiting
+# for company. A few ms is invisible next to a ~10 ms encode but lets a
+# burst of concurrent single-query searches share one forward pass.
+_DEFAULT_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5"))
+
+
+@dataclass
+class _EncodeRequest:
+    texts: List[str]
+    future: "Future[np.ndarray]"
+    enqueued_at: float
+
+
+class EmbeddingEngine:
+    """Runs SentenceTransformer encodes on one dedicated worker thread.
+
+    Callers enqueue texts and get a future back; the worker drains the
+    queue, coalesces whatever arrived within `max_wait_ms` (up to
+    `max_batch_size` texts) into a single `model.encode` call and
+    slices the result back out per request. Keeps CPU-bound inference
+    off the event loop and turns N concurrent one-line queries into one
+    batched forward pass.
+
+    `model_loader` is called on the worker thread right before each
+    encode so the model can still be loaded lazily by its owner.
+    """
+
+    def __init__(
+        self,
+        model_loader: Callable[[], Any],
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+    ) -> None:
+        self._model_loader = model_loader
+        self.max_batch_size = max(1, max_batch_size or _DEFAULT_MAX_BATCH)
+        wait_ms = _DEFAULT_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms
+        self.max_wait_s = max(0.0, wait_ms) / 1000.0
+        self._queue: "queue.Queue[Optional[_EncodeRequest]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stopped = False
+
+        # Metrics. Only the worker thread writes these, so plain ints
+        # are fine; readers may see a slightly stale snapshot.
+        self._requests_total = 0
+        self._texts_total = 0
+        self._batches_total = 0
+        self._errors_total = 0
+        self._last_batch_size = 0
+        self._max_batch_seen = 0
+        self._encode_seconds_total = 0.0
+        self._last_encode_ms = 0.0
+        self._max_encode_ms = 0.0
+        self._queue_wait_seconds_total = 0.0
+
+    # ---- public API ------------------------------------------------
+
+    def submit(self, texts: List[str]) -> "Future[np.ndarray]":
+        """Enqueue `texts` and return a future resolving to a 2-D array
+        with one row per text."""
+        if self._stopped:
+            raise RuntimeError("EmbeddingEngine is stopped")
+        future: "Future[np.ndarray]" = Future()
+        if not texts:
+            future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return future
+        self._ensure_started()
+        self._queue.put(_EncodeRequest(list(texts), future, time.monotonic()))
+        return future
+
+    def encode_many_sync(self, texts: List[str]) -> np.ndarray:
+        """Blocking batch encode. Call from a worker thread, never from
+        the event loop."""
+        return self.submit(texts).result()
+
+    def encode_sync(self, text: str) -> np.ndarray:
+        """Blocking single-text encode; returns a 1-D vector."""
+        return np.asarray(self.encode_many_sync([text])[0])
+
+    async def encode_many(self, texts: List[str]) -> np.ndarray:
+        return await asyncio.wrap_future(self.submit(texts))
+
+    async def encode(self, text: str) -> np.ndarray:
+        return np.asarray((await self.encode_many([text]))[0])
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop accepting work and let the worker finish what is queued."""
+        self._stopped = True
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        batches = self._batches_total
+        requests = self._requests_total
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_s * 1000.0,
+            "requests_total": requests,
+            "texts_total": self._texts_total,
+            "batches_total": batches,
+            "errors_total": self._errors_total,
+            "avg_batch_size": (self._texts_total / batches) if batches else 0.0,
+            "last_batch_size": self._last_batch_size,
+            "max_batch_size_seen": self._max_batch_seen,
+            "avg_encode_ms": (self._encode_seconds_total * 1000.0 / batches) if batches else 0.0,
+            "last_encode_ms": self._last_encode_ms,
+            "max_encode_ms": self._max_encode_ms,
+            "avg_queue_wait_ms": (self._queue_wait_seconds_total * 1000.0 / requests) if requests else 0.0,
+        }
+
+    # ---- worker ----------------------------------------------------
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="embedding-engine", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        carry: Optional[_EncodeRequest] = None
+        stopping = False
+        while not stopping:
+            first = carry if carry is not None else self._queue.get()
+            carry = None
+            if first is None:
+                break
+
+            batch = [first]
+            size = len(first.texts)
+            deadline = time.monotonic() + self.max_wait_s
+            # A request that already fills the batch (a PDF's worth of
+            # chunks) goes straight through without waiting.
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    nxt = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stopping = True
+                    break
+                if size + len(nxt.texts) > self.max_batch_size:
+                    carry = nxt
+                    break
+                batch.append(nxt)
+                size += len(nxt.texts)
+
+            self._encode_batch(batch)
+
+        if carry is not None:
+            self._encode_batch([carry])
+        # Drain anything that raced in before stop() so no caller hangs.
+        while True:
+            try:
+                leftover = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if leftover is not None:
+                self._encode_batch([leftover])
+
+    def _encode_batch(self, batch: List[_EncodeRequest]) -> None:
+        live = [r for r in batch if r.future.set_running_or_notify_cancel()]
+        if not live:
+            return
+        now = time.monotonic()
+        texts: List[str] = []
+        for req in live:
+            self._queue_wait_seconds_total += now - req.enqueued_at
+            texts.extend(req.texts)
+
+        started = time.perf_counter()
+        try:
+            model = self._model_loader()
+            vectors = np.asarray(
+                model.encode(texts, batch_size=self.max_batch_size, convert_to_numpy=True)
+            )
+        except Exception as exc:  # noqa: BLE001
+            self._errors_total += 1
+            logger.error("Embedding batch of %d texts failed: %s", len(texts), exc)
+            for req in live:
+                req.future.set_exception(exc)
+            return
+        elapsed = time.perf_counter() - started
+
+        self._requests_total += len(live)
+        self._texts_total += len(texts)
+        self._batches_total += 1
+        self._last_batch_size = len(texts)
+        self._max_batch_seen = max(self._max_batch_seen, len(texts))
+        self._encode_seconds_total += elapsed
+        self._last_encode_ms = elapsed * 1000.0
+        self._max_encode_ms = max(self._max_encode_ms, self._last_encode_ms)
+
+        offset = 0
+        for req in live:
+            n = len(req.texts)
+            req.future.set_result(vectors[offset:offset + n])
+            offset += n
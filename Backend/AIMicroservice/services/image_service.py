@@ -1,17 +1,12 @@
 import asyncio
 import logging
 import os
-import uuid
 from typing import Optional
 
-import aiofiles
-
+from services.asset_store import get_asset_store
 
 logger = logging.getLogger(__name__)
 
-PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "")
-
-
 # Imagen 3 generally available models. `imagen-3.0-generate-002` is the
 # current standard-quality model — best balance of detail and cost for
 # picture-description scenes. `imagen-3.0-fast-generate-001` is ~2x
@@ -76,8 +71,8 @@ class ImageService:
         return self._enabled
 
     async def generate(self, visual_prompt: str) -> str | None:
-        """Render `visual_prompt` to a PNG, save it under
-        `static/images/<uuid>.png`, and return the public URL.
+        """Render `visual_prompt` to a PNG, store it in the
+        AssetStore (`static/images/<shard>/<sha256>.png`), and return the public URL.
 
         Returns None on any failure so the caller can route to a
         fallback renderer instead of surfacing a 500.
@@ -115,14 +110,7 @@ class ImageService:
             logger.warning("Imagen response had empty bytes — falling back.")
             return None
 
-        out_dir = "static/images"
-        os.makedirs(out_dir, exist_ok=True)
-        file_name = f"{uuid.uuid4()}.png"
-        file_path = os.path.join(out_dir, file_name)
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(image_bytes)
-
-        return f"{PUBLIC_BASE_URL}/static/images/{file_name}"
+        return await get_asset_store().save("images", image_bytes, "png")
 
     def _generate_blocking(self, prompt: str) -> list:
         """Synchronous Imagen call wrapped by `generate()` in an executor.
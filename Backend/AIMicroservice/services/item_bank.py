@@ -0,0 +1,347 @@
+"""Calibrated placement item bank with adaptive (CAT) item selection.
+
+Placement used to generate every question live and walk `LEVELS` with
+the 2-of-3 streak rule: one LLM call per answer and slow convergence.
+`ItemBank` keeps the validated tasks placement has served, each with a
+difficulty on the IRT logit scale, and `select` hands out the unseen
+item that is most informative at the learner's current ability
+estimate. Only when no item lies within `max_gap` logits of that
+estimate does the caller generate a new task, which then joins the
+bank.
+
+Model: Rasch (discrimination 1) with a fixed guessing floor,
+1/len(options) for multiple choice and 0 for fill-in-the-blank.
+Ability is the EAP estimate over a fixed grid with a normal prior
+(`estimate_ability`). A new item starts at its CEFR level's anchor in
+`LEVEL_DIFFICULTY` and is recalibrated from every answer with an
+Elo-style step against the answering learner's estimate; the step
+shrinks as the item collects responses. Answers are scored here
+against the banked payload, never taken from the client's verdict, so
+a tampered `is_correct` can't skew the shared calibration. Steps are persisted as atomic
+increments (`ItemBankStore.record`), so replicas don't overwrite each
+other's calibration.
+
+Items live in Postgres (`placement_items`) and are loaded per
+(language, UI language) shelf on first use, then reloaded every
+`reload_s` to pick up items other replicas added.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Sequence, Set, Tuple, Union
+
+from models.dtos.task_dto import FillInTheBlankTask, MultipleChoiceTask
+from utils.background import get_background_dispatcher
+
+logger = logging.getLogger("ai_microservice")
+
+# Off unless configured; docker-compose turns it on. While off, nothing
+# is banked or calibrated.
+_ENABLED = os.getenv("PLACEMENT_ITEM_BANK", "0") not in ("0", "false", "False")
+# Largest |difficulty - ability| an item may have and still be served.
+_MAX_GAP = float(os.getenv("ITEM_BANK_MAX_GAP", "0.75"))
+# Serve one of the k most informative items, not always the best one,
+# so a handful of items don't absorb every learner's exposure.
+_TOP_K = int(os.getenv("ITEM_BANK_TOP_K", "3"))
+_RELOAD_S = float(os.getenv("ITEM_BANK_RELOAD_S", "600"))
+# Answers after which an item's difficulty counts as calibrated.
+CALIBRATED_AFTER = int(os.getenv("ITEM_BANK_CALIBRATED_AFTER", "30"))
+
+_PRIOR_MEAN = -1.5
+_PRIOR_SD = 1.5
+_GRID = tuple(x / 10 for x in range(-40, 41))
+_DIFFICULTY_BOUND = 4.0
+_STEP = 0.4
+_MIN_STEP = 0.02
+# Retry a failed shelf load after this long instead of `reload_s`.
+_LOAD_RETRY_S = 60.0
+# Typos a fill-in-the-blank answer may contain and still count as
+# correct; same tolerance the placement UI grades with.
+_FILL_TOLERANCE = 2
+
+# Anchor difficulty (logits) of tasks generated for each CEFR level.
+LEVEL_DIFFICULTY: Dict[str, float] = {
+    "A1": -2.5,
+    "A2": -1.5,
+    "B1": -0.5,
+    "B2": 0.5,
+    "C1": 1.5,
+    "C2": 2.5,
+}
+
+# (difficulty at the time, guessing floor, answered correctly)
+Response = Tuple[float, float, bool]
+ShelfKey = Tuple[str, str]
+BankTask = Union[MultipleChoiceTask, FillInTheBlankTask]
+
+
+def p_correct(ability: float, difficulty: float, guess: float = 0.0) -> float:
+    return guess + (1.0 - guess) / (1.0 + math.exp(difficulty - ability))
+
+
+def item_information(ability: float, difficulty: float, guess: float = 0.0) -> float:
+    """Fisher information of one item at `ability`."""
+    p = p_correct(ability, difficulty, guess)
+    if p <= 0.0 or p >= 1.0:
+        return 0.0
+    return ((p - guess) / (1.0 - guess)) ** 2 * (1.0 - p) / p
+
+
+def estimate_ability(responses: Sequence[Response]) -> Tuple[float, float]:
+    """EAP ability estimate and its posterior SD. With no responses
+    this is the prior."""
+    log_weights: List[float] = []
+    for theta in _GRID:
+        lw = -0.5 * ((theta - _PRIOR_MEAN) / _PRIOR_SD) ** 2
+        for difficulty, guess, correct in responses:
+            p = p_correct(theta, difficulty, guess)
+            lw += math.log(p if correct else 1.0 - p)
+        log_weights.append(lw)
+    top = max(log_weights)
+    weights = [math.exp(lw - top) for lw in log_weights]
+    total = sum(weights)
+    mean = sum(t * w for t, w in zip(_GRID, weights)) / total
+    variance = sum((t - mean) ** 2 * w for t, w in zip(_GRID, weights)) / total
+    return mean, math.sqrt(variance)
+
+
+# Where every learner starts.
+PRIOR_ESTIMATE: Tuple[float, float] = estimate_ability(())
+
+
+def level_for(ability: float) -> str:
+    """CEFR level whose anchor difficulty is closest to `ability`."""
+    return min(LEVEL_DIFFICULTY, key=lambda level: abs(LEVEL_DIFFICULTY[level] - ability))
+
+
+def _edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def guess_floor(task: BankTask) -> float:
+    if isinstance(task, MultipleChoiceTask) and task.options:
+        return 1.0 / len(task.options)
+    return 0.0
+
+
+@dataclass(slots=True)
+class BankItem:
+    id: str
+    task_type: str
+    payload: Dict[str, Any]
+    difficulty: float
+    guess: float = 0.0
+    responses: int = 0
+    correct: int = 0
+    retired: bool = False
+
+    @property
+    def calibrated(self) -> bool:
+        return self.responses >= CALIBRATED_AFTER
+
+    def task(self) -> BankTask:
+        """A fresh task DTO, so callers can't mutate the banked copy."""
+        if self.task_type == "multiple_choice":
+            return MultipleChoiceTask.model_validate(self.payload)
+        return FillInTheBlankTask.model_validate(self.payload)
+
+    def is_correct(self, answer: str) -> bool:
+        """Score `answer` against the banked correct answer(s)."""
+        expected = self.payload.get("correct_answer")
+        keys = [str(key) for key in (expected if isinstance(expected, list) else [expected]) if key is not None]
+        if self.task_type == "multiple_choice":
+            return answer in keys
+        given = answer.strip().lower()
+        return any(_edit_distance(given, key.strip().lower()) <= _FILL_TOLERANCE for key in keys)
+
+
+class ItemStore(Protocol):
+    """Persistence behind ItemBank (`ItemBankStore` in production)."""
+
+    async def load(self, language: str, ui_locale: str) -> List[BankItem]: ...
+
+    async def add(self, language: str, ui_locale: str, level: str, item: BankItem) -> None: ...
+
+    async def record(self, item_id: str, delta: float, correct: bool, retire: bool) -> None: ...
+
+
+@dataclass
+class _Shelf:
+    items: Dict[str, BankItem] = field(default_factory=dict)
+    # Monotonic time after which the shelf is reloaded.
+    fresh_until: float = 0.0
+    # Added here since the last load; the next load may not see them yet.
+    added: Set[str] = field(default_factory=set)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class ItemBank:
+    def __init__(
+        self,
+        store: Optional[ItemStore],
+        max_gap: float = _MAX_GAP,
+        top_k: int = _TOP_K,
+        reload_s: float = _RELOAD_S,
+        enabled: bool = _ENABLED,
+    ) -> None:
+        self._store = store
+        self.max_gap = max_gap
+        self.top_k = max(1, top_k)
+        self.reload_s = reload_s
+        self._enabled = enabled
+        self._shelves: Dict[ShelfKey, _Shelf] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.added = 0
+        self.answers = 0
+        self.retired = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    async def _shelf(self, language: str, ui_locale: str) -> _Shelf:
+        key = (language, ui_locale)
+        shelf = self._shelves.setdefault(key, _Shelf())
+        if self._store is None or time.monotonic() < shelf.fresh_until:
+            return shelf
+        async with shelf.lock:
+            if time.monotonic() < shelf.fresh_until:
+                return shelf
+            try:
+                loaded = await self._store.load(language, ui_locale)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Item bank load for %s failed: %s", key, exc)
+                shelf.fresh_until = time.monotonic() + _LOAD_RETRY_S
+                return shelf
+            fresh = {item.id: item for item in loaded}
+            for item_id in shelf.added:
+                if item_id in shelf.items:
+                    fresh.setdefault(item_id, shelf.items[item_id])
+            shelf.items = fresh
+            shelf.added = set()
+            shelf.fresh_until = time.monotonic() + self.reload_s
+        return shelf
+
+    async def select(
+        self,
+        language: str,
+        ui_locale: str,
+        ability: float,
+        exclude: Iterable[str] = (),
+    ) -> Optional[BankItem]:
+        """The next item for a learner at `ability`, or None when the
+        bank has nothing unseen close enough (caller generates)."""
+        shelf = await self._shelf(language, ui_locale)
+        # No awaits from here on: concurrent requests of one session
+        # see each other's `exclude` updates.
+        excluded = set(exclude)
+        candidates = [
+            item
+            for item in shelf.items.values()
+            if not item.retired
+            and item.id not in excluded
+            and abs(item.difficulty - ability) <= self.max_gap
+        ]
+        if not candidates:
+            self.misses += 1
+            return None
+        candidates.sort(
+            key=lambda item: item_information(ability, item.difficulty, item.guess),
+            reverse=True,
+        )
+        self.hits += 1
+        return random.choice(candidates[: self.top_k])
+
+    async def add(self, language: str, ui_locale: str, task: BankTask, level: str) -> BankItem:
+        """Bank a freshly generated (already validated) task at its
+        level's anchor difficulty."""
+        shelf = await self._shelf(language, ui_locale)
+        item = BankItem(
+            id=task.id,
+            task_type=task.type,
+            payload=task.model_dump(),
+            difficulty=LEVEL_DIFFICULTY.get(level, 0.0),
+            guess=guess_floor(task),
+        )
+        shelf.items.setdefault(item.id, item)
+        shelf.added.add(item.id)
+        self.added += 1
+        if self._store is not None:
+            try:
+                await self._store.add(language, ui_locale, level, item)
+            except Exception as exc:  # noqa: BLE001
+                # Still served from memory; only persistence is lost.
+                logger.warning("Item bank insert of %s failed: %s", item.id, exc)
+        return item
+
+    def record_answer(
+        self,
+        language: str,
+        ui_locale: str,
+        item_id: str,
+        answer: str,
+        ability: float,
+    ) -> Optional[Response]:
+        """Score `answer` to `item_id` and recalibrate the item from it,
+        given the learner was estimated at `ability` (before this
+        answer). Returns the response to add to the learner's record,
+        or None for an item this bank doesn't know."""
+        shelf = self._shelves.get((language, ui_locale))
+        item = shelf.items.get(item_id) if shelf is not None else None
+        if item is None:
+            return None
+        correct = item.is_correct(answer)
+        response: Response = (item.difficulty, item.guess, correct)
+
+        step = max(_MIN_STEP, _STEP / (1.0 + item.responses / 10.0))
+        expected = p_correct(ability, item.difficulty, item.guess)
+        # Answered correctly more often than expected => easier.
+        target = item.difficulty + step * (expected - (1.0 if correct else 0.0))
+        target = min(max(target, -_DIFFICULTY_BOUND), _DIFFICULTY_BOUND)
+        delta = target - item.difficulty
+        item.difficulty = target
+        item.responses += 1
+        item.correct += int(correct)
+        self.answers += 1
+        # Pinned at the edge of the scale after calibration: everyone
+        # (or no one) gets it right, so it tells us nothing.
+        retire = item.calibrated and abs(target) >= _DIFFICULTY_BOUND
+        if retire and not item.retired:
+            item.retired = True
+            self.retired += 1
+
+        if self._store is not None:
+            get_background_dispatcher().submit(
+                self._store.record(item_id, delta, correct, retire),
+                name="item_bank.record",
+            )
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        items = [item for shelf in self._shelves.values() for item in shelf.items.values()]
+        selections = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "shelves": len(self._shelves),
+            "items": len(items),
+            "calibrated": sum(1 for item in items if item.calibrated),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / selections) if selections else 0.0,
+            "added": self.added,
+            "answers": self.answers,
+            "retired": self.retired,
+        }
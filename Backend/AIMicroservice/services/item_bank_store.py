@@ -0,0 +1,68 @@
+"""Postgres persistence for the placement item bank (`placement_items`)."""
+
+from typing import List
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from database.models import PlacementItem
+from services.item_bank import BankItem
+
+
+class ItemBankStore:
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self._session_factory = session_factory
+
+    async def load(self, language: str, ui_locale: str) -> List[BankItem]:
+        query = select(PlacementItem).where(
+            PlacementItem.language == language,
+            PlacementItem.ui_locale == ui_locale,
+            PlacementItem.retired.is_(False),
+        )
+        async with self._session_factory() as session:
+            rows = (await session.execute(query)).scalars().all()
+        return [
+            BankItem(
+                id=row.id,
+                task_type=row.task_type,
+                payload=row.payload,
+                difficulty=row.difficulty,
+                guess=row.guess,
+                responses=row.responses,
+                correct=row.correct,
+            )
+            for row in rows
+        ]
+
+    async def add(self, language: str, ui_locale: str, level: str, item: BankItem) -> None:
+        async with self._session_factory() as session:
+            await session.execute(
+                pg_insert(PlacementItem).values(
+                    id=item.id,
+                    language=language,
+                    ui_locale=ui_locale,
+                    task_type=item.task_type,
+                    seed_level=level,
+                    payload=item.payload,
+                    difficulty=item.difficulty,
+                    guess=item.guess,
+                ).on_conflict_do_nothing(index_elements=["id"])
+            )
+            await session.commit()
+
+    async def record(self, item_id: str, delta: float, correct: bool, retire: bool) -> None:
+        """Apply one answer as increments, so concurrent replicas add
+        up instead of overwriting each other."""
+        values = {
+            "difficulty": PlacementItem.difficulty + delta,
+            "responses": PlacementItem.responses + 1,
+            "correct": PlacementItem.correct + int(correct),
+        }
+        if retire:
+            values["retired"] = True
+        async with self._session_factory() as session:
+            await session.execute(
+                update(PlacementItem).where(PlacementItem.id == item_id).values(**values)
+            )
+            await session.commit()
@@ -1,11 +1,7 @@
-import asyncio
-import json
 import logging
 import os
 import uuid
-from typing import List, Optional
-
-import aiofiles
+from typing import Any, Awaitable, Callable, List, Optional
 
 from constants.variety import variety_picker
 from models.dtos.listening_task_dto import ListeningTaskRequest
@@ -15,7 +11,9 @@ from models.responses.listening_task_response import (
     ListeningTaskResponse,
 )
 from services.ai_service import AI_Service
+from services.audio_streams import get_audio_stream_store
 from services.tts_service import TTSService
+from utils.json_stream import JsonStreamParser
 from utils.user_context import UserContext
 
 logger = logging.getLogger(__name__)
@@ -50,6 +48,8 @@ class ListeningTaskService:
         focus_topic: str | None = None,
         focus_keywords: list[str] | None = None,
         focus_weaknesses: list[str] | None = None,
+        on_delta: Callable[[str], Awaitable[None]] | None = None,
+        on_question: Callable[[ListeningQuestion], Awaitable[None]] | None = None,
     ) -> ListeningTaskResponse:
         language = request.language
         level = request.level
@@ -86,35 +86,47 @@ class ListeningTaskService:
             needs_dialogue=needs_dialogue,
         )
 
+        parser = JsonStreamParser("questions")
+        questions: List[ListeningQuestion] = []
+
+        async def _accept(raw_items: List[Any]) -> None:
+            for raw in raw_items:
+                question = self._validate_question(raw)
+                if question is None:
+                    continue
+                questions.append(question)
+                if on_question is not None:
+                    await on_question(question)
+
+        async def _on_stream_delta(text: str) -> None:
+            if on_delta is not None:
+                await on_delta(text)
+            await _accept(parser.feed(text))
+
+        streaming = on_delta is not None or on_question is not None
         response = await self.ai_service.get_ai_response(
-            prompt, user_context=user_context
+            prompt,
+            user_context=user_context,
+            on_delta=_on_stream_delta if streaming else None,
         )
-        try:
-            content_json = json.loads(response)
-        except json.JSONDecodeError as e:
-            logger.error("Listening AI response is not valid JSON: %s", e)
+        # Questions are validated one by one as their objects close, so
+        # a truncated or broken tail keeps every complete question.
+        await _accept(parser.feed(response[len(parser.text):]))
+        if parser.malformed:
+            logger.warning(
+                "Listening response had %d malformed element(s); kept %d question(s).",
+                parser.malformed,
+                len(questions),
+            )
+        if not parser.fields and not questions:
+            logger.error("Listening AI response is not valid JSON")
             raise ValueError("Failed to parse AI response for listening task")
 
-        transcript = str(content_json.get("transcript", "")).strip()
-        raw_questions = content_json.get("questions") or []
+        transcript = str(parser.fields.get("transcript", "")).strip()
 
         if not transcript:
             raise ValueError("Generated transcript is empty")
 
-        questions: List[ListeningQuestion] = []
-        for raw in raw_questions:
-            if not isinstance(raw, dict):
-                continue
-            try:
-                questions.append(ListeningQuestionAdapter.validate_python(raw))
-            except Exception as e:
-                logger.debug(
-                    "Skipping malformed listening question (type=%s): %s",
-                    raw.get("type"),
-                    e,
-                )
-                continue
-
         if not questions:
             raise ValueError("Failed to parse AI response for listening task")
 
@@ -123,26 +135,18 @@ class ListeningTaskService:
         # FE-visible audio pipeline from whether we actually had
         # multi_speaker_matching items in the set — sometimes a model
         # produces dialogue regardless.
+        #
+        # The turns are only started here: the task goes back right
+        # away and its audio URL streams each turn as it's ready (see
+        # AudioStreamStore).
         try:
-            loop = asyncio.get_running_loop()
-            audio_bytes, speakers = await loop.run_in_executor(
-                None,
-                tts_service.synthesize_multispeaker,
-                transcript,
-                language,
-                level,
-            )
+            clips, speakers = tts_service.multispeaker_clips(transcript, language, level)
         except Exception as e:
             logger.error("TTS synthesis failed: %s", e)
             raise
 
-        audio_dir = "static/audio"
-        os.makedirs(audio_dir, exist_ok=True)
-        file_name = f"{uuid.uuid4()}.mp3"
-        file_path = os.path.join(audio_dir, file_name)
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(audio_bytes)
-        audio_url = f"{PUBLIC_BASE_URL}/static/audio/{file_name}"
+        stream_id = get_audio_stream_store().open(clips)
+        audio_url = f"{PUBLIC_BASE_URL}/static/audio/stream/{stream_id}.mp3"
 
         return ListeningTaskResponse(
             type="listening",
@@ -152,6 +156,20 @@ class ListeningTaskService:
             speakers=speakers,
         )
 
+    @staticmethod
+    def _validate_question(raw: object) -> Optional[ListeningQuestion]:
+        if not isinstance(raw, dict):
+            return None
+        try:
+            return ListeningQuestionAdapter.validate_python(raw)
+        except Exception as e:
+            logger.debug(
+                "Skipping malformed listening question (type=%s): %s",
+                raw.get("type"),
+                e,
+            )
+            return None
+
     @staticmethod
     def _resolve_question_types(requested: Optional[List[str]]) -> List[str]:
         """Filter the requested type list to canonical entries; fall
@@ -0,0 +1,102 @@
+"""Periodic background maintenance for the shared stores.
+
+Index builds and similar housekeeping are blocking, potentially
+minutes-long calls into LanceDB. `MaintenanceRunner` runs each
+registered job on a worker thread at its own interval, one job at a
+time, so the event loop and request threads never wait on them. Jobs
+report a small dict that shows up under `/internal/metrics`.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("ai_microservice")
+
+Job = Callable[[], Dict[str, Any]]
+
+
+class _Scheduled:
+    def __init__(self, name: str, fn: Job, interval_s: float) -> None:
+        self.name = name
+        self.fn = fn
+        self.interval_s = interval_s
+        self.next_run = 0.0
+        self.runs = 0
+        self.failures = 0
+        self.last_duration_ms: Optional[float] = None
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+
+
+class MaintenanceRunner:
+    def __init__(self, initial_delay_s: float = 30.0) -> None:
+        self.initial_delay_s = initial_delay_s
+        self._jobs: List[_Scheduled] = []
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def register(self, name: str, fn: Job, interval_s: float) -> None:
+        self._jobs.append(_Scheduled(name, fn, interval_s))
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="maintenance")
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def run_now(self, name: str) -> Optional[Dict[str, Any]]:
+        """Run one job immediately (tests, manual triggers)."""
+        for job in self._jobs:
+            if job.name == name:
+                await self._run_job(job)
+                return job.last_result
+        return None
+
+    async def _run(self) -> None:
+        await asyncio.sleep(self.initial_delay_s)
+        while True:
+            now = time.monotonic()
+            for job in self._jobs:
+                if job.next_run <= now:
+                    await self._run_job(job)
+            if self._jobs:
+                wait = min(job.next_run for job in self._jobs) - time.monotonic()
+            else:
+                wait = 60.0
+            await asyncio.sleep(max(1.0, wait))
+
+    async def _run_job(self, job: _Scheduled) -> None:
+        started = time.perf_counter()
+        try:
+            job.last_result = await asyncio.to_thread(job.fn)
+            job.last_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            job.failures += 1
+            job.last_error = str(exc)
+            logger.warning("Maintenance job %s failed: %s", job.name, exc)
+        finally:
+            job.runs += 1
+            job.last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            job.next_run = time.monotonic() + job.interval_s
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            job.name: {
+                "runs": job.runs,
+                "failures": job.failures,
+                "last_duration_ms": job.last_duration_ms,
+                "last_result": job.last_result,
+                "last_error": job.last_error,
+            }
+            for job in self._jobs
+        }
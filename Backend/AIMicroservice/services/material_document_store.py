@@ -0,0 +1,136 @@
+"""Content-addressed registry of ingested PDFs (AI Postgres database).
+
+`process_pdf` hashes every upload. A hash seen before means the chunks,
+embeddings and document analysis already exist, so the upload just
+records an ownership row for the new user and returns the stored
+result. `owned_hashes` tells the vector search which shared documents
+a user may retrieve from.
+
+Each upload's DocumentMap is also kept per user (`document_maps`), so
+`generate_quiz` starts from one indexed read instead of re-running the
+classification call when the client doesn't send the map back.
+"""
+
+import logging
+import uuid
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from database.models import DocumentMapRecord, MaterialDocument, MaterialOwnership
+from models.dtos.material_dtos import DocumentMap, ProcessPdfResponse
+
+logger = logging.getLogger("ai_microservice")
+
+
+class MaterialDocumentStore:
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self._session_factory = session_factory
+
+    async def get(self, content_hash: str) -> Optional[MaterialDocument]:
+        async with self._session_factory() as session:
+            return await session.get(MaterialDocument, content_hash)
+
+    async def save(
+        self,
+        content_hash: str,
+        owner_id: str,
+        filename: str,
+        result: ProcessPdfResponse,
+    ) -> None:
+        """Record a freshly ingested document and its first owner. A
+        concurrent insert of the same hash (another replica) wins."""
+        document_map = result.document_map.model_dump() if result.document_map else None
+        analyzed_types = [
+            t if isinstance(t, dict) else t.model_dump() for t in result.analyzed_types
+        ]
+        async with self._session_factory() as session:
+            await session.execute(
+                pg_insert(MaterialDocument).values(
+                    content_hash=content_hash,
+                    chunks_count=result.chunks_count,
+                    analyzed_types=analyzed_types,
+                    document_map=document_map,
+                    source_owner_id=owner_id,
+                    source_filename=filename,
+                ).on_conflict_do_nothing(index_elements=["content_hash"])
+            )
+            await self._claim(session, owner_id, content_hash, filename)
+            await session.commit()
+
+    async def claim(self, owner_id: str, content_hash: str, filename: str) -> None:
+        """Give `owner_id` access to an already ingested document."""
+        async with self._session_factory() as session:
+            await self._claim(session, owner_id, content_hash, filename)
+            await session.commit()
+
+    @staticmethod
+    async def _claim(session: AsyncSession, owner_id: str, content_hash: str, filename: str) -> None:
+        stmt = pg_insert(MaterialOwnership).values(
+            user_id=owner_id, content_hash=content_hash, filename=filename
+        )
+        await session.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_user_material",
+                set_={"filename": stmt.excluded.filename, "uploaded_at": stmt.excluded.uploaded_at},
+            )
+        )
+
+    async def owned_hashes(self, owner_id: str) -> List[str]:
+        async with self._session_factory() as session:
+            rows = await session.execute(
+                select(MaterialOwnership.content_hash).where(MaterialOwnership.user_id == owner_id)
+            )
+            return [row[0] for row in rows.all()]
+
+    async def save_document_map(
+        self,
+        owner_id: str,
+        filename: str,
+        document_map: DocumentMap,
+        content_hash: Optional[str] = None,
+    ) -> str:
+        """Store `document_map` for `owner_id`'s upload `filename` and
+        return its id (stable across re-uploads of the same name)."""
+        insert = pg_insert(DocumentMapRecord).values(
+            id=str(uuid.uuid4()),
+            user_id=owner_id,
+            filename=filename,
+            content_hash=content_hash,
+            document_map=document_map.model_dump(),
+        )
+        upsert = insert.on_conflict_do_update(
+            constraint="uq_user_document_map",
+            set_={
+                "content_hash": insert.excluded.content_hash,
+                "document_map": insert.excluded.document_map,
+                "created_at": insert.excluded.created_at,
+            },
+        ).returning(DocumentMapRecord.id)
+        async with self._session_factory() as session:
+            document_id: str = (await session.execute(upsert)).scalar_one()
+            await session.commit()
+        return document_id
+
+    async def load_document_map(self, owner_id: str, document_id: str) -> Optional[DocumentMap]:
+        """`owner_id`'s map `document_id`. Someone else's id reads as
+        missing."""
+        query = select(DocumentMapRecord.document_map).where(
+            DocumentMapRecord.user_id == owner_id,
+            DocumentMapRecord.id == document_id,
+        )
+        async with self._session_factory() as session:
+            raw = (await session.execute(query)).scalar_one_or_none()
+        return DocumentMap.model_validate(raw) if raw else None
+
+    @staticmethod
+    def to_response(document: MaterialDocument, filename: str) -> ProcessPdfResponse:
+        return ProcessPdfResponse(
+            filename=filename,
+            chunks_count=document.chunks_count,
+            status="success",
+            analyzed_types=document.analyzed_types or [],
+            document_map=DocumentMap.model_validate(document.document_map) if document.document_map else None,
+        )
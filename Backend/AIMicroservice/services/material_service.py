@@ -3,11 +3,24 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from pypdf import PdfReader
 import io
 import asyncio
-import re
-from typing import List, Dict, Any, Optional, Union, Tuple, Set
+import hashlib
+import os
+import weakref
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Any, Optional, Sequence, Union, Tuple, TypeVar
 from fastapi import HTTPException
 from services.ai_service import AI_Service
+from services.material_document_store import MaterialDocumentStore
 from services.user_service import UserService
+from utils.json_stream import JsonStreamParser
+from utils.ngram_index import NgramIndex, NgramIndexStore, ngram_hashes
+from utils.pdf_text import (
+    StreamingChunker,
+    extract_page_range,
+    get_pdf_executor,
+    non_text_share,
+    page_ranges,
+    pdf_worker_count,
+)
 from utils.user_context import UserContext
 import json
 import logging
@@ -50,17 +63,31 @@ _STIMULUS_BEARING_TYPES = {
 _VERBATIM_NGRAM_SIZE = 12
 _VERBATIM_RETRIES = 1
 
+# PDFs with fewer pages than this are extracted on one worker thread;
+# longer ones fan out over the PDF process pool.
+_PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "24"))
+
+
+def content_digest(content: bytes) -> str:
+    """SHA-256 hex of an uploaded file — the ingestion dedup key."""
+    return hashlib.sha256(content).hexdigest()
+
+
+_T = TypeVar("_T")
+
 
-def _word_ngrams(text: str, n: int) -> Set[Tuple[str, ...]]:
-    """Return the set of lowercase word n-grams in `text`. Punctuation
-    and whitespace differences don't count — we tokenize on word
-    characters only, so "Madrid." and "Madrid," produce the same
-    token. This makes the verbatim check robust against trivial
-    formatting changes the model uses to paper over copying."""
-    words = re.findall(r"\w+", text.lower(), flags=re.UNICODE)
-    if len(words) < n:
-        return set()
-    return {tuple(words[i : i + n]) for i in range(len(words) - n + 1)}
+def _bind_exercise(
+    callback: Optional[Callable[[int, _T], Awaitable[None]]],
+    index: int,
+) -> Optional[Callable[[_T], Awaitable[None]]]:
+    """Per-exercise callback that tags each item with its exercise."""
+    if callback is None:
+        return None
+
+    async def _forward(item: _T) -> None:
+        await callback(index, item)
+
+    return _forward
 
 
 def _dedupe_preserve_order(options: List[Any]) -> List[str]:
@@ -93,24 +120,39 @@ def _has_verbatim_overlap(
     candidate: str,
     source_chunks: List[str],
     n: int = _VERBATIM_NGRAM_SIZE,
+    indexes: Sequence[NgramIndex] = (),
 ) -> bool:
     """True if `candidate` shares any n-word contiguous slice with any
-    of the source chunks. With n=12 this almost never fires on
-    independently-written prose but reliably catches verbatim quotes."""
-    cand_grams = _word_ngrams(candidate, n)
-    if not cand_grams:
+    of the source chunks or any prebuilt fingerprint index. With n=12
+    this almost never fires on independently-written prose but
+    reliably catches verbatim quotes."""
+    cand_hashes = ngram_hashes(candidate, n)
+    if not cand_hashes:
         return False
-    for chunk in source_chunks:
-        if cand_grams & _word_ngrams(chunk, n):
-            return True
-    return False
+    if source_chunks:
+        indexes = [*indexes, NgramIndex.from_texts(source_chunks, n)]
+    return any(h in index for index in indexes if len(index) for h in cand_hashes)
+
 
 logger = logging.getLogger(__name__)
 
 class MaterialService:
-    def __init__(self, vector_db_service: VectorDBService, ai_service: AI_Service) -> None:
+    def __init__(
+        self,
+        vector_db_service: VectorDBService,
+        ai_service: AI_Service,
+        ngram_index_store: Optional[NgramIndexStore] = None,
+        document_store: Optional[MaterialDocumentStore] = None,
+    ) -> None:
         self.vector_db_service = vector_db_service
         self.ai_service = ai_service
+        # Per-document n-gram fingerprints for the Stage 2 anti-copy
+        # check, written once at upload time.
+        self.ngram_index_store = ngram_index_store or NgramIndexStore(n=_VERBATIM_NGRAM_SIZE)
+        # Content-hash registry of ingested PDFs; without it every
+        # upload is ingested in full.
+        self.document_store = document_store
+        self._ingest_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
         self.user_service = UserService()
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000,
@@ -118,16 +160,182 @@ class MaterialService:
             length_function=len,
         )
 
-    async def process_pdf(self, file_content: bytes, filename: str, user_context: Optional[object] = None) -> ProcessPdfResponse:
+    async def _iter_pdf_pages(
+        self, file_content: bytes
+    ) -> AsyncIterator[Tuple[str, int, int]]:
+        """Yield (page text, pages done, total pages) in page order.
+
+        Short documents are read on a worker thread. Longer ones are cut
+        into page ranges extracted in parallel in the PDF process pool,
+        so a 200-page coursebook neither blocks the event loop nor
+        serialises on the GIL.
+        """
+        reader = await asyncio.to_thread(PdfReader, io.BytesIO(file_content))
+        pages = reader.pages
+        total = len(pages)
+        workers = pdf_worker_count()
+        if total < _PDF_PARALLEL_MIN_PAGES or workers < 2:
+            for i, page in enumerate(pages):
+                text = await asyncio.to_thread(page.extract_text)
+                yield text or "", i + 1, total
+            return
+
+        loop = asyncio.get_running_loop()
+        executor = get_pdf_executor()
+        # A few more ranges than workers evens out pages of uneven size.
+        futures = [
+            loop.run_in_executor(executor, extract_page_range, file_content, start, stop)
+            for start, stop in page_ranges(total, workers * 2)
+        ]
+        done = 0
         try:
-            logger.info(f"Parsing PDF: {filename}")
-            pdf_file = io.BytesIO(file_content)
-            reader = PdfReader(pdf_file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
+            for future in futures:
+                for text in await future:
+                    done += 1
+                    yield text, done, total
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def process_pdf(
+        self,
+        file_content: bytes,
+        filename: str,
+        user_context: Optional[object] = None,
+        on_progress: Optional[Callable[[str, float], None]] = None,
+    ) -> ProcessPdfResponse:
+        """Extract, chunk, embed and classify an uploaded PDF.
+        `on_progress(stage, fraction)` is called as pages are extracted
+        ("extracting"), chunks are embedded ("embedding") and before
+        the AI analysis ("analyzing").
+
+        Uploads are content-addressed: when the same bytes were ingested
+        before (by anyone), nothing is parsed, embedded or classified
+        again — the uploader becomes an owner of the stored chunks and
+        gets the stored analysis back."""
+        owner_id = (
+            user_context.user_id
+            if isinstance(user_context, UserContext)
+            else None
+        )
+        if self.document_store is None or not owner_id:
+            return await self._ingest_pdf(file_content, filename, owner_id, user_context, on_progress)
+
+        content_hash = await asyncio.to_thread(content_digest, file_content)
+        # Two owners uploading the same coursebook at once: the second
+        # waits for the first ingestion and then reuses it.
+        lock = self._ingest_locks.setdefault(content_hash, asyncio.Lock())
+        async with lock:
+            reused = await self._reuse_ingested(content_hash, owner_id, filename)
+            if reused is not None:
+                return reused
+            return await self._ingest_pdf(
+                file_content, filename, owner_id, user_context, on_progress, content_hash
+            )
 
-            if not text.strip():
+    async def _reuse_ingested(
+        self, content_hash: str, owner_id: str, filename: str
+    ) -> Optional[ProcessPdfResponse]:
+        assert self.document_store is not None
+        try:
+            document = await self.document_store.get(content_hash)
+            if document is None:
+                return None
+            await self.document_store.claim(owner_id, content_hash, filename)
+        except Exception as exc:  # noqa: BLE001
+            # The registry is an optimisation; ingest normally without it.
+            logger.warning("Material document store unavailable (%s); ingesting %s in full.", exc, filename)
+            return None
+        try:
+            copied = await asyncio.to_thread(
+                self.ngram_index_store.copy, content_hash, owner_id, filename
+            )
+            if not copied:
+                # Ingested before fingerprints were kept by hash; the
+                # overlap check still covers the chunks in each prompt.
+                logger.info("No stored n-gram index for %s; skipping the copy.", content_hash[:12])
+        except OSError as exc:
+            logger.warning("Could not copy n-gram index for %s: %s", filename, exc)
+        logger.info("Reusing ingested document %s for %s", content_hash[:12], filename)
+        result = self.document_store.to_response(document, filename)
+        await self._remember_document_map(owner_id, filename, result, content_hash)
+        return result
+
+    async def _remember_document_map(
+        self,
+        owner_id: Optional[str],
+        filename: str,
+        result: ProcessPdfResponse,
+        content_hash: Optional[str] = None,
+    ) -> None:
+        """Persist the upload's DocumentMap for `owner_id` and put its id
+        on `result`. Best-effort: without it generate_quiz falls back to
+        re-classifying."""
+        if self.document_store is None or not owner_id or result.document_map is None:
+            return
+        try:
+            result.document_id = await self.document_store.save_document_map(
+                owner_id, filename, result.document_map, content_hash or None
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not store document map for %s: %s", filename, exc)
+
+    async def _stored_document_map(
+        self, owner_id: Optional[str], document_id: Optional[str]
+    ) -> Optional[DocumentMap]:
+        # No id means the caller doesn't know which upload the quiz is
+        # for; the user's most recent map may belong to another file.
+        if self.document_store is None or not owner_id or not document_id:
+            return None
+        try:
+            return await self.document_store.load_document_map(owner_id, document_id)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not load document map %s: %s", document_id, exc)
+            return None
+
+    async def _owned_hashes(self, owner_id: Optional[str]) -> List[str]:
+        """Content hashes of the shared documents `owner_id` may search."""
+        if self.document_store is None or not owner_id:
+            return []
+        try:
+            return await self.document_store.owned_hashes(owner_id)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not load owned materials for %s: %s", owner_id, exc)
+            return []
+
+    async def _ingest_pdf(
+        self,
+        file_content: bytes,
+        filename: str,
+        owner_id: Optional[str],
+        user_context: Optional[object],
+        on_progress: Optional[Callable[[str, float], None]],
+        content_hash: str = "",
+    ) -> ProcessPdfResponse:
+        def report(stage: str, fraction: float) -> None:
+            if on_progress is not None:
+                on_progress(stage, fraction)
+
+        try:
+            logger.info(f"Parsing PDF: {filename}")
+            # Page text goes straight into the splitter as it arrives
+            # rather than being concatenated into one big string first.
+            chunker = StreamingChunker(self.text_splitter)
+            chunks: List[str] = []
+            non_text = 0
+            total_chars = 0
+            has_text = False
+            async for page_text, pages_done, total_pages in self._iter_pdf_pages(file_content):
+                page_text += "\n"
+                bad, size = non_text_share(page_text)
+                non_text += bad
+                total_chars += size
+                has_text = has_text or bool(page_text.strip())
+                chunks.extend(chunker.feed(page_text))
+                report("extracting", pages_done / max(total_pages, 1))
+            chunks.extend(chunker.finish())
+
+            if not has_text:
                 from utils.error_codes import PDF_NO_TEXT, raise_with_code
                 raise_with_code(
                     PDF_NO_TEXT,
@@ -136,23 +344,18 @@ class MaterialService:
                 )
 
             # Detect garbled text from custom-font / encrypted-encoding PDFs.
-                        # pypdf still 'extracts' something, but it comes out as
+            # pypdf still 'extracts' something, but it comes out as
             # high-bit nonsense like '\x03URWRNRĄ\x03' that no LLM can
             # parse and that triggers Groq's json_validate_failed when
             # asked for a structured response. Cheap heuristic: count
             # the share of characters that aren't word characters,
             # whitespace, or basic punctuation. Above 30% means the
             # extraction is garbage.
-            import re as _re
-            non_text = sum(
-                1 for c in text
-                if not _re.match(r"[\w\s.,;:!?\"'()\[\]{}\-—–‑/\\]", c, _re.UNICODE)
-            )
-            non_text_share = non_text / max(len(text), 1)
-            if non_text_share > 0.30:
+            non_text_ratio = non_text / max(total_chars, 1)
+            if non_text_ratio > 0.30:
                 logger.warning(
                     "PDF text appears garbled (non-text share %.1f%%) for %s",
-                    non_text_share * 100,
+                    non_text_ratio * 100,
                     filename,
                 )
                 from utils.error_codes import PDF_GARBLED_TEXT, raise_with_code
@@ -162,20 +365,39 @@ class MaterialService:
                     "PDF text could not be read cleanly — likely a scan or custom embedded font.",
                 )
 
-            logger.info(f"Extracted {len(text)} characters from PDF.")
-
-            chunks = self.text_splitter.split_text(text)
+            logger.info(f"Extracted {total_chars} characters from PDF.")
             logger.info(f"Split text into {len(chunks)} chunks.")
-            
+
             metadatas = [ChunkMetadata(source=filename, chunk_index=i) for i in range(len(chunks))]
             logger.info("Saving chunks to Vector DB...")
-            owner_id = (
-                user_context.user_id
-                if isinstance(user_context, UserContext)
-                else None
-            )
-            self.vector_db_service.save_chunks(chunks, metadatas, user_id=owner_id)
+            # Encoding hundreds of chunks is CPU-bound; keep it off the
+            # event loop so other users' requests keep flowing. The
+            # store encodes and writes in record batches and reports
+            # rows written after each one.
+            shareable = False
+            if chunks:
+                shareable = await asyncio.to_thread(
+                    self.vector_db_service.save_chunks,
+                    chunks,
+                    metadatas,
+                    user_id=owner_id,
+                    on_progress=lambda rows: report("embedding", rows / len(chunks)),
+                    content_hash=content_hash,
+                )
+            report("embedding", 1.0)
+
+            # Fingerprint the document once so Stage 2 can check
+            # generated passages against all of it without
+            # re-tokenising. Chunk overlap (200 chars) covers n-grams
+            # that straddle a chunk boundary.
+            try:
+                await asyncio.to_thread(
+                    self.ngram_index_store.save, owner_id, filename, chunks, content_hash or None
+                )
+            except OSError as exc:
+                logger.warning("Could not store n-gram index for %s: %s", filename, exc)
 
+            report("analyzing", 0.0)
             logger.info("Analyzing question types using AI...")
             total_chunks = len(chunks)
             if total_chunks <= 5:
@@ -427,13 +649,28 @@ class MaterialService:
                 analyzed_types = []
                 document_map = None
 
-            return ProcessPdfResponse(
+            result = ProcessPdfResponse(
                 filename=filename,
                 chunks_count=len(chunks),
                 status="success",
                 analyzed_types=analyzed_types,
                 document_map=document_map,
             )
+            # Without a map the analysis failed; recording it would hand
+            # every later uploader of these bytes the same empty result.
+            if (
+                content_hash
+                and shareable
+                and owner_id
+                and result.document_map is not None
+                and self.document_store is not None
+            ):
+                try:
+                    await self.document_store.save(content_hash, owner_id, filename, result)
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning("Could not record ingested document %s: %s", filename, exc)
+            await self._remember_document_map(owner_id, filename, result, content_hash)
+            return result
 
         except Exception as e:
             logger.error(f"Error processing PDF: {e}")
@@ -445,11 +682,15 @@ class MaterialService:
         user_context: Optional[object] = None,
         target_language: Optional[str] = None,
         document_map: Optional[DocumentMap] = None,
+        on_delta: Optional[Callable[[int, str], Awaitable[None]]] = None,
+        on_question: Optional[Callable[[int, QuizQuestion], Awaitable[None]]] = None,
+        document_id: Optional[str] = None,
     ) -> GenerateQuizResponse:
         """Multi-stage quiz generation.
 
-        Stage 1 — derive (or accept) a DocumentMap describing what's in
-        the user's material.
+        Stage 1 — accept the caller's DocumentMap, else load the one
+        stored at upload under `document_id`, else derive one from the
+        indexed material.
         Stage 2 — for every exercise that needs a stimulus passage,
         generate a NEW passage of the right length and topic, NOT a
         copy of the source.
@@ -458,6 +699,11 @@ class MaterialService:
 
         Stages 2+3 fan out per-exercise via asyncio.gather so a 4-exercise
         document doesn't pay 4× sequential latency.
+
+        `on_delta(exercise_index, text)` receives Stage 3 output as it
+        streams and `on_question(exercise_index, question)` each
+        question as soon as it validates; the parallel exercises
+        interleave, hence the index.
         """
         try:
             logger.info(
@@ -473,10 +719,11 @@ class MaterialService:
             )
 
             # Stage 1: get a DocumentMap. Trust the one the caller
-            # passed in if they did; otherwise re-derive it from a
-            # representative slice of the indexed material so we
-            # don't lose continuity when the FE doesn't round-trip
-            # the map.
+            # passed in if they did; otherwise read the one stored at
+            # upload time, and only as a last resort re-derive it from
+            # a representative slice of the indexed material.
+            if document_map is None or not document_map.exercises:
+                document_map = await self._stored_document_map(owner_id, document_id)
             if document_map is None or not document_map.exercises:
                 document_map = await self._classify_indexed_material(
                     user_context=user_context,
@@ -516,8 +763,10 @@ class MaterialService:
                         ui_lang=ui_lang,
                         target_language=target_language,
                         user_context=user_context,
+                        on_delta=_bind_exercise(on_delta, index),
+                        on_question=_bind_exercise(on_question, index),
                     )
-                    for ex in exercises
+                    for index, ex in enumerate(exercises)
                 ),
                 return_exceptions=True,
             )
@@ -589,10 +838,12 @@ class MaterialService:
         # A neutral query so the spread covers passages and exercises
         # alike; the old "exercises questions tasks" query starved
         # reading passages from the retrieved set.
-        relevant_docs = self.vector_db_service.search_materials(
+        relevant_docs = await asyncio.to_thread(
+            self.vector_db_service.search_materials,
             "passage paragraph exercise question task",
             limit=12,
             user_id=owner_id,
+            content_hashes=await self._owned_hashes(owner_id),
         )
         if not relevant_docs:
             return None
@@ -722,6 +973,8 @@ class MaterialService:
         ui_lang: str,
         target_language: Optional[str],
         user_context: Optional[object],
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+        on_question: Optional[Callable[[QuizQuestion], Awaitable[None]]] = None,
     ) -> List[QuizQuestion]:
         """Stage 2 + Stage 3 for one exercise.
 
@@ -753,6 +1006,8 @@ class MaterialService:
             ui_lang=ui_lang,
             target_language=target_language,
             user_context=user_context,
+            on_delta=on_delta,
+            on_question=on_question,
         )
 
     @staticmethod
@@ -794,10 +1049,12 @@ class MaterialService:
         # We also hand these chunks to the verbatim-check so the
         # comparison set matches what the model actually saw.
         topic_query = topic_hint or exercise.type.replace("_", " ")
-        topic_chunks = self.vector_db_service.search_materials(
+        topic_chunks = await asyncio.to_thread(
+            self.vector_db_service.search_materials,
             topic_query,
             limit=4,
             user_id=owner_id,
+            content_hashes=await self._owned_hashes(owner_id),
         )
         topic_anchor_texts = [str(d.text) for d in topic_chunks]
         topic_anchor = "\n\n".join(topic_anchor_texts)[:2400]
@@ -807,6 +1064,14 @@ class MaterialService:
         comparison_corpus = topic_anchor_texts + (
             [style_excerpt] if style_excerpt else []
         )
+        # Fingerprints are built once here, not per candidate/retry:
+        # the whole uploaded document (from the ingestion-time index)
+        # plus what this prompt shows the model — the latter also
+        # covers material uploaded before the index existed.
+        overlap_indexes = [
+            await asyncio.to_thread(self.ngram_index_store.load, owner_id),
+            NgramIndex.from_texts(comparison_corpus, _VERBATIM_NGRAM_SIZE),
+        ]
 
         lang_clause = (
             f"Write the passage in {target_language}."
@@ -867,7 +1132,7 @@ class MaterialService:
             if not candidate:
                 raise ValueError("Stimulus generation returned empty passage")
 
-            if not _has_verbatim_overlap(candidate, comparison_corpus):
+            if not _has_verbatim_overlap(candidate, [], indexes=overlap_indexes):
                 passage = candidate
                 break
 
@@ -935,6 +1200,8 @@ class MaterialService:
         ui_lang: str,
         target_language: Optional[str],
         user_context: Optional[object],
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+        on_question: Optional[Callable[[QuizQuestion], Awaitable[None]]] = None,
     ) -> List[QuizQuestion]:
         """Stage 3: write questions for one exercise.
 
@@ -945,7 +1212,9 @@ class MaterialService:
 
         Items are parsed through QuizQuestionAdapter, which routes
         each item to the right discriminated-union variant based on
-        its `type` field.
+        its `type` field. The response is parsed incrementally, so each
+        item is validated (and handed to `on_question`) as soon as its
+        closing brace arrives.
         """
         question_count = exercise.question_count or 4
         question_count = max(2, min(question_count, 8))
@@ -1074,80 +1343,107 @@ class MaterialService:
         - For matching, every `left` value must be unique and every
           `right` value must be unique.
         """
+        parser = JsonStreamParser("questions")
+        out: List[QuizQuestion] = []
+
+        async def _accept(raw_items: List[Any]) -> None:
+            for raw in raw_items:
+                question = self._normalize_question(raw, stimulus)
+                if question is None:
+                    continue
+                out.append(question)
+                if on_question is not None:
+                    await on_question(question)
+
+        async def _on_stream_delta(text: str) -> None:
+            if on_delta is not None:
+                await on_delta(text)
+            await _accept(parser.feed(text))
+
+        streaming = on_delta is not None or on_question is not None
         response_json_str = await self.ai_service.get_ai_response(
             prompt=prompt,
             response_format={"type": "json_object"},
             system_prompt="You are an expert teacher creating practice questions.",
             user_context=user_context,
+            on_delta=_on_stream_delta if streaming else None,
         )
-        cleaned = response_json_str.strip()
-        if cleaned.startswith("```"):
-            cleaned = cleaned.strip("`").lstrip("json").strip()
-        parsed = json.loads(cleaned)
-        raw_questions = parsed.get("questions") or []
+        # Whatever the stream didn't already deliver (all of it when not
+        # streaming, or on a cache hit). Each element is validated on
+        # its own, so a broken tail only costs the items it touches.
+        await _accept(parser.feed(response_json_str[len(parser.text):]))
+        if parser.malformed:
+            logger.warning(
+                "Dropped %d malformed question element(s) for type=%s; kept %d.",
+                parser.malformed,
+                exercise.type,
+                len(out),
+            )
+        return out
 
-        out: List[QuizQuestion] = []
-        for raw in raw_questions:
-            if not isinstance(raw, dict):
-                continue
-            # Inject the stimulus into context_text when the model
-            # forgot to and a stimulus exists. This keeps the wire
-            # contract consistent for the frontend.
-            if stimulus and not raw.get("context_text"):
-                raw["context_text"] = stimulus
-            # Dedupe options before validation. Models occasionally
-            # produce e.g. ["диагностировать", "диагнозировать",
-            # "диагностицировать", "диагностировать"] — two of those
-            # are byte-identical and the user picks one of them and
-            # gets "Correct!" without learning anything. Strip
-            # adjacent-equal-after-trim duplicates before we hand the
-            # question to the FE; if dedup leaves <2 options, drop
-            # the whole item rather than render a broken question.
-            if raw.get("type") in ("multiple_choice", "multi_select_mc"):
-                deduped = _dedupe_preserve_order(raw.get("options") or [])
-                if len(deduped) < 2:
-                    logger.warning(
-                        "Dropping %s question — too few distinct options after dedupe (%s)",
-                        raw.get("type"),
-                        raw.get("options"),
-                    )
-                    continue
-                raw["options"] = deduped
-                # multi_select_mc keeps `correct_answers` (plural).
-                # multiple_choice picks ONE — verify the canonical
-                # answer is still in the deduped option set; if it
-                # was the dropped duplicate, we have to fail
-                # gracefully instead of returning an unanswerable item.
-                if raw.get("type") == "multiple_choice":
-                    ca = str(raw.get("correct_answer") or "").strip().lower()
-                    options_normalized = [
-                        str(o).strip().lower() for o in raw["options"]
-                    ]
-                    if ca and ca not in options_normalized:
-                        logger.warning(
-                            "Dropping multiple_choice — correct_answer %r vanished after option dedupe",
-                            raw.get("correct_answer"),
-                        )
-                        continue
-            elif raw.get("type") == "matching":
-                # Matching bug variant: identical lefts or identical
-                # rights. The renderer pairs by `left` so dup lefts
-                # silently overwrite each other. Drop the item.
-                pairs = raw.get("pairs") or []
-                lefts = [str(p.get("left") or "").strip() for p in pairs]
-                rights = [str(p.get("right") or "").strip() for p in pairs]
-                if len(set(lefts)) != len(lefts) or len(set(rights)) != len(rights):
+    @staticmethod
+    def _normalize_question(raw: object, stimulus: Optional[str]) -> Optional[QuizQuestion]:
+        """Clean up and validate one generated question item; None if
+        it has to be dropped."""
+        if not isinstance(raw, dict):
+            return None
+        # Inject the stimulus into context_text when the model
+        # forgot to and a stimulus exists. This keeps the wire
+        # contract consistent for the frontend.
+        if stimulus and not raw.get("context_text"):
+            raw["context_text"] = stimulus
+        # Dedupe options before validation. Models occasionally
+        # produce e.g. ["диагностировать", "диагнозировать",
+        # "диагностицировать", "диагностировать"] — two of those
+        # are byte-identical and the user picks one of them and
+        # gets "Correct!" without learning anything. Strip
+        # adjacent-equal-after-trim duplicates before we hand the
+        # question to the FE; if dedup leaves <2 options, drop
+        # the whole item rather than render a broken question.
+        if raw.get("type") in ("multiple_choice", "multi_select_mc"):
+            deduped = _dedupe_preserve_order(raw.get("options") or [])
+            if len(deduped) < 2:
+                logger.warning(
+                    "Dropping %s question — too few distinct options after dedupe (%s)",
+                    raw.get("type"),
+                    raw.get("options"),
+                )
+                return None
+            raw["options"] = deduped
+            # multi_select_mc keeps `correct_answers` (plural).
+            # multiple_choice picks ONE — verify the canonical
+            # answer is still in the deduped option set; if it
+            # was the dropped duplicate, we have to fail
+            # gracefully instead of returning an unanswerable item.
+            if raw.get("type") == "multiple_choice":
+                ca = str(raw.get("correct_answer") or "").strip().lower()
+                options_normalized = [
+                    str(o).strip().lower() for o in raw["options"]
+                ]
+                if ca and ca not in options_normalized:
                     logger.warning(
-                        "Dropping matching question — duplicate left/right values"
+                        "Dropping multiple_choice — correct_answer %r vanished after option dedupe",
+                        raw.get("correct_answer"),
                     )
-                    continue
-            try:
-                out.append(QuizQuestionAdapter.validate_python(raw))
-            except Exception as item_err:
-                logger.debug(
-                    "Skipping malformed question item (type=%s): %s",
-                    raw.get("type"),
-                    item_err,
+                    return None
+        elif raw.get("type") == "matching":
+            # Matching bug variant: identical lefts or identical
+            # rights. The renderer pairs by `left` so dup lefts
+            # silently overwrite each other. Drop the item.
+            pairs = raw.get("pairs") or []
+            lefts = [str(p.get("left") or "").strip() for p in pairs]
+            rights = [str(p.get("right") or "").strip() for p in pairs]
+            if len(set(lefts)) != len(lefts) or len(set(rights)) != len(rights):
+                logger.warning(
+                    "Dropping matching question — duplicate left/right values"
                 )
-                continue
-        return out
+                return None
+        try:
+            return QuizQuestionAdapter.validate_python(raw)
+        except Exception as item_err:
+            logger.debug(
+                "Skipping malformed question item (type=%s): %s",
+                raw.get("type"),
+                item_err,
+            )
+            return None
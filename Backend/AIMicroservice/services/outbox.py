@@ -0,0 +1,286 @@
+"""Durable outbox for best-effort writes to the User microservice.
+
+Task history, achievement progress, XP and recurring-error rows used to
+be POSTed inline, so every graded answer waited on one to four round
+trips to the User service — and a User-service outage silently dropped
+them. Now `UserService` appends each write to a local SQLite table
+(one fsync-cheap INSERT in WAL mode) and returns; `Outbox.start()` runs
+a drainer that delivers due rows in batches, deletes them on success
+and reschedules them with exponential backoff on failure.
+
+Rows are claimed by pushing `next_attempt_at` forward by a lease before
+delivery, so several workers sharing the file never send the same row
+twice, and a worker that dies mid-delivery only delays its batch until
+the lease runs out. After `max_attempts` a row is parked (``dead = 1``)
+instead of being deleted, so nothing is lost without a trace.
+
+Only the identity headers (``x-user-*``) are stored — never the
+caller's bearer token. The internal service key is added at send time.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("ai_microservice")
+
+_DEFAULT_PATH = os.getenv("USER_OUTBOX_PATH", "data/user_outbox.sqlite3")
+_BATCH_SIZE = int(os.getenv("USER_OUTBOX_BATCH_SIZE", "50"))
+_MAX_ATTEMPTS = int(os.getenv("USER_OUTBOX_MAX_ATTEMPTS", "20"))
+_BASE_BACKOFF_S = 1.0
+_MAX_BACKOFF_S = 300.0
+# How long a claimed batch is hidden from other drainers.
+_LEASE_S = 60.0
+# Upper bound on sleeping when nothing is due (new rows wake us early).
+_IDLE_POLL_S = 5.0
+
+
+@dataclass
+class OutboxMessage:
+    id: int
+    path: str
+    headers: Dict[str, str]
+    body: Dict[str, Any]
+    attempts: int
+
+
+# Returns True when the row is done (delivered, or rejected in a way a
+# retry can't fix) and False when it should be retried later.
+Deliver = Callable[[OutboxMessage], Awaitable[bool]]
+
+
+class Outbox:
+    def __init__(
+        self,
+        path: str = _DEFAULT_PATH,
+        batch_size: int = _BATCH_SIZE,
+        max_attempts: int = _MAX_ATTEMPTS,
+    ) -> None:
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.enqueued = 0
+        self.delivered = 0
+        self.retried = 0
+        self.parked = 0
+
+    # ── storage (runs on a worker thread) ───────────────────────────
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " path TEXT NOT NULL,"
+                " headers TEXT NOT NULL,"
+                " body TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt_at REAL NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_error TEXT,"
+                " dead INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox(dead, next_attempt_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _insert_sync(self, path: str, headers: Dict[str, str], body: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO outbox (path, headers, body, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (path, json.dumps(headers), json.dumps(body, ensure_ascii=False), now, now),
+            )
+            conn.commit()
+
+    def _claim_sync(self, limit: int) -> List[OutboxMessage]:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            # IMMEDIATE takes the write lock up front so two processes
+            # can't both select the same due rows.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT id, path, headers, body, attempts FROM outbox"
+                    " WHERE dead = 0 AND next_attempt_at <= ?"
+                    " ORDER BY id LIMIT ?",
+                    (now, limit),
+                ).fetchall()
+                if rows:
+                    conn.executemany(
+                        "UPDATE outbox SET next_attempt_at = ? WHERE id = ?",
+                        [(now + _LEASE_S, row[0]) for row in rows],
+                    )
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        return [
+            OutboxMessage(id=row[0], path=row[1], headers=json.loads(row[2]), body=json.loads(row[3]), attempts=row[4])
+            for row in rows
+        ]
+
+    def _settle_sync(self, done: List[int], failed: List[OutboxMessage]) -> int:
+        """Delete delivered rows, reschedule failed ones. Returns how
+        many were parked."""
+        now = time.time()
+        parked = 0
+        with self._lock:
+            conn = self._connection()
+            if done:
+                conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in done])
+            for message in failed:
+                attempts = message.attempts + 1
+                if attempts >= self.max_attempts:
+                    parked += 1
+                    conn.execute(
+                        "UPDATE outbox SET attempts = ?, dead = 1 WHERE id = ?",
+                        (attempts, message.id),
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE outbox SET attempts = ?, next_attempt_at = ? WHERE id = ?",
+                        (attempts, now + _retry_delay(attempts), message.id),
+                    )
+            conn.commit()
+        return parked
+
+    def _counts_sync(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT dead, COUNT(*) FROM outbox GROUP BY dead"
+            ).fetchall()
+        counts = dict(rows)
+        return {"pending": counts.get(0, 0), "parked": counts.get(1, 0)}
+
+    def _next_due_sync(self) -> Optional[float]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE dead = 0"
+            ).fetchone()
+        return row[0] if row else None
+
+    # ── public API ──────────────────────────────────────────────────
+
+    async def enqueue(self, path: str, headers: Dict[str, str], body: Dict[str, Any]) -> None:
+        """Persist one POST to `path` on the User service."""
+        await asyncio.to_thread(self._insert_sync, path, headers, body)
+        self.enqueued += 1
+        if self._wake is not None:
+            self._wake.set()
+
+    async def drain_once(self, deliver: Deliver) -> int:
+        """Deliver one batch of due rows concurrently. Returns the
+        number of rows claimed (0 when nothing is due)."""
+        batch = await asyncio.to_thread(self._claim_sync, self.batch_size)
+        if not batch:
+            return 0
+        outcomes = await asyncio.gather(*(deliver(m) for m in batch), return_exceptions=True)
+        done: List[int] = []
+        failed: List[OutboxMessage] = []
+        for message, outcome in zip(batch, outcomes):
+            if outcome is True:
+                done.append(message.id)
+            else:
+                if isinstance(outcome, BaseException):
+                    logger.warning("outbox delivery to %s raised: %s", message.path, outcome)
+                failed.append(message)
+        parked = await asyncio.to_thread(self._settle_sync, done, failed)
+        self.delivered += len(done)
+        self.retried += len(failed) - parked
+        self.parked += parked
+        if parked:
+            logger.error("Parked %d outbox row(s) after %d attempts.", parked, self.max_attempts)
+        return len(batch)
+
+    def start(self, deliver: Deliver) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run(deliver), name="user-outbox")
+
+    async def _run(self, deliver: Deliver) -> None:
+        assert self._wake is not None
+        while True:
+            try:
+                claimed = await self.drain_once(deliver)
+                if claimed >= self.batch_size:
+                    continue  # more may be due right away
+                next_due = await asyncio.to_thread(self._next_due_sync)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("outbox drain failed: %s", exc)
+                next_due = None
+            wait = _IDLE_POLL_S if next_due is None else min(_IDLE_POLL_S, max(0.0, next_due - time.time()))
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self) -> None:
+        """Stop the drainer. Undelivered rows stay on disk for the next
+        start."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            counts: Dict[str, Any] = self._counts_sync()
+        except sqlite3.Error:
+            counts = {"pending": None, "parked": None}
+        return {
+            **counts,
+            "running": self._task is not None and not self._task.done(),
+            "enqueued": self.enqueued,
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "parked_total": self.parked,
+        }
+
+
+def _retry_delay(attempts: int) -> float:
+    # Exponential backoff with jitter, capped.
+    base = min(_MAX_BACKOFF_S, _BASE_BACKOFF_S * (2 ** (attempts - 1)))
+    return random.uniform(base / 2, base)
+
+
+_outbox: Optional[Outbox] = None
+
+
+def get_user_outbox() -> Optional[Outbox]:
+    """Process-wide outbox, or None when USER_OUTBOX_PATH is set to an
+    empty string (writes then go straight to the User service)."""
+    global _outbox
+    if _outbox is None and _DEFAULT_PATH:
+        _outbox = Outbox(_DEFAULT_PATH)
+    return _outbox
@@ -2,13 +2,16 @@ from services.writing_task_service import WritingTaskService
 from .vector_db_service import VectorDBService
 from .ai_service import AI_Service
 from .user_service import UserService
+from .task_pool import TaskPool
+from .item_bank import PRIOR_ESTIMATE, ItemBank, Response, estimate_ability, level_for
 from utils.user_context import UserContext
 from constants.variety import variety_picker
+import logging
 import random
 import json
 import time
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Set
 
 from fastapi import HTTPException
 
@@ -17,6 +20,8 @@ from models.dtos.evaluate_test_dto import EvaluateTestDto
 from models.dtos.placement_dtos import PlacementAnswer, PlacementTestAnswer
 
 
+logger = logging.getLogger("ai_microservice")
+
 LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
 # Drop a placement session after this much idle time (no answers).
 SESSION_TTL_SECONDS = 60 * 30
@@ -34,13 +39,30 @@ class _PlacementSession:
     # rule below — far less jumpy than +1/-1 every answer.
     recent: List[bool] = field(default_factory=list)
     last_touched: float = field(default_factory=time.time)
+    # Item-bank (IRT) state; unused when the service has no item bank.
+    ability: float = PRIOR_ESTIMATE[0]
+    ability_sd: float = PRIOR_ESTIMATE[1]
+    responses: List[Response] = field(default_factory=list)
+    served: Set[str] = field(default_factory=set)
+    answered: Set[str] = field(default_factory=set)
 
 
 class PlacementService:
-    def __init__(self, ai_service: AI_Service, vector_db_service: VectorDBService):
+    def __init__(
+        self,
+        ai_service: AI_Service,
+        vector_db_service: VectorDBService,
+        task_pool: Optional[TaskPool[MultipleChoiceTask | FillInTheBlankTask]] = None,
+        item_bank: Optional[ItemBank] = None,
+    ):
         self.ai_service = ai_service
         self.vector_db_service = vector_db_service
         self.writing_task_service = WritingTaskService(vector_db_service, ai_service)
+        # Pre-generated questions; a miss falls back to live generation.
+        self.task_pool = task_pool
+        # Calibrated items + adaptive selection; None keeps the 2-of-3
+        # streak rule and always generates.
+        self.item_bank = item_bank
         self.user_service = UserService()
         # In-process per-user state. For multi-replica deploys this would
         # need to live in Redis; for the current single AI-service container
@@ -85,22 +107,109 @@ class PlacementService:
         user_context: UserContext | None = None,
     ) -> MultipleChoiceTask | FillInTheBlankTask:
         sess = self._session_for(user_context)
+        session_key = user_context.user_id if user_context else "placement_global"
+
+        if self.item_bank is not None and self.item_bank.enabled:
+            return await self._generate_adaptive(
+                language, sess, previous_answer, user_context, session_key
+            )
+
         if previous_answer:
             self._adjust_for_session(sess, previous_answer.is_correct)
+        return await self._fresh_task(language, sess.current_level, user_context, session_key)
 
-        session_key = user_context.user_id if user_context else "placement_global"
-        random_topic = variety_picker.pick_topic(sess.current_level, session_key=session_key)
+    async def _generate_adaptive(
+        self,
+        language: str,
+        sess: _PlacementSession,
+        previous_answer: Optional[PlacementAnswer],
+        user_context: Optional[UserContext],
+        session_key: str,
+    ) -> MultipleChoiceTask | FillInTheBlankTask:
+        """Item-bank path: score the previous answer against its item,
+        then serve the most informative unseen banked item, generating
+        (and banking) a new one only when none is close enough."""
+        assert self.item_bank is not None
+        ui_locale = user_context.ui_locale_label if user_context else "English"
+        if previous_answer is not None:
+            self._record_answer(sess, language, ui_locale, previous_answer)
+
+        item = await self.item_bank.select(language, ui_locale, sess.ability, exclude=sess.served)
+        if item is not None:
+            sess.served.add(item.id)
+            return item.task()
+
+        level = level_for(sess.ability)
+        task = await self._fresh_task(language, level, user_context, session_key)
+        sess.served.add(task.id)
+        await self.item_bank.add(language, ui_locale, task, level)
+        return task
+
+    def _record_answer(
+        self,
+        sess: _PlacementSession,
+        language: str,
+        ui_locale: str,
+        answer: PlacementAnswer,
+    ) -> None:
+        # Only items this session was served, each scored once, and
+        # only from the submitted answer: `is_correct` is the client's
+        # own verdict and never moves the shared calibration. Anything
+        # else (the warm-up request, older clients) leaves the estimate
+        # where it is.
+        if (
+            answer.task_id is None
+            or answer.answer is None
+            or answer.task_id not in sess.served
+            or answer.task_id in sess.answered
+        ):
+            logger.info("Placement answer to unknown item %s not scored", answer.task_id)
+            return
+        sess.answered.add(answer.task_id)
+        assert self.item_bank is not None
+        response = self.item_bank.record_answer(
+            language, ui_locale, answer.task_id, answer.answer, sess.ability
+        )
+        if response is None:
+            return
+        sess.responses.append(response)
+        sess.ability, sess.ability_sd = estimate_ability(sess.responses)
+        sess.current_level = level_for(sess.ability)
 
+    async def _fresh_task(
+        self,
+        language: str,
+        level: str,
+        user_context: Optional[UserContext],
+        session_key: str,
+    ) -> MultipleChoiceTask | FillInTheBlankTask:
+        """A task at `level` from the pre-generation pool, or generated
+        live on a pool miss."""
         task_type = random.choice(["multiple_choice", "fill_in_the_blank"])
         task: MultipleChoiceTask | FillInTheBlankTask
+
+        if self.task_pool is not None:
+            pooled = self.task_pool.take(
+                TaskPool.key(
+                    language,
+                    level,
+                    task_type,
+                    user_context.ui_locale_label if user_context else None,
+                ),
+                session_key,
+            )
+            if pooled is not None:
+                return pooled
+
+        random_topic = variety_picker.pick_topic(level, session_key=session_key)
         try:
             if task_type == "multiple_choice":
                 task = await self.writing_task_service.generate_writing_multiple_choice_task(
-                    language, sess.current_level, user_context=user_context, topic=random_topic
+                    language, level, user_context=user_context, topic=random_topic
                 )
             else:
                 task = await self.writing_task_service.generate_writing_fill_in_the_blank_task(
-                    language, sess.current_level, user_context=user_context, topic=random_topic
+                    language, level, user_context=user_context, topic=random_topic
                 )
             return task
 
@@ -169,6 +278,17 @@ class PlacementService:
             ui_lang = (
                 getattr(user_context, "ui_locale_label", None) or "English"
             )
+            # Item-bank ability estimate, when this test ran adaptively.
+            sess = self._sessions.get(
+                user_context.user_id if user_context else "placement_anonymous"
+            )
+            ability_line = ""
+            if sess is not None and sess.responses:
+                ability_line = (
+                    f"\n  - Adaptive estimate: {level_for(sess.ability)} "
+                    f"(ability {sess.ability:+.2f} ± {sess.ability_sd:.2f} logits "
+                    f"over {len(sess.responses)} calibrated items)"
+                )
 
             prompt = f"""You are a language proficiency evaluator.
 Evaluate the following {language} placement test.
@@ -176,7 +296,7 @@ Evaluate the following {language} placement test.
 Summary:
   - Total questions : {total_questions}
   - Marked correct  : {correct_answers}
-  - Success rate    : {percentage:.0f}%
+  - Success rate    : {percentage:.0f}%{ability_line}
 
 Question-by-question breakdown (re-verify each if needed — the user may have
 given a close synonym or made a minor typo that was still marked wrong):
@@ -249,7 +369,11 @@ LOCALIZATION (HARD RULE):
             if user_context:
                 from utils.language_codes import to_iso_language
 
-                await self.user_service.log_task_history(
+                # The history row, achievements and XP are independent
+                # best-effort writes; dispatch them concurrently in the
+                # background instead of awaiting four round trips to
+                # the User service before answering.
+                self.user_service.dispatch(self.user_service.log_task_history(
                     user_context,
                     {
                         "taskType": "placement",
@@ -269,24 +393,27 @@ LOCALIZATION (HARD RULE):
                             "strengths": list(evaluation.strengths or []),
                         },
                     },
-                )
+                ), name="placement.history")
 
                 # Award "First Steps" achievement for completing any
                 # placement test.
-                await self.user_service.post_achievement_progress(
+                self.user_service.dispatch(self.user_service.post_achievement_progress(
                     user_context, "First Steps", 1
-                )
+                ), name="placement.achievement")
 
                 # "Level Up" only fires for B1 and above — reaching
                 # those levels means the learner has cleared A-level
                 # material which is the intent of the achievement.
                 if evaluation.level in ("B1", "B2", "C1", "C2"):
-                    await self.user_service.post_achievement_progress(
+                    self.user_service.dispatch(self.user_service.post_achievement_progress(
                         user_context, "Level Up", 1
-                    )
+                    ), name="placement.achievement")
 
                 # XP for completing a placement test (50 points).
-                await self.user_service.log_activity(user_context, 50)
+                self.user_service.dispatch(
+                    self.user_service.log_activity(user_context, 50),
+                    name="placement.activity",
+                )
 
             return evaluation
 
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from database.connection import async_session
+from services.ai_service import AI_Service
+from services.asset_store import get_asset_store
+from services.audio_streams import get_audio_stream_store
+from services.item_bank import ItemBank
+from services.item_bank_store import ItemBankStore
+from services.material_document_store import MaterialDocumentStore
+from services.maintenance import MaintenanceRunner
+from services.material_service import MaterialService
+from services.outbox import get_user_outbox
+from services.task_pool import TaskPool, parse_prewarm_keys
+from services.tts_service import shutdown_tts_executor
+from services.upload_jobs import get_upload_job_store
+from services.user_service import UserService, close_user_http_client
+from services.vector_db_service import VectorDBService
+from services.writing_task_service import WritingTaskService
+from utils.audio_prep import audio_prep_stats, shutdown_audio_prep_executor
+from utils.background import get_background_dispatcher
+from utils.cache_backends import close_shared_cache_backend, get_shared_cache_backend
+from utils.clip_cache import get_clip_cache
+from utils.pdf_text import shutdown_pdf_executor
+from utils.ttl_cache import cache_stats
+
+logger = logging.getLogger("ai_microservice")
+
+_INDEX_MAINTENANCE_INTERVAL_S = float(os.getenv("VECTOR_INDEX_INTERVAL_S", "600"))
+_COMPACTION_INTERVAL_S = float(os.getenv("LANCE_COMPACTION_INTERVAL_S", "1800"))
+# Sweeps only touch expired index rows, so they can run often.
+_ASSET_SWEEP_INTERVAL_S = float(os.getenv("ASSET_SWEEP_INTERVAL_S", "300"))
+# "English:A1,English:A2,..." — pool keys to fill right after warm-up
+# instead of on their first request.
+_TASK_POOL_PREWARM = os.getenv("TASK_POOL_PREWARM", "")
+
+
+class ServiceRegistry:
+    """Process-wide owner of the heavyweight, shareable services.
+
+    Before this existed, `/materials/upload` and `/materials/quiz` each
+    built a fresh VectorDBService (reconnect LanceDB + reload the
+    SentenceTransformer from disk) and a fresh AI_Service per request.
+    Now everything that needs an encoder — the materials router,
+    WritingTaskService, PlacementService — gets the same instance from
+    here.
+
+    Instances are created eagerly (construction is cheap) so module-
+    level router wiring in main.py can hold references to them; the
+    expensive part, loading the encoder, happens in `start()` from the
+    app lifespan. `ready` flips to True only once that has finished, and
+    backs the `/health/ready` probe.
+    """
+
+    def __init__(self) -> None:
+        self.ai_service = AI_Service()
+        self.vector_db_service = VectorDBService()
+        self.material_service = MaterialService(
+            self.vector_db_service,
+            self.ai_service,
+            document_store=MaterialDocumentStore(async_session),
+        )
+        self.writing_task_service = WritingTaskService(
+            self.vector_db_service, self.ai_service
+        )
+        # Ready-made placement questions; see TaskPool.
+        self.task_pool = TaskPool(self.writing_task_service.generate_pooled_task)
+        # Calibrated placement items for adaptive selection; see ItemBank.
+        self.item_bank = ItemBank(ItemBankStore(async_session))
+        self._warmup_task: Optional["asyncio.Task[None]"] = None
+        self._warmup_error: Optional[BaseException] = None
+        self.maintenance = MaintenanceRunner()
+        self.maintenance.register(
+            "materials_indexes",
+            self.vector_db_service.maintain_indexes,
+            _INDEX_MAINTENANCE_INTERVAL_S,
+        )
+        self.maintenance.register(
+            "lance_compaction",
+            self.vector_db_service.compact_tables,
+            _COMPACTION_INTERVAL_S,
+        )
+        self.maintenance.register(
+            "static_assets",
+            get_asset_store().sweep,
+            _ASSET_SWEEP_INTERVAL_S,
+        )
+
+    @property
+    def ready(self) -> bool:
+        return self.vector_db_service.is_warm
+
+    async def start(self) -> None:
+        """Kick off the encoder warm-up in the background. Returns
+        immediately so the server starts accepting liveness probes
+        while the model loads; requests that need the encoder before
+        warm-up finishes wait for the same load off the event loop
+        (VectorDBService.ensure_warm). Also starts
+        the drainer for the User-service outbox and the periodic
+        maintenance jobs (vector index builds, LanceDB compaction,
+        expired static assets)."""
+        if self._warmup_task is None:
+            self._warmup_task = asyncio.create_task(
+                self._warm_up(), name="vector-db-warmup"
+            )
+        outbox = get_user_outbox()
+        if outbox is not None:
+            outbox.start(UserService().deliver)
+        self.maintenance.start()
+
+    async def _warm_up(self) -> None:
+        try:
+            await self.vector_db_service.ensure_warm()
+            logger.info(
+                "Vector DB warm: encoder %s loaded.",
+                self.vector_db_service.model_name,
+            )
+            self.task_pool.prewarm(
+                parse_prewarm_keys(_TASK_POOL_PREWARM, ("multiple_choice", "fill_in_the_blank"))
+            )
+        except Exception as exc:  # noqa: BLE001
+            # Leave `ready` False so the probe keeps the replica out of
+            # rotation; the next request retries the load lazily.
+            self._warmup_error = exc
+            logger.error("Vector DB warm-up failed: %s", exc)
+
+    async def stop(self) -> None:
+        if self._warmup_task is not None and not self._warmup_task.done():
+            self._warmup_task.cancel()
+            try:
+                await self._warmup_task
+            except asyncio.CancelledError:
+                pass
+        await self.maintenance.stop()
+        await self.task_pool.shutdown()
+        await get_upload_job_store().shutdown()
+        await get_audio_stream_store().shutdown()
+        shutdown_pdf_executor()
+        shutdown_tts_executor()
+        shutdown_audio_prep_executor()
+        get_asset_store().close()
+        # Let dispatched side effects finish before their HTTP pool goes.
+        await get_background_dispatcher().drain()
+        outbox = get_user_outbox()
+        if outbox is not None:
+            await outbox.stop()
+        await close_user_http_client()
+        await asyncio.to_thread(self.vector_db_service.close)
+        await close_shared_cache_backend()
+
+    def readiness(self) -> Dict[str, Any]:
+        """Body of the readiness probe."""
+        status: Dict[str, Any] = {
+            "status": "ready" if self.ready else "starting",
+            "service": "ai",
+            "encoder": self.vector_db_service.model_name,
+        }
+        if self._warmup_error is not None and not self.ready:
+            status["error"] = str(self._warmup_error)
+        return status
+
+    async def metrics(self) -> Dict[str, Any]:
+        """Body of `/internal/metrics`."""
+        shared = get_shared_cache_backend()
+        outbox = get_user_outbox()
+        # The outbox counts are a sqlite query; keep it off the loop.
+        outbox_stats = await asyncio.to_thread(outbox.stats) if outbox is not None else None
+        return {
+            "ready": self.ready,
+            "embedding": self.vector_db_service.embedder.stats(),
+            "caches": cache_stats(),
+            "shared_cache": shared.stats() if shared is not None else None,
+            "background": get_background_dispatcher().stats(),
+            "outbox": outbox_stats,
+            "maintenance": self.maintenance.stats(),
+            "task_pool": self.task_pool.stats(),
+            "item_bank": self.item_bank.stats(),
+            "tts_clips": get_clip_cache().stats(),
+            "audio_streams": get_audio_stream_store().stats(),
+            "static_assets": get_asset_store().stats(),
+            "whisper_audio_prep": audio_prep_stats(),
+        }
+
+
+_registry: Optional[ServiceRegistry] = None
+
+
+def get_service_registry() -> ServiceRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ServiceRegistry()
+    return _registry
@@ -5,8 +5,6 @@ import hashlib
 import logging
 import re
 import time
-import uuid
-import aiofiles
 import httpx
 from typing import Optional, Any, List, Dict, Tuple
 
@@ -14,8 +12,12 @@ from fastapi import HTTPException
 from dotenv import load_dotenv
 
 from .ai_service import AI_Service
+from .asset_store import get_asset_store
 from .image_service import ImageService
+from .transcription_cache import TranscriptionCache, get_transcription_cache
 from .user_service import UserService
+from utils.audio_prep import prepare_for_transcription
+from utils.ttl_cache import TTLCache
 from utils.user_context import UserContext
 from models.dtos.speaking_analysis_dtos import WhisperTranscriptionResult, WhisperSegment, WhisperWord
 from models.responses.speaking_analysis_response import (
@@ -40,7 +42,7 @@ GROQ_WHISPER_MODEL = os.getenv("GROQ_WHISPER_MODEL", "whisper-large-v3-turbo")
 
 
 _SPEAKING_CACHE_TTL = 60 * 60  # 1h
-_SPEAKING_CACHE_MAX = 64
+_SPEAKING_CACHE_MAX_BYTES = 4 * 1024 * 1024
 
 
 class SpeakingService:
@@ -48,6 +50,7 @@ class SpeakingService:
         self,
         ai_service: AI_Service,
         image_service: ImageService | None = None,
+        transcription_cache: TranscriptionCache | None = None,
     ):
         self.ai_service = ai_service
         self.user_service = UserService()
@@ -56,10 +59,19 @@ class SpeakingService:
         # if env vars are missing it silently disables itself and
         # the speaking flow falls back to Pollinations transparently.
         self.image_service = image_service or ImageService()
-        # (cache_key) -> (expires_at, response). cache_key is sha256 of
-        # (audio bytes, language, ui_locale) — so re-clicking 'Analyze'
-        # on the same recording doesn't bill the provider twice.
-        self._analyze_cache: Dict[str, Tuple[float, "SpeakingAnalysisResponse"]] = {}
+        # Whisper results keyed by (audio digest, language, model),
+        # shared with every other ASR consumer in the process.
+        self.transcription_cache = transcription_cache or get_transcription_cache()
+        # cache_key -> (response, cacheable). cache_key is sha256 of
+        # (audio digest, language, ui_locale) — so re-clicking 'Analyze'
+        # on the same recording doesn't bill the provider twice, and a
+        # double-submit while the first is still running waits on it.
+        self._analyze_cache: TTLCache[str, Tuple[SpeakingAnalysisResponse, bool]] = TTLCache(
+            "speaking_analysis",
+            _SPEAKING_CACHE_TTL,
+            _SPEAKING_CACHE_MAX_BYTES,
+            sizeof=lambda entry: len(entry[0].model_dump_json()),
+        )
 
     async def generate_practice_phrase(
         self,
@@ -138,37 +150,26 @@ Respond with a single JSON object only, no prose, with these keys:
         }
 
     def _cache_key(
-        self, audio_bytes: bytes, language: Optional[str], ui_locale: Optional[str]
+        self, audio_digest: str, language: Optional[str], ui_locale: Optional[str]
     ) -> str:
         h = hashlib.sha256()
-        h.update(audio_bytes)
+        h.update(audio_digest.encode("ascii"))
         h.update(b"\0")
         h.update((language or "").encode("utf-8"))
         h.update(b"\0")
         h.update((ui_locale or "").encode("utf-8"))
         return h.hexdigest()
 
-    def _cache_get(self, key: str) -> Optional["SpeakingAnalysisResponse"]:
-        entry = self._analyze_cache.get(key)
-        if not entry:
-            return None
-        expires_at, value = entry
-        if time.time() > expires_at:
-            self._analyze_cache.pop(key, None)
-            return None
-        return value
-
-    def _cache_put(self, key: str, value: "SpeakingAnalysisResponse") -> None:
-        if len(self._analyze_cache) >= _SPEAKING_CACHE_MAX:
-            # Evict the oldest entry — cheap O(n) on tiny dict, no need
-            # for an OrderedDict here.
-            oldest = min(self._analyze_cache.items(), key=lambda kv: kv[1][0])[0]
-            self._analyze_cache.pop(oldest, None)
-        self._analyze_cache[key] = (time.time() + _SPEAKING_CACHE_TTL, value)
-
     async def _transcribe_audio_with_whisper(
-        self, audio_file_bytes: bytes, filename: str, language_code: str
+        self,
+        audio_file_bytes: bytes,
+        filename: str,
+        language_code: str,
+        audio_digest: Optional[str] = None,
     ) -> WhisperTranscriptionResult:
+        """Transcription of the recording, through the shared
+        TranscriptionCache. `audio_digest` is the sha256 of
+        `audio_file_bytes` when the caller already has it."""
         api_key = os.getenv("GROQ_API_KEY")
         if not api_key:
             from utils.error_codes import SPEAKING_GROQ_KEY_MISSING, raise_with_code
@@ -178,6 +179,19 @@ Respond with a single JSON object only, no prose, with these keys:
                 "GROQ_API_KEY is not configured for speech transcription.",
             )
 
+        digest = audio_digest or hashlib.sha256(audio_file_bytes).hexdigest()
+        return await self.transcription_cache.get_or_transcribe(
+            digest,
+            language_code,
+            GROQ_WHISPER_MODEL,
+            lambda: self._request_whisper(audio_file_bytes, filename, language_code, api_key),
+        )
+
+    async def _request_whisper(
+        self, audio_file_bytes: bytes, filename: str, language_code: str, api_key: str
+    ) -> WhisperTranscriptionResult:
+        # Downmixed, silence-trimmed Opus instead of the raw recording.
+        upload_bytes, filename = await prepare_for_transcription(audio_file_bytes, filename)
         ext = (filename or "recording.webm").rsplit(".", 1)[-1].lower()
         content_type_map = {
             "mp4": "audio/mp4",
@@ -190,11 +204,12 @@ Respond with a single JSON object only, no prose, with these keys:
         content_type = content_type_map.get(ext, "audio/webm")
 
         try:
+            started = time.perf_counter()
             async with httpx.AsyncClient(timeout=120.0) as client:
                 response = await client.post(
                     GROQ_TRANSCRIPTION_URL,
                     headers={"Authorization": f"Bearer {api_key}"},
-                    files={"file": (filename, audio_file_bytes, content_type)},
+                    files={"file": (filename, upload_bytes, content_type)},
                     data={
                         "model": GROQ_WHISPER_MODEL,
                         "language": language_code,
@@ -202,6 +217,10 @@ Respond with a single JSON object only, no prose, with these keys:
                         "timestamp_granularities[]": "segment",
                     },
                 )
+            logger.info(
+                "Groq transcription of %d bytes took %.0f ms.",
+                len(upload_bytes), (time.perf_counter() - started) * 1000,
+            )
 
             if response.status_code != 200:
                 logger.error(
@@ -445,6 +464,7 @@ Respond with a single JSON object only, no prose, with these keys:
         language: Optional[str] = None,
         user_context: Optional[UserContext] = None,
         ui_locale: Optional[str] = None,
+        audio_digest: Optional[str] = None,
     ) -> SpeakingAnalysisResponse:
         logger.info(f"Received audio file of size: {len(audio_file_bytes)} bytes for analysis.")
         if not audio_file_bytes:
@@ -454,19 +474,38 @@ Respond with a single JSON object only, no prose, with these keys:
         effective_filename = filename if filename else "recording.webm"
         language_code = convert_to_language_code(language) if language else "en"
 
-        cache_key = self._cache_key(audio_file_bytes, language, ui_locale)
-        cached = self._cache_get(cache_key)
-        if cached is not None:
-            logger.info("speaking analysis cache hit")
-            return cached
+        digest = audio_digest or hashlib.sha256(audio_file_bytes).hexdigest()
+        cache_key = self._cache_key(digest, language, ui_locale)
+        result, _ = await self._analyze_cache.get_or_load(
+            cache_key,
+            lambda: self._analyze_uncached(
+                audio_file_bytes, effective_filename, language_code,
+                language, user_context, ui_locale, digest,
+            ),
+            should_cache=lambda entry: entry[1],
+        )
+        return result
 
+    async def _analyze_uncached(
+        self,
+        audio_file_bytes: bytes,
+        effective_filename: str,
+        language_code: str,
+        language: Optional[str],
+        user_context: Optional[UserContext],
+        ui_locale: Optional[str],
+        audio_digest: str,
+    ) -> Tuple[SpeakingAnalysisResponse, bool]:
+        """Returns the analysis plus whether it is worth caching — the
+        "couldn't hear you" short-circuits are not, so a retry with the
+        same bytes gets a fresh attempt."""
         transcription = await self._transcribe_audio_with_whisper(
-            audio_file_bytes, effective_filename, language_code
+            audio_file_bytes, effective_filename, language_code, audio_digest
         )
         logger.info(f"Transcription completed: {transcription.text[:100]}...")
 
         if not transcription.text.strip():
-            return SpeakingAnalysisResponse(
+            unheard = SpeakingAnalysisResponse(
                 transcription="",
                 detected_language=transcription.language,
                 overall_assessment="Could not transcribe any speech from the audio. Please try again with clearer audio.",
@@ -478,6 +517,7 @@ Respond with a single JSON object only, no prose, with these keys:
                     fluency_score=0.0,
                 ),
             )
+            return unheard, False
 
         pronunciation = self._compute_pronunciation_metrics(transcription)
         logger.info(f"Pronunciation metrics: confidence={pronunciation.overall_confidence}, fluency={pronunciation.fluency_score}")
@@ -491,7 +531,7 @@ Respond with a single JSON object only, no prose, with these keys:
                 "Skipping AI feedback — overall_confidence=%.2f below threshold",
                 pronunciation.overall_confidence,
             )
-            return SpeakingAnalysisResponse(
+            unclear = SpeakingAnalysisResponse(
                 transcription=transcription.text.strip(),
                 detected_language=transcription.language,
                 overall_assessment=(
@@ -508,6 +548,7 @@ Respond with a single JSON object only, no prose, with these keys:
                 ],
                 pronunciation=pronunciation,
             )
+            return unclear, False
 
         ai_feedback = await self._get_ai_feedback(
             transcription.text,
@@ -581,8 +622,7 @@ Respond with a single JSON object only, no prose, with these keys:
                     },
                 },
             )
-        self._cache_put(cache_key, result)
-        return result
+        return result, True
 
     # -----------------------------------------------------------------
     # Phase 3 — format-driven speaking flow.
@@ -663,9 +703,9 @@ Respond with a single JSON object only, no prose, with these keys:
             phrase = phrase_payload["phrase"]
             audio_url: Optional[str] = None
             if tts_synthesizer is not None:
-                # Synthesise the phrase to MP3 and write to the same
-                # static/audio directory the listening flow uses, so
-                # the FE just plays the URL.
+                # Synthesise the phrase to MP3 and store it with the
+                # listening audio (AssetStore), so the FE just plays
+                # the URL.
                 try:
                     loop = asyncio.get_running_loop()
                     audio_bytes = await loop.run_in_executor(
@@ -754,11 +794,13 @@ Respond with a single JSON object only, no prose, with these keys:
         target_phrase: Optional[str] = None,
         user_context: Optional[UserContext] = None,
         ui_locale: Optional[str] = None,
+        audio_digest: Optional[str] = None,
     ) -> SpeakingGradeResponse:
         """Format-aware grading.
 
         Pipeline:
-          1. Whisper transcribes the recording (shared across formats).
+          1. Whisper transcribes the recording (cached per recording,
+             so re-grading against another format reuses it).
           2. Pronunciation metrics from segment-level confidence.
           3. Per-format rubric: `repeat_after_me` does WER vs target;
              everything else asks the LLM to grade against rubric hints.
@@ -771,7 +813,7 @@ Respond with a single JSON object only, no prose, with these keys:
         language_code = convert_to_language_code(language) if language else "en"
 
         transcription = await self._transcribe_audio_with_whisper(
-            audio_file_bytes, effective_filename, language_code
+            audio_file_bytes, effective_filename, language_code, audio_digest
         )
         pronunciation = self._compute_pronunciation_metrics(transcription)
         transcript_text = transcription.text.strip()
@@ -1145,17 +1187,9 @@ identified_errors length: 0 to 5. error_type stays in English. Output valid JSON
             }
 
     async def _persist_static_audio(self, audio_bytes: bytes) -> str:
-        """Write TTS bytes under static/audio/<uuid>.mp3 and return
-        the public URL. Mirrors the listening service path so the FE
-        plays the same way."""
-        public_base = os.getenv("PUBLIC_BASE_URL", "")
-        audio_dir = "static/audio"
-        os.makedirs(audio_dir, exist_ok=True)
-        file_name = f"{uuid.uuid4()}.mp3"
-        file_path = os.path.join(audio_dir, file_name)
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(audio_bytes)
-        return f"{public_base}/static/audio/{file_name}"
+        """Store TTS bytes in the AssetStore and return the public URL.
+        The same phrase synthesised again maps to the same file."""
+        return await get_asset_store().save("audio", audio_bytes, "mp3")
 
 
 # ---------- Module-level helpers ---------------------------------------
@@ -0,0 +1,201 @@
+"""Pre-generated placement tasks, served without waiting on the LLM.
+
+Each `/placement` step used to await a full generation while the
+learner sat between questions. `TaskPool` keeps a few ready-made tasks
+per (language, level, task type, UI language) and tops them up in the
+background: when a key drops to `low_water` items a refill generates up
+to `high_water`. Items older than `ttl_s` are discarded so the pool
+doesn't serve stale prompts after a deploy-time prompt change.
+
+Every pooled item remembers the topic it was generated for; `take`
+prefers items whose topic isn't in the learner's recent
+`variety_picker` history and records the one it serves, so pooled tasks
+rotate topics the same way live ones do.
+
+Pool generation runs without a user context, i.e. on the platform's
+provider credentials rather than the learner's own key. That is why
+only placement uses the pool: its questions are generic, shared by
+every learner of a language, and banked on the same terms by
+`ItemBank`. Practice endpoints (/writing/...) always generate with the
+learner's own provider and token. Callers fall back to live generation
+on a miss.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Generic, Iterable, Optional, Set, Tuple, TypeVar
+
+from constants.variety import variety_picker
+
+logger = logging.getLogger("ai_microservice")
+
+_LOW_WATER = int(os.getenv("TASK_POOL_LOW_WATER", "2"))
+_HIGH_WATER = int(os.getenv("TASK_POOL_HIGH_WATER", "5"))
+_ITEM_TTL_S = float(os.getenv("TASK_POOL_TTL_S", str(6 * 3600)))
+_CONCURRENCY = int(os.getenv("TASK_POOL_CONCURRENCY", "2"))
+_MAX_KEYS = int(os.getenv("TASK_POOL_MAX_KEYS", "64"))
+# After a failed refill, leave the key alone for this long.
+_FAILURE_BACKOFF_S = 60.0
+
+# (language, CEFR level, task type, UI language label)
+PoolKey = Tuple[str, str, str, str]
+T = TypeVar("T")
+Generate = Callable[[PoolKey, str], Awaitable[T]]
+
+
+@dataclass
+class _Pooled(Generic[T]):
+    task: T
+    topic: str
+    created_at: float
+
+
+class TaskPool(Generic[T]):
+    def __init__(
+        self,
+        generate: Generate[T],
+        low_water: int = _LOW_WATER,
+        high_water: int = _HIGH_WATER,
+        ttl_s: float = _ITEM_TTL_S,
+        concurrency: int = _CONCURRENCY,
+        max_keys: int = _MAX_KEYS,
+    ) -> None:
+        self._generate = generate
+        self.high_water = max(0, high_water)
+        self.low_water = min(max(0, low_water), self.high_water)
+        self.ttl_s = ttl_s
+        self.concurrency = max(1, concurrency)
+        self.max_keys = max_keys
+        self._items: Dict[PoolKey, Deque[_Pooled[T]]] = {}
+        self._refills: Dict[PoolKey, "asyncio.Task[None]"] = {}
+        self._retry_at: Dict[PoolKey, float] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._closed = False
+
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.expired = 0
+        self.failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.high_water > 0 and not self._closed
+
+    @staticmethod
+    def key(language: str, level: str, task_type: str, ui_locale_label: Optional[str]) -> PoolKey:
+        effective_level = "A1" if level.upper() == "A0" else level.upper()
+        return (language.strip(), effective_level, task_type, ui_locale_label or "English")
+
+    def take(self, key: PoolKey, session_key: str) -> Optional[T]:
+        """A ready task for `key`, or None (caller generates live). Either
+        way the key is topped up in the background."""
+        if not self.enabled:
+            return None
+        items = self._items.get(key)
+        if items is None:
+            if len(self._items) >= self.max_keys:
+                return None
+            items = self._items[key] = deque()
+        self._drop_expired(items)
+
+        chosen: Optional[_Pooled[T]] = None
+        if items:
+            recent = set(variety_picker.recent_topics(session_key))
+            chosen = next((item for item in items if item.topic not in recent), items[0])
+            items.remove(chosen)
+            variety_picker.remember_topic(session_key, chosen.topic)
+            self.hits += 1
+        else:
+            self.misses += 1
+        self._maybe_refill(key)
+        return chosen.task if chosen is not None else None
+
+    def prewarm(self, keys: Iterable[PoolKey]) -> None:
+        for key in keys:
+            if not self.enabled or len(self._items) >= self.max_keys:
+                return
+            self._items.setdefault(key, deque())
+            self._maybe_refill(key)
+
+    def _drop_expired(self, items: Deque[_Pooled[T]]) -> None:
+        cutoff = time.monotonic() - self.ttl_s
+        while items and items[0].created_at < cutoff:
+            items.popleft()
+            self.expired += 1
+
+    def _maybe_refill(self, key: PoolKey) -> None:
+        if key in self._refills or len(self._items[key]) > self.low_water:
+            return
+        if time.monotonic() < self._retry_at.get(key, 0.0):
+            return
+        task = asyncio.create_task(self._refill(key), name=f"task-pool-{'/'.join(key)}")
+        self._refills[key] = task
+        task.add_done_callback(functools.partial(self._forget_refill, key))
+
+    def _forget_refill(self, key: PoolKey, _task: "asyncio.Task[None]") -> None:
+        self._refills.pop(key, None)
+
+    async def _refill(self, key: PoolKey) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        items = self._items[key]
+        level = key[1]
+        # One pass up to the high-water mark; expiry is handled in take().
+        for _ in range(self.high_water - len(items)):
+            if self._closed:
+                return
+            async with self._semaphore:
+                topic = variety_picker.pick_topic(level, session_key=f"task_pool:{'/'.join(key)}")
+                try:
+                    task = await self._generate(key, topic)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:  # noqa: BLE001
+                    self.failures += 1
+                    self._retry_at[key] = time.monotonic() + _FAILURE_BACKOFF_S
+                    logger.warning("Task pool refill for %s failed: %s", key, exc)
+                    return
+            items.append(_Pooled(task, topic, time.monotonic()))
+            self.generated += 1
+
+    async def shutdown(self) -> None:
+        self._closed = True
+        refills: Set["asyncio.Task[None]"] = set(self._refills.values())
+        for task in refills:
+            task.cancel()
+        if refills:
+            await asyncio.gather(*refills, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "keys": len(self._items),
+            "ready": sum(len(items) for items in self._items.values()),
+            "refilling": len(self._refills),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            "generated": self.generated,
+            "expired": self.expired,
+            "failures": self.failures,
+        }
+
+
+def parse_prewarm_keys(spec: str, task_types: Iterable[str]) -> Tuple[PoolKey, ...]:
+    """`"English:A1,English:A2"` -> one key per listed (language, level)
+    and task type, English UI."""
+    keys = []
+    types = tuple(task_types)
+    for entry in spec.split(","):
+        language, _, level = entry.strip().partition(":")
+        if not language or not level:
+            continue
+        for task_type in types:
+            keys.append(TaskPool.key(language, level, task_type, None))
+    return tuple(keys)
@@ -0,0 +1,87 @@
+"""Parsed Whisper transcriptions, shared by every speech consumer.
+
+`/speaking/analyze` cached only its final feedback, and
+`/speaking/grade` cached nothing. Grading the same recording against
+another format or target phrase, or analysing it after grading,
+therefore paid for another Whisper call. The transcription depends
+only on the audio, the language hint and the model, so it is cached
+under exactly those: the sha256 of the upload (the controllers
+compute it while reading the file), the language code, and
+GROQ_WHISPER_MODEL.
+
+The in-process TTLCache is L1 and also coalesces concurrent requests
+for the same recording. When AI_CACHE_BACKEND configures a shared
+backend, L1 misses check it before calling the provider, as in
+AI_Service. Empty transcripts are not cached, so a "couldn't hear
+you" result can be retried.
+"""
+
+import logging
+import os
+from typing import Awaitable, Callable, Optional
+
+from models.dtos.speaking_analysis_dtos import WhisperTranscriptionResult
+from utils.cache_backends import get_shared_cache_backend
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger("ai_microservice")
+
+_TRANSCRIPTION_CACHE_TTL = float(os.getenv("TRANSCRIPTION_CACHE_TTL_S", str(60 * 60)))
+_TRANSCRIPTION_CACHE_MAX_BYTES = int(float(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "8")) * 1024 * 1024)
+
+Transcriber = Callable[[], Awaitable[WhisperTranscriptionResult]]
+
+
+def transcription_key(audio_digest: str, language_code: str, model: str) -> str:
+    return f"transcript:{model}:{language_code}:{audio_digest}"
+
+
+def _worth_caching(result: WhisperTranscriptionResult) -> bool:
+    return bool(result.text.strip())
+
+
+class TranscriptionCache:
+    def __init__(
+        self,
+        ttl_seconds: float = _TRANSCRIPTION_CACHE_TTL,
+        max_bytes: int = _TRANSCRIPTION_CACHE_MAX_BYTES,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._local: TTLCache[str, WhisperTranscriptionResult] = TTLCache(
+            "transcriptions",
+            ttl_seconds,
+            max_bytes,
+            sizeof=lambda result: len(result.model_dump_json()),
+        )
+
+    async def get_or_transcribe(
+        self, audio_digest: str, language_code: str, model: str, transcribe: Transcriber
+    ) -> WhisperTranscriptionResult:
+        key = transcription_key(audio_digest, language_code, model)
+        return await self._local.get_or_load(
+            key, lambda: self._load(key, transcribe), should_cache=_worth_caching
+        )
+
+    async def _load(self, key: str, transcribe: Transcriber) -> WhisperTranscriptionResult:
+        shared = get_shared_cache_backend()
+        if shared is not None:
+            raw = await shared.get(key)
+            if raw is not None:
+                try:
+                    return WhisperTranscriptionResult.model_validate_json(raw)
+                except ValueError as exc:
+                    logger.warning("Ignoring unreadable shared transcription %s: %s", key, exc)
+        result = await transcribe()
+        if shared is not None and _worth_caching(result):
+            await shared.set(key, result.model_dump_json(), self.ttl_seconds)
+        return result
+
+
+_cache: Optional[TranscriptionCache] = None
+
+
+def get_transcription_cache() -> TranscriptionCache:
+    global _cache
+    if _cache is None:
+        _cache = TranscriptionCache()
+    return _cache
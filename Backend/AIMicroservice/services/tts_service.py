@@ -1,11 +1,20 @@
 import os
 import random
 import re
-from typing import List, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, TypedDict
 
 from google.api_core.client_options import ClientOptions
 from google.cloud import texttospeech
 
+from utils.clip_cache import ClipCache, clip_key, get_clip_cache
+
+# Dialogue turns synthesised at once, across all requests. The sync
+# client is thread-safe, so turns share it from a small pool.
+_TURN_CONCURRENCY = int(os.getenv("TTS_TURN_CONCURRENCY", "4"))
+
+_turn_executor: Optional[ThreadPoolExecutor] = None
+
 
 # Multi-speaker transcripts come in tagged like:
 #   [Speaker 1]: Hello there.
@@ -19,6 +28,11 @@ _SPEAKER_TAG_RE = re.compile(
 )
 
 
+class VoicePool(TypedDict):
+    code: str
+    voices: List[str]
+
+
 # Chirp 3 HD is Google's current top voice family across all our
 # target languages. It supersedes Neural2 (older, less natural on
 # intonation) and Wavenet (oldest, only viable option for PL/RU
@@ -28,7 +42,7 @@ _SPEAKER_TAG_RE = re.compile(
 # Chirp 3 HD supports `speaking_rate` (required for our CEFR pace
 # scaling) but ignores `pitch`, `volumeGainDb`, and SSML — the
 # synthesize call already uses pitch=0 so this isn't a regression.
-LANGUAGE_VOICE_POOLS = {
+LANGUAGE_VOICE_POOLS: Dict[str, VoicePool] = {
     "english": {
         "code": "en-US",
         "voices": [
@@ -124,8 +138,24 @@ def _speaking_rate_for_level(level: str | None) -> float:
     return _LEVEL_RATE.get(level.upper().strip(), 1.0)
 
 
+def _get_turn_executor() -> ThreadPoolExecutor:
+    global _turn_executor
+    if _turn_executor is None:
+        _turn_executor = ThreadPoolExecutor(
+            max_workers=max(1, _TURN_CONCURRENCY), thread_name_prefix="tts-turn"
+        )
+    return _turn_executor
+
+
+def shutdown_tts_executor() -> None:
+    global _turn_executor
+    if _turn_executor is not None:
+        _turn_executor.shutdown(wait=False, cancel_futures=True)
+        _turn_executor = None
+
+
 class TTSService:
-    def __init__(self) -> None:
+    def __init__(self, clip_cache: Optional[ClipCache] = None) -> None:
         api_key = os.getenv("GOOGLE_TTS_API_KEY")
         if api_key:
             self.client = texttospeech.TextToSpeechClient(
@@ -133,6 +163,31 @@ class TTSService:
             )
         else:
             self.client = texttospeech.TextToSpeechClient()
+        self.clip_cache = clip_cache if clip_cache is not None else get_clip_cache()
+
+    def _synthesize_clip(
+        self, text: str, voice_name: str, language_code: str, rate: float
+    ) -> bytes:
+        """One MP3 clip, from the clip cache when this exact
+        (text, voice, language, rate) was synthesised before."""
+        key = clip_key(text, voice_name, language_code, rate)
+        cached = self.clip_cache.get(key)
+        if cached is not None:
+            return cached
+        response = self.client.synthesize_speech(
+            input=texttospeech.SynthesisInput(text=text),
+            voice=texttospeech.VoiceSelectionParams(
+                language_code=language_code,
+                name=voice_name,
+            ),
+            audio_config=texttospeech.AudioConfig(
+                audio_encoding=texttospeech.AudioEncoding.MP3,
+                speaking_rate=rate,
+                pitch=0.0,
+            ),
+        )
+        self.clip_cache.put(key, response.audio_content)
+        return response.audio_content
 
     def synthesize(
         self, text: str, language: str, level: str | None = None
@@ -148,28 +203,12 @@ class TTSService:
         language_key = language.lower()
         pool = LANGUAGE_VOICE_POOLS.get(language_key) or LANGUAGE_VOICE_POOLS[FALLBACK_LANGUAGE]
 
+        # The clip cache is keyed by voice too, so a random pick still
+        # hits it whenever the same (text, voice) comes up again.
         voice_name = random.choice(pool["voices"])
-        language_code = pool["code"]
-
-        rate = _speaking_rate_for_level(level)
-
-        synthesis_input = texttospeech.SynthesisInput(text=text)
-        voice = texttospeech.VoiceSelectionParams(
-            language_code=language_code,
-            name=voice_name,
-        )
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3,
-            speaking_rate=rate,
-            pitch=0.0,
-        )
-
-        response = self.client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config,
+        return self._synthesize_clip(
+            text, voice_name, pool["code"], _speaking_rate_for_level(level)
         )
-        return response.audio_content
 
     def synthesize_multispeaker(
         self, text: str, language: str, level: str | None = None
@@ -187,15 +226,39 @@ class TTSService:
         possible at frame boundaries but are inaudible at the
         speaking rates we use for learners.
 
+        Turns are synthesised concurrently on a shared pool of
+        `TTS_TURN_CONCURRENCY` threads (each through the clip cache)
+        and joined in transcript order; see `multispeaker_clips` for
+        consuming them as they finish.
+
         Returns (audio_bytes, speaker_labels_in_order_of_appearance).
         Falls back to single-voice synthesis when the text contains
         no speaker tags.
         """
+        clips, speakers_in_order = self.multispeaker_clips(text, language, level)
+        try:
+            return b"".join(clip.result() for clip in clips), speakers_in_order
+        finally:
+            # Don't keep synthesising turns nobody will join.
+            for clip in clips:
+                clip.cancel()
+
+    def multispeaker_clips(
+        self, text: str, language: str, level: str | None = None
+    ) -> Tuple[List["Future[bytes]"], List[str]]:
+        """Start synthesising `text` turn by turn without waiting.
+
+        Returns (clip futures in transcript order, speaker labels in
+        order of appearance). Concatenating the clip bytes in order
+        gives the same MP3 `synthesize_multispeaker` returns, so a
+        caller can stream each clip as soon as it and its predecessors
+        are done. A monologue is a single clip.
+        """
         # Pull speaker tags + segments. If none found, this is a
         # plain monologue and we can defer to the single-voice path.
         segments = _split_by_speaker_tags(text)
         if not segments:
-            return self.synthesize(text, language, level), []
+            return [_get_turn_executor().submit(self.synthesize, text, language, level)], []
 
         language_key = language.lower()
         pool = LANGUAGE_VOICE_POOLS.get(language_key) or LANGUAGE_VOICE_POOLS[FALLBACK_LANGUAGE]
@@ -217,27 +280,21 @@ class TTSService:
                 ]
                 speakers_in_order.append(label)
 
-        audio_chunks: List[bytes] = []
-        for label, line in segments:
-            if not line.strip():
-                continue
-            voice = texttospeech.VoiceSelectionParams(
-                language_code=language_code,
-                name=speaker_to_voice[label],
-            )
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3,
-                speaking_rate=rate,
-                pitch=0.0,
-            )
-            response = self.client.synthesize_speech(
-                input=texttospeech.SynthesisInput(text=line),
-                voice=voice,
-                audio_config=audio_config,
-            )
-            audio_chunks.append(response.audio_content)
+        turns = [
+            (speaker_to_voice[label], line) for label, line in segments if line.strip()
+        ]
+        return self._submit_turns(turns, language_code, rate), speakers_in_order
 
-        return b"".join(audio_chunks), speakers_in_order
+    def _submit_turns(
+        self, turns: List[Tuple[str, str]], language_code: str, rate: float
+    ) -> List["Future[bytes]"]:
+        """Start every (voice, line) turn on the turn pool; futures are
+        in transcript order."""
+        executor = _get_turn_executor()
+        return [
+            executor.submit(self._synthesize_clip, line, voice_name, language_code, rate)
+            for voice_name, line in turns
+        ]
 
     @staticmethod
     def available_languages() -> List[str]:
@@ -0,0 +1,43 @@
+"""Postgres persistence for background upload job status (`upload_jobs`)."""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from database.models import UploadJobRecord
+from services.upload_jobs import StoredUploadJob
+
+
+class UploadJobRecordStore:
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self._session_factory = session_factory
+
+    async def save(self, job_id: str, owner_id: Optional[str], status: Dict[str, Any]) -> None:
+        now = datetime.now(timezone.utc)
+        async with self._session_factory() as session:
+            await session.execute(
+                pg_insert(UploadJobRecord).values(
+                    id=job_id, user_id=owner_id, status=status, updated_at=now
+                ).on_conflict_do_update(
+                    index_elements=["id"],
+                    set_={"status": status, "updated_at": now},
+                )
+            )
+            await session.commit()
+
+    async def load(self, job_id: str) -> Optional[StoredUploadJob]:
+        async with self._session_factory() as session:
+            row = (
+                await session.execute(select(UploadJobRecord).where(UploadJobRecord.id == job_id))
+            ).scalar_one_or_none()
+        if row is None:
+            return None
+        return StoredUploadJob(owner_id=row.user_id, status=row.status, updated_at=row.updated_at)
+
+    async def purge(self, before: datetime) -> None:
+        async with self._session_factory() as session:
+            await session.execute(delete(UploadJobRecord).where(UploadJobRecord.updated_at < before))
+            await session.commit()
@@ -0,0 +1,231 @@
+"""Background PDF ingestion jobs.
+
+`POST /materials/upload/jobs` reads the file, hands
+`MaterialService.process_pdf` to `UploadJobStore.submit` and answers
+202 with a job id straight away; the client then polls
+`GET /materials/upload/jobs/{id}` for stage/progress and finally the
+same `ProcessPdfResponse` the synchronous `/materials/upload` returns.
+
+The replica that accepted the upload runs the job and keeps its live
+status in memory; it also writes the status to the `upload_jobs` table
+on start, every `heartbeat_s` while the job runs, and when it finishes,
+so a poll that lands on another replica (or after a restart) still gets
+an answer. A queued/running row whose heartbeat is older than `stale_s`
+was left behind by a replica that went away and is reported as failed
+with UPLOAD_JOB_INTERRUPTED. Jobs are dropped `ttl_seconds` after their
+last update.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol, Set
+
+from fastapi import HTTPException
+
+from models.dtos.material_dtos import ProcessPdfResponse, UploadJobStatus
+
+logger = logging.getLogger("ai_microservice")
+
+_JOB_CONCURRENCY = int(os.getenv("UPLOAD_JOB_CONCURRENCY", "2"))
+_JOB_TTL_S = 3600.0
+_HEARTBEAT_S = 1.0
+_STALE_S = 30.0
+# Minimum spacing of the `upload_jobs` clean-up runs.
+_PURGE_EVERY_S = 300.0
+
+# Share of the overall progress bar each stage covers.
+_STAGE_SPAN = {
+    "extracting": (0.0, 0.4),
+    "embedding": (0.4, 0.85),
+    "analyzing": (0.85, 1.0),
+}
+
+Progress = Callable[[str, float], None]
+Runner = Callable[[Progress], Awaitable[ProcessPdfResponse]]
+
+
+@dataclass
+class StoredUploadJob:
+    owner_id: Optional[str]
+    # UploadJobStatus.model_dump(mode="json").
+    status: Dict[str, Any]
+    updated_at: datetime
+
+
+class JobStatusStore(Protocol):
+    """Shared persistence behind UploadJobStore (`UploadJobRecordStore`
+    in production)."""
+
+    async def save(self, job_id: str, owner_id: Optional[str], status: Dict[str, Any]) -> None: ...
+
+    async def load(self, job_id: str) -> Optional[StoredUploadJob]: ...
+
+    async def purge(self, before: datetime) -> None: ...
+
+
+class _UploadJob:
+    def __init__(self, owner_id: Optional[str], filename: str) -> None:
+        self.owner_id = owner_id
+        self.status = UploadJobStatus(
+            job_id=uuid.uuid4().hex, filename=filename, status="queued"
+        )
+        self.task: Optional["asyncio.Task[None]"] = None
+        self.finished_at: Optional[float] = None
+
+
+class UploadJobStore:
+    def __init__(
+        self,
+        store: Optional[JobStatusStore] = None,
+        concurrency: int = _JOB_CONCURRENCY,
+        ttl_seconds: float = _JOB_TTL_S,
+        heartbeat_s: float = _HEARTBEAT_S,
+        stale_s: float = _STALE_S,
+    ) -> None:
+        self._store = store
+        self.concurrency = max(1, concurrency)
+        self.ttl_seconds = ttl_seconds
+        self.heartbeat_s = heartbeat_s
+        self.stale_s = stale_s
+        self._jobs: Dict[str, _UploadJob] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._next_store_purge = 0.0
+
+    async def submit(self, owner_id: Optional[str], filename: str, run: Runner) -> UploadJobStatus:
+        """Start `run(progress)` in the background and return its
+        initial status. The status is persisted before this returns, so
+        the first poll finds it on any replica; if that write fails the
+        upload is refused rather than accepted as an unpollable job."""
+        await self._purge()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        job = _UploadJob(owner_id, filename)
+        if self._store is not None:
+            await self._store.save(job.status.job_id, owner_id, job.status.model_dump(mode="json"))
+        self._jobs[job.status.job_id] = job
+        job.task = asyncio.create_task(self._run(job, run), name=f"upload-{job.status.job_id}")
+        self._tasks.add(job.task)
+        job.task.add_done_callback(self._tasks.discard)
+        return job.status
+
+    async def get(self, job_id: str, owner_id: Optional[str]) -> Optional[UploadJobStatus]:
+        """Status of `job_id`, or None if unknown or owned by someone
+        else (the two are indistinguishable on purpose). Jobs this
+        replica runs are answered from memory, the rest from the store."""
+        await self._purge()
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.status if job.owner_id == owner_id else None
+        if self._store is None:
+            return None
+        stored = await self._store.load(job_id)
+        if stored is None or stored.owner_id != owner_id:
+            return None
+        status = UploadJobStatus.model_validate(stored.status)
+        age = (datetime.now(timezone.utc) - stored.updated_at).total_seconds()
+        if status.status in ("queued", "running") and age > self.stale_s:
+            from utils.error_codes import UPLOAD_JOB_INTERRUPTED
+
+            status.status = "failed"
+            status.error = {
+                "code": UPLOAD_JOB_INTERRUPTED,
+                "message": "The server processing this upload stopped before it finished",
+            }
+        return status
+
+    async def _save(self, job: _UploadJob) -> None:
+        if self._store is None:
+            return
+        try:
+            await self._store.save(job.status.job_id, job.owner_id, job.status.model_dump(mode="json"))
+        except Exception as exc:  # noqa: BLE001
+            # The job itself is fine; other replicas just see an older
+            # status until the next heartbeat gets through.
+            logger.warning("Could not persist upload job %s: %s", job.status.job_id, exc)
+
+    async def _heartbeat(self, job: _UploadJob) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_s)
+            await self._save(job)
+
+    async def _run(self, job: _UploadJob, run: Runner) -> None:
+        status = job.status
+        heartbeat = asyncio.create_task(self._heartbeat(job)) if self._store is not None else None
+
+        def progress(stage: str, fraction: float) -> None:
+            low, high = _STAGE_SPAN.get(stage, (0.0, 1.0))
+            status.stage = stage
+            status.progress = round(low + (high - low) * min(max(fraction, 0.0), 1.0), 3)
+
+        assert self._semaphore is not None
+        try:
+            async with self._semaphore:
+                status.status = "running"
+                status.result = await run(progress)
+            status.status = "done"
+            status.stage = None
+            status.progress = 1.0
+        except asyncio.CancelledError:
+            status.status = "failed"
+            status.error = {"code": None, "message": "Cancelled"}
+            raise
+        except HTTPException as exc:
+            status.status = "failed"
+            detail = exc.detail
+            status.error = detail if isinstance(detail, dict) else {"code": None, "message": str(detail)}
+        except Exception as exc:  # noqa: BLE001
+            from utils.error_codes import FILE_PROCESSING_FAILED
+
+            logger.error("Upload job %s failed: %s", status.job_id, exc, exc_info=True)
+            status.status = "failed"
+            status.error = {"code": FILE_PROCESSING_FAILED, "message": str(exc)}
+        finally:
+            job.finished_at = time.monotonic()
+            if heartbeat is not None:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+            # Shielded so a cancelled job still records "failed" instead
+            # of being reported as interrupted later.
+            await asyncio.shield(self._save(job))
+
+    async def _purge(self) -> None:
+        now = time.monotonic()
+        cutoff = now - self.ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        if self._store is None or now < self._next_store_purge:
+            return
+        self._next_store_purge = now + _PURGE_EVERY_S
+        try:
+            await self._store.purge(datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not purge expired upload jobs: %s", exc)
+
+    async def shutdown(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+_store: Optional[UploadJobStore] = None
+
+
+def get_upload_job_store() -> UploadJobStore:
+    global _store
+    if _store is None:
+        from database.connection import async_session
+        from services.upload_job_store import UploadJobRecordStore
+
+        _store = UploadJobStore(UploadJobRecordStore(async_session))
+    return _store
@@ -1,14 +1,102 @@
+import asyncio
+import importlib.util
+import json
 import logging
 import os
-from typing import Any, Dict, List, Optional, TypedDict
+from typing import Any, Awaitable, Dict, List, Optional, TypedDict
 
 import httpx
 from fastapi import status
 
+from services.outbox import OutboxMessage, get_user_outbox
+from utils.background import get_background_dispatcher
+from utils.secret_box import SecretBox
+from utils.ttl_cache import TTLCache
 from utils.user_context import UserContext
 
 logger = logging.getLogger("ai_microservice")
 
+# Pool tunables for the shared client below.
+_USER_HTTP_MAX_CONNECTIONS = int(os.getenv("USER_HTTP_MAX_CONNECTIONS", "50"))
+_USER_HTTP_MAX_KEEPALIVE = int(os.getenv("USER_HTTP_MAX_KEEPALIVE", "20"))
+_USER_HTTP_KEEPALIVE_EXPIRY_S = float(os.getenv("USER_HTTP_KEEPALIVE_EXPIRY_S", "30"))
+# HTTP/2 needs the optional `h2` package; without it we stay on
+# HTTP/1.1 keep-alive, which is what the plain-http in-cluster URL
+# negotiates anyway.
+_USER_HTTP2 = (
+    os.getenv("USER_HTTP2", "1") == "1"
+    and importlib.util.find_spec("h2") is not None
+)
+
+_shared_client: Optional[httpx.AsyncClient] = None
+_shared_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_user_http_client() -> httpx.AsyncClient:
+    """Process-wide pooled client for calls to the User microservice.
+
+    Every UserService call used to open (and tear down) its own
+    AsyncClient, paying a TCP handshake each time. Connections are now
+    kept alive and reused. Recreated if the event loop changed (tests
+    run one loop per test) or after `close_user_http_client()`.
+    """
+    global _shared_client, _shared_client_loop
+    loop = asyncio.get_running_loop()
+    if _shared_client is None or _shared_client.is_closed or _shared_client_loop is not loop:
+        _shared_client = httpx.AsyncClient(
+            http2=_USER_HTTP2,
+            limits=httpx.Limits(
+                max_connections=_USER_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=_USER_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=_USER_HTTP_KEEPALIVE_EXPIRY_S,
+            ),
+            timeout=10.0,
+        )
+        _shared_client_loop = loop
+    return _shared_client
+
+
+async def close_user_http_client() -> None:
+    global _shared_client, _shared_client_loop
+    if _shared_client is not None and not _shared_client.is_closed:
+        await _shared_client.aclose()
+    _shared_client = None
+    _shared_client_loop = None
+
+
+# Per-user AI token lists. One quiz fans out a burst of parallel LLM
+# calls that each resolve the same default token; with single-flight
+# loading they share one User-service lookup. Entries are sealed so the
+# raw provider keys never sit in memory as plain strings, and the TTL
+# is short so a key changed elsewhere is picked up quickly even if the
+# invalidation call is missed.
+_TOKEN_CACHE_TTL_S = float(os.getenv("USER_TOKEN_CACHE_TTL_S", "60"))
+_token_box = SecretBox()
+_token_cache: TTLCache[str, bytes] = TTLCache(
+    "user_ai_tokens", _TOKEN_CACHE_TTL_S, 1024 * 1024, sizeof=len
+)
+# Bumped on invalidation so a lookup that was already in flight when
+# the tokens changed doesn't write its stale result back. Only needs to
+# outlive a lookup (10s HTTP timeout), so entries expire and the map
+# stays bounded; sized by entry count.
+_TOKEN_GENERATION_TTL_S = 300.0
+_token_generation: TTLCache[str, int] = TTLCache(
+    "user_ai_token_generations", _TOKEN_GENERATION_TTL_S, 100_000, sizeof=lambda _: 1
+)
+
+
+def _generation(user_id: str) -> int:
+    return _token_generation.get(user_id) or 0
+
+
+def invalidate_ai_tokens(user_id: Optional[str]) -> None:
+    """Drop the cached AI tokens for `user_id` (after a token was
+    added, removed, re-defaulted or verified)."""
+    if not user_id:
+        return
+    _token_generation.put(user_id, _generation(user_id) + 1)
+    _token_cache.invalidate(user_id)
+
 
 def _internal_key() -> str:
     """Read INTERNAL_SERVICE_KEY at the call site so a fresh container
@@ -59,6 +147,13 @@ class UserService:
             "USER_MICROSERVICE_URL", "http://localhost:3004/api"
         ).rstrip("/")
 
+    @staticmethod
+    def dispatch(side_effect: Awaitable[None], name: Optional[str] = None) -> None:
+        """Run a best-effort call (log_task_history, log_activity, ...)
+        in the background instead of on the request path. Several
+        dispatched calls proceed concurrently."""
+        get_background_dispatcher().submit(side_effect, name=name)
+
     async def _get(
         self, path: str, forward_headers: Dict[str, str]
     ) -> Dict[str, Any]:
@@ -71,8 +166,9 @@ class UserService:
         )
         url = f"{self.base_url}{path}"
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(url, headers=forward_headers)
+            response = await get_user_http_client().get(
+                url, headers=forward_headers, timeout=10.0
+            )
         except httpx.RequestError as exc:
             raise_with_code(
                 USER_SERVICE_UNREACHABLE,
@@ -118,6 +214,24 @@ class UserService:
             )
 
     async def get_ai_tokens(self, ctx: UserContext) -> List[UserAIToken]:
+        """The user's AI tokens, from the short-lived per-user cache."""
+        user_id = ctx.user_id
+        if not user_id:
+            return await self._fetch_ai_tokens(ctx)
+        generation = _generation(user_id)
+
+        async def _load() -> bytes:
+            tokens = await self._fetch_ai_tokens(ctx)
+            return _token_box.seal(json.dumps(tokens).encode("utf-8"))
+
+        sealed = await _token_cache.get_or_load(
+            user_id,
+            _load,
+            should_cache=lambda _: _generation(user_id) == generation,
+        )
+        return json.loads(_token_box.open(sealed))  # type: ignore[no-any-return]
+
+    async def _fetch_ai_tokens(self, ctx: UserContext) -> List[UserAIToken]:
         from utils.error_codes import (
             USER_SERVICE_BAD_REQUEST,
             USER_SERVICE_BAD_RESPONSE,
@@ -144,101 +258,99 @@ class UserService:
 
         return payload
 
+    async def _write(
+        self, ctx: UserContext, path: str, body: Dict[str, Any], label: str
+    ) -> None:
+        """Hand a best-effort write to the outbox; it is delivered by the
+        drainer with retries. Falls back to a direct POST when the
+        outbox is disabled or can't be written. Never raises."""
+        outbox = get_user_outbox()
+        if outbox is not None:
+            # Identity only: the drainer authenticates with the internal
+            # key, and a bearer token may have expired by retry time.
+            headers = {
+                k: v for k, v in ctx.to_forward_headers().items()
+                if k != "authorization"
+            }
+            try:
+                await outbox.enqueue(path, headers, body)
+                return
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("%s enqueue failed, posting directly: %s", label, exc)
+        try:
+            await self._post(path, ctx.to_forward_headers(), body, label)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("%s exception: %s", label, exc)
+
+    async def _post(
+        self, path: str, forward_headers: Dict[str, str], body: Dict[str, Any], label: str
+    ) -> bool:
+        """POST one write. True when the row is done (accepted, or
+        rejected with a 4xx a retry can't fix); False when it is worth
+        retrying. Transport errors propagate."""
+        headers = dict(forward_headers)
+        headers["x-internal-service-key"] = _internal_key()
+        headers["content-type"] = "application/json"
+        response = await get_user_http_client().post(
+            f"{self.base_url}{path}", headers=headers, json=body, timeout=5.0
+        )
+        if response.status_code < 400:
+            return True
+        logger.warning(
+            "%s failed status=%s body=%s",
+            label,
+            response.status_code,
+            response.text[:200],
+        )
+        return response.status_code < 500 and response.status_code not in (408, 429)
+
+    async def deliver(self, message: OutboxMessage) -> bool:
+        """`Deliver` callback for the outbox drainer."""
+        try:
+            return await self._post(message.path, message.headers, message.body, f"outbox {message.path}")
+        except (httpx.RequestError, RuntimeError) as exc:
+            # Unreachable, or INTERNAL_SERVICE_KEY missing — both are
+            # worth retrying once the environment recovers.
+            logger.warning("outbox %s delivery failed: %s", message.path, exc)
+            return False
+
     async def log_task_history(
         self, ctx: UserContext, entry: TaskHistoryEntry
     ) -> None:
-        """Best-effort POST to /api/history. Never raises — history logging
-        must not block or fail the actual user-facing operation.
+        """Best-effort write to /api/history (via the outbox). Never
+        raises — history logging must not block or fail the actual
+        user-facing operation.
         """
-        try:
-            url = f"{self.base_url}/history"
-            headers = ctx.to_forward_headers()
-            headers["x-internal-service-key"] = _internal_key()
-            headers["content-type"] = "application/json"
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.post(url, headers=headers, json=entry)
-            if response.status_code >= 400:
-                logger.warning(
-                    "history log failed status=%s body=%s",
-                    response.status_code,
-                    response.text[:200],
-                )
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("history log exception: %s", exc)
+        await self._write(ctx, "/history", dict(entry), "history log")
 
     async def record_user_error(
         self, ctx: UserContext, error: "UserErrorEntry"
     ) -> None:
-        """Best-effort POST to /api/user-errors. Records one recurring
+        """Best-effort write to /api/user-errors. Records one recurring
         error (FR6) with upsert semantics on the User side. Never raises —
         error logging must not block or fail the grading response the user
         is waiting on.
         """
-        try:
-            url = f"{self.base_url}/user-errors"
-            headers = ctx.to_forward_headers()
-            headers["x-internal-service-key"] = _internal_key()
-            headers["content-type"] = "application/json"
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.post(url, headers=headers, json=error)
-            if response.status_code >= 400:
-                logger.warning(
-                    "record_user_error failed status=%s body=%s",
-                    response.status_code,
-                    response.text[:200],
-                )
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("record_user_error exception: %s", exc)
+        await self._write(ctx, "/user-errors", dict(error), "record_user_error")
 
     async def post_achievement_progress(
         self, ctx: UserContext, achievement_name: str, increment_by: int = 1
     ) -> None:
-        """Best-effort POST to /api/achievements/progress. Never raises —
+        """Best-effort write to /api/achievements/progress. Never raises —
         achievement updates must not block or fail the user-facing operation.
         """
-        try:
-            url = f"{self.base_url}/achievements/progress"
-            headers = ctx.to_forward_headers()
-            headers["x-internal-service-key"] = _internal_key()
-            headers["content-type"] = "application/json"
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.post(
-                    url,
-                    headers=headers,
-                    json={"achievementName": achievement_name, "incrementBy": increment_by},
-                )
-            if response.status_code >= 400:
-                logger.warning(
-                    "achievement progress failed status=%s body=%s",
-                    response.status_code,
-                    response.text[:200],
-                )
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("post_achievement_progress exception: %s", exc)
+        await self._write(
+            ctx,
+            "/achievements/progress",
+            {"achievementName": achievement_name, "incrementBy": increment_by},
+            "achievement progress",
+        )
 
     async def log_activity(self, ctx: UserContext, xp_gained: int) -> None:
-        """Best-effort POST to /api/me/activity. Never raises — XP/streak
+        """Best-effort write to /api/me/activity. Never raises — XP/streak
         updates must not block or fail the user-facing operation.
         """
-        try:
-            url = f"{self.base_url}/me/activity"
-            headers = ctx.to_forward_headers()
-            headers["x-internal-service-key"] = _internal_key()
-            headers["content-type"] = "application/json"
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.post(
-                    url,
-                    headers=headers,
-                    json={"xpGained": xp_gained},
-                )
-            if response.status_code >= 400:
-                logger.warning(
-                    "log_activity failed status=%s body=%s",
-                    response.status_code,
-                    response.text[:200],
-                )
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("log_activity exception: %s", exc)
+        await self._write(ctx, "/me/activity", {"xpGained": xp_gained}, "log_activity")
 
     async def get_recent_history(
         self, ctx: UserContext, limit: int = 20, task_type: Optional[str] = None
@@ -1,13 +1,28 @@
+import asyncio
+import logging
+import math
+import os
 import re
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from types import MappingProxyType
 
 import lancedb
+import numpy as np
+import pyarrow as pa
+from lancedb.query import LanceVectorQueryBuilder
+from lancedb.table import LanceTable, Table
 from sentence_transformers import SentenceTransformer
 import pandas as pd
 from constants.constants import LEVEL_EMBEDDINGS
 
-from models.dtos.vector_db_dtos import SpecificSkillContext, FullLevelContext, SimilarLevel, LevelSkills, MaterialChunk, TaskTemplate
+from services.embedding_engine import EmbeddingEngine
+from models.dtos.vector_db_dtos import SpecificSkillContext, FullLevelContext, SimilarLevel, LevelSkills, MaterialHit, TaskTemplate, TemplateHit
 from models.dtos.material_dtos import ChunkMetadata
-from typing import List, Union, Optional, Dict, Any
+from utils.ttl_cache import TTLCache
+from typing import Callable, Iterator, List, Mapping, Sequence, Union, Optional, Dict, Any, Tuple, cast
 
 # Strict UUID format check used to gate user_id before it's
 # interpolated into a LanceDB where-clause. Anything that doesn't
@@ -17,25 +32,247 @@ _UUID_RE = re.compile(
     r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$",
 )
 
+# Content hashes (SHA-256 hex) get the same treatment before they go
+# into an IN (...) list.
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+_DEFAULT_DB_PATH = "language_levels.db"
+_DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+
+logger = logging.getLogger("ai_microservice")
+
+# Below this many chunks a flat scan is fast enough and exact; above it
+# the maintenance job builds an IVF-PQ index on `vector`.
+_ANN_MIN_ROWS = int(os.getenv("VECTOR_ANN_MIN_ROWS", "50000"))
+# Tenants with at most this many chunks are searched exactly (flat scan
+# over their prefiltered rows) even once the ANN index exists.
+_EXACT_TENANT_MAX_ROWS = int(os.getenv("VECTOR_EXACT_TENANT_MAX_ROWS", "20000"))
+_ANN_NPROBES = int(os.getenv("VECTOR_ANN_NPROBES", "20"))
+# Re-rank refine_factor × limit PQ candidates with exact distances.
+_ANN_REFINE_FACTOR = int(os.getenv("VECTOR_ANN_REFINE_FACTOR", "5"))
+
+_TEMPLATE_CACHE_TTL_S = float(os.getenv("TEMPLATE_CACHE_TTL_S", "3600"))
+_TEMPLATE_CACHE_MAX_BYTES = int(os.getenv("TEMPLATE_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# Element type for the `vector` column of newly created tables. float16
+# halves vector storage and scan I/O at a small recall cost; existing
+# tables keep whatever type they were created with.
+_VECTOR_VALUE_TYPES = {"float32": pa.float32(), "float16": pa.float16()}
+_VECTOR_DTYPE = os.getenv("VECTOR_STORAGE_DTYPE", "float32").lower()
+# Chunks encoded and written per Arrow record batch.
+_INGEST_BATCH_ROWS = int(os.getenv("VECTOR_INGEST_BATCH_ROWS", "64"))
+
+# Compaction thresholds: every table.add() leaves one small fragment and
+# one manifest version behind.
+_COMPACT_MIN_FRAGMENTS = int(os.getenv("LANCE_COMPACT_MIN_FRAGMENTS", "32"))
+_COMPACT_TARGET_ROWS = int(os.getenv("LANCE_COMPACT_TARGET_ROWS", str(1024 * 1024)))
+_CLEANUP_MIN_VERSIONS = int(os.getenv("LANCE_CLEANUP_MIN_VERSIONS", "50"))
+# Versions younger than this survive cleanup so in-flight readers that
+# opened an older manifest keep working.
+_VERSION_RETENTION_S = float(os.getenv("LANCE_VERSION_RETENTION_S", "3600"))
+
+# Columns search_materials reads back; the vector is never needed.
+_MATERIAL_COLUMNS = ["text", "source", "chunk_index", "user_id", "content_hash"]
+
+_SKILL_COLUMNS = ("listening", "reading", "spoken_interaction", "spoken_production", "writing")
+
+# level -> (full context, skill column -> single-skill context)
+_LevelEntry = Tuple[FullLevelContext, Mapping[str, SpecificSkillContext]]
+
+
+def vector_column(embeddings: np.ndarray, value_type: pa.DataType) -> pa.FixedSizeListArray:
+    """Wrap an (n, dim) embedding matrix as a FixedSizeList<value_type>
+    Arrow array straight from its buffer — no per-row Python float
+    lists. For float32 encoder output the child array shares the NumPy
+    memory; float16 costs one downcast."""
+    matrix = np.ascontiguousarray(embeddings, dtype=value_type.to_pandas_dtype())
+    if matrix.ndim != 2:
+        raise ValueError(f"expected an (n, dim) matrix, got shape {matrix.shape}")
+    values = pa.array(matrix.reshape(-1), type=value_type)
+    return pa.FixedSizeListArray.from_arrays(values, matrix.shape[1])
+
+
+def material_hits(
+    results: pa.Table,
+    user_id: Optional[str] = None,
+    content_hashes: Sequence[str] = (),
+) -> List[MaterialHit]:
+    """Turn a projected search result into MaterialHit rows, column-wise
+    (one to_pylist per column instead of a dict per row). With
+    `user_id`, only rows the user uploaded or whose document they own
+    (`content_hashes`) are kept."""
+    if results.num_rows == 0:
+        return []
+    names = results.column_names
+    texts = results.column("text").to_pylist()
+    sources = results.column("source").to_pylist()
+    indexes = results.column("chunk_index").to_pylist()
+    distances = (
+        results.column("_distance").to_pylist() if "_distance" in names else [None] * len(texts)
+    )
+    keep: Sequence[int]
+    if not user_id:
+        keep = range(len(texts))
+    else:
+        owners = results.column("user_id").to_pylist() if "user_id" in names else [user_id] * len(texts)
+        hashes = results.column("content_hash").to_pylist() if "content_hash" in names else [None] * len(texts)
+        shared = set(content_hashes)
+        keep = [i for i in range(len(texts)) if owners[i] == user_id or hashes[i] in shared]
+    return [MaterialHit(texts[i], sources[i], indexes[i], distances[i]) for i in keep]
+
+
+def template_hits(results: pa.Table) -> List[TemplateHit]:
+    """Turn a projected template search result into TemplateHit rows,
+    column-wise like `material_hits`."""
+    if results.num_rows == 0:
+        return []
+    names = results.column_names
+    ids = results.column("id").to_pylist() if "id" in names else [None] * results.num_rows
+    templates = results.column("template").to_pylist()
+    distances = (
+        results.column("_distance").to_pylist() if "_distance" in names else [None] * len(templates)
+    )
+    extra_names = [name for name in names if name not in ("id", "template", "_distance", "vector")]
+    if not extra_names:
+        return [TemplateHit(ids[i], templates[i], distances[i]) for i in range(len(templates))]
+    extra_columns = [results.column(name).to_pylist() for name in extra_names]
+    return [
+        TemplateHit(
+            ids[i],
+            templates[i],
+            distances[i],
+            {name: column[i] for name, column in zip(extra_names, extra_columns)},
+        )
+        for i in range(len(templates))
+    ]
+
+
+def _configured_vector_type() -> pa.DataType:
+    value_type = _VECTOR_VALUE_TYPES.get(_VECTOR_DTYPE)
+    if value_type is None:
+        logger.warning("Unknown VECTOR_STORAGE_DTYPE %r; using float32.", _VECTOR_DTYPE)
+        return pa.float32()
+    return value_type
+
+
 class VectorDBService:
-    def __init__(self) -> None:
-        self.db = lancedb.connect("language_levels.db")
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+    """LanceDB-backed store for CEFR level descriptors, uploaded
+    material chunks and task templates.
+
+    Construction is cheap: the LanceDB connection and the
+    SentenceTransformer encoder are opened on first use (or eagerly
+    via `warm_up()` from the app lifespan). One instance is meant to
+    be shared process-wide through `ServiceRegistry` — building one
+    per request reloads ~80 MB of model weights each time.
+    """
+
+    def __init__(
+        self,
+        db_path: str = _DEFAULT_DB_PATH,
+        model_name: str = _DEFAULT_MODEL_NAME,
+    ) -> None:
+        self.db_path = db_path
+        self.model_name = model_name
         self.table_name = "levels"
         self.materials_table_name = "materials"
         self.templates_table_name = "task_templates"
-        self.initialize_db()
+        self._db: Optional[lancedb.DBConnection] = None
+        self._model: Optional[SentenceTransformer] = None
+        self._warm = False
+        # Guards the lazy open below. Warm-up runs on a worker thread
+        # while early requests may already be hitting the service via
+        # asyncio.to_thread, so two threads can race to load the model.
+        self._init_lock = threading.Lock()
+        # Which columns of the materials table are indexed; refreshed by
+        # maintain_indexes(), lazily read once otherwise.
+        self._materials_indexed: Optional[set] = None
+        # Materials rows per user_id and per content_hash, so picking
+        # exact vs ANN search doesn't count rows on every query.
+        # Recounted by maintain_indexes(), bumped by save_chunks(); None
+        # until the first count.
+        self._tenant_rows: Optional[Dict[str, Counter[str]]] = None
+        # The levels table is seeded once from constants and never
+        # written afterwards, so it's read into this map at warm-up and
+        # served from memory. Treat the returned models as read-only.
+        self._level_index: Optional[Mapping[str, _LevelEntry]] = None
+        # Point lookups by template id; entries are dropped when
+        # save_task_templates writes the same id again.
+        self._template_cache: TTLCache[str, TaskTemplate] = TTLCache(
+            "task_templates", _TEMPLATE_CACHE_TTL_S, _TEMPLATE_CACHE_MAX_BYTES
+        )
+        # Running totals across compact_tables() runs, for metrics.
+        self._compaction_totals = {"fragments_removed": 0, "bytes_reclaimed": 0, "versions_removed": 0}
+        # All query/chunk encodes go through one worker thread that
+        # micro-batches concurrent requests; see EmbeddingEngine.
+        self.embedder = EmbeddingEngine(lambda: self.model)
+
+    @property
+    def db(self) -> lancedb.DBConnection:
+        self._require_warm()
+        assert self._db is not None
+        return self._db
+
+    @property
+    def model(self) -> SentenceTransformer:
+        self._require_warm()
+        assert self._model is not None
+        return self._model
+
+    def _require_warm(self) -> None:
+        """Load lazily on the calling worker thread. On the event loop
+        a load would stall every request (health probes included), so
+        async callers must `await ensure_warm()` first."""
+        if self._warm:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.warm_up()
+            return
+        raise RuntimeError("VectorDBService used on the event loop before ensure_warm()")
+
+    @property
+    def is_warm(self) -> bool:
+        """True once the encoder is loaded and the levels table exists."""
+        return self._warm
+
+    def warm_up(self) -> None:
+        """Open LanceDB, load the encoder and seed the levels table.
+        Blocking (model load is seconds of disk + CPU) — call it from a
+        worker thread. Idempotent and safe to call concurrently."""
+        if self.is_warm:
+            return
+        with self._init_lock:
+            if self.is_warm:
+                return
+            db = lancedb.connect(self.db_path)
+            model = SentenceTransformer(self.model_name)
+            self._db = db
+            self._model = model
+            self.initialize_db()
+            self._warm = True
+
+    async def ensure_warm(self) -> None:
+        """Wait for `warm_up` without blocking the event loop: joins a
+        load already running (the registry's) or retries a failed one."""
+        if not self._warm:
+            await asyncio.to_thread(self.warm_up)
+
+    def close(self) -> None:
+        """Stop the embedding worker. Called from the app lifespan."""
+        self.embedder.stop()
 
     def initialize_db(self) -> None:
+        assert self._db is not None and self._model is not None
         try:
-            if self.table_name not in self.db.table_names():
+            if self.table_name not in self._db.table_names():
                 data = []
                 for level, skills in LEVEL_EMBEDDINGS.items():
                     full_description = f"Level {level} proficiency description:\n"
                     for skill, description in skills.items():
                         full_description += f"{skill}: {description}\n"
 
-                    embedding = self.model.encode(full_description)
+                    embedding = self._model.encode(full_description)
 
                     data.append(
                         {
@@ -51,54 +288,55 @@ class VectorDBService:
                     )
 
                 df = pd.DataFrame(data)
-                self.db.create_table(self.table_name, data=df)
+                self._db.create_table(self.table_name, data=df)
                 print(f"Table {self.table_name} created successfully")
 
-            if self.materials_table_name not in self.db.table_names():
+            if self.materials_table_name not in self._db.table_names():
                 pass
-            if self.templates_table_name not in self.db.table_names():
+            if self.templates_table_name not in self._db.table_names():
                 pass
 
-        except Exception as e:
-            raise e
-
-    def get_level_context(self, level: str, skill_type: Optional[str] = None) -> Optional[Union[SpecificSkillContext, FullLevelContext]]:
-        try:
-            table = self.db.open_table(self.table_name)
-            df = table.to_pandas()
-            result = df[df["level"] == level]
-
-            if result.empty:
-                return None
-
-            level_data = result.to_dict("records")[0]
-
-            if skill_type and skill_type.lower() in level_data:
-                return SpecificSkillContext(
-                    level=level,
-                    skill_type=skill_type,
-                    description=level_data[skill_type.lower()],
-                )
-            else:
-                level_skills = LevelSkills(
-                    listening=level_data["listening"],
-                    reading=level_data["reading"],
-                    spoken_interaction=level_data["spoken_interaction"],
-                    spoken_production=level_data["spoken_production"],
-                    writing=level_data["writing"],
-                )
-                return FullLevelContext(
-                    level=level,
-                    full_description=level_data["full_description"],
-                    skills=level_skills,
-                )
+            self._level_index = self._build_level_index(self._db.open_table(self.table_name))
 
         except Exception as e:
             raise e
 
+    @staticmethod
+    def _build_level_index(table: Table) -> Mapping[str, _LevelEntry]:
+        columns = ["level", "full_description", *_SKILL_COLUMNS]
+        index: Dict[str, _LevelEntry] = {}
+        for row in table.to_arrow().select(columns).to_pylist():
+            level = row["level"]
+            if level in index:
+                continue  # first row wins, as the old DataFrame scan did
+            skills = LevelSkills(**{skill: row[skill] for skill in _SKILL_COLUMNS})
+            full = FullLevelContext(level=level, full_description=row["full_description"], skills=skills)
+            per_skill = MappingProxyType({
+                skill: SpecificSkillContext(level=level, skill_type=skill, description=row[skill])
+                for skill in _SKILL_COLUMNS
+            })
+            index[level] = (full, per_skill)
+        return MappingProxyType(index)
+
+    async def get_level_context(self, level: str, skill_type: Optional[str] = None) -> Optional[Union[SpecificSkillContext, FullLevelContext]]:
+        await self.ensure_warm()
+        assert self._level_index is not None
+        entry = self._level_index.get(level)
+        if entry is None:
+            return None
+        full, per_skill = entry
+        if skill_type:
+            specific = per_skill.get(skill_type.lower())
+            if specific is not None:
+                # The DataFrame scan echoed skill_type as the caller spelled it.
+                if specific.skill_type != skill_type:
+                    return specific.model_copy(update={"skill_type": skill_type})
+                return specific
+        return full
+
     def find_similar_levels(self, query: str, limit: int = 3) -> List[SimilarLevel]:
         try:
-            query_embedding = self.model.encode(query)
+            query_embedding = self.embedder.encode_sync(query)
             table = self.db.open_table(self.table_name)
             results = table.search(query_embedding.tolist()).limit(limit).to_pandas()
 
@@ -129,63 +367,135 @@ class VectorDBService:
         chunks: List[str],
         metadatas: List[ChunkMetadata],
         user_id: Optional[str] = None,
-    ) -> None:
+        on_progress: Optional[Callable[[int], None]] = None,
+        content_hash: str = "",
+    ) -> bool:
         """
         Saves text chunks and their metadata to the materials table.
+        Chunks are encoded and written in Arrow record batches;
+        `on_progress(rows_written)` is called after each batch.
 
         user_id is stored alongside each chunk so that search_materials
         can filter results to a single owner. Without it the previous
         implementation pooled all users' uploads into one search index,
         meaning user A's quiz could be generated from user B's PDF.
+
+        `content_hash` tags the chunks with their source document so
+        other owners of the same PDF can search them. Returns False if
+        the table couldn't take the tag (the chunks are then only
+        visible to `user_id`).
         """
         try:
-            embeddings = self.model.encode(chunks)
-            data = []
-            for i, chunk in enumerate(chunks):
-                record = {
-                    "text": chunk,
-                    "vector": embeddings[i].tolist(),
-                    "source": metadatas[i].source,
-                    "chunk_index": metadatas[i].chunk_index,
-                    # Empty string instead of None — LanceDB schema needs
-                    # a stable column type, and an empty string still
-                    # disambiguates pre-multitenant rows from post.
-                    "user_id": user_id or "",
-                }
-                data.append(record)
-
-            df = pd.DataFrame(data)
-
+            if not chunks:
+                return True
             if self.materials_table_name in self.db.table_names():
                 table = self.db.open_table(self.materials_table_name)
-                table.add(data=df)
+                if "content_hash" not in table.schema.names:
+                    try:
+                        # Tables from before content addressing.
+                        table.add_columns({"content_hash": "''"})
+                        table = self.db.open_table(self.materials_table_name)
+                    except Exception as exc:  # noqa: BLE001
+                        logger.warning("Could not add content_hash to materials: %s", exc)
+                schema = table.schema
+            else:
+                table = None
+                schema = self._materials_schema()
+
+            batches = self._chunk_batches(chunks, metadatas, user_id or "", content_hash, schema, on_progress)
+            # One streamed write per document: LanceDB consumes the
+            # batches as they're encoded, so peak memory is one batch
+            # of vectors rather than the whole PDF, and the table gets
+            # one new fragment instead of one per batch.
+            if table is not None:
+                table.add(data=pa.RecordBatchReader.from_batches(schema, batches))
             else:
-                self.db.create_table(self.materials_table_name, data=df)
+                self.db.create_table(self.materials_table_name, data=batches, schema=schema)
+            if self._tenant_rows is not None:
+                self._tenant_rows["user_id"][user_id or ""] += len(chunks)
+                self._tenant_rows["content_hash"][content_hash] += len(chunks)
+            return "content_hash" in schema.names
 
         except Exception as e:
             print(f"Error saving chunks: {e}")
             raise e
 
+    def _materials_schema(self) -> pa.Schema:
+        dim = int(self.model.get_sentence_embedding_dimension() or 0)
+        return pa.schema([
+            pa.field("text", pa.string()),
+            pa.field("vector", pa.list_(_configured_vector_type(), dim)),
+            pa.field("source", pa.string()),
+            pa.field("chunk_index", pa.int64()),
+            # Empty string instead of None — LanceDB schema needs a
+            # stable column type, and an empty string still
+            # disambiguates pre-multitenant rows from post.
+            pa.field("user_id", pa.string()),
+            # SHA-256 of the uploaded PDF; "" for rows from before
+            # content-addressed ingestion.
+            pa.field("content_hash", pa.string()),
+        ])
+
+    def _chunk_batches(
+        self,
+        chunks: List[str],
+        metadatas: List[ChunkMetadata],
+        user_id: str,
+        content_hash: str,
+        schema: pa.Schema,
+        on_progress: Optional[Callable[[int], None]],
+    ) -> Iterator[pa.RecordBatch]:
+        vector_type = schema.field("vector").type.value_type
+        for start in range(0, len(chunks), _INGEST_BATCH_ROWS):
+            texts = chunks[start:start + _INGEST_BATCH_ROWS]
+            metas = metadatas[start:start + _INGEST_BATCH_ROWS]
+            columns = {
+                "text": texts,
+                "vector": vector_column(self.embedder.encode_many_sync(texts), vector_type),
+                "source": [m.source for m in metas],
+                "chunk_index": [m.chunk_index for m in metas],
+                "user_id": [user_id] * len(texts),
+                "content_hash": [content_hash] * len(texts),
+            }
+            arrays = []
+            for field in schema:
+                value = columns.get(field.name)
+                if value is None:
+                    arrays.append(pa.nulls(len(texts), field.type))
+                elif isinstance(value, pa.Array):
+                    arrays.append(value)
+                else:
+                    arrays.append(pa.array(value, type=field.type))
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+            if on_progress is not None:
+                on_progress(start + len(texts))
+
     def search_materials(
         self,
         query: str,
         limit: int = 5,
         user_id: Optional[str] = None,
-    ) -> List[MaterialChunk]:
+        content_hashes: Sequence[str] = (),
+    ) -> List[MaterialHit]:
         """
-        Searches for materials similar to the query.
+        Searches for materials similar to the query. Only the text and
+        metadata columns are read back; rows are lightweight
+        `MaterialHit`s (`.to_model()` gives the MaterialChunk DTO).
 
         If user_id is provided, results are restricted to chunks that
         belong to that user. Pre-multitenant rows have user_id="" and
         are NEVER returned in a scoped query — they're effectively
-        invisible until backfilled.
+        invisible until backfilled. `content_hashes` additionally admits
+        chunks of shared documents the user owns (uploaded first by
+        someone else).
         """
         try:
             if self.materials_table_name not in self.db.table_names():
                 return []
 
-            query_embedding = self.model.encode(query)
-            table = self.db.open_table(self.materials_table_name)
+            query_embedding = self.embedder.encode_sync(query)
+            table = self._open_lance_table(self.materials_table_name)
+            ann = "vector" in self._indexed_columns(table)
 
             search = table.search(query_embedding.tolist())
             if user_id:
@@ -196,29 +506,198 @@ class VectorDBService:
                 # SQL fragments into the LanceDB query.
                 if not _UUID_RE.match(user_id):
                     return []
-                try:
-                    search = search.where(f"user_id = '{user_id}'")
-                except Exception:  # noqa: BLE001
-                    pass
-            results_df = search.limit(limit).to_pandas()
+                tenant_filter = f"user_id = '{user_id}'"
+                content_hashes = [h for h in content_hashes if _SHA256_RE.match(h)]
+                if content_hashes and "content_hash" in table.schema.names:
+                    listed = ", ".join(f"'{h}'" for h in content_hashes)
+                    tenant_filter = f"({tenant_filter} OR content_hash IN ({listed}))"
+                # Prefilter: restrict to the tenant's rows BEFORE the
+                # nearest-neighbour step (served by the scalar index on
+                # user_id), so `limit` rows come back even when other
+                # tenants dominate the neighbourhood.
+                search = search.where(tenant_filter, prefilter=True)
+                if (
+                    ann
+                    and hasattr(search, "bypass_vector_index")
+                    and self._tenant_is_small(table, tenant_filter, user_id, content_hashes)
+                ):
+                    # Exact results for ordinary tenants: a flat scan
+                    # over a few thousand prefiltered rows is cheap.
+                    search = search.bypass_vector_index()
+                    ann = False
+            if ann and isinstance(search, LanceVectorQueryBuilder):
+                search = search.nprobes(_ANN_NPROBES).refine_factor(_ANN_REFINE_FACTOR)
+            columns = [c for c in _MATERIAL_COLUMNS if c in table.schema.names]
+            results = search.select(columns).limit(limit).to_arrow()
 
             # Defensive post-filter: even if the where-clause can't be
             # applied (older table schema), drop foreign-user rows here.
-            records = results_df.to_dict("records")
-            if user_id and "user_id" in results_df.columns:
-                records = [r for r in records if r.get("user_id") == user_id]
-
-            # Strip the user_id field before constructing MaterialChunk
-            # so we don't have to widen the dto for an internal-only key.
-            for r in records:
-                r.pop("user_id", None)
-
-            return [MaterialChunk(**record) for record in records]
+            return material_hits(results, user_id, content_hashes)
 
         except Exception as e:
             print(f"Error searching materials: {e}")
             raise e
 
+    def _tenant_is_small(
+        self, table: Table, tenant_filter: str, user_id: str, content_hashes: Sequence[str]
+    ) -> bool:
+        counts = self._tenant_rows
+        if counts is not None:
+            # Upper bound: a row matching both the user and a hash
+            # counts twice, which can only tip the choice towards ANN.
+            rows = counts["user_id"][user_id] + sum(counts["content_hash"][h] for h in content_hashes)
+            return rows <= _EXACT_TENANT_MAX_ROWS
+        # Not counted yet in this process; ask the table.
+        try:
+            return int(table.count_rows(tenant_filter)) <= _EXACT_TENANT_MAX_ROWS
+        except Exception:  # noqa: BLE001
+            return False
+
+    @staticmethod
+    def _count_tenant_rows(table: LanceTable) -> Dict[str, Counter[str]]:
+        names = [c for c in ("user_id", "content_hash") if c in table.schema.names]
+        data = table.to_lance().to_table(columns=names)
+        counts: Dict[str, Counter[str]] = {"user_id": Counter(), "content_hash": Counter()}
+        for name in names:
+            for entry in data.column(name).value_counts().to_pylist():
+                counts[name][entry["values"] or ""] += int(entry["counts"])
+        return counts
+
+    def _open_lance_table(self, name: str) -> LanceTable:
+        # Local (file-backed) connections always open a LanceTable;
+        # index listing and compaction need its pylance dataset.
+        return cast(LanceTable, self.db.open_table(name))
+
+    def _indexed_columns(self, table: LanceTable) -> set:
+        if self._materials_indexed is None:
+            try:
+                self._materials_indexed = self._list_indexed_columns(table)
+            except Exception as exc:  # noqa: BLE001
+                # Searching without ANN parameters is still correct;
+                # don't cache, so the next query asks again.
+                logger.warning("Listing materials indexes failed: %s", exc)
+                return set()
+        return self._materials_indexed
+
+    @staticmethod
+    def _list_indexed_columns(table: LanceTable) -> set:
+        # The sync LanceTable in the pinned lancedb has no
+        # list_indices(); the pylance dataset underneath does.
+        columns: set = set()
+        for index in table.to_lance().list_indices():
+            columns.update(index.get("fields") or [])
+        return columns
+
+    def maintain_indexes(self) -> Dict[str, Any]:
+        """Background maintenance for the materials table (run by
+        `MaintenanceRunner`, never on a request path).
+
+        - BTREE scalar indexes on `user_id` and `content_hash`, so the
+          tenant prefilter in search_materials doesn't scan the whole
+          table.
+        - IVF-PQ index on `vector` once the table has `_ANN_MIN_ROWS`
+          rows; partitions scale with √rows.
+        - Afterwards, rows appended since the last build are folded in
+          incrementally by `compact_tables()` instead of rebuilding.
+        - Recounts rows per tenant for search_materials' exact-vs-ANN
+          choice.
+
+        If the indexes can't be listed the run fails instead of
+        rebuilding them blind.
+        """
+        if not self.is_warm or self.materials_table_name not in self.db.table_names():
+            return {"rows": 0}
+        table = self._open_lance_table(self.materials_table_name)
+        rows = int(table.count_rows())
+        indexed = self._list_indexed_columns(table)
+        actions: List[str] = []
+
+        for column in ("user_id", "content_hash"):
+            if column not in indexed and column in table.schema.names:
+                table.create_scalar_index(column, replace=True)
+                actions.append(f"scalar:{column}")
+
+        if "vector" not in indexed:
+            if rows >= _ANN_MIN_ROWS:
+                dim = int(self.model.get_sentence_embedding_dimension() or 0)
+                table.create_index(
+                    metric="l2",
+                    vector_column_name="vector",
+                    num_partitions=max(16, min(4096, int(math.sqrt(rows)))),
+                    num_sub_vectors=max(1, dim // 8) if dim % 8 == 0 else 1,
+                    replace=True,
+                )
+                actions.append("ivf_pq:vector")
+
+        self._materials_indexed = self._list_indexed_columns(table)
+        try:
+            self._tenant_rows = self._count_tenant_rows(table)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Counting materials rows per tenant failed: %s", exc)
+        if actions:
+            logger.info("Materials index maintenance (%d rows): %s", rows, ", ".join(actions))
+        return {"rows": rows, "indexed": sorted(self._materials_indexed), "actions": actions}
+
+    @staticmethod
+    def _unindexed_rows(table: LanceTable) -> int:
+        dataset = table.to_lance()
+        return max(
+            (int(dataset.stats.index_stats(index["name"]).get("num_unindexed_rows") or 0) for index in dataset.list_indices()),
+            default=0,
+        )
+
+    def compact_tables(self) -> Dict[str, Any]:
+        """Background compaction for the append-heavy tables (run by
+        `MaintenanceRunner`). Per table, on thresholds:
+
+        - merge small fragments once there are `_COMPACT_MIN_FRAGMENTS`
+          (indexes are remapped by the compaction itself);
+        - drop manifest versions older than `_VERSION_RETENTION_S` once
+          there are `_CLEANUP_MIN_VERSIONS`;
+        - fold rows the indexes haven't seen yet into them.
+        """
+        if not self.is_warm:
+            return {"tables": {}}
+        report: Dict[str, Any] = {}
+        for name in (self.materials_table_name, self.templates_table_name):
+            if name in self.db.table_names():
+                report[name] = self._compact_table(self._open_lance_table(name))
+        return {"tables": report, "totals": dict(self._compaction_totals)}
+
+    def _compact_table(self, table: LanceTable) -> Dict[str, Any]:
+        started = time.perf_counter()
+        fragments = len(table.to_lance().get_fragments())
+        versions = len(table.list_versions())
+        result: Dict[str, Any] = {"fragments": fragments, "versions": versions}
+
+        if fragments >= _COMPACT_MIN_FRAGMENTS:
+            metrics = table.compact_files(target_rows_per_fragment=_COMPACT_TARGET_ROWS)
+            removed = int(getattr(metrics, "fragments_removed", 0))
+            result["fragments_removed"] = removed
+            result["fragments_added"] = int(getattr(metrics, "fragments_added", 0))
+            self._compaction_totals["fragments_removed"] += removed
+            # Compaction itself adds a version; count it in the check below.
+            versions += 1
+
+        if versions >= _CLEANUP_MIN_VERSIONS:
+            stats = table.cleanup_old_versions(older_than=timedelta(seconds=_VERSION_RETENTION_S))
+            reclaimed = int(getattr(stats, "bytes_removed", 0))
+            dropped = int(getattr(stats, "old_versions", 0))
+            result["bytes_reclaimed"] = reclaimed
+            result["versions_removed"] = dropped
+            self._compaction_totals["bytes_reclaimed"] += reclaimed
+            self._compaction_totals["versions_removed"] += dropped
+
+        if self._unindexed_rows(table) > 0:
+            table.to_lance().optimize.optimize_indices()
+            result["indices_optimized"] = True
+
+        result["fragments_after"] = len(table.to_lance().get_fragments())
+        result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        if result["fragments_after"] != fragments or result.get("versions_removed"):
+            logger.info("Compacted %s: %s", table.name, result)
+        return result
+
     def save_task_templates(self, templates: List[TaskTemplate]) -> None:
         """
         Saves extracted task templates.
@@ -226,39 +705,53 @@ class VectorDBService:
         if not templates:
             return
         try:
-            embeddings = self.model.encode([t.template for t in templates])
-            data = []
-            for i, template in enumerate(templates):
-                record = template.model_dump()
-                record["vector"] = embeddings[i].tolist()
-                data.append(record)
-
-            df = pd.DataFrame(data)
+            table: Optional[LanceTable] = None
             if self.templates_table_name in self.db.table_names():
-                table = self.db.open_table(self.templates_table_name)
-                table.add(data=df)
+                table = self._open_lance_table(self.templates_table_name)
+                vector_type = table.schema.field("vector").type.value_type
+            else:
+                vector_type = _configured_vector_type()
+            embeddings = self.embedder.encode_many_sync([t.template for t in templates])
+            data = pa.Table.from_pylist(
+                [t.model_dump(exclude={"vector"}) for t in templates]
+            ).append_column("vector", vector_column(embeddings, vector_type))
+
+            if table is not None:
+                table.add(data=data)
             else:
-                self.db.create_table(self.templates_table_name, data=df)
+                table = cast(LanceTable, self.db.create_table(self.templates_table_name, data=data))
+            for template in templates:
+                if template.id is not None:
+                    self._template_cache.invalidate(template.id)
+            try:
+                if "id" not in self._list_indexed_columns(table):
+                    table.create_scalar_index("id", replace=True)
+            except Exception as exc:  # noqa: BLE001
+                # Lookups still work (filtered scan), just slower.
+                logger.warning("Scalar index on task_templates.id failed: %s", exc)
         except Exception as e:
             print(f"Error saving templates: {e}")
             raise e
 
-    def search_task_templates(self, query: str, limit: int = 20) -> List[TaskTemplate]:
+    def search_task_templates(self, query: str, limit: int = 20) -> List[TemplateHit]:
         """
-        Searches for stored task templates similar to the query.
+        Searches for stored task templates similar to the query. Rows
+        come back as TemplateHit; call `to_model()` where a TaskTemplate
+        is needed.
         """
         try:
             if self.templates_table_name not in self.db.table_names():
                 return []
-            query_embedding = self.model.encode(query)
+            query_embedding = self.embedder.encode_sync(query)
             table = self.db.open_table(self.templates_table_name)
+            columns = [name for name in table.schema.names if name != "vector"]
             results = (
                 table.search(query_embedding.tolist())
+                .select(columns)
                 .limit(limit)
-                .to_pandas()
+                .to_arrow()
             )
-            records = results.to_dict("records")
-            return [TaskTemplate(**rec) for rec in records]
+            return template_hits(results)
         except Exception as e:
             print(f"Error searching templates: {e}")
             return []
@@ -267,16 +760,22 @@ class VectorDBService:
         """
         Returns a template by its id.
         """
+        cached = self._template_cache.get(template_id)
+        if cached is not None:
+            return cached
         try:
             if self.templates_table_name not in self.db.table_names():
                 return None
             table = self.db.open_table(self.templates_table_name)
-            df = table.to_pandas()
-            result = df[df["id"] == template_id]
-            if result.empty:
+            # Point query served by the scalar index on `id` instead of
+            # materialising the whole table.
+            quoted = template_id.replace("'", "''")
+            rows = table.search().where(f"id = '{quoted}'", prefilter=True).limit(1).to_list()
+            if not rows:
                 return None
-            record = result.to_dict("records")[0]
-            return TaskTemplate(**record)
+            template = TaskTemplate(**rows[0])
+            self._template_cache.put(template_id, template)
+            return template
         except Exception as e:
             print(f"Error fetching template by id: {e}")
             raise e
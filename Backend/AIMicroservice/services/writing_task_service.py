@@ -1,9 +1,11 @@
 import json
 import uuid
 import logging
-from typing import Union, Any, Dict, Type, TypeVar, Optional
+from typing import Union, Any, Awaitable, Callable, Dict, Tuple, Type, TypeVar, Optional
+
 from services.vector_db_service import VectorDBService
 from services.ai_service import AI_Service
+from utils.json_stream import salvage_object
 from utils.user_context import UserContext
 from dotenv import load_dotenv
 from constants.prompts import (
@@ -39,10 +41,10 @@ class WritingTaskService:
     async def generate_writing_multiple_choice_task(
         self, language: str, level: str, user_context: Optional[UserContext] = None,
         topic: Optional[str] = None, keywords: Optional[list[str]] = None,
-        weaknesses: Optional[list[str]] = None,
+        weaknesses: Optional[list[str]] = None, ui_locale_label: Optional[str] = None,
     ) -> MultipleChoiceTask:
         effective_level = "A1" if level.upper() == "A0" else level.upper()
-        level_context: Union[SpecificSkillContext, FullLevelContext, None] = self.vector_db_service.get_level_context(
+        level_context: Union[SpecificSkillContext, FullLevelContext, None] = await self.vector_db_service.get_level_context(
             effective_level, "writing"
         )
         if not level_context:
@@ -56,7 +58,7 @@ class WritingTaskService:
         prompt = writing_multiple_choice_task_prompt(
             language, level, level_context.model_dump(),
             topic=topic, keywords=keywords, weaknesses=weaknesses, seed=seed,
-            ui_locale_label=user_context.ui_locale_label if user_context else None,
+            ui_locale_label=user_context.ui_locale_label if user_context else ui_locale_label,
         )
         response = await self.ai_service.get_ai_response(
             prompt, user_context=user_context, temperature=0.8
@@ -82,10 +84,10 @@ class WritingTaskService:
     async def generate_writing_fill_in_the_blank_task(
         self, language: str, level: str, user_context: Optional[UserContext] = None,
         topic: Optional[str] = None, keywords: Optional[list[str]] = None,
-        weaknesses: Optional[list[str]] = None,
+        weaknesses: Optional[list[str]] = None, ui_locale_label: Optional[str] = None,
     ) -> FillInTheBlankTask:
         effective_level = "A1" if level.upper() == "A0" else level.upper()
-        level_context: Union[SpecificSkillContext, FullLevelContext, None] = self.vector_db_service.get_level_context(
+        level_context: Union[SpecificSkillContext, FullLevelContext, None] = await self.vector_db_service.get_level_context(
             effective_level, "writing"
         )
 
@@ -100,7 +102,7 @@ class WritingTaskService:
         prompt = writing_fill_in_the_blank_task_prompt(
             language, level, level_context.model_dump(),
             topic=topic, keywords=keywords, weaknesses=weaknesses, seed=seed,
-            ui_locale_label=user_context.ui_locale_label if user_context else None,
+            ui_locale_label=user_context.ui_locale_label if user_context else ui_locale_label,
         )
         response = await self.ai_service.get_ai_response(
             prompt, user_context=user_context, temperature=0.8
@@ -109,6 +111,19 @@ class WritingTaskService:
 
         return self._finalize_task_generation(json_response, "fill_in_the_blank", FillInTheBlankTask)
 
+    async def generate_pooled_task(
+        self, key: Tuple[str, str, str, str], topic: str
+    ) -> Union[MultipleChoiceTask, FillInTheBlankTask]:
+        """TaskPool generator: no user context, so platform credentials."""
+        language, level, task_type, ui_locale_label = key
+        if task_type == "multiple_choice":
+            return await self.generate_writing_multiple_choice_task(
+                language, level, topic=topic, ui_locale_label=ui_locale_label
+            )
+        return await self.generate_writing_fill_in_the_blank_task(
+            language, level, topic=topic, ui_locale_label=ui_locale_label
+        )
+
     async def generate_essay_task(
         self,
         language: str,
@@ -125,7 +140,7 @@ class WritingTaskService:
         """
         effective_level = "A1" if level.upper() == "A0" else level.upper()
         level_context: Union[SpecificSkillContext, FullLevelContext, None] = (
-            self.vector_db_service.get_level_context(effective_level, "writing")
+            await self.vector_db_service.get_level_context(effective_level, "writing")
         )
         if not level_context:
             raise ValueError(f"Invalid level: {effective_level}")
@@ -155,11 +170,13 @@ class WritingTaskService:
         essay: str,
         word_count_target: int,
         user_context: Optional[UserContext] = None,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
     ) -> EssayEvaluation:
-        """Grade a learner-submitted essay 0-100 with structured feedback."""
+        """Grade a learner-submitted essay 0-100 with structured feedback.
+        `on_delta` receives the raw model output as it streams in."""
         effective_level = "A1" if level.upper() == "A0" else level.upper()
         level_context: Union[SpecificSkillContext, FullLevelContext, None] = (
-            self.vector_db_service.get_level_context(effective_level, "writing")
+            await self.vector_db_service.get_level_context(effective_level, "writing")
         )
         if not level_context:
             raise ValueError(f"Invalid level: {effective_level}")
@@ -175,7 +192,10 @@ class WritingTaskService:
         )
         # Low temperature — grading should be consistent, not creative.
         response = await self.ai_service.get_ai_response(
-            prompt, user_context=user_context, temperature=0.2
+            prompt,
+            user_context=user_context,
+            temperature=0.2,
+            on_delta=on_delta,
         )
         json_response = await self._process_ai_response_and_validate(response)
 
@@ -330,6 +350,16 @@ class WritingTaskService:
             json_data = json.loads(response_str)
             return json_data  # type: ignore
         except json.JSONDecodeError as e:
+            # Truncated / broken tail: keep every top-level field that
+            # did close. Model validation downstream decides whether
+            # what survived is enough (e.g. an essay grade that lost
+            # only its trailing `suggestions` list still validates).
+            salvaged = salvage_object(response_str)
+            if salvaged:
+                logger.warning(
+                    f"AI response JSON malformed ({e}); salvaged fields: {sorted(salvaged)}"
+                )
+                return salvaged
             logger.error(f"Failed to parse AI response JSON: {e}")
             raise_with_code(
                 AI_RESPONSE_PARSE_FAILED,
@@ -96,20 +96,9 @@ def client() -> Iterable[TestClient]:
         "services.user_service.UserService.get_default_ai_token",
         new=AsyncMock(return_value={"aiProviderId": "google-geminis", "token": None}),
     ), patch(
-        "services.listening_task_service.os.makedirs",
-    ), patch(
-        "services.listening_task_service.aiofiles.open",
-    ) as listen_aio, patch(
-        "services.speaking_service.os.makedirs",
-    ), patch(
-        "services.speaking_service.aiofiles.open",
-    ) as speak_aio:
-        for ao in (listen_aio, speak_aio):
-            ctx = MagicMock()
-            ctx.__aenter__ = AsyncMock(return_value=AsyncMock())
-            ctx.__aexit__ = AsyncMock(return_value=None)
-            ao.return_value = ctx
-
+        "services.asset_store.AssetStore.put",
+        return_value="audio/ab/ab.mp3",
+    ):
         from main import app
 
         yield TestClient(app)
@@ -288,8 +277,9 @@ class TestListeningFlows:
             "services.tts_service.TTSService.synthesize",
             new=MagicMock(return_value=b"fake-mp3"),
         ), patch(
-            "services.tts_service.TTSService.synthesize_multispeaker",
-            new=MagicMock(return_value=(b"fake-mp3", [])),
+            # Dialogue turns; monologues go through `synthesize` above.
+            "services.tts_service.TTSService._synthesize_clip",
+            new=MagicMock(return_value=b"fake-mp3"),
         ):
             yield
 
@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, List
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+from litellm.exceptions import AuthenticationError, Timeout
+
+from services.ai_service import AI_Service
+
+
+def _chunk(text: str) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class _FakeStream:
+    def __init__(self, parts: List[str]) -> None:
+        self._parts = parts
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._gen()
+
+    async def _gen(self) -> AsyncIterator[Any]:
+        for part in self._parts:
+            yield _chunk(part)
+
+
+@pytest.fixture
+def ai_service() -> AI_Service:
+    return AI_Service()
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_deltas_in_order(ai_service: AI_Service) -> None:
+    fake = AsyncMock(return_value=_FakeStream(["", '{"a": ', "1}"]))
+    with patch("services.ai_service.acompletion", fake), \
+            patch("services.ai_service.get_shared_cache_backend", return_value=None):
+        deltas = [d async for d in ai_service.get_ai_response_stream("prompt", temperature=0.9)]
+
+    assert deltas == ['{"a": ', "1}"]
+    assert fake.await_args is not None
+    assert fake.await_args.kwargs["stream"] is True
+
+
+@pytest.mark.asyncio
+async def test_get_ai_response_on_delta_returns_full_text(ai_service: AI_Service) -> None:
+    seen: List[str] = []
+
+    async def on_delta(text: str) -> None:
+        seen.append(text)
+
+    fake = AsyncMock(return_value=_FakeStream(["hel", "lo"]))
+    with patch("services.ai_service.acompletion", fake), \
+            patch("services.ai_service.get_shared_cache_backend", return_value=None):
+        result = await ai_service.get_ai_response(
+            "prompt-on-delta", temperature=0.9, on_delta=on_delta
+        )
+
+    assert result == "hello"
+    assert seen == ["hel", "lo"]
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_before_first_delta(ai_service: AI_Service) -> None:
+    fake = AsyncMock(side_effect=[Timeout("slow", model="m", llm_provider="p"), _FakeStream(["ok"])])
+    with patch("services.ai_service.acompletion", fake), \
+            patch("services.ai_service.get_shared_cache_backend", return_value=None), \
+            patch("services.ai_service.asyncio.sleep", AsyncMock()):
+        deltas = [d async for d in ai_service.get_ai_response_stream("prompt-retry", temperature=0.9)]
+
+    assert deltas == ["ok"]
+    assert fake.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_maps_auth_errors(ai_service: AI_Service) -> None:
+    fake = AsyncMock(side_effect=AuthenticationError("bad key", llm_provider="p", model="m"))
+    with patch("services.ai_service.acompletion", fake), \
+            patch("services.ai_service.get_shared_cache_backend", return_value=None):
+        with pytest.raises(HTTPException) as exc_info:
+            async for _ in ai_service.get_ai_response_stream("prompt-auth", temperature=0.9):
+                pass
+
+    assert exc_info.value.status_code == 401
+    assert fake.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_low_temperature_stream_is_cached(ai_service: AI_Service) -> None:
+    fake = AsyncMock(return_value=_FakeStream(["cached ", "text"]))
+    with patch("services.ai_service.acompletion", fake), \
+            patch("services.ai_service.get_shared_cache_backend", return_value=None):
+        first = [d async for d in ai_service.get_ai_response_stream("prompt-cache", temperature=0.2)]
+        second = [d async for d in ai_service.get_ai_response_stream("prompt-cache", temperature=0.2)]
+
+    assert "".join(first) == "cached text"
+    # Cache hit comes back as a single delta, no second provider call.
+    assert second == ["cached text"]
+    assert fake.await_count == 1
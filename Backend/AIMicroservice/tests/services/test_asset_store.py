@@ -0,0 +1,53 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from services.asset_store import AssetStore
+
+
+def _store(tmp_path: Path, ttl_s: float = 3600.0) -> AssetStore:
+    return AssetStore(
+        root=str(tmp_path / "static"),
+        index_path=str(tmp_path / "index.sqlite3"),
+        ttl_s={"audio": ttl_s, "images": ttl_s},
+        public_base_url="http://host",
+    )
+
+
+@pytest.mark.asyncio
+async def test_identical_bytes_are_stored_once_under_their_digest(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    digest = hashlib.sha256(b"clip").hexdigest()
+
+    first = await store.save("audio", b"clip", "mp3")
+    second = await store.save("audio", b"clip", "mp3")
+
+    assert first == second == f"http://host/static/audio/{digest[:2]}/{digest}.mp3"
+    assert (tmp_path / "static" / "audio" / digest[:2] / f"{digest}.mp3").read_bytes() == b"clip"
+    assert store.stats() == {"saved": 1, "deduplicated": 1, "swept": 0}
+
+
+def test_sweep_removes_only_expired_assets_and_their_aliases(tmp_path: Path) -> None:
+    store = _store(tmp_path, ttl_s=0)
+    old = store.put("audio", b"old", "mp3", alias="stream/a")
+    store.ttl_s["images"] = 3600
+    kept = store.put("images", b"new", "png")
+
+    assert store.sweep() == {"removed": 1, "assets": 1, "bytes": 3}
+    assert not (tmp_path / "static" / old).exists()
+    assert (tmp_path / "static" / kept).exists()
+    assert store.resolve("stream/a") is None
+
+
+def test_new_index_adopts_files_already_on_disk(tmp_path: Path) -> None:
+    legacy = tmp_path / "static" / "audio" / "legacy.mp3"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(b"x")
+    stale = time.time() - 7200
+    os.utime(legacy, (stale, stale))
+
+    assert _store(tmp_path).sweep()["removed"] == 1
+    assert not legacy.exists()
@@ -0,0 +1,57 @@
+import asyncio
+from concurrent.futures import Future
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from services.asset_store import AssetStore
+from services.audio_streams import AudioStreamStore
+
+
+def _store(tmp_path: Path) -> AudioStreamStore:
+    return AudioStreamStore(AssetStore(root=str(tmp_path), index_path=str(tmp_path / "index.sqlite3")))
+
+
+@pytest.mark.asyncio
+async def test_reader_gets_turns_in_order_while_later_turns_run(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    first: Future = Future()
+    second: Future = Future()
+    stream_id = store.open([first, second])
+    stream = store.get(stream_id)
+    assert stream is not None
+
+    # The second turn finishing first must not reorder the audio.
+    second.set_result(b"-two")
+    first.set_result(b"one")
+    await stream.wait_started()
+    received: List[bytes] = [chunk async for chunk in stream.iter_bytes()]
+
+    assert b"".join(received) == b"one-two"
+    await store.shutdown()
+    path = store.file_path(stream_id)
+    assert path is not None
+    assert Path(path).read_bytes() == b"one-two"
+
+
+@pytest.mark.asyncio
+async def test_first_turn_failure_ends_stream_without_audio(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    clip: Future = Future()
+    later: Future = Future()
+    stream = store.get(store.open([clip, later]))
+    assert stream is not None
+
+    clip.set_exception(RuntimeError("tts down"))
+    await asyncio.wait_for(stream.wait_started(), timeout=1)
+
+    assert stream.chunks == []
+    assert stream.error == "tts down"
+    assert later.cancelled()
+
+
+def test_file_lookup_rejects_non_stream_ids(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    assert store.file_path("../../etc/passwd") is None
+    assert store.file_path("0" * 32) is None
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from typing import Any, List
+
+import numpy as np
+import pytest
+
+from services.embedding_engine import EmbeddingEngine
+
+
+class _FakeModel:
+    """Encodes each text as [len(text), index-in-batch] and records the
+    size of every batch it was handed."""
+
+    def __init__(self) -> None:
+        self.batches: List[int] = []
+        self.lock = threading.Lock()
+
+    def encode(self, texts: List[str], **_: Any) -> np.ndarray:
+        with self.lock:
+            self.batches.append(len(texts))
+        return np.array([[float(len(t)), float(i)] for i, t in enumerate(texts)], dtype=np.float32)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_single_encodes_are_coalesced() -> None:
+    model = _FakeModel()
+    engine = EmbeddingEngine(lambda: model, max_batch_size=16, max_wait_ms=50)
+    try:
+        texts = ["a" * (i + 1) for i in range(8)]
+        vectors = await asyncio.gather(*(engine.encode(t) for t in texts))
+    finally:
+        engine.stop()
+
+    # Every caller gets its own row back...
+    assert [int(v[0]) for v in vectors] == [len(t) for t in texts]
+    # ...but the model saw far fewer calls than requests.
+    assert len(model.batches) < len(texts)
+    assert sum(model.batches) == len(texts)
+
+
+@pytest.mark.asyncio
+async def test_batches_respect_max_batch_size() -> None:
+    model = _FakeModel()
+    engine = EmbeddingEngine(lambda: model, max_batch_size=3, max_wait_ms=50)
+    try:
+        await asyncio.gather(*(engine.encode(str(i)) for i in range(7)))
+    finally:
+        engine.stop()
+
+    assert max(model.batches) <= 3
+    assert sum(model.batches) == 7
+
+
+def test_encode_many_sync_returns_one_row_per_text() -> None:
+    model = _FakeModel()
+    engine = EmbeddingEngine(lambda: model, max_batch_size=4, max_wait_ms=0)
+    try:
+        # Larger than max_batch_size: handed to encode() in one go,
+        # which does its own internal batching.
+        out = engine.encode_many_sync(["x", "yy", "zzz", "w", "vv", "u"])
+    finally:
+        engine.stop()
+
+    assert out.shape == (6, 2)
+    assert list(out[:, 0]) == [1.0, 2.0, 3.0, 1.0, 2.0, 1.0]
+
+
+def test_encode_errors_propagate_and_are_counted() -> None:
+    class _Broken:
+        def encode(self, texts: List[str], **_: Any) -> np.ndarray:
+            raise RuntimeError("model exploded")
+
+    engine = EmbeddingEngine(lambda: _Broken(), max_wait_ms=0)
+    try:
+        with pytest.raises(RuntimeError, match="model exploded"):
+            engine.encode_sync("hello")
+        assert engine.stats()["errors_total"] == 1
+    finally:
+        engine.stop()
+
+
+def test_stats_report_batches_and_latency() -> None:
+    model = _FakeModel()
+    engine = EmbeddingEngine(lambda: model, max_wait_ms=0)
+    try:
+        engine.encode_sync("one")
+        engine.encode_many_sync(["two", "three"])
+        stats = engine.stats()
+    finally:
+        engine.stop()
+
+    assert stats["requests_total"] == 2
+    assert stats["texts_total"] == 3
+    assert stats["batches_total"] == 2
+    assert stats["queue_depth"] == 0
+    assert stats["last_encode_ms"] >= 0.0
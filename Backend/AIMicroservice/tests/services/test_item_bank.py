@@ -0,0 +1,112 @@
+from typing import List, Optional, Tuple
+
+import pytest
+
+from models.dtos.task_dto import FillInTheBlankTask
+from services.item_bank import (
+    LEVEL_DIFFICULTY,
+    PRIOR_ESTIMATE,
+    BankItem,
+    ItemBank,
+    ItemStore,
+    estimate_ability,
+    item_information,
+    level_for,
+)
+from utils.background import get_background_dispatcher
+
+
+class _MemoryStore(ItemStore):
+    def __init__(self, items: List[BankItem]) -> None:
+        self.items = items
+        self.loads = 0
+        self.added: List[Tuple[str, str, str, str]] = []
+        self.recorded: List[Tuple[str, float, bool, bool]] = []
+
+    async def load(self, language: str, ui_locale: str) -> List[BankItem]:
+        self.loads += 1
+        return list(self.items)
+
+    async def add(self, language: str, ui_locale: str, level: str, item: BankItem) -> None:
+        self.added.append((language, ui_locale, level, item.id))
+
+    async def record(self, item_id: str, delta: float, correct: bool, retire: bool) -> None:
+        self.recorded.append((item_id, delta, correct, retire))
+
+
+def _item(item_id: str, difficulty: float) -> BankItem:
+    return BankItem(
+        id=item_id, task_type="fill_in_the_blank", payload={"correct_answer": ["went"]}, difficulty=difficulty
+    )
+
+
+def _id(item: Optional[BankItem]) -> str:
+    assert item is not None
+    return item.id
+
+
+def test_ability_estimate_moves_with_answers_and_narrows() -> None:
+    prior, prior_sd = PRIOR_ESTIMATE
+    up, up_sd = estimate_ability([(1.0, 0.0, True), (1.5, 0.0, True)])
+    down, _ = estimate_ability([(-2.0, 0.0, False)])
+
+    assert up > prior > down
+    assert up_sd < prior_sd
+    assert level_for(LEVEL_DIFFICULTY["B2"] + 0.2) == "B2"
+
+
+def test_information_peaks_at_item_difficulty() -> None:
+    assert item_information(0.5, 0.5) > item_information(2.0, 0.5)
+    assert item_information(0.5, 0.5) > item_information(-1.0, 0.5)
+
+
+@pytest.mark.asyncio
+async def test_select_picks_most_informative_unseen_item() -> None:
+    store = _MemoryStore([_item("near", -0.4), _item("close", -0.9), _item("far", 2.0)])
+    bank = ItemBank(store, max_gap=0.75, top_k=1)
+
+    assert _id(await bank.select("English", "English", -0.5)) == "near"
+    assert _id(await bank.select("English", "English", -0.5, exclude={"near"})) == "close"
+    assert await bank.select("English", "English", -0.5, exclude={"near", "close"}) is None
+    assert store.loads == 1
+    assert bank.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unexpected_correct_answer_makes_item_easier() -> None:
+    store = _MemoryStore([_item("hard", 1.5)])
+    bank = ItemBank(store)
+    await bank.select("English", "English", -1.5)
+
+    response = bank.record_answer("English", "English", "hard", " Went", ability=-1.5)
+    await get_background_dispatcher().drain()
+
+    assert response == (1.5, 0.0, True)
+    item_id, delta, correct, retire = store.recorded[0]
+    assert (item_id, correct, retire) == ("hard", True, False)
+    assert delta < 0
+    assert bank.record_answer("English", "English", "unknown", "went", ability=0.0) is None
+
+
+def test_answers_are_scored_against_the_banked_payload() -> None:
+    fill = _item("fill", 0.0)
+    choice = BankItem(
+        id="mc", task_type="multiple_choice", payload={"options": ["a", "b"], "correct_answer": "a"}, difficulty=0.0
+    )
+
+    assert fill.is_correct("wnet")
+    assert not fill.is_correct("goes")
+    assert choice.is_correct("a")
+    assert not choice.is_correct("b")
+
+
+@pytest.mark.asyncio
+async def test_items_added_between_loads_survive_reload() -> None:
+    task = FillInTheBlankTask(id="fresh", type="fill_in_the_blank", question="She ___ home.", correct_answer=["went"])
+    store = _MemoryStore([])
+    bank = ItemBank(store, reload_s=0)
+    item = await bank.add("English", "English", task, "B1")
+
+    assert item.difficulty == LEVEL_DIFFICULTY["B1"]
+    assert store.added == [("English", "English", "B1", "fresh")]
+    assert _id(await bank.select("English", "English", LEVEL_DIFFICULTY["B1"])) == "fresh"
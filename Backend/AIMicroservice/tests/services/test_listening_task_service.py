@@ -1,4 +1,7 @@
 import json
+from concurrent.futures import Future
+from typing import List, Tuple
+
 import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 
@@ -30,20 +33,27 @@ def listening_service(mock_ai_service: MagicMock) -> ListeningTaskService:
 
 
 def _patch_audio_pipeline(audio_bytes: bytes = b"audio", speakers=None):
-    """Common patches: TTS returns canned bytes + speakers, file IO
-    is mocked out so tests don't touch the disk."""
+    """Common patches: TTS hands back one finished clip + speakers,
+    and the stream store is mocked out so tests don't touch the disk.
+    The second patch yields the store mock."""
     speakers = speakers or []
 
-    def synth(*_args, **_kwargs):
-        return audio_bytes, speakers
+    def clips(*_args: object, **_kwargs: object) -> Tuple[List[Future[bytes]], List[str]]:
+        clip: Future[bytes] = Future()
+        clip.set_result(audio_bytes)
+        return [clip], speakers
 
+    store = MagicMock()
+    store.open.return_value = "0" * 32
     return (
         patch(
-            "services.listening_task_service.tts_service.synthesize_multispeaker",
-            side_effect=synth,
+            "services.listening_task_service.tts_service.multispeaker_clips",
+            side_effect=clips,
+        ),
+        patch(
+            "services.listening_task_service.get_audio_stream_store",
+            return_value=store,
         ),
-        patch("services.listening_task_service.os.makedirs"),
-        patch("services.listening_task_service.aiofiles.open"),
     )
 
 
@@ -180,17 +190,13 @@ async def test_create_listening_task_default_mix(
             ],
         }
     )
-    p1, p2, p3 = _patch_audio_pipeline()
-    with p1, p2 as _mk, p3 as ao:
-        ctx = MagicMock()
-        ctx.__aenter__.return_value = AsyncMock()
-        ctx.__aexit__.return_value = None
-        ao.return_value = ctx
-
+    p1, p2 = _patch_audio_pipeline()
+    with p1, p2:
         request = ListeningTaskRequest(language="English", level="A2")
         result = await listening_service.create_listening_task(request)
 
     assert isinstance(result, ListeningTaskResponse)
+    assert result.audioUrl.endswith(f"/static/audio/stream/{'0' * 32}.mp3")
     assert isinstance(result.questions[0], MultipleChoiceQuestion)
     assert isinstance(result.questions[1], FillInTheBlankQuestion)
     assert result.speakers == []  # monologue
@@ -214,13 +220,8 @@ async def test_create_listening_task_dictation_mode(
             ],
         }
     )
-    p1, p2, p3 = _patch_audio_pipeline()
-    with p1, p2, p3 as ao:
-        ctx = MagicMock()
-        ctx.__aenter__.return_value = AsyncMock()
-        ctx.__aexit__.return_value = None
-        ao.return_value = ctx
-
+    p1, p2 = _patch_audio_pipeline()
+    with p1, p2:
         request = ListeningTaskRequest(
             language="English", level="A1", question_types=["dictation"]
         )
@@ -269,16 +270,11 @@ async def test_create_listening_task_multi_speaker_synth(
             ],
         }
     )
-    p1, p2, p3 = _patch_audio_pipeline(
+    p1, p2 = _patch_audio_pipeline(
         audio_bytes=b"multi-voice-mp3",
         speakers=["Speaker 1", "Speaker 2"],
     )
-    with p1, p2, p3 as ao:
-        ctx = MagicMock()
-        ctx.__aenter__.return_value = AsyncMock()
-        ctx.__aexit__.return_value = None
-        ao.return_value = ctx
-
+    with p1, p2:
         request = ListeningTaskRequest(
             language="English",
             level="B2",
@@ -316,13 +312,8 @@ async def test_create_listening_task_drops_malformed_questions(
             ],
         }
     )
-    p1, p2, p3 = _patch_audio_pipeline()
-    with p1, p2, p3 as ao:
-        ctx = MagicMock()
-        ctx.__aenter__.return_value = AsyncMock()
-        ctx.__aexit__.return_value = None
-        ao.return_value = ctx
-
+    p1, p2 = _patch_audio_pipeline()
+    with p1, p2:
         request = ListeningTaskRequest(
             language="English",
             level="B1",
@@ -354,13 +345,8 @@ async def test_create_listening_task_unknown_types_fall_back(
             ],
         }
     )
-    p1, p2, p3 = _patch_audio_pipeline()
-    with p1, p2, p3 as ao:
-        ctx = MagicMock()
-        ctx.__aenter__.return_value = AsyncMock()
-        ctx.__aexit__.return_value = None
-        ao.return_value = ctx
-
+    p1, p2 = _patch_audio_pipeline()
+    with p1, p2:
         request = ListeningTaskRequest(
             language="English",
             level="A1",
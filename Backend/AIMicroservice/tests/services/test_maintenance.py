@@ -0,0 +1,37 @@
+import pytest
+
+from services.maintenance import MaintenanceRunner
+
+
+@pytest.mark.asyncio
+async def test_run_now_records_result_and_failures() -> None:
+    runner = MaintenanceRunner()
+    calls = []
+
+    def ok() -> dict:
+        calls.append(1)
+        return {"rows": len(calls)}
+
+    def broken() -> dict:
+        raise RuntimeError("index build failed")
+
+    runner.register("ok", ok, 60)
+    runner.register("broken", broken, 60)
+
+    assert await runner.run_now("ok") == {"rows": 1}
+    assert await runner.run_now("broken") is None
+    assert await runner.run_now("missing") is None
+
+    stats = runner.stats()
+    assert stats["ok"]["runs"] == 1 and stats["ok"]["failures"] == 0
+    assert stats["broken"]["failures"] == 1
+    assert stats["broken"]["last_error"] == "index build failed"
+
+
+@pytest.mark.asyncio
+async def test_stop_without_start_is_noop() -> None:
+    runner = MaintenanceRunner()
+    await runner.stop()
+    runner.start()
+    await runner.stop()
+    assert runner.stats() == {}
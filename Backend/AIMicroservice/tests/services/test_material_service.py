@@ -2,8 +2,8 @@ import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 from services.material_service import (
     MaterialService,
+    content_digest,
     _has_verbatim_overlap,
-    _word_ngrams,
     _dedupe_preserve_order,
 )
 from models.dtos.material_dtos import (
@@ -23,6 +23,7 @@ from models.dtos.material_dtos import (
     ClozePassageQuizQuestion,
 )
 from models.dtos.vector_db_dtos import MaterialChunk
+from utils.ngram_index import ngram_hashes
 
 
 @pytest.fixture
@@ -210,13 +211,12 @@ async def test_generate_quiz_no_materials(
 # ---------- Verbatim-check unit tests (Phase 1.6) -----------------
 
 
-def test_word_ngrams_below_n_is_empty() -> None:
-    assert _word_ngrams("only three words here", n=12) == set()
+def test_ngram_hashes_below_n_is_empty() -> None:
+    assert len(ngram_hashes("only three words here", n=12)) == 0
 
 
-def test_word_ngrams_lowercases_and_strips_punct() -> None:
-    grams = _word_ngrams("Hello, World!", n=2)
-    assert ("hello", "world") in grams
+def test_ngram_hashes_lowercase_and_strip_punct() -> None:
+    assert ngram_hashes("Hello, World!", n=2) == ngram_hashes("hello world", n=2)
 
 
 def test_verbatim_overlap_detects_12_word_match() -> None:
@@ -615,3 +615,207 @@ async def test_generate_questions_drops_matching_with_duplicate_lefts(
     q = result.quiz.questions[0]
     assert isinstance(q, MatchingQuizQuestion)
     assert q.question == "OK match."
+
+
+@pytest.mark.asyncio
+async def test_generate_quiz_keeps_questions_before_malformed_tail(
+    material_service: MaterialService,
+    mock_vector_db: MagicMock,
+    mock_ai_service: MagicMock,
+) -> None:
+    """A response cut off mid-item used to fail json.loads and lose
+    the whole exercise. Items are now validated one by one, so the
+    complete ones survive."""
+    mock_vector_db.search_materials.return_value = [
+        MaterialChunk(text="x", source="doc", chunk_index=0, vector=[0.1])
+    ]
+    mock_ai_service.get_ai_response.side_effect = [
+        '{"questions": ['
+        '{"type":"multiple_choice","question":"Q1","options":["A","B"],"correct_answer":"A"},'
+        '{"type":"multiple_choice","question":"Q2","options":["A","B"],"correct_answer":"B"},'
+        '{"type":"multiple_choice","question":"Q3","options":["A",'
+    ]
+    doc_map = DocumentMap(
+        exercises=[DocumentExercise(type="gap_fill_grammar", question_count=3)]
+    )
+
+    result = await material_service.generate_quiz(document_map=doc_map)
+    assert isinstance(result.quiz, QuizContent)
+    assert [q.question for q in result.quiz.questions] == ["Q1", "Q2"]
+
+
+@pytest.mark.asyncio
+async def test_generate_quiz_pushes_each_question_as_it_streams(
+    material_service: MaterialService,
+    mock_vector_db: MagicMock,
+    mock_ai_service: MagicMock,
+) -> None:
+    """With on_question set, each question is handed over while the
+    completion is still streaming, before get_ai_response returns."""
+    mock_vector_db.search_materials.return_value = [
+        MaterialChunk(text="x", source="doc", chunk_index=0, vector=[0.1])
+    ]
+    parts = [
+        '{"questions": [{"type":"multiple_choice","question":"Q1",',
+        '"options":["A","B"],"correct_answer":"A"}, ',
+        '{"type":"multiple_choice","question":"Q2","options":["A","B"],"correct_answer":"B"}]}',
+    ]
+    events: list = []
+
+    async def fake_stream(*_args: object, on_delta: object = None, **_kwargs: object) -> str:
+        for part in parts:
+            events.append("delta")
+            await on_delta(part)  # type: ignore[operator]
+        return "".join(parts)
+
+    mock_ai_service.get_ai_response.side_effect = fake_stream
+
+    async def on_question(index: int, question: object) -> None:
+        events.append(("question", index, getattr(question, "question")))
+
+    doc_map = DocumentMap(
+        exercises=[DocumentExercise(type="gap_fill_grammar", question_count=2)]
+    )
+    result = await material_service.generate_quiz(
+        document_map=doc_map, on_question=on_question
+    )
+
+    assert events == ["delta", "delta", ("question", 0, "Q1"), "delta", ("question", 0, "Q2")]
+    assert isinstance(result.quiz, QuizContent)
+    assert len(result.quiz.questions) == 2
+
+
+@pytest.mark.asyncio
+async def test_process_pdf_reuses_previously_ingested_content(
+    mock_vector_db: MagicMock,
+    mock_ai_service: MagicMock,
+) -> None:
+    """A PDF whose bytes were ingested before is neither parsed,
+    embedded nor classified again; the uploader just becomes an owner."""
+    from types import SimpleNamespace
+
+    from services.material_document_store import MaterialDocumentStore
+    from utils.user_context import UserContext
+
+    store = MagicMock()
+    store.get = AsyncMock(return_value=SimpleNamespace(
+        chunks_count=7,
+        analyzed_types=[{"type": "multiple_choice", "example": "ex"}],
+        document_map={"document_kind": "Workbook", "exercises": [{"type": "gap fill"}]},
+        source_owner_id="first-owner",
+        source_filename="murphy.pdf",
+    ))
+    store.claim = AsyncMock()
+    store.to_response = MaterialDocumentStore.to_response
+    ngram_store = MagicMock()
+    service = MaterialService(
+        mock_vector_db, mock_ai_service, ngram_index_store=ngram_store, document_store=store
+    )
+    user = UserContext(user_id="second-owner", user_email=None, user_role=None, authorization=None)
+
+    with patch("services.material_service.PdfReader") as MockPdfReader:
+        result = await service.process_pdf(b"%PDF-1.4 same bytes", "my-copy.pdf", user_context=user)
+
+    MockPdfReader.assert_not_called()
+    mock_vector_db.save_chunks.assert_not_called()
+    mock_ai_service.get_ai_response.assert_not_called()
+    store.claim.assert_awaited_once_with(
+        "second-owner", content_digest(b"%PDF-1.4 same bytes"), "my-copy.pdf"
+    )
+    ngram_store.copy.assert_called_once_with(
+        content_digest(b"%PDF-1.4 same bytes"), "second-owner", "my-copy.pdf"
+    )
+    assert result.filename == "my-copy.pdf"
+    assert result.chunks_count == 7
+    assert result.document_map is not None
+    assert result.document_map.exercises[0].type == "gap fill"
+
+
+@pytest.mark.asyncio
+async def test_process_pdf_does_not_record_content_without_a_document_map(
+    mock_vector_db: MagicMock,
+    mock_ai_service: MagicMock,
+) -> None:
+    """A failed classification isn't shared: the next uploader of the
+    same bytes must get a fresh analysis, not the empty one."""
+    from utils.user_context import UserContext
+
+    store = MagicMock()
+    store.get = AsyncMock(return_value=None)
+    store.save = AsyncMock()
+    ngram_store = MagicMock()
+    service = MaterialService(
+        mock_vector_db, mock_ai_service, ngram_index_store=ngram_store, document_store=store
+    )
+    mock_vector_db.save_chunks.return_value = True
+    mock_ai_service.get_ai_response.return_value = '{"types": []}'
+    user = UserContext(user_id="owner-1", user_email=None, user_role=None, authorization=None)
+
+    with patch("services.material_service.PdfReader") as MockPdfReader:
+        page = MagicMock()
+        page.extract_text.return_value = "Chunk of text."
+        MockPdfReader.return_value.pages = [page]
+        result = await service.process_pdf(b"%PDF-1.4 unclassified", "notes.pdf", user_context=user)
+
+    assert result.document_map is None
+    store.save.assert_not_awaited()
+    digest = content_digest(b"%PDF-1.4 unclassified")
+    assert ngram_store.save.call_args.args[-1] == digest
+
+
+@pytest.mark.asyncio
+async def test_generate_quiz_loads_stored_document_map_by_id(
+    mock_vector_db: MagicMock,
+    mock_ai_service: MagicMock,
+) -> None:
+    """Without a round-tripped map, Stage 1 reads the map stored at
+    upload instead of running the classification call."""
+    from utils.user_context import UserContext
+
+    store = MagicMock()
+    store.load_document_map = AsyncMock(return_value=DocumentMap(
+        document_kind="Murphy_Grammar",
+        exercises=[DocumentExercise(type="gap_fill_grammar", question_count=1)],
+    ))
+    store.owned_hashes = AsyncMock(return_value=[])
+    service = MaterialService(mock_vector_db, mock_ai_service, document_store=store)
+    mock_vector_db.search_materials.return_value = []
+    mock_ai_service.get_ai_response.side_effect = [
+        '{"questions": [{"question": "She ___ home.",'
+        ' "options": ["went", "go", "goes"],'
+        ' "correct_answer": "went",'
+        ' "type": "fill_in_the_blank",'
+        ' "context_text": null}]}',
+    ]
+    user = UserContext(user_id="owner-1", user_email=None, user_role=None, authorization=None)
+
+    with patch.object(service.user_service, "log_task_history", AsyncMock()):
+        result = await service.generate_quiz(user_context=user, document_id="doc-1")
+
+    store.load_document_map.assert_awaited_once_with("owner-1", "doc-1")
+    assert isinstance(result.quiz, QuizContent)
+    # Only the questions call; no classification round trip.
+    assert mock_ai_service.get_ai_response.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_quiz_without_document_id_rederives_map(
+    mock_vector_db: MagicMock,
+    mock_ai_service: MagicMock,
+) -> None:
+    """No `document_id` means no stored map is guessed at (the latest
+    one may be another file's); Stage 1 re-derives it instead."""
+    from utils.user_context import UserContext
+
+    store = MagicMock()
+    store.load_document_map = AsyncMock()
+    store.owned_hashes = AsyncMock(return_value=[])
+    service = MaterialService(mock_vector_db, mock_ai_service, document_store=store)
+    user = UserContext(user_id="owner-1", user_email=None, user_role=None, authorization=None)
+
+    with patch.object(service, "_classify_indexed_material", AsyncMock(return_value=None)) as classify:
+        result = await service.generate_quiz(user_context=user)
+
+    store.load_document_map.assert_not_awaited()
+    classify.assert_awaited_once()
+    assert result.quiz == "No relevant material found to generate tasks."
@@ -0,0 +1,73 @@
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+import pytest
+
+from services.outbox import Outbox, OutboxMessage
+
+
+@pytest.fixture
+def outbox(tmp_path: Path) -> Outbox:
+    return Outbox(str(tmp_path / "outbox.sqlite3"), batch_size=10, max_attempts=3)
+
+
+@pytest.mark.asyncio
+async def test_delivered_rows_are_removed(outbox: Outbox) -> None:
+    sent: List[OutboxMessage] = []
+
+    async def deliver(message: OutboxMessage) -> bool:
+        sent.append(message)
+        return True
+
+    await outbox.enqueue("/history", {"x-user-id": "u1"}, {"taskType": "writing", "score": 80})
+    await outbox.enqueue("/me/activity", {"x-user-id": "u1"}, {"xpGained": 50})
+
+    assert await outbox.drain_once(deliver) == 2
+    assert [m.path for m in sent] == ["/history", "/me/activity"]
+    assert sent[0].body == {"taskType": "writing", "score": 80}
+    assert sent[0].headers == {"x-user-id": "u1"}
+    assert outbox.stats()["pending"] == 0
+    assert outbox.stats()["delivered"] == 2
+    await outbox.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_rows_back_off_then_park(outbox: Outbox) -> None:
+    async def deliver(message: OutboxMessage) -> bool:
+        raise ConnectionError("user service down")
+
+    await outbox.enqueue("/history", {"x-user-id": "u1"}, {"taskType": "writing"})
+
+    assert await outbox.drain_once(deliver) == 1
+    # Rescheduled into the future, so not due again immediately.
+    assert await outbox.drain_once(deliver) == 0
+    assert outbox.stats()["pending"] == 1
+
+    # Skip the remaining backoff waits.
+    with patch("services.outbox._retry_delay", return_value=-1.0):
+        conn = outbox._connection()
+        conn.execute("UPDATE outbox SET next_attempt_at = 0")
+        conn.commit()
+        assert await outbox.drain_once(deliver) == 1
+        assert await outbox.drain_once(deliver) == 1
+        assert await outbox.drain_once(deliver) == 0
+
+    stats = outbox.stats()
+    assert stats["pending"] == 0
+    assert stats["parked"] == 1  # kept on disk, not dropped
+    await outbox.stop()
+
+
+@pytest.mark.asyncio
+async def test_claimed_rows_are_hidden_from_other_drainers(tmp_path: Path) -> None:
+    path = str(tmp_path / "shared.sqlite3")
+    first = Outbox(path)
+    second = Outbox(path)
+    await first.enqueue("/history", {"x-user-id": "u1"}, {"taskType": "writing"})
+
+    claimed = first._claim_sync(10)
+    assert len(claimed) == 1
+    assert second._claim_sync(10) == []
+    await first.stop()
+    await second.stop()
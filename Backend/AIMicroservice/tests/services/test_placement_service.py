@@ -115,3 +115,64 @@ async def test_evaluate_test_results(placement_service: PlacementService, mock_a
 async def test_evaluate_test_results_empty(placement_service: PlacementService) -> None:
     with pytest.raises(ValueError, match="cannot be empty"):
         await placement_service.evaluate_test_results([], "English")
+
+
+@pytest.mark.asyncio
+async def test_item_bank_serves_banked_item_and_scores_answer(
+    mock_ai_service: MagicMock, mock_vector_db: MagicMock
+) -> None:
+    from services.item_bank import PRIOR_ESTIMATE, ItemBank
+
+    bank = ItemBank(None, enabled=True)
+    banked = MultipleChoiceTask(
+        id="bank-1", type="multiple_choice", question="Q?", options=["a", "b"], correct_answer="a"
+    )
+    await bank.add("English", "English", banked, "A2")
+    service = PlacementService(mock_ai_service, mock_vector_db, item_bank=bank)
+    service.writing_task_service = AsyncMock()
+
+    task = await service.generate_placement_task("English")
+    assert task.id == "bank-1"
+    service.writing_task_service.generate_writing_multiple_choice_task.assert_not_called()
+
+    # Nothing unseen left near the new estimate: generate and bank it.
+    generated = FillInTheBlankTask(id="gen-1", type="fill_in_the_blank", question="__", correct_answer=["x"])
+    service.writing_task_service.generate_writing_fill_in_the_blank_task.return_value = generated
+    with patch("random.choice", return_value="fill_in_the_blank"):
+        follow_up = await service.generate_placement_task(
+            "English", previous_answer=PlacementAnswer(is_correct=False, task_id="bank-1", answer="a")
+        )
+
+    # Scored from the submitted answer, not the client's verdict.
+    assert follow_up.id == "gen-1"
+    sess = service._session_for(None)
+    assert sess.ability > PRIOR_ESTIMATE[0]
+    assert sess.served == {"bank-1", "gen-1"}
+    assert bank.stats()["items"] == 2
+
+
+@pytest.mark.asyncio
+async def test_item_bank_ignores_answers_without_a_served_task(
+    mock_ai_service: MagicMock, mock_vector_db: MagicMock
+) -> None:
+    from services.item_bank import PRIOR_ESTIMATE, ItemBank
+
+    bank = ItemBank(None, max_gap=10.0, enabled=True)
+    for item_id in ("bank-1", "bank-2", "bank-3"):
+        await bank.add(
+            "English",
+            "English",
+            MultipleChoiceTask(id=item_id, type="multiple_choice", question="Q?", options=["a", "b"], correct_answer="a"),
+            "A2",
+        )
+    service = PlacementService(mock_ai_service, mock_vector_db, item_bank=bank)
+
+    await service.generate_placement_task("English", previous_answer=PlacementAnswer(is_correct=True, answer="a"))
+    await service.generate_placement_task(
+        "English", previous_answer=PlacementAnswer(is_correct=True, task_id="never-served", answer="a")
+    )
+
+    sess = service._session_for(None)
+    assert sess.ability == PRIOR_ESTIMATE[0]
+    assert sess.responses == []
+    assert bank.stats()["answers"] == 0
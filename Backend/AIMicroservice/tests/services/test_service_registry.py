@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from typing import AsyncIterator, Callable, List, Tuple
+
+import httpx
+import pytest
+import pytest_asyncio
+
+import main
+from services import service_registry as registry_module
+from services.service_registry import ServiceRegistry
+from services.vector_db_service import VectorDBService
+
+
+async def _until(condition: Callable[[], bool], timeout_s: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout_s
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+@pytest_asyncio.fixture
+async def gated_registry(monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[Tuple[ServiceRegistry, threading.Event, List[int]]]:
+    """A fresh registry served by main.app whose warm-up blocks until
+    the returned event is set, without loading the encoder."""
+    release = threading.Event()
+    calls: List[int] = []
+
+    def gated_warm_up(self: VectorDBService) -> None:
+        calls.append(1)
+        release.wait(5)
+        self._warm = True
+
+    monkeypatch.setattr(VectorDBService, "warm_up", gated_warm_up)
+    monkeypatch.setattr(registry_module, "get_user_outbox", lambda: None)
+    registry = ServiceRegistry()
+    monkeypatch.setattr(main, "service_registry", registry)
+    try:
+        yield registry, release, calls
+    finally:
+        release.set()
+        await registry.stop()
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://ai")
+
+
+@pytest.mark.asyncio
+async def test_readiness_reports_starting_until_warm_up_finishes(
+    gated_registry: Tuple[ServiceRegistry, threading.Event, List[int]],
+) -> None:
+    registry, release, _ = gated_registry
+    await registry.start()
+
+    async with _client() as client:
+        starting = await client.get("/health/ready")
+        release.set()
+        await _until(lambda: registry.ready)
+        ready = await client.get("/api/health/ready")
+
+    assert starting.status_code == 503
+    assert starting.json()["status"] == "starting"
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ready"
+
+
+@pytest.mark.asyncio
+async def test_start_is_idempotent_and_stop_cancels_background_work(
+    gated_registry: Tuple[ServiceRegistry, threading.Event, List[int]],
+) -> None:
+    registry, _, calls = gated_registry
+    await registry.start()
+    await registry.start()
+    await _until(lambda: bool(calls))
+
+    await registry.stop()
+
+    assert calls == [1]
+    assert not registry.ready
+    assert registry.maintenance._task is None
+
+
+@pytest.mark.asyncio
+async def test_internal_metrics_requires_the_internal_key(
+    gated_registry: Tuple[ServiceRegistry, threading.Event, List[int]], monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("INTERNAL_SERVICE_KEY", "internal-secret")
+
+    async with _client() as client:
+        anonymous = await client.get("/internal/metrics")
+        forged = await client.get("/internal/metrics", headers={"x-internal-service-key": "guess"})
+        internal = await client.get("/internal/metrics", headers={"x-internal-service-key": "internal-secret"})
+
+    assert anonymous.status_code == 403
+    assert forged.status_code == 403
+    assert internal.status_code == 200
+    assert "task_pool" in internal.json()
@@ -247,13 +247,8 @@ async def test_generate_prompt_repeat_after_me_with_tts(
     )
     fake_tts = MagicMock(return_value=b"mp3-bytes")
 
-    with patch("services.speaking_service.os.makedirs"), patch(
-        "services.speaking_service.aiofiles.open"
-    ) as mock_open:
-        ctx = MagicMock()
-        ctx.__aenter__.return_value = AsyncMock()
-        ctx.__aexit__.return_value = None
-        mock_open.return_value = ctx
+    with patch("services.speaking_service.get_asset_store") as mock_assets:
+        mock_assets.return_value.save = AsyncMock(return_value="/static/audio/ab/ab.mp3")
 
         out = await speaking_service.generate_speaking_prompt(
             language="English",
@@ -264,8 +259,9 @@ async def test_generate_prompt_repeat_after_me_with_tts(
 
     assert out.format == "repeat_after_me"
     assert out.targetPhrase == "I would like a coffee, please."
-    assert out.audioUrl is not None
+    assert out.audioUrl == "/static/audio/ab/ab.mp3"
     fake_tts.assert_called_once()
+    mock_assets.return_value.save.assert_awaited_once_with("audio", b"mp3-bytes", "mp3")
 
 
 @pytest.mark.asyncio
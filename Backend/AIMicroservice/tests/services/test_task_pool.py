@@ -0,0 +1,96 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from constants.variety import variety_picker
+from services.task_pool import Generate, PoolKey, TaskPool, parse_prewarm_keys
+
+
+def _recording_generator(calls: List[str]) -> Generate[str]:
+    async def generate(key: PoolKey, topic: str) -> str:
+        calls.append(topic)
+        return f"{key[2]}:{topic}"
+
+    return generate
+
+
+async def _settle(pool: TaskPool) -> None:
+    while pool.stats()["refilling"]:
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_miss_triggers_refill_then_serves_from_pool() -> None:
+    calls: List[str] = []
+    pool = TaskPool(_recording_generator(calls), low_water=1, high_water=3)
+    key = TaskPool.key("English", "b1", "multiple_choice", None)
+
+    assert pool.take(key, "user-1") is None
+    await _settle(pool)
+    assert pool.stats()["ready"] == 3
+
+    task = pool.take(key, "user-1")
+    assert task is not None and task.startswith("multiple_choice:")
+    assert pool.stats()["hits"] == 1
+    assert pool.stats()["misses"] == 1
+    await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_take_prefers_topics_outside_recent_history() -> None:
+    calls: List[str] = []
+    pool = TaskPool(_recording_generator(calls), low_water=0, high_water=3)
+    key = TaskPool.key("English", "A2", "fill_in_the_blank", None)
+    pool.prewarm([key])
+    await _settle(pool)
+
+    session = "variety-user"
+    for topic in calls[:2]:
+        variety_picker.remember_topic(session, topic)
+
+    served = pool.take(key, session)
+    assert served == f"fill_in_the_blank:{calls[2]}"
+    assert calls[2] in variety_picker.recent_topics(session)
+    await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_expired_items_are_not_served() -> None:
+    pool = TaskPool(_recording_generator([]), low_water=0, high_water=2, ttl_s=-1)
+    key = TaskPool.key("English", "C1", "multiple_choice", None)
+    pool.prewarm([key])
+    await _settle(pool)
+
+    assert pool.take(key, "user-2") is None
+    assert pool.stats()["expired"] == 2
+    await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_refill_backs_off() -> None:
+    attempts = 0
+
+    async def broken(key: PoolKey, topic: str) -> str:
+        nonlocal attempts
+        attempts += 1
+        raise RuntimeError("provider down")
+
+    pool = TaskPool(broken, low_water=1, high_water=2)
+    key = TaskPool.key("English", "A1", "multiple_choice", None)
+    pool.take(key, "u")
+    await _settle(pool)
+    pool.take(key, "u")
+    await _settle(pool)
+
+    assert attempts == 1
+    assert pool.stats()["failures"] == 1
+    await pool.shutdown()
+
+
+def test_parse_prewarm_keys() -> None:
+    keys = parse_prewarm_keys("English:A1, Polish:b2,bogus", ("multiple_choice",))
+    assert keys == (
+        ("English", "A1", "multiple_choice", "English"),
+        ("Polish", "B2", "multiple_choice", "English"),
+    )
@@ -0,0 +1,44 @@
+from typing import List
+
+import pytest
+
+from models.dtos.speaking_analysis_dtos import WhisperTranscriptionResult
+from services.transcription_cache import TranscriptionCache, Transcriber
+
+
+class _CountingWhisper:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.calls: List[str] = []
+
+    def __call__(self, language_code: str) -> Transcriber:
+        async def _transcribe() -> WhisperTranscriptionResult:
+            self.calls.append(language_code)
+            return WhisperTranscriptionResult(text=self.text, language=language_code)
+
+        return _transcribe
+
+
+@pytest.mark.asyncio
+async def test_same_recording_is_transcribed_once_per_language_and_model() -> None:
+    cache = TranscriptionCache()
+    whisper = _CountingWhisper("Hello world.")
+
+    first = await cache.get_or_transcribe("abc", "en", "whisper", whisper("en"))
+    again = await cache.get_or_transcribe("abc", "en", "whisper", whisper("en"))
+    await cache.get_or_transcribe("abc", "pl", "whisper", whisper("pl"))
+    await cache.get_or_transcribe("abc", "en", "other-model", whisper("en"))
+
+    assert first.text == again.text == "Hello world."
+    assert whisper.calls == ["en", "pl", "en"]
+
+
+@pytest.mark.asyncio
+async def test_empty_transcripts_are_retried() -> None:
+    cache = TranscriptionCache()
+    whisper = _CountingWhisper("  ")
+
+    await cache.get_or_transcribe("abc", "en", "whisper", whisper("en"))
+    await cache.get_or_transcribe("abc", "en", "whisper", whisper("en"))
+
+    assert whisper.calls == ["en", "en"]
@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+
+from models.dtos.material_dtos import ProcessPdfResponse
+from services.upload_jobs import StoredUploadJob, UploadJobStore
+from utils.error_codes import PDF_NO_TEXT, UPLOAD_JOB_INTERRUPTED, raise_with_code
+
+
+class _FakeStore:
+    """Stands in for the shared `upload_jobs` table."""
+
+    def __init__(self) -> None:
+        self.rows: Dict[str, StoredUploadJob] = {}
+
+    async def save(self, job_id: str, owner_id: Optional[str], status: Dict[str, Any]) -> None:
+        self.rows[job_id] = StoredUploadJob(owner_id, status, datetime.now(timezone.utc))
+
+    async def load(self, job_id: str) -> Optional[StoredUploadJob]:
+        return self.rows.get(job_id)
+
+    async def purge(self, before: datetime) -> None:
+        self.rows = {key: row for key, row in self.rows.items() if row.updated_at >= before}
+
+
+async def _wait_finished(store: UploadJobStore, job_id: str, owner: str) -> None:
+    for _ in range(100):
+        status = await store.get(job_id, owner)
+        if status is not None and status.status in ("done", "failed"):
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+@pytest.mark.asyncio
+async def test_job_reports_progress_and_result() -> None:
+    store = UploadJobStore()
+    release = asyncio.Event()
+
+    async def run(progress: Callable[[str, float], None]) -> ProcessPdfResponse:
+        progress("extracting", 0.5)
+        await release.wait()
+        progress("embedding", 1.0)
+        return ProcessPdfResponse(filename="a.pdf", chunks_count=3, status="success")
+
+    status = await store.submit("user-1", "a.pdf", run)
+    assert status.status == "queued"
+    await asyncio.sleep(0)
+
+    running = await store.get(status.job_id, "user-1")
+    assert running is not None
+    assert running.status == "running"
+    assert running.stage == "extracting"
+    assert 0.0 < running.progress < 0.4
+
+    release.set()
+    await _wait_finished(store, status.job_id, "user-1")
+    done = await store.get(status.job_id, "user-1")
+    assert done is not None
+    assert done.status == "done"
+    assert done.progress == 1.0
+    assert done.result is not None and done.result.chunks_count == 3
+
+
+@pytest.mark.asyncio
+async def test_job_failure_keeps_error_code_and_hides_from_other_users() -> None:
+    store = UploadJobStore()
+
+    async def run(progress: Callable[[str, float], None]) -> ProcessPdfResponse:
+        raise_with_code(PDF_NO_TEXT, 400, "No selectable text found.")
+
+    status = await store.submit("user-1", "scan.pdf", run)
+    await _wait_finished(store, status.job_id, "user-1")
+
+    failed = await store.get(status.job_id, "user-1")
+    assert failed is not None
+    assert failed.status == "failed"
+    assert failed.error == {"code": PDF_NO_TEXT, "message": "No selectable text found."}
+    assert await store.get(status.job_id, "user-2") is None
+
+
+@pytest.mark.asyncio
+async def test_other_replica_sees_job_through_shared_store() -> None:
+    shared = _FakeStore()
+    worker = UploadJobStore(shared, heartbeat_s=0.01)
+    other = UploadJobStore(shared)
+    release = asyncio.Event()
+
+    async def run(progress: Callable[[str, float], None]) -> ProcessPdfResponse:
+        progress("embedding", 0.5)
+        await release.wait()
+        return ProcessPdfResponse(filename="a.pdf", chunks_count=2, status="success")
+
+    status = await worker.submit("user-1", "a.pdf", run)
+    queued = await other.get(status.job_id, "user-1")
+    assert queued is not None and queued.status == "queued"
+
+    await asyncio.sleep(0.05)
+    running = await other.get(status.job_id, "user-1")
+    assert running is not None
+    assert running.status == "running" and running.stage == "embedding"
+    assert await other.get(status.job_id, "user-2") is None
+
+    release.set()
+    await _wait_finished(other, status.job_id, "user-1")
+    done = await other.get(status.job_id, "user-1")
+    assert done is not None
+    assert done.status == "done"
+    assert done.result is not None and done.result.chunks_count == 2
+
+
+@pytest.mark.asyncio
+async def test_job_abandoned_by_dead_replica_reports_interrupted() -> None:
+    shared = _FakeStore()
+    status = {"job_id": "abc", "filename": "a.pdf", "status": "running", "stage": "embedding", "progress": 0.5}
+    shared.rows["abc"] = StoredUploadJob("user-1", status, datetime.now(timezone.utc) - timedelta(minutes=5))
+
+    interrupted = await UploadJobStore(shared, stale_s=30.0).get("abc", "user-1")
+    assert interrupted is not None
+    assert interrupted.status == "failed"
+    assert interrupted.error is not None and interrupted.error["code"] == UPLOAD_JOB_INTERRUPTED
@@ -0,0 +1,104 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from services import user_service as user_service_mod
+from services.user_service import UserService, invalidate_ai_tokens
+from utils.user_context import UserContext
+
+_TOKENS = [
+    {"id": "t1", "token": "sk-a", "aiProviderId": "openai", "isDefault": False},
+    {"id": "t2", "token": "sk-b", "aiProviderId": "groq", "isDefault": True},
+]
+
+
+@pytest.fixture(autouse=True)
+def _clear_token_cache() -> None:
+    user_service_mod._token_cache.clear()
+    user_service_mod._token_generation.clear()
+
+
+@pytest.mark.asyncio
+async def test_burst_of_lookups_shares_one_fetch() -> None:
+    ctx = UserContext(user_id="user-burst", user_email=None, user_role=None, authorization=None)
+    fetch = AsyncMock(return_value=_TOKENS)
+    with patch.object(UserService, "_fetch_ai_tokens", fetch):
+        service = UserService()
+        tokens = await asyncio.gather(
+            *(service.get_default_ai_token(ctx) for _ in range(8))
+        )
+
+    assert fetch.await_count == 1
+    assert all(t["id"] == "t2" for t in tokens)
+
+
+@pytest.mark.asyncio
+async def test_invalidate_forces_refetch() -> None:
+    ctx = UserContext(user_id="user-inv", user_email=None, user_role=None, authorization=None)
+    fetch = AsyncMock(side_effect=[_TOKENS, _TOKENS[:1]])
+    with patch.object(UserService, "_fetch_ai_tokens", fetch):
+        service = UserService()
+        assert (await service.get_default_ai_token(ctx))["id"] == "t2"
+        invalidate_ai_tokens("user-inv")
+        assert (await service.get_default_ai_token(ctx))["id"] == "t1"
+
+    assert fetch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_during_fetch_drops_stale_result() -> None:
+    ctx = UserContext(user_id="user-race", user_email=None, user_role=None, authorization=None)
+    release = asyncio.Event()
+
+    async def slow_fetch(self: UserService, ctx: UserContext) -> list:
+        await release.wait()
+        return _TOKENS
+
+    with patch.object(UserService, "_fetch_ai_tokens", slow_fetch):
+        pending = asyncio.ensure_future(UserService().get_ai_tokens(ctx))
+        await asyncio.sleep(0)
+        invalidate_ai_tokens("user-race")
+        release.set()
+        assert await pending == _TOKENS
+
+    assert user_service_mod._token_cache.get("user-race") is None
+
+
+@pytest.mark.asyncio
+async def test_cached_tokens_are_sealed() -> None:
+    ctx = UserContext(user_id="user-sealed", user_email=None, user_role=None, authorization=None)
+    with patch.object(UserService, "_fetch_ai_tokens", AsyncMock(return_value=_TOKENS)):
+        await UserService().get_ai_tokens(ctx)
+
+    sealed = user_service_mod._token_cache.get("user-sealed")
+    assert sealed is not None
+    assert b"sk-a" not in sealed
+
+
+def test_invalidate_endpoint_requires_internal_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from controllers.ai_token_verify_controller import AITokenVerifyController
+
+    monkeypatch.setenv("INTERNAL_SERVICE_KEY", "bridge-key")
+    app = FastAPI()
+    app.include_router(AITokenVerifyController().get_router())
+    client = TestClient(app)
+
+    wrong = client.post(
+        "/ai-tokens/invalidate",
+        headers={"x-internal-service-key": "guess", "x-user-id": "user-inv"},
+    )
+    missing = client.post("/ai-tokens/invalidate", headers={"x-user-id": "user-inv"})
+    ok = client.post(
+        "/ai-tokens/invalidate",
+        headers={"x-internal-service-key": "bridge-key", "x-user-id": "user-inv"},
+    )
+
+    assert wrong.status_code == 403
+    assert wrong.json()["detail"]["code"] == "AUTH_INVALID_TOKEN"
+    assert missing.status_code == 403
+    assert ok.status_code == 200
+    assert ok.json()["payload"] is True
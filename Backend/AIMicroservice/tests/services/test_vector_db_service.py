@@ -0,0 +1,379 @@
+import threading
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Union, cast
+from unittest.mock import MagicMock, patch
+
+import lancedb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from lancedb.table import LanceTable
+from sentence_transformers import SentenceTransformer
+
+from constants.constants import LEVEL_EMBEDDINGS
+from models.dtos.material_dtos import ChunkMetadata
+from models.dtos.vector_db_dtos import (
+    FullLevelContext,
+    LevelSkills,
+    MaterialChunk,
+    SpecificSkillContext,
+    TaskTemplate,
+    TemplateHit,
+)
+from services import vector_db_service as vector_db_module
+from services.service_registry import ServiceRegistry
+from services.vector_db_service import VectorDBService, material_hits, vector_column
+
+
+def test_vector_column_float32_keeps_shape_and_values() -> None:
+    embeddings = np.arange(12, dtype=np.float32).reshape(3, 4)
+    column = vector_column(embeddings, pa.float32())
+
+    assert column.type == pa.list_(pa.float32(), 4)
+    assert len(column) == 3
+    assert column[1].as_py() == [4.0, 5.0, 6.0, 7.0]
+
+
+def test_vector_column_float16_downcasts() -> None:
+    embeddings = np.full((2, 3), 0.5, dtype=np.float32)
+    column = vector_column(embeddings, pa.float16())
+
+    assert column.type == pa.list_(pa.float16(), 3)
+    assert column.flatten().to_numpy().dtype == np.float16
+
+
+def test_vector_column_rejects_flat_input() -> None:
+    with pytest.raises(ValueError):
+        vector_column(np.zeros(4, dtype=np.float32), pa.float32())
+
+
+def test_material_hits_projects_and_filters_owner() -> None:
+    results = pa.table({
+        "text": ["mine", "theirs"],
+        "source": ["a.pdf", "b.pdf"],
+        "chunk_index": [0, 3],
+        "user_id": ["u1", "u2"],
+        "_distance": [0.1, 0.2],
+    })
+
+    hits = material_hits(results, "u1")
+
+    assert [h.text for h in hits] == ["mine"]
+    assert not hasattr(hits[0], "__dict__")
+    model = hits[0].to_model()
+    assert isinstance(model, MaterialChunk)
+    assert model.distance == pytest.approx(0.1)
+    assert model.vector is None
+
+
+def _levels_service(tmp_path: Path) -> VectorDBService:
+    """A warm service over a temp LanceDB seeded like initialize_db,
+    without loading the sentence-transformer."""
+    service = VectorDBService(db_path=str(tmp_path / "db"))
+    db = lancedb.connect(service.db_path)
+    rows = []
+    for level, skills in LEVEL_EMBEDDINGS.items():
+        full_description = f"Level {level} proficiency description:\n" + "".join(
+            f"{skill}: {description}\n" for skill, description in skills.items()
+        )
+        rows.append({
+            "level": level,
+            "full_description": full_description,
+            "listening": skills["Listening"],
+            "reading": skills["Reading"],
+            "spoken_interaction": skills["Spoken Interaction"],
+            "spoken_production": skills["Spoken Production"],
+            "writing": skills["Writing"],
+            "vector": [0.0, 0.0, 0.0, 0.0],
+        })
+    db.create_table(service.table_name, data=pd.DataFrame(rows))
+    service._db = db
+    service._level_index = service._build_level_index(db.open_table(service.table_name))
+    service._warm = True
+    return service
+
+
+def _scan_level_context(
+    service: VectorDBService, level: str, skill_type: Optional[str]
+) -> Optional[Union[SpecificSkillContext, FullLevelContext]]:
+    """get_level_context as it was before the in-memory index."""
+    df = service.db.open_table(service.table_name).to_pandas()
+    result = df[df["level"] == level]
+    if result.empty:
+        return None
+    level_data = result.to_dict("records")[0]
+    if skill_type and skill_type.lower() in level_data:
+        return SpecificSkillContext(level=level, skill_type=skill_type, description=level_data[skill_type.lower()])
+    return FullLevelContext(
+        level=level,
+        full_description=level_data["full_description"],
+        skills=LevelSkills(**{skill: level_data[skill] for skill in LevelSkills.model_fields}),
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("skill_type", [None, "", "reading", "Reading", "WRITING", "spoken_interaction", "Spoken Interaction", "dancing"])
+async def test_level_index_matches_dataframe_scan(tmp_path: Path, skill_type: Optional[str]) -> None:
+    service = _levels_service(tmp_path)
+
+    for level in [*LEVEL_EMBEDDINGS, "Z9"]:
+        assert await service.get_level_context(level, skill_type) == _scan_level_context(service, level, skill_type)
+
+
+@pytest.mark.asyncio
+async def test_cold_level_lookup_loads_off_the_event_loop(tmp_path: Path) -> None:
+    """A request arriving before warm-up finishes waits for the load on
+    a worker thread; the loop keeps serving (health probes included)."""
+    warm = _levels_service(tmp_path)
+    service = VectorDBService(db_path=str(tmp_path / "cold"))
+    loaded_on: List[int] = []
+
+    def fake_warm_up() -> None:
+        loaded_on.append(threading.get_ident())
+        service._level_index = warm._level_index
+        service._warm = True
+
+    with patch.object(service, "warm_up", fake_warm_up):
+        with pytest.raises(RuntimeError):
+            service.db
+        context = await service.get_level_context("B1", "writing")
+
+    assert loaded_on and loaded_on[0] != threading.get_ident()
+    assert context == await warm.get_level_context("B1", "writing")
+
+
+def _templates_service(tmp_path: Path) -> VectorDBService:
+    service = VectorDBService(db_path=str(tmp_path / "db"))
+    service._db = lancedb.connect(service.db_path)
+    service._warm = True
+    service.embedder.encode_many_sync = lambda texts: np.zeros((len(texts), 4), dtype=np.float32)  # type: ignore[method-assign]
+    return service
+
+
+def test_template_point_lookup_is_served_from_cache(tmp_path: Path) -> None:
+    service = _templates_service(tmp_path)
+    service.save_task_templates([TaskTemplate(id="t1", template="Fill in: ___")])
+    db = MagicMock(wraps=service._db)
+    service._db = db
+
+    first = service.get_task_template_by_id("t1")
+    second = service.get_task_template_by_id("t1")
+
+    assert first is not None and first.template == "Fill in: ___"
+    assert second is first
+    assert db.open_table.call_count == 1
+
+
+def test_save_task_templates_invalidates_rewritten_id(tmp_path: Path) -> None:
+    service = _templates_service(tmp_path)
+    service.save_task_templates([TaskTemplate(id="t1", template="old"), TaskTemplate(id="t2", template="other")])
+    assert service.get_task_template_by_id("t1") is not None
+    assert service.get_task_template_by_id("t2") is not None
+
+    service.save_task_templates([TaskTemplate(id="t1", template="new")])
+
+    assert service._template_cache.get("t1") is None
+    assert service._template_cache.get("t2") is not None
+    assert service.get_task_template_by_id("t1") is not None
+
+
+def test_template_search_returns_lazy_hits(tmp_path: Path) -> None:
+    service = _templates_service(tmp_path)
+    service.save_task_templates([
+        TaskTemplate.model_validate({"id": "t1", "template": "Fill in: ___", "kind": "gap_fill"}),
+        TaskTemplate.model_validate({"id": "t2", "template": "Choose: a/b", "kind": "multiple_choice"}),
+    ])
+    table = service.db.open_table(service.templates_table_name)
+    eager = {
+        rec["id"]: TaskTemplate(**rec)
+        for rec in table.search([0.0] * 4).select(["id", "template", "kind"]).limit(5).to_arrow().to_pylist()
+    }
+
+    hits = service.search_task_templates("fill", limit=5)
+
+    assert {type(hit) for hit in hits} == {TemplateHit}
+    assert {hit.id: hit.extra["kind"] for hit in hits} == {"t1": "gap_fill", "t2": "multiple_choice"}
+    for hit in hits:
+        assert hit.to_model() == eager[hit.id]
+
+
+_USER_A = "00000000-0000-0000-0000-00000000000a"
+_USER_B = "00000000-0000-0000-0000-00000000000b"
+
+
+def test_tenant_row_counts_are_cached_and_bumped_on_save(tmp_path: Path) -> None:
+    service = _templates_service(tmp_path)
+    service._model = cast(SentenceTransformer, SimpleNamespace(get_sentence_embedding_dimension=lambda: 4))
+
+    def save(user_id: str, count: int, content_hash: str) -> None:
+        metas = [ChunkMetadata(source="doc.pdf", chunk_index=i) for i in range(count)]
+        service.save_chunks([f"chunk {i}" for i in range(count)], metas, user_id=user_id, content_hash=content_hash)
+
+    save(_USER_A, 3, "a" * 64)
+    save(_USER_B, 2, "b" * 64)
+    service.maintain_indexes()
+    save(_USER_A, 4, "a" * 64)
+
+    table = MagicMock()
+    assert service._tenant_rows is not None
+    assert service._tenant_rows["user_id"][_USER_A] == 7
+    assert service._tenant_rows["content_hash"]["b" * 64] == 2
+    with patch.object(vector_db_module, "_EXACT_TENANT_MAX_ROWS", 9):
+        assert service._tenant_is_small(table, "", _USER_B, ["a" * 64])
+        assert not service._tenant_is_small(table, "", _USER_A, ["a" * 64])
+    table.count_rows.assert_not_called()
+
+
+def test_maintain_indexes_sees_existing_indexes(tmp_path: Path) -> None:
+    service = _templates_service(tmp_path)
+    service._model = cast(SentenceTransformer, SimpleNamespace(get_sentence_embedding_dimension=lambda: 4))
+    metas = [ChunkMetadata(source="doc.pdf", chunk_index=i) for i in range(3)]
+    service.save_chunks(["a", "b", "c"], metas, user_id=_USER_A, content_hash="a" * 64)
+
+    first = service.maintain_indexes()
+    second = service.maintain_indexes()
+
+    assert first["actions"] == ["scalar:user_id", "scalar:content_hash"]
+    assert {"user_id", "content_hash"} <= set(second["indexed"])
+    assert second["actions"] == []
+
+
+def test_maintain_indexes_fails_rather_than_rebuilding_blind(tmp_path: Path) -> None:
+    service = _templates_service(tmp_path)
+    service._model = cast(SentenceTransformer, SimpleNamespace(get_sentence_embedding_dimension=lambda: 4))
+    metas = [ChunkMetadata(source="doc.pdf", chunk_index=0)]
+    service.save_chunks(["a"], metas, user_id=_USER_A, content_hash="a" * 64)
+
+    with (
+        patch("lance.dataset.LanceDataset.list_indices", side_effect=RuntimeError("boom")),
+        patch.object(LanceTable, "create_scalar_index") as create_scalar_index,
+        pytest.raises(RuntimeError),
+    ):
+        service.maintain_indexes()
+    create_scalar_index.assert_not_called()
+
+
+class _FakeLance:
+    def __init__(self, table: "_FakeTable") -> None:
+        self._table = table
+        self.optimize = SimpleNamespace(optimize_indices=lambda: table.optimized.append(True))
+        self.stats = SimpleNamespace(index_stats=lambda name: {"num_unindexed_rows": table.unindexed})
+
+    def get_fragments(self) -> List[int]:
+        return list(range(self._table.fragments))
+
+    def list_indices(self) -> List[Dict[str, object]]:
+        return [{"name": "vector_idx", "fields": ["vector"]}]
+
+
+class _FakeTable:
+    """Just the surface _compact_table touches."""
+
+    def __init__(self, name: str, fragments: int, versions: int, unindexed: int = 0) -> None:
+        self.name = name
+        self.fragments = fragments
+        self.versions = versions
+        self.unindexed = unindexed
+        self.optimized: List[bool] = []
+        self.cleanups: List[timedelta] = []
+
+    def to_lance(self) -> _FakeLance:
+        return _FakeLance(self)
+
+    def list_versions(self) -> List[int]:
+        return list(range(self.versions))
+
+    def compact_files(self, target_rows_per_fragment: int) -> SimpleNamespace:
+        removed, self.fragments = self.fragments - 1, 1
+        self.versions += 1
+        return SimpleNamespace(fragments_removed=removed, fragments_added=1)
+
+    def cleanup_old_versions(self, older_than: timedelta) -> SimpleNamespace:
+        self.cleanups.append(older_than)
+        dropped, self.versions = self.versions - 1, 1
+        return SimpleNamespace(bytes_removed=dropped * 100, old_versions=dropped)
+
+
+@pytest.fixture
+def compaction_thresholds(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(vector_db_module, "_COMPACT_MIN_FRAGMENTS", 4)
+    monkeypatch.setattr(vector_db_module, "_CLEANUP_MIN_VERSIONS", 5)
+
+
+@pytest.mark.usefixtures("compaction_thresholds")
+def test_compact_table_below_thresholds_does_nothing() -> None:
+    service = VectorDBService()
+    table = _FakeTable("materials", fragments=3, versions=4)
+
+    result = service._compact_table(cast(LanceTable, table))
+
+    assert result["fragments"] == 3 and result["fragments_after"] == 3
+    assert "fragments_removed" not in result and "versions_removed" not in result
+    assert table.cleanups == [] and table.optimized == []
+
+
+@pytest.mark.usefixtures("compaction_thresholds")
+def test_compaction_version_counts_toward_cleanup_threshold() -> None:
+    service = VectorDBService()
+    # 4 versions alone is under the threshold; the compaction's own
+    # commit makes it 5.
+    table = _FakeTable("materials", fragments=6, versions=4, unindexed=10)
+
+    result = service._compact_table(cast(LanceTable, table))
+
+    assert result["fragments_removed"] == 5 and result["fragments_after"] == 1
+    assert result["versions_removed"] == 4 and result["bytes_reclaimed"] == 400
+    assert table.cleanups == [timedelta(seconds=vector_db_module._VERSION_RETENTION_S)]
+    assert result["indices_optimized"] is True
+
+
+@pytest.mark.usefixtures("compaction_thresholds")
+def test_version_threshold_alone_triggers_cleanup() -> None:
+    service = VectorDBService()
+    table = _FakeTable("task_templates", fragments=2, versions=7)
+
+    result = service._compact_table(cast(LanceTable, table))
+
+    assert "fragments_removed" not in result
+    assert result["versions_removed"] == 6
+
+
+class _FakeDB:
+    def __init__(self, tables: Dict[str, _FakeTable]) -> None:
+        self.tables = tables
+
+    def table_names(self) -> List[str]:
+        return list(self.tables)
+
+    def open_table(self, name: str) -> _FakeTable:
+        return self.tables[name]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("compaction_thresholds")
+async def test_compaction_totals_accumulate_into_maintenance_metrics() -> None:
+    registry = ServiceRegistry()
+    tables = {
+        "materials": _FakeTable("materials", fragments=6, versions=10),
+        "task_templates": _FakeTable("task_templates", fragments=1, versions=1),
+    }
+    service = registry.vector_db_service
+    service._db = cast(lancedb.DBConnection, _FakeDB(tables))
+    service._warm = True
+
+    await registry.maintenance.run_now("lance_compaction")
+    tables["materials"].fragments = 9
+    await registry.maintenance.run_now("lance_compaction")
+
+    job = (await registry.metrics())["maintenance"]["lance_compaction"]
+    assert job["runs"] == 2 and job["failures"] == 0
+    assert job["last_result"]["tables"]["task_templates"]["fragments"] == 1
+    assert job["last_result"]["totals"] == {
+        "fragments_removed": 5 + 8,
+        # Only the first run crossed the version threshold.
+        "bytes_reclaimed": 1000,
+        "versions_removed": 10,
+    }
@@ -11,7 +11,7 @@ from pipelines.verification_pipeline import VerificationResult
 @pytest.fixture
 def mock_vector_db() -> MagicMock:
     service = MagicMock()
-    service.get_level_context = MagicMock()
+    service.get_level_context = AsyncMock()
     return service
 
 
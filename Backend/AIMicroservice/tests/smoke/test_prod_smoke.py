@@ -27,6 +27,7 @@ import os
 import time
 import uuid
 import jwt
+from concurrent.futures import Future
 from typing import Any, Iterable
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -63,6 +64,13 @@ def _auth_headers(user_id: str = _TEST_USER_ID, ui_locale: str = "en") -> dict:
     }
 
 
+def _done_clip(audio: bytes) -> "Future[bytes]":
+    """A finished TTS turn, as TTSService.multispeaker_clips returns."""
+    clip: Future = Future()
+    clip.set_result(audio)
+    return clip
+
+
 # ---------- Test fixtures: app + boundary mocks --------------------
 
 
@@ -116,7 +124,7 @@ def smoke_client(monkeypatch: pytest.MonkeyPatch) -> Iterable[TestClient]:
 
     # TTS — return canned MP3 bytes.
     fake_tts_synth = MagicMock(return_value=b"smoke-mp3-bytes")
-    fake_multispeaker = MagicMock(return_value=(b"smoke-mp3-bytes", []))
+    fake_multispeaker = MagicMock(return_value=([_done_clip(b"smoke-mp3-bytes")], []))
 
     # Whisper — also canned. The real one is _transcribe_audio_with_whisper
     # which we patch at the SpeakingService instance level later.
@@ -136,7 +144,7 @@ def smoke_client(monkeypatch: pytest.MonkeyPatch) -> Iterable[TestClient]:
         tts_service_mod.TTSService, "synthesize", fake_tts_synth
     ), patch.object(
         tts_service_mod.TTSService,
-        "synthesize_multispeaker",
+        "multispeaker_clips",
         fake_multispeaker,
     ), patch.object(
         vector_db_mod, "VectorDBService", return_value=fake_vector_db
@@ -147,22 +155,10 @@ def smoke_client(monkeypatch: pytest.MonkeyPatch) -> Iterable[TestClient]:
         "services.user_service.UserService.log_task_history",
         new=AsyncMock(return_value=None),
     ), patch(
-        "services.listening_task_service.os.makedirs"
-    ), patch(
-        "services.listening_task_service.aiofiles.open"
-    ) as listen_aio, patch(
-        "services.speaking_service.os.makedirs"
-    ), patch(
-        "services.speaking_service.aiofiles.open"
-    ) as speak_aio:
-
-        # Async-context-manager stub so `async with aiofiles.open(...)`
-        # short-circuits to an in-memory write that succeeds.
-        for ao in (listen_aio, speak_aio):
-            ctx = MagicMock()
-            ctx.__aenter__.return_value = AsyncMock()
-            ctx.__aexit__.return_value = None
-            ao.return_value = ctx
+        # Generated audio/images "land" without touching static/.
+        "services.asset_store.AssetStore.put",
+        return_value="audio/ab/ab.mp3",
+    ):
 
         # Patch Whisper transcription on the singleton SpeakingService
         # used by the controller. Default: a usable transcript so the
@@ -500,9 +496,9 @@ def test_phase2_listening_multi_speaker_routes_to_multispeaker_tts(
     smoke_client: TestClient,
 ) -> None:
     """Transcript with [Speaker N]: tags must trigger
-    synthesize_multispeaker, and the speakers list must bubble up."""
+    multi-speaker TTS, and the speakers list must bubble up."""
     smoke_client.fake_tts_multispeaker.return_value = (
-        b"multi-mp3",
+        [_done_clip(b"multi-mp3")],
         ["Speaker 1", "Speaker 2"],
     )
     smoke_client.fake_ai.return_value = json.dumps(
@@ -0,0 +1,29 @@
+import math
+
+import pytest
+
+import utils.audio_prep as audio_prep
+from utils.audio_prep import prepare_for_transcription, speech_bounds
+
+
+def test_speech_bounds_skip_quiet_edges() -> None:
+    levels = [-math.inf, -70.0, -20.0, -62.0, -18.0, -80.0, -math.inf]
+
+    assert speech_bounds(levels) == (2, 4)
+    assert speech_bounds([-math.inf, -math.inf]) is None
+
+
+@pytest.mark.asyncio
+async def test_undecodable_upload_is_sent_unchanged(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(audio_prep, "_MIN_BYTES", 0)
+
+    data, name = await prepare_for_transcription(b"not audio at all", "take.webm")
+
+    assert (data, name) == (b"not audio at all", "take.webm")
+    assert audio_prep.audio_prep_stats()["failed"] >= 1
+    audio_prep.shutdown_audio_prep_executor()
+
+
+@pytest.mark.asyncio
+async def test_small_upload_skips_the_pool() -> None:
+    assert await prepare_for_transcription(b"tiny", "take.wav") == (b"tiny", "take.wav")
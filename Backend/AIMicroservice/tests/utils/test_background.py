@@ -0,0 +1,59 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from utils.background import BackgroundDispatcher
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_before_work_and_runs_concurrently() -> None:
+    dispatcher = BackgroundDispatcher(concurrency=4)
+    started: List[int] = []
+    release = asyncio.Event()
+
+    async def side_effect(i: int) -> None:
+        started.append(i)
+        await release.wait()
+
+    for i in range(3):
+        dispatcher.submit(side_effect(i), name=f"t{i}")
+    assert dispatcher.stats()["in_flight"] == 3
+
+    await asyncio.sleep(0)
+    # All three started without waiting for each other.
+    assert sorted(started) == [0, 1, 2]
+    release.set()
+    await dispatcher.drain()
+    assert dispatcher.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failures_are_logged_not_raised() -> None:
+    dispatcher = BackgroundDispatcher()
+
+    async def boom() -> None:
+        raise RuntimeError("user service down")
+
+    dispatcher.submit(boom(), name="boom")
+    await dispatcher.drain()
+    assert dispatcher.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded() -> None:
+    dispatcher = BackgroundDispatcher(concurrency=2)
+    running = 0
+    peak = 0
+
+    async def side_effect() -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    for _ in range(6):
+        dispatcher.submit(side_effect())
+    await dispatcher.drain()
+    assert peak == 2
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import pytest
+import pytest_asyncio
+
+from utils.cache_backends import (
+    InMemoryCacheBackend,
+    RedisCacheBackend,
+    SQLiteCacheBackend,
+    build_cache_backend,
+)
+
+
+class _FakeRedis:
+    """Just enough of a RESP2 server for GET / SET PX / AUTH / SELECT;
+    anything else (e.g. CLIENT SETINFO) gets an error reply."""
+
+    def __init__(self, password: Optional[str] = None) -> None:
+        self.password = password
+        self.data: Dict[bytes, Tuple[bytes, float]] = {}
+        self.commands: List[str] = []
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+        header = await reader.readline()
+        if not header:
+            return None
+        count = int(header[1:-2])
+        args = []
+        for _ in range(count):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        authed = self.password is None
+        while True:
+            args = await self._read_command(reader)
+            if args is None:
+                break
+            cmd = args[0].decode().upper()
+            self.commands.append(cmd)
+            if cmd == "AUTH":
+                authed = args[-1].decode() == self.password
+                writer.write(b"+OK\r\n" if authed else b"-WRONGPASS invalid password\r\n")
+            elif not authed:
+                writer.write(b"-NOAUTH Authentication required.\r\n")
+            elif cmd == "SELECT":
+                writer.write(b"+OK\r\n")
+            elif cmd == "SET":
+                ttl_ms = int(args[4]) if len(args) > 4 else 10**9
+                self.data[args[1]] = (args[2], time.monotonic() + ttl_ms / 1000)
+                writer.write(b"+OK\r\n")
+            elif cmd == "GET":
+                entry = self.data.get(args[1])
+                if entry is None or entry[1] < time.monotonic():
+                    writer.write(b"$-1\r\n")
+                else:
+                    writer.write(b"$%d\r\n%s\r\n" % (len(entry[0]), entry[0]))
+            else:
+                writer.write(b"-ERR unknown command\r\n")
+            await writer.drain()
+        writer.close()
+
+
+@pytest_asyncio.fixture
+async def fake_redis() -> AsyncIterator[Tuple[_FakeRedis, str]]:
+    server_state = _FakeRedis(password="s3cret")
+    server = await asyncio.start_server(server_state.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        yield server_state, f"redis://:s3cret@127.0.0.1:{port}/2"
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_roundtrip(fake_redis: Tuple[_FakeRedis, str]) -> None:
+    server, url = fake_redis
+    backend = RedisCacheBackend(url)
+    try:
+        assert await backend.get("k") is None
+        await backend.set("k", "zażółć gęślą jaźń", ttl_seconds=60)
+        assert await backend.get("k") == "zażółć gęślą jaźń"
+    finally:
+        await backend.close()
+
+    # Connection set-up authenticated and selected the db from the URL.
+    assert server.commands[0] == "AUTH"
+    assert "SELECT" in server.commands
+    assert b"ai_cache:k" in server.data
+    assert backend.stats()["hits"] == 1
+    assert backend.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_unreachable_degrades_to_miss() -> None:
+    # Nothing listens on port 1.
+    backend = RedisCacheBackend("redis://127.0.0.1:1/0", connect_timeout_s=0.2)
+    assert await backend.get("k") is None
+    await backend.set("k", "v", ttl_seconds=60)
+    assert backend.stats()["errors"] == 1  # second call skipped while marked down
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_shared_between_instances(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite3")
+    writer = SQLiteCacheBackend(path)
+    reader = SQLiteCacheBackend(path)
+    try:
+        await writer.set("k", "v", ttl_seconds=60)
+        await writer.set("expired", "v", ttl_seconds=-1)
+        assert await reader.get("k") == "v"
+        assert await reader.get("expired") is None
+    finally:
+        await writer.close()
+        await reader.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_close_runs_off_the_event_loop(tmp_path: Path) -> None:
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+    await backend.set("k", "v", ttl_seconds=60)
+    loop_thread = threading.get_ident()
+    closed_on: List[int] = []
+    close_sync = backend._close_sync
+
+    def record_thread() -> None:
+        closed_on.append(threading.get_ident())
+        close_sync()
+
+    backend._close_sync = record_thread  # type: ignore[method-assign]
+    await backend.close()
+
+    assert closed_on and closed_on[0] != loop_thread
+    assert backend._conn is None
+
+
+@pytest.mark.asyncio
+async def test_in_memory_backend_roundtrip() -> None:
+    backend = InMemoryCacheBackend()
+    await backend.set("k", "v", ttl_seconds=60)
+    assert await backend.get("k") == "v"
+
+
+def test_build_cache_backend_selection(tmp_path: Path) -> None:
+    assert build_cache_backend("memory") is None
+    assert isinstance(build_cache_backend("sqlite", str(tmp_path / "c.db")), SQLiteCacheBackend)
+    assert isinstance(build_cache_backend("redis", "redis://cache:6380/1"), RedisCacheBackend)
+    assert build_cache_backend("memcached") is None
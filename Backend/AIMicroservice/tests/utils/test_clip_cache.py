@@ -0,0 +1,52 @@
+import os
+from pathlib import Path
+
+from utils.clip_cache import ClipCache, clip_key
+
+
+def test_key_covers_voice_language_and_rate_but_not_whitespace() -> None:
+    base = clip_key("Good morning!", "en-US-Chirp3-HD-Achird", "en-US", 0.85)
+    assert base == clip_key("  Good   morning! ", "en-US-Chirp3-HD-Achird", "en-US", 0.85)
+    assert base != clip_key("Good morning!", "en-US-Chirp3-HD-Algenib", "en-US", 0.85)
+    assert base != clip_key("Good morning!", "en-US-Chirp3-HD-Achird", "en-GB", 0.85)
+    assert base != clip_key("Good morning!", "en-US-Chirp3-HD-Achird", "en-US", 1.0)
+
+
+def test_round_trip_and_miss(tmp_path: Path) -> None:
+    cache = ClipCache(str(tmp_path))
+    key = clip_key("Hola", "es-ES-Chirp3-HD-Achird", "es-ES", 0.8)
+
+    assert cache.get(key) is None
+    cache.put(key, b"mp3-bytes")
+
+    assert cache.get(key) == b"mp3-bytes"
+    assert (tmp_path / key[:2] / f"{key}.mp3").exists()
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_over_budget_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ClipCache(str(tmp_path), max_bytes=25)
+    keys = [clip_key(f"phrase {i}", "v", "en-US", 1.0) for i in range(3)]
+    for age, key in enumerate(keys):
+        cache.put(key, b"x" * 10)
+        # Oldest first: keys[0] is the least recently used.
+        path = tmp_path / key[:2] / f"{key}.mp3"
+        os.utime(path, (1000 + age, 1000 + age))
+
+    cache.prune()
+
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) == b"x" * 10
+    assert cache.stats()["bytes"] <= 25
+
+
+def test_rewriting_a_clip_does_not_count_it_twice(tmp_path: Path) -> None:
+    cache = ClipCache(str(tmp_path))
+    first, second = (clip_key(f"phrase {i}", "v", "en-US", 1.0) for i in range(2))
+    cache.put(first, b"x" * 10)
+
+    cache.put(second, b"y" * 10)
+    cache.put(second, b"y" * 10)
+
+    assert cache.stats()["bytes"] == 20
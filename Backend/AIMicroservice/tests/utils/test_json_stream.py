@@ -0,0 +1,61 @@
+import json
+import random
+
+from utils.json_stream import JsonStreamParser, salvage_array, salvage_object
+
+
+_DOC = {
+    "transcript": 'She said "hi" {not a brace} [nor a bracket],',
+    "questions": [
+        {"type": "multiple_choice", "options": ["a", "b]", "c}"], "correctAnswer": "a"},
+        {"type": "true_false_not_given", "question": "Escaped \\\" quote", "correctAnswer": "true"},
+        "scalar, with comma",
+        7,
+    ],
+    "meta": {"nested": [1, 2, {"x": None}]},
+}
+
+
+def test_elements_emitted_as_they_close_for_any_chunking() -> None:
+    text = "```json\n" + json.dumps(_DOC, indent=2) + "\n```"
+    rng = random.Random(1234)
+    for _ in range(50):
+        parser = JsonStreamParser("questions")
+        seen = []
+        i = 0
+        while i < len(text):
+            step = rng.randint(1, 9)
+            seen.extend(parser.feed(text[i:i + step]))
+            i += step
+        assert seen == _DOC["questions"]
+        assert parser.fields == {"transcript": _DOC["transcript"], "meta": _DOC["meta"]}
+        assert parser.malformed == 0
+
+
+def test_object_element_is_available_before_the_array_ends() -> None:
+    parser = JsonStreamParser("questions")
+    assert parser.feed('{"questions": [{"a": 1}') == [{"a": 1}]
+    assert parser.feed(', {"b": 2') == []
+    assert parser.feed("}]}") == [{"b": 2}]
+
+
+def test_truncated_tail_keeps_complete_elements() -> None:
+    text = '{"questions": [{"a": 1}, {"b": 2}, {"c": tr'
+    assert salvage_array(text) == [{"a": 1}, {"b": 2}]
+
+
+def test_malformed_middle_element_is_skipped() -> None:
+    parser = JsonStreamParser("questions")
+    out = parser.feed('{"questions": [{"a": 1}, {"b": oops}, {"c": 3}]}')
+    assert out == [{"a": 1}, {"c": 3}]
+    assert parser.malformed == 1
+
+
+def test_salvage_object_keeps_closed_fields() -> None:
+    text = '{"score": 80, "passed": true, "summary": "ok", "strengths": ["x"], "weakn'
+    assert salvage_object(text) == {
+        "score": 80,
+        "passed": True,
+        "summary": "ok",
+        "strengths": ["x"],
+    }
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+from utils.ngram_index import NgramIndex, NgramIndexStore, ngram_hashes
+
+_SOURCE = (
+    "The migration of birds across the Sahara is one of the most "
+    "remarkable journeys in the animal kingdom, covering thousands of "
+    "kilometres without rest."
+)
+
+
+def test_rolling_hash_matches_hash_of_each_window() -> None:
+    words = _SOURCE.lower().replace(",", "").replace(".", "").split()
+    rolled = list(ngram_hashes(_SOURCE, 5))
+    direct = [ngram_hashes(" ".join(words[i:i + 5]), 5)[0] for i in range(len(words) - 4)]
+    assert rolled == direct
+
+
+def test_index_detects_copied_span_only() -> None:
+    index = NgramIndex.from_texts([_SOURCE], n=12)
+    copied = (
+        "Scientists agree that the migration of birds across the Sahara "
+        "is one of the most remarkable journeys in the animal kingdom."
+    )
+    paraphrased = (
+        "Crossing the Sahara is a remarkable feat for migrating birds, "
+        "who fly thousands of kilometres in one go."
+    )
+    assert index.overlaps(copied)
+    assert not index.overlaps(paraphrased)
+    assert not NgramIndex(12).overlaps(copied)
+
+
+def test_store_roundtrip_is_per_owner(tmp_path: Path) -> None:
+    store = NgramIndexStore(str(tmp_path), n=12)
+    assert store.save("user-a", "book.pdf", [_SOURCE]) > 0
+    store.save("user-a", "other.pdf", ["An unrelated document about verbs and tenses in English grammar lessons for adults."])
+
+    assert store.load("user-a").overlaps(_SOURCE)
+    assert len(store.load("user-b")) == 0
+
+    # Re-uploading a document replaces its fingerprints.
+    store.save("user-a", "book.pdf", ["Completely different content now, nothing about birds or deserts at all here."])
+    assert not store.load("user-a").overlaps(_SOURCE)
+
+
+def test_copy_shares_fingerprints_with_new_owner(tmp_path: Path) -> None:
+    store = NgramIndexStore(str(tmp_path), n=12)
+    store.save("user-a", "book.pdf", [_SOURCE], content_hash="a" * 64)
+    # The first uploader later reuses the name for a different PDF.
+    store.save("user-a", "book.pdf", ["Completely different content now, nothing about birds or deserts at all here."])
+
+    assert store.copy("a" * 64, "user-b", "same-book.pdf")
+    assert store.load("user-b").overlaps(_SOURCE)
+    assert not store.copy("b" * 64, "user-b", "x.pdf")
+
+
+def test_loaded_indexes_are_capped_by_fingerprint_bytes(tmp_path: Path) -> None:
+    # Room for one owner's merged index (same-sized docs), not two.
+    size = len(NgramIndex.from_texts([_SOURCE], n=12)) * 8
+    store = NgramIndexStore(str(tmp_path), n=12, cache_max_bytes=size)
+    store.save("user-a", "book.pdf", [_SOURCE])
+    store.save("user-b", "book.pdf", [_SOURCE])
+
+    assert store.load("user-a").overlaps(_SOURCE)
+    assert store.load("user-b").overlaps(_SOURCE)
+
+    assert len(store._loaded) == 1
+    assert store._loaded.size_bytes <= size
+    # An evicted owner is simply read from disk again.
+    assert store.load("user-a").overlaps(_SOURCE)
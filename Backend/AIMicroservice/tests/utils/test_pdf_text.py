@@ -0,0 +1,39 @@
+import re
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from utils.pdf_text import StreamingChunker, non_text_share, page_ranges
+
+
+def test_non_text_share_matches_per_character_scan() -> None:
+    text = "Reading passage — (A) and [B]; ok?\n\x03URWRNRĄ\x03\x05 ©®" * 20
+    expected = sum(
+        1 for c in text
+        if not re.match(r"[\w\s.,;:!?\"'()\[\]{}\-—–‑/\\]", c, re.UNICODE)
+    )
+    assert non_text_share(text) == (expected, len(text))
+
+
+def test_page_ranges_cover_every_page_once() -> None:
+    ranges = page_ranges(203, 8)
+    assert ranges[0][0] == 0 and ranges[-1][1] == 203
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert page_ranges(2, 8) == [(0, 1), (1, 2)]
+
+
+def test_streaming_chunker_matches_whole_document_split() -> None:
+    splitter = RecursiveCharacterTextSplitter(chunk_size=200, chunk_overlap=40, length_function=len)
+    pages = [f"Page {i}. " + "Sentence about bird migration. " * 12 + "\n" for i in range(30)]
+
+    chunker = StreamingChunker(splitter, flush_chars=1500)
+    streamed = []
+    for page in pages:
+        streamed.extend(chunker.feed(page))
+    streamed.extend(chunker.finish())
+
+    whole = splitter.split_text("".join(pages))
+    # Same content, same granularity; boundaries may shift slightly
+    # around flush points.
+    assert abs(len(streamed) - len(whole)) <= 2
+    assert all(len(c) <= 200 for c in streamed)
+    assert "".join(streamed).count("Page 29.") >= 1
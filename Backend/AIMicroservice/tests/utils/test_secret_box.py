@@ -0,0 +1,24 @@
+import pytest
+
+from utils.secret_box import SecretBox
+
+
+def test_seal_roundtrip_hides_plaintext() -> None:
+    box = SecretBox()
+    secret = b'[{"token": "sk-live-abcdef0123456789"}]' * 3
+    sealed = box.seal(secret)
+
+    assert b"sk-live" not in sealed
+    assert box.open(sealed) == secret
+    # Fresh nonce per seal.
+    assert box.seal(secret) != sealed
+
+
+def test_open_rejects_tampering_and_foreign_boxes() -> None:
+    box = SecretBox()
+    sealed = bytearray(box.seal(b"sk-secret"))
+    sealed[20] ^= 1
+    with pytest.raises(ValueError):
+        box.open(bytes(sealed))
+    with pytest.raises(ValueError):
+        SecretBox().open(box.seal(b"sk-secret"))
@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from utils.ttl_cache import TTLCache
+
+
+def test_lru_eviction_by_bytes() -> None:
+    cache: TTLCache[str, str] = TTLCache("test_lru", ttl_seconds=60, max_bytes=10)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    # Touch "a" so "b" becomes least-recently used.
+    assert cache.get("a") == "aaaa"
+    cache.put("c", "cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.get("c") == "cccc"
+    assert cache.size_bytes == 8
+    assert cache.stats()["evictions"] == 1
+
+
+def test_oversized_value_is_not_cached() -> None:
+    cache: TTLCache[str, str] = TTLCache("test_oversized", ttl_seconds=60, max_bytes=4)
+    cache.put("small", "ab")
+    cache.put("big", "abcdefgh")
+    assert cache.get("big") is None
+    # The existing entry survives instead of being flushed.
+    assert cache.get("small") == "ab"
+
+
+def test_entries_expire() -> None:
+    cache: TTLCache[str, str] = TTLCache("test_ttl", ttl_seconds=10, max_bytes=100)
+    with patch("utils.ttl_cache.time.monotonic", return_value=1000.0):
+        cache.put("k", "v")
+    with patch("utils.ttl_cache.time.monotonic", return_value=1005.0):
+        assert cache.get("k") == "v"
+    with patch("utils.ttl_cache.time.monotonic", return_value=1011.0):
+        assert cache.get("k") is None
+    assert len(cache) == 0
+    assert cache.size_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_single_flight() -> None:
+    cache: TTLCache[str, str] = TTLCache("test_single_flight", ttl_seconds=60, max_bytes=1000)
+    calls = 0
+    release = asyncio.Event()
+
+    async def loader() -> str:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "value"
+
+    waiters = [asyncio.create_task(cache.get_or_load("k", loader)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert results == ["value"] * 5
+    assert calls == 1
+    stats = cache.stats()
+    assert stats["coalesced"] == 4
+    assert stats["inflight"] == 0
+
+    # Subsequent lookups are plain hits.
+    assert await cache.get_or_load("k", loader) == "value"
+    assert calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_failure_is_shared_and_not_cached() -> None:
+    cache: TTLCache[str, str] = TTLCache("test_failure", ttl_seconds=60, max_bytes=1000)
+    calls = 0
+
+    async def loader() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise RuntimeError("provider down")
+
+    results = await asyncio.gather(
+        cache.get_or_load("k", loader),
+        cache.get_or_load("k", loader),
+        return_exceptions=True,
+    )
+    assert calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.get("k") is None
+
+
+@pytest.mark.asyncio
+async def test_should_cache_predicate() -> None:
+    cache: TTLCache[str, str] = TTLCache("test_predicate", ttl_seconds=60, max_bytes=1000)
+
+    async def loader() -> str:
+        return ""
+
+    assert await cache.get_or_load("k", loader, should_cache=bool) == ""
+    assert cache.get("k") is None
@@ -0,0 +1,149 @@
+"""Shrinks speaking recordings before they are uploaded to Whisper.
+
+Browsers send whatever MediaRecorder produced, often 48 kHz stereo
+WAV or high-bitrate webm. Groq has to receive every byte of it before
+it starts transcribing. `prepare_for_transcription` decodes the
+recording once (pydub, which drives ffmpeg) and downmixes it to 16 kHz
+mono, the rate Whisper resamples to anyway. It trims leading and
+trailing silence with an energy gate on 10 ms frames, then re-encodes
+to Opus in Ogg. The work runs on a small thread pool; the heavy part
+happens in the ffmpeg subprocesses.
+
+The stage never fails a transcription. If decoding fails, pydub is
+unavailable, or the result is not smaller, the original bytes are
+uploaded unchanged.
+"""
+
+import asyncio
+import io
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("ai_microservice")
+
+_ENABLED = os.getenv("WHISPER_AUDIO_PREP", "1") != "0"
+_WORKERS = int(os.getenv("AUDIO_PREP_WORKERS", str(min(4, os.cpu_count() or 1))))
+_BITRATE = os.getenv("WHISPER_AUDIO_BITRATE", "24k")
+# Smaller uploads are already compact; an ffmpeg round trip won't pay off.
+_MIN_BYTES = int(os.getenv("AUDIO_PREP_MIN_BYTES", str(32 * 1024)))
+
+TARGET_RATE = 16000
+FRAME_MS = 10
+# A frame is speech when it is within this many dB of the loudest
+# frame, and above an absolute floor for near-silent recordings.
+_GATE_BELOW_PEAK_DB = 35.0
+_GATE_FLOOR_DBFS = -60.0
+# Kept on both sides of the detected speech so onsets aren't clipped.
+_PAD_MS = 250
+
+_executor: Optional[ThreadPoolExecutor] = None
+_stats_lock = threading.Lock()
+_stats: Dict[str, float] = {
+    "prepared": 0,
+    "skipped": 0,
+    "failed": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+    "trimmed_ms": 0,
+}
+
+
+def speech_bounds(levels: List[float]) -> Optional[Tuple[int, int]]:
+    """[first, last] frame index whose level (dBFS) passes the gate,
+    or None when no frame does."""
+    finite = [level for level in levels if level != -math.inf]
+    if not finite:
+        return None
+    threshold = max(max(finite) - _GATE_BELOW_PEAK_DB, _GATE_FLOOR_DBFS)
+    voiced = [i for i, level in enumerate(levels) if level >= threshold]
+    if not voiced:
+        return None
+    return voiced[0], voiced[-1]
+
+
+def _prepare_blocking(data: bytes, filename: str) -> Tuple[bytes, str, int]:
+    """(encoded bytes, filename, trimmed ms) — runs on the pool."""
+    from pydub import AudioSegment
+
+    segment = AudioSegment.from_file(io.BytesIO(data))
+    segment = segment.set_channels(1).set_frame_rate(TARGET_RATE)
+    original_ms = len(segment)
+
+    levels = [segment[i:i + FRAME_MS].dBFS for i in range(0, original_ms, FRAME_MS)]
+    bounds = speech_bounds(levels)
+    if bounds is not None:
+        start = max(0, bounds[0] * FRAME_MS - _PAD_MS)
+        end = min(original_ms, (bounds[1] + 1) * FRAME_MS + _PAD_MS)
+        segment = segment[start:end]
+    # All silence: upload it untrimmed and let Whisper report no speech.
+
+    out = io.BytesIO()
+    segment.export(out, format="ogg", codec="libopus", bitrate=_BITRATE)
+    stem = (filename or "recording").rsplit(".", 1)[0]
+    return out.getvalue(), f"{stem}.ogg", original_ms - len(segment)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max(1, _WORKERS), thread_name_prefix="audio-prep")
+    return _executor
+
+
+def _count(**deltas: float) -> None:
+    with _stats_lock:
+        for key, value in deltas.items():
+            _stats[key] += value
+
+
+async def prepare_for_transcription(data: bytes, filename: str) -> Tuple[bytes, str]:
+    """The (bytes, filename) to upload for `data`."""
+    if not _ENABLED or len(data) < _MIN_BYTES:
+        _count(skipped=1)
+        return data, filename
+
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    try:
+        prepared, prepared_name, trimmed_ms = await loop.run_in_executor(
+            _get_executor(), _prepare_blocking, data, filename
+        )
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Audio pre-processing failed for %s, uploading as is: %s", filename, exc)
+        _count(failed=1)
+        return data, filename
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if not prepared or len(prepared) >= len(data):
+        logger.info(
+            "Audio pre-processing kept %s (%d bytes; re-encoded %d) in %.0f ms.",
+            filename, len(data), len(prepared), elapsed_ms,
+        )
+        _count(skipped=1)
+        return data, filename
+
+    logger.info(
+        "Whisper upload %s: %d -> %d bytes, %d ms silence trimmed, prep %.0f ms.",
+        filename, len(data), len(prepared), trimmed_ms, elapsed_ms,
+    )
+    _count(prepared=1, bytes_in=len(data), bytes_out=len(prepared), trimmed_ms=trimmed_ms)
+    return prepared, prepared_name
+
+
+def audio_prep_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stats)
+    stats["size_ratio"] = (stats["bytes_out"] / stats["bytes_in"]) if stats["bytes_in"] else None
+    return stats
+
+
+def shutdown_audio_prep_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,84 @@
+"""Fire-and-forget dispatcher for best-effort side effects.
+
+History rows, achievement bumps and XP updates don't change what the
+user gets back, so the request handler shouldn't wait on them. Handing
+them to `BackgroundDispatcher.submit` starts them concurrently and
+returns immediately. Tasks are tracked (so they can't be garbage
+collected mid-flight), concurrency is bounded, and the lifespan drains
+what's still running on shutdown.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Dict, Optional, Set
+
+logger = logging.getLogger("ai_microservice")
+
+_DEFAULT_CONCURRENCY = int(os.getenv("BACKGROUND_DISPATCH_CONCURRENCY", "16"))
+
+
+class BackgroundDispatcher:
+    def __init__(self, concurrency: int = _DEFAULT_CONCURRENCY) -> None:
+        self.concurrency = max(1, concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set["asyncio.Task[Any]"] = set()
+        self.submitted = 0
+        self.failed = 0
+
+    def _limiter(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running loop, not import time.
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    def submit(self, awaitable: Awaitable[Any], name: Optional[str] = None) -> "asyncio.Task[Any]":
+        """Schedule `awaitable` and return without waiting for it.
+        Exceptions are logged, never propagated."""
+        task = asyncio.ensure_future(self._run(awaitable, name))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.submitted += 1
+        return task
+
+    async def _run(self, awaitable: Awaitable[Any], name: Optional[str]) -> None:
+        async with self._limiter():
+            try:
+                await awaitable
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                self.failed += 1
+                logger.warning("background task %s failed: %s", name or "", exc)
+
+    async def drain(self, timeout: float = 10.0) -> None:
+        """Wait for in-flight tasks (shutdown); cancel stragglers."""
+        pending = set(self._tasks)
+        if not pending:
+            return
+        done, still_pending = await asyncio.wait(pending, timeout=timeout)
+        for task in still_pending:
+            task.cancel()
+        if still_pending:
+            logger.warning("Cancelled %d background task(s) at shutdown.", len(still_pending))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._tasks),
+            "concurrency": self.concurrency,
+            "submitted": self.submitted,
+            "failed": self.failed,
+        }
+
+
+_dispatcher: Optional[BackgroundDispatcher] = None
+
+
+def get_background_dispatcher() -> BackgroundDispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = BackgroundDispatcher()
+    return _dispatcher
@@ -0,0 +1,275 @@
+"""Shared (L2) cache backends for AI responses.
+
+The in-process `TTLCache` in ai_service is L1. With several AI replicas
+behind the gateway each one used to re-bill identical low-temperature
+prompts, so L1 misses now fall through to one of these before calling
+the provider:
+
+- ``memory`` — the in-process cache only (default; no L2).
+- ``sqlite`` — one on-disk file shared by every worker on the host.
+- ``redis``  — any Redis-protocol server, shared across hosts.
+
+Selected with ``AI_CACHE_BACKEND`` / ``AI_CACHE_URL``. Every backend is
+best-effort: an unreachable store degrades to a miss, never to a
+failed request.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+import redis.asyncio as aioredis
+from redis.backoff import NoBackoff
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import RedisError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+from redis.retry import Retry
+
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger("ai_microservice")
+
+_KEY_PREFIX = "ai_cache:"
+
+
+class CacheBackend(ABC):
+    """Async string key/value store with per-entry TTL."""
+
+    name = "abstract"
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None: ...
+
+    async def close(self) -> None:
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+    def _record(self, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Process-local backend over `TTLCache`. Useful in tests and as the
+    explicit "no shared cache" choice."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024) -> None:
+        super().__init__()
+        self._cache: TTLCache[str, str] = TTLCache("ai_l2_memory", ttl_seconds=600, max_bytes=max_bytes)
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._record(self._cache.get(key))
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        self._cache.put(key, value, ttl_seconds)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """On-disk backend for several workers on one host.
+
+    WAL mode lets readers in other processes proceed while one writes.
+    Calls run on a worker thread so disk I/O never blocks the loop.
+    """
+
+    name = "sqlite"
+    _PURGE_EVERY = 200
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ai_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ai_cache_expires ON ai_cache(expires_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _get_sync(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value FROM ai_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set_sync(self, key: str, value: str, ttl_seconds: float) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO ai_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl_seconds),
+            )
+            self._writes += 1
+            if self._writes % self._PURGE_EVERY == 0:
+                conn.execute("DELETE FROM ai_cache WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            return self._record(await asyncio.to_thread(self._get_sync, key))
+        except sqlite3.Error as exc:
+            self.errors += 1
+            logger.warning("sqlite cache read failed: %s", exc)
+            return None
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        try:
+            await asyncio.to_thread(self._set_sync, key, value, ttl_seconds)
+        except sqlite3.Error as exc:
+            self.errors += 1
+            logger.warning("sqlite cache write failed: %s", exc)
+
+    def _close_sync(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close_sync)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend on `redis.asyncio`, for any Redis-protocol server.
+
+    URL form: ``redis://[:password@]host[:port][/db]`` (``rediss://``
+    for TLS). After a connection failure the backend stays dark for
+    `retry_after_s` rather than paying a connect timeout on every
+    request.
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        url: str,
+        connect_timeout_s: float = 1.0,
+        command_timeout_s: float = 1.0,
+        retry_after_s: float = 30.0,
+    ) -> None:
+        super().__init__()
+        self.url = url
+        self.retry_after_s = retry_after_s
+        # RESP2 so servers without HELLO (Redis < 6, most compatibles)
+        # work too; no client-side retries, a miss is cheaper than a
+        # stalled request.
+        self._client = aioredis.from_url(
+            url,
+            protocol=2,
+            socket_connect_timeout=connect_timeout_s,
+            socket_timeout=command_timeout_s,
+            retry=Retry(NoBackoff(), 0),
+        )
+        self._down_until = 0.0
+
+    def _failed(self, command: str, exc: RedisError) -> None:
+        self.errors += 1
+        if isinstance(exc, (RedisConnectionError, RedisTimeoutError)):
+            self._down_until = time.monotonic() + self.retry_after_s
+            logger.warning(
+                "redis cache unreachable (%s); bypassing for %.0fs", exc, self.retry_after_s
+            )
+        else:
+            logger.warning("redis cache %s failed: %s", command, exc)
+
+    async def get(self, key: str) -> Optional[str]:
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            reply = await self._client.get(_KEY_PREFIX + key)
+        except RedisError as exc:
+            self._failed("GET", exc)
+            return None
+        return self._record(reply.decode("utf-8") if isinstance(reply, bytes) else None)
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        if time.monotonic() < self._down_until:
+            return
+        try:
+            await self._client.set(_KEY_PREFIX + key, value, px=max(1, int(ttl_seconds * 1000)))
+        except RedisError as exc:
+            self._failed("SET", exc)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["available"] = time.monotonic() >= self._down_until
+        return stats
+
+
+def build_cache_backend(kind: Optional[str] = None, url: Optional[str] = None) -> Optional[CacheBackend]:
+    """Backend named by `kind` (default ``AI_CACHE_BACKEND``), or None
+    for ``memory`` — L1 already is the in-memory tier."""
+    kind = (kind or os.getenv("AI_CACHE_BACKEND") or "memory").strip().lower()
+    url = url if url is not None else os.getenv("AI_CACHE_URL", "")
+    if kind in ("", "memory", "none"):
+        return None
+    if kind == "sqlite":
+        return SQLiteCacheBackend(url or "cache/ai_cache.sqlite3")
+    if kind == "redis":
+        return RedisCacheBackend(url or "redis://localhost:6379/0")
+    logger.warning("Unknown AI_CACHE_BACKEND=%r; using in-process cache only.", kind)
+    return None
+
+
+_shared_backend: Optional[CacheBackend] = None
+_shared_backend_built = False
+
+
+def get_shared_cache_backend() -> Optional[CacheBackend]:
+    global _shared_backend, _shared_backend_built
+    if not _shared_backend_built:
+        _shared_backend = build_cache_backend()
+        _shared_backend_built = True
+    return _shared_backend
+
+
+async def close_shared_cache_backend() -> None:
+    global _shared_backend, _shared_backend_built
+    if _shared_backend is not None:
+        await _shared_backend.close()
+    _shared_backend = None
+    _shared_backend_built = False
@@ -0,0 +1,144 @@
+"""Content-addressed on-disk cache of synthesised TTS clips.
+
+A clip is fully determined by its text, voice, language code and
+speaking rate, so `clip_key` hashes exactly those and the MP3 bytes are
+stored under that digest (sharded by its first two hex characters).
+Repeated phrases — "repeat_after_me" targets, greetings that open many
+dialogues — are then read from local disk instead of paying another
+Google TTS round trip.
+
+Hits refresh a file's mtime; when the directory grows past `max_bytes`
+the least recently used clips are deleted until it is back under 90%
+of the budget.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("ai_microservice")
+
+_DEFAULT_DIR = os.getenv("TTS_CLIP_CACHE_DIR", "data/tts_clips")
+_DEFAULT_MAX_BYTES = int(float(os.getenv("TTS_CLIP_CACHE_MAX_MB", "512")) * 1024 * 1024)
+
+
+def clip_key(text: str, voice_name: str, language_code: str, speaking_rate: float) -> str:
+    # Whitespace differences don't change the audio.
+    material = "\x1f".join(
+        (" ".join(text.split()), voice_name, language_code, f"{speaking_rate:.3f}", "mp3")
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ClipCache:
+    def __init__(self, root: str = _DEFAULT_DIR, max_bytes: int = _DEFAULT_MAX_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Bytes on disk; None until the first write scans the directory.
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".mp3")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+            # Under the lock, so two threads writing the same key can't
+            # both see it missing and count it twice.
+            with self._lock:
+                try:
+                    replaced = os.stat(path).st_size
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp, path)
+                if self._size is None:
+                    self._size = sum(size for _, size, _ in self._scan())
+                else:
+                    self._size += len(data) - replaced
+                over = self._size > self.max_bytes
+        except OSError as exc:
+            # A cache that can't write just stops caching.
+            logger.warning("TTS clip cache write failed: %s", exc)
+            return
+        if over:
+            self.prune()
+
+    def _scan(self) -> List[Tuple[float, int, str]]:
+        entries: List[Tuple[float, int, str]] = []
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                if not name.endswith(".mp3"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def prune(self) -> int:
+        """Delete least recently used clips until under 90% of the
+        budget. Returns how many were removed."""
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self._size = total
+            self.evicted += removed
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "evicted": self.evicted,
+        }
+
+
+_cache: Optional[ClipCache] = None
+
+
+def get_clip_cache() -> ClipCache:
+    global _cache
+    if _cache is None:
+        _cache = ClipCache()
+    return _cache
@@ -45,6 +45,8 @@ PDF_NO_TEXT = "PDF_NO_TEXT"
 PDF_GARBLED_TEXT = "PDF_GARBLED_TEXT"
 PDF_AI_REJECTED = "PDF_AI_REJECTED"
 FILE_PROCESSING_FAILED = "FILE_PROCESSING_FAILED"
+UPLOAD_JOB_NOT_FOUND = "UPLOAD_JOB_NOT_FOUND"
+UPLOAD_JOB_INTERRUPTED = "UPLOAD_JOB_INTERRUPTED"
 
 # ── Materials / Quiz ───────────────────────────────────────────────
 MATERIALS_NO_RELEVANT = "MATERIALS_NO_RELEVANT"
@@ -59,6 +61,10 @@ AI_BAD_GATEWAY = "AI_BAD_GATEWAY"
 AI_EMPTY_RESPONSE = "AI_EMPTY_RESPONSE"
 AI_RESPONSE_PARSE_FAILED = "AI_RESPONSE_PARSE_FAILED"
 
+# ── Listening ──────────────────────────────────────────────────────
+LISTENING_AUDIO_NOT_FOUND = "LISTENING_AUDIO_NOT_FOUND"
+LISTENING_AUDIO_FAILED = "LISTENING_AUDIO_FAILED"
+
 # ── Speaking / Whisper ─────────────────────────────────────────────
 SPEAKING_NO_AUDIO = "SPEAKING_NO_AUDIO"
 SPEAKING_GROQ_KEY_MISSING = "SPEAKING_GROQ_KEY_MISSING"
@@ -0,0 +1,179 @@
+"""Incremental parser for streamed LLM JSON output.
+
+Our generators answer with one JSON object whose interesting part is a
+top-level array (``{"transcript": ..., "questions": [ {...}, ... ]}``).
+`JsonStreamParser` is fed the completion text chunk by chunk and hands
+back each element of that array the moment its closing brace arrives,
+so a question can be validated and pushed to the client while the
+model is still writing the next one. It also records every other
+top-level field once its value is complete.
+
+Because elements are parsed one at a time, a truncated or malformed
+tail only loses the elements it touches; everything before it
+survives (`salvage_array` / `salvage_object` for already-complete
+strings).
+
+Only structure is tracked here (bracket depth and string state); each
+finished slice is handed to `json.loads`, so escaping and number
+formats follow the stdlib exactly. Text before the first ``{`` (e.g. a
+```json fence) is ignored.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("ai_microservice")
+
+_WHITESPACE = " \t\r\n"
+
+
+class JsonStreamParser:
+    def __init__(self, array_key: str = "questions") -> None:
+        self.array_key = array_key
+        # Completed top-level fields (the target array excluded).
+        self.fields: Dict[str, Any] = {}
+        # Elements that closed but failed json.loads.
+        self.malformed = 0
+        self._text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._started = False
+        self._finished = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._value_start = -1
+        self._in_target = False
+        self._element_start = -1
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return self._text
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume `chunk`; return array elements completed by it."""
+        self._text += chunk
+        completed: List[Any] = []
+        text = self._text
+        i = self._pos
+        n = len(text)
+        while i < n and not self._finished:
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1 and self._value_start < 0:
+                        self._last_string = text[self._string_start:i + 1]
+                i += 1
+                continue
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._stack.append("{")
+                i += 1
+                continue
+
+            depth = len(self._stack)
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+                self._mark_element_start(i, depth)
+            elif ch in "{[":
+                self._mark_element_start(i, depth)
+                if depth == 1 and ch == "[" and self._key == self.array_key:
+                    self._in_target = True
+                self._stack.append(ch)
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                new_depth = len(self._stack)
+                if self._in_target and new_depth == 2 and self._element_start >= 0:
+                    # Object/array element just closed.
+                    self._emit(text[self._element_start:i + 1], completed)
+                elif self._in_target and new_depth == 1:
+                    # The target array itself closed.
+                    self._close_element(text, i, completed)
+                    self._in_target = False
+                    self._value_start = -1
+                    self._key = None
+                elif new_depth == 0:
+                    self._close_field(text, i)
+                    self._finished = True
+            elif ch == ":" and depth == 1:
+                self._key = self._decode_key(self._last_string)
+                self._last_string = None
+                self._value_start = i + 1
+            elif ch == ",":
+                if self._in_target and depth == 2:
+                    self._close_element(text, i, completed)
+                elif depth == 1:
+                    self._close_field(text, i)
+            elif ch not in _WHITESPACE:
+                self._mark_element_start(i, depth)
+            i += 1
+        self._pos = i
+        return completed
+
+    def _mark_element_start(self, i: int, depth: int) -> None:
+        if self._in_target and depth == 2 and self._element_start < 0:
+            self._element_start = i
+
+    def _close_element(self, text: str, end: int, completed: List[Any]) -> None:
+        """Scalar element terminated by ``,`` or ``]``."""
+        if self._element_start >= 0:
+            self._emit(text[self._element_start:end], completed)
+
+    def _emit(self, raw: str, completed: List[Any]) -> None:
+        self._element_start = -1
+        raw = raw.strip()
+        if not raw:
+            return
+        try:
+            completed.append(json.loads(raw))
+        except json.JSONDecodeError as exc:
+            self.malformed += 1
+            logger.debug("Skipping malformed streamed element: %s", exc)
+
+    def _close_field(self, text: str, end: int) -> None:
+        if self._key is None or self._value_start < 0 or self._in_target:
+            return
+        raw = text[self._value_start:end].strip()
+        key, self._key, self._value_start = self._key, None, -1
+        if key == self.array_key or not raw:
+            return
+        try:
+            self.fields[key] = json.loads(raw)
+        except json.JSONDecodeError:
+            self.malformed += 1
+
+    @staticmethod
+    def _decode_key(raw: Optional[str]) -> Optional[str]:
+        if raw is None:
+            return None
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+        return value if isinstance(value, str) else None
+
+
+def salvage_array(text: str, array_key: str = "questions") -> List[Any]:
+    """Every well-formed element of `array_key` in a possibly broken
+    JSON document."""
+    return JsonStreamParser(array_key).feed(text)
+
+
+def salvage_object(text: str) -> Dict[str, Any]:
+    """Every complete top-level field of a possibly truncated object."""
+    parser = JsonStreamParser(array_key="")
+    parser.feed(text)
+    return parser.fields
@@ -0,0 +1,195 @@
+"""Word n-gram fingerprints for the verbatim-overlap check.
+
+Every n-word window of a text is reduced to one 64-bit polynomial
+rolling hash over stable per-word hashes, so a window costs one
+multiply-add instead of a tuple allocation. A document's fingerprints
+are kept as a sorted, de-duplicated `array('Q')` (8 bytes per n-gram)
+and probed with binary search.
+
+`NgramIndexStore` persists one fingerprint file per uploaded document
+(built once in `process_pdf`) and loads an owner's files on demand, so
+checking a generated passage is O(len(candidate) · log N) against the
+whole source instead of re-tokenising every retrieved chunk per
+candidate and per retry. Merged per-owner indexes are kept in a
+`TTLCache` capped at `NGRAM_CACHE_MAX_BYTES` of fingerprints, so only
+recently active owners stay resident.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.ttl_cache import TTLCache
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_MASK = (1 << 64) - 1
+# Odd 64-bit multiplier for the rolling hash.
+_BASE = 0x100000001B3
+
+_DEFAULT_DIR = os.getenv("NGRAM_INDEX_DIR", "data/ngram_index")
+_CACHE_TTL_S = float(os.getenv("NGRAM_CACHE_TTL_S", "900"))
+_CACHE_MAX_BYTES = int(os.getenv("NGRAM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def _word_hash(word: str, memo: Dict[str, int]) -> int:
+    h = memo.get(word)
+    if h is None:
+        # Stable across processes, unlike built-in hash().
+        h = int.from_bytes(
+            hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        memo[word] = h
+    return h
+
+
+def ngram_hashes(text: str, n: int) -> array:
+    """Rolling hashes of every n-word window of `text` (lowercased,
+    word characters only, so punctuation and spacing changes don't
+    hide a copied window)."""
+    words = _WORD_RE.findall(text.lower())
+    out = array("Q")
+    if len(words) < n:
+        return out
+    memo: Dict[str, int] = {}
+    hashes = [_word_hash(w, memo) for w in words]
+    top = pow(_BASE, n - 1, 1 << 64)
+    h = 0
+    for i in range(n):
+        h = (h * _BASE + hashes[i]) & _MASK
+    out.append(h)
+    for i in range(n, len(hashes)):
+        h = ((h - hashes[i - n] * top) * _BASE + hashes[i]) & _MASK
+        out.append(h)
+    return out
+
+
+class NgramIndex:
+    """Sorted, unique n-gram fingerprints of a text corpus."""
+
+    def __init__(self, n: int, values: Optional[array] = None) -> None:
+        self.n = n
+        self.values = values if values is not None else array("Q")
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str], n: int) -> "NgramIndex":
+        merged: set = set()
+        for text in texts:
+            merged.update(ngram_hashes(text, n))
+        return cls(n, array("Q", sorted(merged)))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, value: int) -> bool:
+        i = bisect_left(self.values, value)
+        return i < len(self.values) and self.values[i] == value
+
+    def overlaps(self, text: str) -> bool:
+        """True if any n-word window of `text` is in the index."""
+        if not self.values:
+            return False
+        return any(h in self for h in ngram_hashes(text, self.n))
+
+
+class NgramIndexStore:
+    """One fingerprint file per (owner, document) under `root`."""
+
+    def __init__(
+        self,
+        root: str = _DEFAULT_DIR,
+        n: int = 12,
+        cache_ttl_s: float = _CACHE_TTL_S,
+        cache_max_bytes: int = _CACHE_MAX_BYTES,
+    ) -> None:
+        self.root = root
+        self.n = n
+        # owner dir -> (mtime at load, merged index); sized by the
+        # fingerprints it holds, 8 bytes each.
+        self._loaded: TTLCache[str, Tuple[float, NgramIndex]] = TTLCache(
+            "ngram_index", cache_ttl_s, cache_max_bytes,
+            sizeof=lambda entry: len(entry[1].values) * 8,
+        )
+
+    def _owner_dir(self, owner_id: Optional[str]) -> str:
+        key = hashlib.sha1((owner_id or "").encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.root, key)
+
+    def _document_path(self, owner_id: Optional[str], source: str) -> str:
+        name = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16] + ".q"
+        return os.path.join(self._owner_dir(owner_id), name)
+
+    def _content_path(self, content_hash: str) -> str:
+        return os.path.join(self.root, "content", content_hash + ".q")
+
+    @staticmethod
+    def _write(path: str, values: array) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fh:
+            values.tofile(fh)
+        os.replace(tmp, path)
+
+    def save(
+        self,
+        owner_id: Optional[str],
+        source: str,
+        texts: Iterable[str],
+        content_hash: Optional[str] = None,
+    ) -> int:
+        """Fingerprint `texts` as document `source` of `owner_id`,
+        replacing an earlier upload of the same name. With
+        `content_hash`, a copy is also kept under the hash for `copy`.
+        Returns the number of distinct n-grams stored."""
+        index = NgramIndex.from_texts(texts, self.n)
+        # Directory mtime changes with the rename; load() picks it up.
+        self._write(self._document_path(owner_id, source), index.values)
+        if content_hash:
+            self._write(self._content_path(content_hash), index.values)
+        return len(index)
+
+    def copy(self, content_hash: str, owner_id: Optional[str], source: str) -> bool:
+        """Give `owner_id` the fingerprints of content someone else
+        uploaded first. Keyed by hash, not by the first uploader's
+        filename, which they may since have reused for another PDF.
+        False if there's nothing to copy."""
+        src = self._content_path(content_hash)
+        if not os.path.exists(src):
+            return False
+        path = self._document_path(owner_id, source)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, path)
+        return True
+
+    def load(self, owner_id: Optional[str]) -> NgramIndex:
+        """Merged index over every document of `owner_id` (empty if
+        they have none yet)."""
+        directory = self._owner_dir(owner_id)
+        try:
+            mtime = os.stat(directory).st_mtime
+        except FileNotFoundError:
+            return NgramIndex(self.n)
+        cached = self._loaded.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        parts: List[array] = []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".q"):
+                continue
+            values = array("Q")
+            path = os.path.join(directory, name)
+            with open(path, "rb") as fh:
+                values.frombytes(fh.read())
+            parts.append(values)
+        if len(parts) == 1:
+            merged = NgramIndex(self.n, parts[0])
+        else:
+            merged = NgramIndex(self.n, array("Q", sorted(set().union(*parts))))
+        self._loaded.put(directory, (mtime, merged))
+        return merged
+
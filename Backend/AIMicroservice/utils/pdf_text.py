@@ -0,0 +1,123 @@
+"""Helpers for the PDF ingestion path in MaterialService.
+
+Page extraction is pure-Python CPU work (pypdf) that holds the GIL, so
+large documents are split into page ranges and extracted in a process
+pool; each worker re-opens the PDF from the raw bytes and returns the
+text of its range. `StreamingChunker` lets the caller feed page text
+into the splitter as it arrives instead of concatenating the whole
+document first, and `non_text_share` replaces the per-character regex
+loop of the garbled-text check with a single compiled pass.
+"""
+
+import io
+import logging
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Protocol, Tuple
+
+logger = logging.getLogger("ai_microservice")
+
+_PDF_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Characters that count as "real text" for the garbled-PDF heuristic:
+# word characters, whitespace, basic punctuation.
+_TEXT_RUN_RE = re.compile(r"[\w\s.,;:!?\"'()\[\]{}\-—–‑/\\]+", re.UNICODE)
+
+_executor: Optional[Executor] = None
+
+
+def non_text_share(text: str) -> Tuple[int, int]:
+    """(non-text characters, total characters) of `text`. Stripping
+    every run of text characters in one `re.sub` leaves exactly the
+    characters the old per-character `re.match` loop counted."""
+    return len(_TEXT_RUN_RE.sub("", text)), len(text)
+
+
+def extract_page_range(content: bytes, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) — runs inside a pool worker."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(content))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def page_ranges(total: int, parts: int) -> List[Tuple[int, int]]:
+    """Split `total` pages into at most `parts` contiguous ranges."""
+    parts = max(1, min(parts, total))
+    size, extra = divmod(total, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def pdf_worker_count() -> int:
+    return max(1, _PDF_WORKERS)
+
+
+def get_pdf_executor() -> Executor:
+    """Shared pool for page extraction. Falls back to threads where
+    processes can't be spawned (some sandboxes)."""
+    global _executor
+    if _executor is None:
+        try:
+            _executor = ProcessPoolExecutor(max_workers=pdf_worker_count())
+        except (OSError, NotImplementedError) as exc:
+            logger.warning("Process pool unavailable (%s); extracting PDFs on threads.", exc)
+            _executor = ThreadPoolExecutor(max_workers=pdf_worker_count())
+    return _executor
+
+
+def shutdown_pdf_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+class TextSplitter(Protocol):
+    """What StreamingChunker needs from a langchain text splitter."""
+
+    def split_text(self, text: str) -> List[str]: ...
+
+
+class StreamingChunker:
+    """Feed text incrementally, get chunks out as they're final.
+
+    Text is buffered until it holds `flush_chars`, then split; every
+    chunk except the last is final, and the last one is carried over as
+    the start of the next buffer so chunk boundaries (and overlap) work
+    across page breaks just like splitting the whole document.
+    """
+
+    def __init__(self, splitter: TextSplitter, flush_chars: int = 20_000) -> None:
+        self.splitter = splitter
+        self.flush_chars = flush_chars
+        self._parts: List[str] = []
+        self._size = 0
+
+    def feed(self, text: str) -> List[str]:
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size < self.flush_chars:
+            return []
+        text = "".join(self._parts)
+        chunks = self.splitter.split_text(text)
+        if len(chunks) <= 1:
+            return []
+        # The splitter strips chunk edges; keep the trailing page break
+        # so the next page doesn't get glued onto the carried chunk.
+        carry = chunks[-1] + text[len(text.rstrip()):]
+        self._parts = [carry]
+        self._size = len(carry)
+        return chunks[:-1]
+
+    def finish(self) -> List[str]:
+        text = "".join(self._parts)
+        self._parts = []
+        self._size = 0
+        return self.splitter.split_text(text) if text.strip() else []
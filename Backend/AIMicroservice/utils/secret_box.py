@@ -0,0 +1,30 @@
+"""Authenticated encryption for secrets that sit in process memory.
+
+Cached provider keys shouldn't be readable as plain strings in a heap
+dump, a core file or a stray debug log of a cache entry. `SecretBox`
+seals them with a Fernet key (AES-128-CBC + HMAC-SHA256, from
+`cryptography`) that only exists in this process — generated at
+start-up, never persisted — so a sealed blob is useless outside it.
+"""
+
+from typing import Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+
+
+class SecretBox:
+    def __init__(self, key: Optional[bytes] = None) -> None:
+        """`key` is a Fernet key (urlsafe base64 of 32 random bytes);
+        a fresh one is generated when omitted."""
+        self._fernet = Fernet(key if key is not None else Fernet.generate_key())
+
+    def seal(self, plaintext: bytes) -> bytes:
+        return self._fernet.encrypt(plaintext)
+
+    def open(self, sealed: bytes) -> bytes:
+        """Decrypt `sealed`; raises ValueError if it was tampered with or
+        sealed by another box."""
+        try:
+            return self._fernet.decrypt(sealed)
+        except InvalidToken as exc:
+            raise ValueError("sealed value failed authentication") from exc
@@ -0,0 +1,130 @@
+"""Server-Sent Events plumbing for the streaming endpoint variants.
+
+A streaming endpoint wraps the same service call as its JSON sibling
+in `sse_response(...)`. The service gets an `emit(event, data)`
+callback; the controller-side wrapper turns every emitted item into an
+SSE frame, then finishes with either a ``result`` event (the exact
+payload the non-streaming endpoint would return) or an ``error`` event
+carrying the usual ``{code, message}`` body.
+
+Events:
+    delta     raw model text as it arrives ({"text": "..."})
+    question  one validated question, as soon as it is complete
+    result    the BaseResponse the JSON endpoint would have returned
+    error     {"status": int, "code": str, "message": str}
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger("ai_microservice")
+
+Emit = Callable[[str, object], Awaitable[None]]
+
+# Comment frame sent while waiting on the model so proxies don't time
+# out an idle connection before the first token.
+_HEARTBEAT_S = 15.0
+_DONE = object()
+
+
+def sse_frame(event: str, data: object, exclude_none: bool = False) -> str:
+    payload = json.dumps(jsonable_encoder(data, exclude_none=exclude_none), ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def delta_forwarder(emit: Emit) -> Callable[[str], Awaitable[None]]:
+    """`on_delta` callback for AI_Service that emits ``delta`` events."""
+
+    async def _on_delta(text: str) -> None:
+        await emit("delta", {"text": text})
+
+    return _on_delta
+
+
+def question_forwarder(emit: Emit) -> Callable[[object], Awaitable[None]]:
+    """`on_question` callback that emits ``question`` events."""
+
+    async def _on_question(question: object) -> None:
+        await emit("question", {"question": question})
+
+    return _on_question
+
+
+def _error_body(exc: BaseException) -> Dict[str, Any]:
+    if isinstance(exc, HTTPException):
+        detail = exc.detail
+        if isinstance(detail, dict):
+            return {
+                "status": exc.status_code,
+                "code": detail.get("code"),
+                "message": detail.get("message", ""),
+            }
+        return {"status": exc.status_code, "code": None, "message": str(detail)}
+    if isinstance(exc, ValueError):
+        return {"status": 400, "code": None, "message": str(exc)}
+    return {"status": 500, "code": None, "message": "Internal Server Error"}
+
+
+async def _event_stream(
+    job: Callable[[Emit], Awaitable[Any]],
+    exclude_none: bool,
+) -> AsyncIterator[str]:
+    queue: "asyncio.Queue[Tuple[str, object]]" = asyncio.Queue()
+
+    async def emit(event: str, data: object) -> None:
+        await queue.put((event, data))
+
+    async def run() -> None:
+        try:
+            await queue.put(("result", await job(emit)))
+        except Exception as exc:  # noqa: BLE001
+            if not isinstance(exc, HTTPException):
+                logger.exception("Streaming job failed: %s", exc)
+            await queue.put(("error", _error_body(exc)))
+        finally:
+            await queue.put(("", _DONE))
+
+    task = asyncio.create_task(run())
+    # Flush headers immediately — this is what gets time-to-first-byte
+    # under a second even when the model takes a while to start.
+    yield ": stream open\n\n"
+    try:
+        while True:
+            try:
+                event, data = await asyncio.wait_for(queue.get(), timeout=_HEARTBEAT_S)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if data is _DONE:
+                break
+            yield sse_frame(event, data, exclude_none=exclude_none and event == "result")
+    finally:
+        # Client went away mid-stream: stop generating for nobody.
+        if not task.done():
+            task.cancel()
+
+
+def sse_response(
+    job: Callable[[Emit], Awaitable[Any]],
+    exclude_none: bool = False,
+    headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """Run `job(emit)` and stream its events, then the BaseResponse it
+    returns as the ``result`` event. `exclude_none` mirrors the JSON
+    route's `response_model_exclude_none`."""
+    return StreamingResponse(
+        _event_stream(job, exclude_none),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # nginx: don't buffer the stream.
+            "X-Accel-Buffering": "no",
+            **(headers or {}),
+        },
+    )
@@ -0,0 +1,30 @@
+import os
+import re
+
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+# AssetStore layout: <kind>/<shard>/<sha256>.<ext>
+HASHED_PATH_RE = re.compile(r"^[a-z]+/([0-9a-f]{2})/(\1[0-9a-f]{62})\.[a-z0-9]+$")
+
+
+class AssetStaticFiles(StaticFiles):
+    """StaticFiles that marks content-addressed paths (see AssetStore)
+    immutable, with the digest from the file name as a strong ETag.
+    Everything else keeps Starlette's defaults."""
+
+    def file_response(
+        self,
+        full_path: "os.PathLike[str] | str",
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        rel = os.path.relpath(full_path, self.directory or ".").replace(os.sep, "/")
+        match = HASHED_PATH_RE.match(rel)
+        if match is not None:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+            response.headers["ETag"] = f'"{match.group(2)}"'
+        return response
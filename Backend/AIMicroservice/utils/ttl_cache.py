@@ -0,0 +1,196 @@
+"""Bounded in-process LRU cache with per-entry TTL and single-flight.
+
+Shared by the AI response cache, the speaking-analysis cache and the
+task-template lookups. Eviction is O(1) (OrderedDict LRU) and the cap
+is on approximate payload bytes rather than entry count, because a
+cached essay evaluation and a cached one-word translation differ in
+size by three orders of magnitude.
+
+`get_or_load` de-duplicates concurrent misses: while one coroutine is
+computing the value for a key, every other caller asking for the same
+key awaits that same result instead of starting its own (billed)
+provider call.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+logger = logging.getLogger("ai_microservice")
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# name -> cache, for the metrics endpoint. Weak so a cache owned by a
+# short-lived service instance (tests) doesn't linger.
+_registry: "weakref.WeakValueDictionary[str, TTLCache[Any, Any]]" = weakref.WeakValueDictionary()
+
+
+def approx_size(value: object) -> int:
+    """Rough payload size in bytes. Good enough for a memory cap; not an
+    exact accounting of Python object overhead."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    dump_json = getattr(value, "model_dump_json", None)
+    if callable(dump_json):
+        return len(dump_json())
+    if isinstance(value, (tuple, list)):
+        return sum(approx_size(v) for v in value)
+    if isinstance(value, dict):
+        return sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class TTLCache(Generic[K, V]):
+    """LRU + TTL cache capped at `max_bytes` of approximate payload.
+
+    Sync `get`/`put` are thread-safe (the vector-store caches are read
+    from worker threads). Single-flight bookkeeping in `get_or_load` is
+    per event loop, which is all this service ever runs.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        max_bytes: int,
+        sizeof: Callable[[V], int] = approx_size,
+    ) -> None:
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        # key -> (expires_at, size, value); order is LRU -> MRU.
+        self._entries: "OrderedDict[K, Tuple[float, int, V]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[K, "asyncio.Future[V]"] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        _registry[name] = self
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, size, value = entry
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V, ttl_seconds: Optional[float] = None) -> None:
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            # One oversized value would flush the whole cache; skip it.
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, key: K) -> bool:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._bytes -= entry[1]
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    async def get_or_load(
+        self,
+        key: K,
+        loader: Callable[[], Awaitable[V]],
+        should_cache: Optional[Callable[[V], bool]] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> V:
+        """Return the cached value for `key`, or run `loader` once and
+        share its result with every concurrent caller for that key.
+
+        The loader runs in its own task, so a caller that gets
+        cancelled (client disconnect) doesn't cancel the computation
+        the others are waiting on. Exceptions propagate to all waiters
+        and nothing is cached.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        async def _run() -> V:
+            try:
+                value = await loader()
+                if should_cache is None or should_cache(value):
+                    self.put(key, value, ttl_seconds)
+                return value
+            finally:
+                self._inflight.pop(key, None)
+
+        task: "asyncio.Future[V]" = asyncio.ensure_future(_run())
+        self._inflight[key] = task
+        # Nobody may await the task if every caller is cancelled;
+        # retrieve the exception so asyncio doesn't log it as unhandled.
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every live TTLCache, keyed by name."""
+    return {name: cache.stats() for name, cache in list(_registry.items())}
@@ -0,0 +1,20 @@
+import hashlib
+from typing import Tuple
+
+from fastapi import UploadFile
+
+_CHUNK_BYTES = 256 * 1024
+
+
+async def read_upload_with_digest(upload: UploadFile) -> Tuple[bytes, str]:
+    """Body of `upload` and its sha256 hex digest. Hashing each chunk as
+    it is read saves a second pass over the joined bytes."""
+    digest = hashlib.sha256()
+    chunks = []
+    while True:
+        chunk = await upload.read(_CHUNK_BYTES)
+        if not chunk:
+            break
+        digest.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks), digest.hexdigest()
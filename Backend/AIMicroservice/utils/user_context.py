@@ -1,3 +1,4 @@
+import hmac
 import logging
 import os
 from dataclasses import dataclass
@@ -80,6 +81,22 @@ def _verified_user_id_from_jwt(authorization: Optional[str]) -> Optional[str]:
     return sub if isinstance(sub, str) else None
 
 
+def require_internal_key(request: Request) -> None:
+    """403 unless the caller presents INTERNAL_SERVICE_KEY in
+    `X-Internal-Service-Key` — for endpoints only sibling services may
+    call, whatever JWT the request carries."""
+    from utils.error_codes import AUTH_INVALID_TOKEN, raise_with_code
+
+    provided = request.headers.get("x-internal-service-key") or ""
+    expected = os.environ.get("INTERNAL_SERVICE_KEY") or ""
+    if not expected or not hmac.compare_digest(provided.encode(), expected.encode()):
+        raise_with_code(
+            AUTH_INVALID_TOKEN,
+            status.HTTP_403_FORBIDDEN,
+            "Missing or invalid internal service key",
+        )
+
+
 def extract_user_context(request: Request) -> UserContext:
     from utils.error_codes import (
         AUTH_INVALID_TOKEN,
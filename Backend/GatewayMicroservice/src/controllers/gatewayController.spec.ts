@@ -1,4 +1,5 @@
 import { Request, Response } from "express";
+import { PassThrough } from "stream";
 import { Test, TestingModule } from "@nestjs/testing";
 
 import { GatewayController } from "./gatewayController";
@@ -65,6 +66,43 @@ describe("GatewayController", () => {
       expect(mockRes.json).toHaveBeenCalledWith({ success: true });
     });
 
+    it("should pipe streamed responses instead of sending JSON", async () => {
+      const mockReq = {
+        method: "POST",
+        url: "/api/gateway/ai/listening/stream",
+        headers: {},
+        body: {},
+      } as Request;
+      const mockRes = {
+        status: jest.fn().mockReturnThis(),
+        json: jest.fn(),
+        setHeader: jest.fn(),
+        flushHeaders: jest.fn(),
+        on: jest.fn(),
+      } as unknown as Response;
+      const upstream = new PassThrough();
+      const pipe = jest
+        .spyOn(upstream, "pipe")
+        .mockImplementation((destination) => destination);
+
+      gatewayService.handleRequest.mockResolvedValue({
+        status: 200,
+        data: {},
+        stream: upstream,
+      });
+
+      await controller.handleAuthRequests(mockReq, mockRes);
+
+      expect(mockRes.status).toHaveBeenCalledWith(200);
+      expect(mockRes.setHeader).toHaveBeenCalledWith(
+        "Content-Type",
+        "text/event-stream",
+      );
+      expect(mockRes.flushHeaders).toHaveBeenCalled();
+      expect(pipe).toHaveBeenCalledWith(mockRes);
+      expect(mockRes.json).not.toHaveBeenCalled();
+    });
+
     it("should handle service errors gracefully", async () => {
       const mockReq = {} as Request;
       const mockRes = {
@@ -24,6 +24,20 @@ export class GatewayController {
       if (response.setCookie && response.setCookie.length > 0) {
         res.setHeader("Set-Cookie", response.setCookie);
       }
+      if (response.stream) {
+        const upstream = response.stream;
+        res.status(response.status);
+        res.setHeader("Content-Type", "text/event-stream");
+        res.setHeader("Cache-Control", "no-cache");
+        // Keeps nginx (the frontend container) from buffering events.
+        res.setHeader("X-Accel-Buffering", "no");
+        res.flushHeaders();
+        // Client went away (or the stream ended): drop the upstream
+        // connection so the AI service sees the disconnect.
+        res.on("close", () => upstream.destroy());
+        upstream.pipe(res);
+        return;
+      }
       return res.status(response.status).json(response.data);
     } catch (error) {
       this.logger.error("Gateway controller error:", error);
@@ -4,6 +4,7 @@ import { of, throwError } from "rxjs";
 import { GatewayService } from "./gatewayService";
 import { HttpService } from "@nestjs/axios";
 import { IncomingMessage } from "http";
+import { Readable } from "stream";
 import { UnauthorizedException } from "@nestjs/common";
 
 jest.mock("src/consts", () => ({
@@ -303,5 +304,78 @@ describe("GatewayService", () => {
         }),
       );
     });
+
+    it("should pass event-stream responses through unbuffered", async () => {
+      (httpService.post as jest.Mock).mockReturnValue(of(mockAuthResponse));
+      const upstream = Readable.from(["event: delta\ndata: {}\n\n"]);
+      (httpService.request as jest.Mock).mockReturnValue(
+        of({
+          status: 200,
+          headers: { "content-type": "text/event-stream; charset=utf-8" },
+          data: upstream,
+        }),
+      );
+
+      const result = await service.handleRequest(
+        "POST",
+        "/api/gateway/ai/materials/quiz/stream",
+        mockHeaders,
+        {},
+        createMockReq(),
+      );
+
+      expect(httpService.request).toHaveBeenCalledWith(
+        expect.objectContaining({ responseType: "stream" }),
+      );
+      expect(result.status).toBe(200);
+      expect(result.stream).toBe(upstream);
+    });
+
+    it("should read JSON errors from stream routes into data", async () => {
+      (httpService.post as jest.Mock).mockReturnValue(of(mockAuthResponse));
+      (httpService.request as jest.Mock).mockReturnValue(
+        of({
+          status: 422,
+          headers: { "content-type": "application/json" },
+          data: Readable.from([
+            Buffer.from('{"success":false,"payload":{"message":"bad"}}'),
+          ]),
+        }),
+      );
+
+      const result = await service.handleRequest(
+        "POST",
+        "/api/gateway/ai/writing/essay/evaluate/stream",
+        mockHeaders,
+        {},
+        createMockReq(),
+      );
+
+      expect(result.status).toBe(422);
+      expect(result.stream).toBeUndefined();
+      expect(result.data).toEqual({
+        success: false,
+        payload: { message: "bad" },
+      });
+    });
+
+    it("should keep buffering regular JSON routes", async () => {
+      (httpService.post as jest.Mock).mockReturnValue(of(mockAuthResponse));
+      (httpService.request as jest.Mock).mockReturnValue(
+        of({ status: 200, data: { success: true } }),
+      );
+
+      await service.handleRequest(
+        "POST",
+        "/api/gateway/ai/materials/quiz",
+        mockHeaders,
+        {},
+        createMockReq(),
+      );
+
+      expect(httpService.request).toHaveBeenCalledWith(
+        expect.not.objectContaining({ responseType: "stream" }),
+      );
+    });
   });
 });
@@ -10,6 +10,7 @@ import { Injectable, Logger, UnauthorizedException } from "@nestjs/common";
 import { AuthenticatedUser } from "src/types";
 import { BaseResponse } from "src/types";
 import { HttpService } from "@nestjs/axios";
+import { Readable } from "stream";
 import { firstValueFrom } from "rxjs";
 
 /** Request body type - can be JSON object, string, or undefined */
@@ -21,6 +22,31 @@ interface GatewayResponse {
   data: BaseResponse<unknown> | Record<string, unknown>;
   /** Set-Cookie headers from the upstream service to forward verbatim. */
   setCookie?: string[];
+  /**
+   * Upstream `text/event-stream` body. When set, the controller pipes
+   * it to the client as it arrives and `data` is unused.
+   */
+  stream?: Readable;
+}
+
+/**
+ * Read a whole upstream body that was requested as a stream but came
+ * back as a regular response (e.g. a JSON 401/422/429 from an SSE
+ * route that failed before streaming started).
+ */
+async function readBufferedBody(
+  stream: Readable,
+): Promise<Record<string, unknown>> {
+  const chunks: Buffer[] = [];
+  for await (const chunk of stream) {
+    chunks.push(Buffer.isBuffer(chunk) ? chunk : Buffer.from(chunk));
+  }
+  const text = Buffer.concat(chunks).toString("utf8");
+  try {
+    return JSON.parse(text) as Record<string, unknown>;
+  } catch {
+    return { success: false, payload: { message: text } };
+  }
 }
 
 /**
@@ -122,6 +148,22 @@ export class GatewayService {
 
   constructor(private readonly httpService: HttpService) {}
 
+  /**
+   * SSE routes (`.../stream`, or any request asking for
+   * `text/event-stream`) are proxied as a stream. Buffering them in
+   * axios would hold every token back until the completion finished.
+   */
+  private isEventStreamRequest(
+    path: string,
+    headers: IncomingHttpHeaders,
+  ): boolean {
+    const accept = headers.accept || "";
+    return (
+      accept.includes("text/event-stream") ||
+      path.split("?")[0].endsWith("/stream")
+    );
+  }
+
   private async validateToken(
     headers: IncomingHttpHeaders,
   ): Promise<AuthenticatedUser> {
@@ -221,7 +263,10 @@ export class GatewayService {
       if (
         microservice === "ai" &&
         userData &&
-        this.AI_RATE_LIMITED_PREFIXES.some((p) => path.startsWith(p))
+        this.AI_RATE_LIMITED_PREFIXES.some((p) => path.startsWith(p)) &&
+        // Polling an upload job's progress is free; the upload that
+        // created it already paid for the quota.
+        !(method === "GET" && path.startsWith("materials/upload/jobs/"))
       ) {
         const quota = checkAndIncrementAiQuota(userData.id);
         if (!quota.ok) {
@@ -250,6 +295,7 @@ export class GatewayService {
       const isMultipart = contentType.includes("multipart/form-data");
 
       const dataToSend = isMultipart ? req : body;
+      const wantsStream = this.isEventStreamRequest(path, headers);
 
       try {
         const response = await firstValueFrom(
@@ -267,6 +313,7 @@ export class GatewayService {
               }),
             },
             data: dataToSend,
+            ...(wantsStream && { responseType: "stream" as const }),
             validateStatus: () => true,
             timeout: 200000,
             family: 4,
@@ -277,6 +324,17 @@ export class GatewayService {
           `Response from ${microservice} microservice: Status ${response.status}`,
         );
 
+        if (wantsStream) {
+          const upstream = response.data as Readable;
+          const upstreamType = String(
+            response.headers?.["content-type"] ?? "",
+          );
+          if (upstreamType.includes("text/event-stream")) {
+            return { status: response.status, data: {}, stream: upstream };
+          }
+          response.data = await readBufferedBody(upstream);
+        }
+
         // Pass Set-Cookie through verbatim so Auth's httpOnly refresh
         // cookie reaches the browser. Without this, /auth/login
         // succeeds upstream but the browser never gets the cookie and
@@ -1,5 +1,5 @@
 import { CreateUserAITokenDto } from "../dtos/createUserAIToken.dto";
-import { Injectable } from "@nestjs/common";
+import { Injectable, Logger } from "@nestjs/common";
 import { PrismaService } from "prisma/prismaService";
 import {
   decryptSecret,
@@ -9,8 +9,26 @@ import {
 
 @Injectable()
 export class UserAITokensService {
+  private readonly logger = new Logger(UserAITokensService.name);
+
   constructor(private readonly prisma: PrismaService) {}
 
+  /** Tell the AI service to drop its cached copy of this user's
+   *  tokens. Best effort: that cache has a short TTL, so a missed
+   *  call only delays the change. No-op when AI_MICROSERVICE_URL is
+   *  not configured. */
+  private notifyTokensChanged(userId: string): void {
+    const baseUrl = process.env.AI_MICROSERVICE_URL;
+    const internalKey = process.env.INTERNAL_SERVICE_KEY;
+    if (!baseUrl || !internalKey) return;
+    fetch(`${baseUrl.replace(/\/$/, "")}/ai-tokens/invalidate`, {
+      method: "POST",
+      headers: { "x-internal-service-key": internalKey, "x-user-id": userId },
+    }).catch((err) =>
+      this.logger.warn(`AI token cache invalidation failed: ${err}`),
+    );
+  }
+
   /** Decrypt the stored envelope to its plaintext token. Rows still
    *  in plaintext from before encrypt-at-rest landed are detected via
    *  `looksEncrypted` and passed through, so the service keeps working
@@ -42,6 +60,7 @@ export class UserAITokensService {
       });
     });
 
+    this.notifyTokensChanged(userId);
     return {
       ...createdToken,
       token: this.maskToken(createUserAITokenDto.token),
@@ -105,6 +124,7 @@ export class UserAITokensService {
       },
     });
 
+    this.notifyTokensChanged(userId);
     return {
       ...deletedToken,
       token: this.maskToken(this.readPlaintext(deletedToken.token)),
@@ -134,6 +154,7 @@ export class UserAITokensService {
     });
 
     if (!updatedToken) return null;
+    this.notifyTokensChanged(userId);
 
     return {
       ...updatedToken,
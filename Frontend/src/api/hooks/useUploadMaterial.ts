@@ -1,9 +1,21 @@
+import { useState } from "react";
 import { useMutation } from "@tanstack/react-query";
-import { uploadMaterial } from "../mutations/uploadMaterial";
+import {
+  uploadMaterial,
+  UploadJobStatus,
+} from "../mutations/uploadMaterial";
 
+/**
+ * `progress` is the latest status of the background ingestion job
+ * (stage + completion in [0, 1]); null until the upload is accepted.
+ */
 export const useUploadMaterial = () => {
-  return useMutation({
-    mutationFn: uploadMaterial,
+  const [progress, setProgress] = useState<UploadJobStatus | null>(null);
+  const mutation = useMutation({
+    mutationFn: (file: File) => {
+      setProgress(null);
+      return uploadMaterial(file, setProgress);
+    },
   });
+  return { ...mutation, progress };
 };
-
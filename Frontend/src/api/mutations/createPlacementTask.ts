@@ -11,6 +11,9 @@ export interface CreatePlacementTaskRequest {
   previousAnswer?: {
     isCorrect: boolean;
     questionNumber: number;
+    taskId?: string;
+    /** The answer given; the item bank scores it server-side. */
+    answer?: string;
   };
 }
 
@@ -102,6 +102,11 @@ export interface GenerateQuizParams {
    * when omitted, the backend re-derives the map from indexed material.
    */
   documentMap?: DocumentMap;
+  /**
+   * `document_id` from /materials/upload. Lets the backend load the
+   * stored map itself when `documentMap` isn't sent.
+   */
+  documentId?: string;
 }
 
 export const generateQuiz = async (
@@ -118,6 +123,7 @@ export const generateQuiz = async (
         selected_types: params.selectedTypes,
         target_language: params.targetLanguage,
         document_map: params.documentMap,
+        document_id: params.documentId,
       }),
     },
   );
@@ -1,5 +1,5 @@
 import { AI_MICROSERVICE_URL } from "../consts";
-import { ApiError } from "../extractApiError";
+import { ApiError, asApiError } from "../extractApiError";
 import { fetchWithAuth } from "../fetchWithAuth";
 import { parseApiPayload } from "../parseApiResponse";
 
@@ -38,6 +38,8 @@ interface UploadMaterialResponse {
   templates_extracted?: number;
   analyzed_types?: AnalyzedType[];
   document_map?: DocumentMap | null;
+  /** Server-side id of the stored document_map (see generateQuiz). */
+  document_id?: string | null;
 }
 
 /**
@@ -48,22 +50,73 @@ interface UploadMaterialResponse {
  */
 export { ApiError as UploadMaterialError };
 
+/**
+ * Mirrors `UploadJobStatus` in
+ * Backend/AIMicroservice/models/dtos/material_dtos.py.
+ */
+export interface UploadJobStatus {
+  job_id: string;
+  filename: string;
+  status: "queued" | "running" | "done" | "failed";
+  /** extracting | embedding | analyzing, while running */
+  stage?: string | null;
+  /** Overall completion in [0, 1]. */
+  progress: number;
+  result?: UploadMaterialResponse | null;
+  error?: { code?: string; message?: string } | null;
+}
+
+export type UploadProgressListener = (job: UploadJobStatus) => void;
+
+const UPLOAD_POLL_INTERVAL_MS = 1000;
+
+const wait = (ms: number) =>
+  new Promise<void>((resolve) => setTimeout(resolve, ms));
+
+/**
+ * Upload a PDF through the background job endpoints: the POST returns
+ * a job id straight away (ingesting a large textbook takes minutes and
+ * used to hold a gateway connection open the whole time), then the job
+ * is polled until it finishes. `onProgress` sees every status update.
+ */
 export const uploadMaterial = async (
   file: File,
+  onProgress?: UploadProgressListener,
 ): Promise<UploadMaterialResponse> => {
   const formData = new FormData();
   formData.append("file", file);
 
   const response = await fetchWithAuth(
-    `${AI_MICROSERVICE_URL}/materials/upload`,
+    `${AI_MICROSERVICE_URL}/materials/upload/jobs`,
     {
       method: "POST",
       body: formData,
     },
   );
-
-  return parseApiPayload<UploadMaterialResponse>(
+  let job = await parseApiPayload<UploadJobStatus>(
     response,
     "Failed to upload material",
   );
+
+  for (;;) {
+    onProgress?.(job);
+    if (job.status === "done" && job.result) {
+      return job.result;
+    }
+    if (job.status === "failed" || job.status === "done") {
+      throw asApiError(
+        { detail: job.error ?? undefined },
+        "Failed to upload material",
+      );
+    }
+    await wait(UPLOAD_POLL_INTERVAL_MS);
+    const poll = await fetchWithAuth(
+      `${AI_MICROSERVICE_URL}/materials/upload/jobs/${encodeURIComponent(job.job_id)}`,
+      { method: "GET" },
+    );
+    job = await parseApiPayload<UploadJobStatus>(
+      poll,
+      "Failed to upload material",
+    );
+  }
 };
@@ -191,6 +191,15 @@ const en = {
       showAnswer: "Show Answer",
       correctAnswerLabel: "Correct Answer:",
       analyzingDocument: "Analyzing Document...",
+      uploadStage: {
+        queued: "Waiting to start...",
+        running: "Processing...",
+        extracting: "Extracting text...",
+        embedding: "Indexing content...",
+        analyzing: "Detecting exercise types...",
+        done: "Done",
+        failed: "Failed",
+      },
       recordOrUpload: "Record or Upload Audio",
       stopRecording: "Stop Recording",
       startRecording: "Start Recording",
@@ -808,7 +817,11 @@ const en = {
         PDF_GARBLED_TEXT: "The PDF's text came out as gibberish. Usually a scanned document or a custom embedded font. Try another file or run OCR.",
         PDF_AI_REJECTED: "The AI couldn't extract anything useful from this PDF. Try a cleaner or longer document.",
         FILE_PROCESSING_FAILED: "We couldn't process this file. Try a different one.",
+        UPLOAD_JOB_NOT_FOUND: "This upload has expired or doesn't exist. Please upload the file again.",
+        UPLOAD_JOB_INTERRUPTED: "Processing of this upload was interrupted. Please upload the file again.",
         MATERIALS_NO_RELEVANT: "Couldn't generate a quiz from this PDF — there isn't enough relevant content.",
+        LISTENING_AUDIO_NOT_FOUND: "This recording has expired. Please generate a new listening task.",
+        LISTENING_AUDIO_FAILED: "We couldn't generate the audio for this task. Please try again.",
         AI_PROVIDER_UNSUPPORTED: "This AI provider isn't supported.",
         AI_API_KEY_MISSING: "No AI API key set for this provider. Add one in Settings → AI Tokens.",
         AI_AUTH_FAILED: "Your AI API key was rejected. Re-check it in Settings → AI Tokens.",
@@ -1055,6 +1068,15 @@ const pl = {
       showAnswer: "Pokaż odpowiedź",
       correctAnswerLabel: "Prawidłowa odpowiedź:",
       analyzingDocument: "Analizowanie dokumentu...",
+      uploadStage: {
+        queued: "Oczekiwanie na rozpoczęcie...",
+        running: "Przetwarzanie...",
+        extracting: "Wyodrębnianie tekstu...",
+        embedding: "Indeksowanie treści...",
+        analyzing: "Wykrywanie typów ćwiczeń...",
+        done: "Gotowe",
+        failed: "Niepowodzenie",
+      },
       recordOrUpload: "Nagraj lub prześlij audio",
       stopRecording: "Zatrzymaj nagrywanie",
       startRecording: "Rozpocznij nagrywanie",
@@ -1665,7 +1687,11 @@ const pl = {
         PDF_GARBLED_TEXT: "Tekst PDF-a wyszedł jako bełkot. Zazwyczaj skan albo wbudowana niestandardowa czcionka. Spróbuj innego pliku lub OCR.",
         PDF_AI_REJECTED: "AI nie potrafił wyciągnąć z tego PDF nic sensownego. Spróbuj czystszego lub dłuższego dokumentu.",
         FILE_PROCESSING_FAILED: "Nie udało się przetworzyć tego pliku. Spróbuj innego.",
+        UPLOAD_JOB_NOT_FOUND: "To przesyłanie wygasło lub nie istnieje. Prześlij plik ponownie.",
+        UPLOAD_JOB_INTERRUPTED: "Przetwarzanie tego pliku zostało przerwane. Prześlij plik ponownie.",
         MATERIALS_NO_RELEVANT: "Nie udało się wygenerować quizu z tego PDF — za mało istotnych treści.",
+        LISTENING_AUDIO_NOT_FOUND: "To nagranie wygasło. Wygeneruj nowe zadanie ze słuchania.",
+        LISTENING_AUDIO_FAILED: "Nie udało się wygenerować nagrania do tego zadania. Spróbuj ponownie.",
         AI_PROVIDER_UNSUPPORTED: "Ten dostawca AI nie jest obsługiwany.",
         AI_API_KEY_MISSING: "Brak klucza API dla tego dostawcy. Dodaj w Ustawienia → Tokeny AI.",
         AI_AUTH_FAILED: "Twój klucz API został odrzucony. Sprawdź go w Ustawienia → Tokeny AI.",
@@ -1912,6 +1938,15 @@ const es = {
       showAnswer: "Mostrar respuesta",
       correctAnswerLabel: "Respuesta correcta:",
       analyzingDocument: "Analizando documento...",
+      uploadStage: {
+        queued: "Esperando para comenzar...",
+        running: "Procesando...",
+        extracting: "Extrayendo texto...",
+        embedding: "Indexando contenido...",
+        analyzing: "Detectando tipos de ejercicios...",
+        done: "Listo",
+        failed: "Error",
+      },
       recordOrUpload: "Grabar o subir audio",
       stopRecording: "Detener grabación",
       startRecording: "Iniciar grabación",
@@ -2520,7 +2555,11 @@ const es = {
         PDF_GARBLED_TEXT: "El texto del PDF salió ilegible. Suele ocurrir con escaneos o fuentes personalizadas. Prueba con otro archivo o OCR.",
         PDF_AI_REJECTED: "La IA no pudo extraer nada útil de este PDF. Prueba un documento más limpio o más largo.",
         FILE_PROCESSING_FAILED: "No pudimos procesar este archivo. Prueba con otro.",
+        UPLOAD_JOB_NOT_FOUND: "Esta subida ha caducado o no existe. Vuelve a subir el archivo.",
+        UPLOAD_JOB_INTERRUPTED: "El procesamiento de esta subida se interrumpió. Vuelve a subir el archivo.",
         MATERIALS_NO_RELEVANT: "No se pudo generar un cuestionario de este PDF — no hay suficiente contenido relevante.",
+        LISTENING_AUDIO_NOT_FOUND: "Esta grabación ha caducado. Genera una nueva tarea de comprensión auditiva.",
+        LISTENING_AUDIO_FAILED: "No se pudo generar el audio de esta tarea. Inténtalo de nuevo.",
         AI_PROVIDER_UNSUPPORTED: "Este proveedor de IA no está soportado.",
         AI_API_KEY_MISSING: "No hay clave API para este proveedor. Añádela en Configuración → Tokens AI.",
         AI_AUTH_FAILED: "Tu clave API fue rechazada. Revísala en Configuración → Tokens AI.",
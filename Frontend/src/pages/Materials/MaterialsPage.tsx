@@ -86,7 +86,7 @@ export const MaterialsPage: React.FC = () => {
   const [userAnswers, setUserAnswers] = useState<Record<number, UserAnswerValue>>({});
   const [isSubmitted, setIsSubmitted] = useState(false);
   
-  const { mutate: upload, isPending: isUploading, error: uploadError, reset: resetUpload } = useUploadMaterial();
+  const { mutate: upload, isPending: isUploading, error: uploadError, reset: resetUpload, progress: uploadProgress } = useUploadMaterial();
   const { mutate: generateQuizMutation, isPending: isGeneratingQuiz, error: quizError, reset: resetQuiz } = useGenerateQuiz();
   const { mutate: saveMaterial } = useSaveMaterial();
   const { data: userMaterials, isLoading: isMaterialsLoading } = useGetUserMaterials();
@@ -233,6 +233,21 @@ export const MaterialsPage: React.FC = () => {
                         </div>
                       )}
 
+                      {isUploading && uploadProgress && (
+                        <div className="mt-6">
+                          <div className="flex justify-between text-sm text-gray-500 dark:text-gray-400 mb-1.5">
+                            <span>{t(`tasks.uploadStage.${uploadProgress.stage ?? uploadProgress.status}`)}</span>
+                            <span>{Math.round(uploadProgress.progress * 100)}%</span>
+                          </div>
+                          <div className="h-2 bg-gray-100 dark:bg-gray-700 rounded-full overflow-hidden">
+                            <div
+                              className="h-full rounded-full bg-indigo-500 transition-all duration-500"
+                              style={{ width: `${Math.round(uploadProgress.progress * 100)}%` }}
+                            />
+                          </div>
+                        </div>
+                      )}
+
                       <div className="mt-6 flex justify-end">
                         <Button
                           onClick={handleUpload}
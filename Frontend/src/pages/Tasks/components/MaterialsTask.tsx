@@ -33,6 +33,7 @@ const MaterialsTask = () => {
   // /materials/quiz so the backend can skip re-classification and
   // drive Stage 2/3 from the same exercises the user picked types from.
   const [documentMap, setDocumentMap] = useState<DocumentMap | null>(null);
+  const [documentId, setDocumentId] = useState<string | null>(null);
   const [quiz, setQuiz] = useState<QuizQuestion[]>([]);
   const [quizError, setQuizError] = useState<string | null>(null);
   // Per-question user answer. Shape varies by question type (string,
@@ -54,7 +55,7 @@ const MaterialsTask = () => {
     ? availableLanguages?.find((lang) => lang.id === startedLearningLink.languageId)?.name
     : undefined;
 
-  const { mutate: upload, isPending: isUploading, error: uploadError } = useUploadMaterial();
+  const { mutate: upload, isPending: isUploading, error: uploadError, progress: uploadProgress } = useUploadMaterial();
   const localizeError = useLocalizedError();
   const { mutate: generateQuizMutation, isPending: isGeneratingQuiz } = useGenerateQuiz();
   const { mutate: saveMaterial } = useSaveMaterial();
@@ -84,6 +85,7 @@ const MaterialsTask = () => {
         // classification call. Null when the response didn't include
         // one (older backend / parser fallback path).
         setDocumentMap(data.document_map ?? null);
+        setDocumentId(data.document_id ?? null);
         setView("ready");
 
         saveMaterial({
@@ -108,6 +110,7 @@ const MaterialsTask = () => {
       selectedTypes,
       targetLanguage,
       documentMap: documentMap ?? undefined,
+      documentId: documentId ?? undefined,
     }, {
       onSuccess: (data) => {
         const payload = data.quiz;
@@ -163,6 +166,7 @@ const MaterialsTask = () => {
     setAnalyzedTypes([]);
     setSelectedTypes([]);
     setDocumentMap(null);
+    setDocumentId(null);
     setQuiz([]);
     setQuizError(null);
     setUserAnswers({});
@@ -453,6 +457,22 @@ const MaterialsTask = () => {
         </Button>
       )}
 
+      {/* Upload job progress */}
+      {view === "upload" && isUploading && uploadProgress && (
+        <div>
+          <div className="flex justify-between text-sm text-gray-500 dark:text-gray-400 mb-1.5">
+            <span>{t(`tasks.uploadStage.${uploadProgress.stage ?? uploadProgress.status}`)}</span>
+            <span>{Math.round(uploadProgress.progress * 100)}%</span>
+          </div>
+          <div className="h-3 bg-gray-100 dark:bg-gray-700 rounded-full overflow-hidden">
+            <div
+              className="h-full rounded-full bg-gradient-to-r from-rose-500 to-orange-500 transition-all duration-500"
+              style={{ width: `${Math.round(uploadProgress.progress * 100)}%` }}
+            />
+          </div>
+        </div>
+      )}
+
       {/* Ready Section - Task Types Selection */}
       {view === "ready" && (
         <div className="space-y-6">
@@ -73,6 +73,8 @@ export const PlacementTaskContainer = () => {
                 ? {
                     isCorrect: lastAnswer.isCorrect,
                     questionNumber: lastAnswer.questionNumber,
+                    taskId: lastAnswer.taskId,
+                    answer: lastAnswer.userAnswer,
                   }
                 : undefined,
             });
@@ -112,7 +114,8 @@ export const PlacementTaskContainer = () => {
       {
         ...placementAnswer,
         questionNumber: currentQuestionNumber,
-        question: currentTask.question
+        question: currentTask.question,
+        taskId: currentTask.id,
       },
       currentTask
     );
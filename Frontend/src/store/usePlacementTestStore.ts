@@ -12,6 +12,7 @@ export interface UserAnswer {
   isCorrect: boolean;
   userAnswer: string;
   question: string;
+  taskId?: string;
 }
 
 type Task = MultipleChoiceTask | FillInTheBlankTask;